@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import contextlib
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .client_manager import TelegramClientManager
+from .config_store import ConfigStore
+from .request_governor import PRIMARY_ACCOUNT, account_scope, governor
+from .time_utils import now_shanghai_iso
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+
+
+ACCOUNT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+# 会话写入时表示主会话与账号池全部账号的名称（不会与账号名冲突），用于备份恢复等整体替换 session/ 的操作。
+ALL_SESSIONS = "*"
+
+
+def account_session_names(config_store: ConfigStore) -> List[str]:
+    """账号池中的账号：session/accounts/ 下每个 <名称>.session 文件一个，不含主会话 t2rss.session。"""
+    if not config_store.account_session_dir.exists():
+        return []
+    return sorted(
+        path.stem
+        for path in config_store.account_session_dir.glob("*.session")
+        if path.is_file() and ACCOUNT_NAME_PATTERN.match(path.stem)
+    )
+
+
+def _can_post(entity) -> bool:
+    from telethon.tl.types import Channel
+
+    if isinstance(entity, Channel):
+        if entity.broadcast:
+            return bool(entity.creator or (entity.admin_rights and entity.admin_rights.post_messages))
+        return not entity.left
+    return True
+
+
+def assign_shards(
+    channel_ids: Iterable[int],
+    access: Dict[str, Set[int]],
+    weights: Dict[int, float],
+    previous: Dict[int, str],
+    limited: Set[str],
+) -> Dict[int, str]:
+    """按负载把来源分给可访问它的账号（主账号可访问全部来源）。
+
+    权重大的来源先分配；原归属账号的负载不超过当前最低负载加上该来源权重时保持不变，避免每次运行都换账号。
+    受限（FloodWait 中）的账号不参与分配，可访问账号全部受限时才退回原有候选。
+    """
+    load: Dict[str, float] = {PRIMARY_ACCOUNT: 0.0, **{name: 0.0 for name in access}}
+    assignment: Dict[int, str] = {}
+    for channel_id in sorted(channel_ids, key=lambda cid: (-weights.get(cid, 1.0), cid)):
+        capable = [PRIMARY_ACCOUNT, *(name for name, ids in sorted(access.items()) if channel_id in ids)]
+        candidates = [name for name in capable if name not in limited] or capable
+        weight = weights.get(channel_id, 1.0)
+        chosen = min(candidates, key=lambda name: (load[name], name))
+        owner = previous.get(channel_id)
+        if owner in candidates and load[owner] <= load[chosen] + weight:
+            chosen = owner
+        assignment[channel_id] = chosen
+        load[chosen] += weight
+    return assignment
+
+
+@dataclass
+class PoolAccount:
+    """一次运行中租到的账号：可访问的来源频道，以及可发帖时目标频道的 InputPeer（不可发帖时为 None）。"""
+
+    name: str
+    client: TelegramClient
+    channel_ids: Set[int]
+    destination: Any = None
+
+
+class SendRotation:
+    """发送账号轮转：按顺序轮流使用，跳过仍在 FloodWait 等待期的账号；全部受限时选剩余等待最短的。"""
+
+    def __init__(self, senders: List[Tuple[str, TelegramClient, Any]]):
+        self.senders = senders
+        self._turn = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.senders)
+
+    @property
+    def available_count(self) -> int:
+        """当前不在 FloodWait 等待期的发送账号数，至少为 1（全部受限时按单账号节奏发送）。"""
+        return max(1, sum(1 for sender in self.senders if governor.flood_wait_remaining(sender[0], "send") <= 0))
+
+    def next(self) -> Tuple[str, TelegramClient, Any]:
+        for offset in range(len(self.senders)):
+            sender = self.senders[(self._turn + offset) % len(self.senders)]
+            if governor.flood_wait_remaining(sender[0], "send") <= 0:
+                self._turn = (self._turn + offset + 1) % len(self.senders)
+                return sender
+        return min(self.senders, key=lambda sender: governor.flood_wait_remaining(sender[0], "send"))
+
+
+class AccountPool:
+    """多账号池：主会话之外，session/accounts/ 下每个已授权会话是一个账号，各自保持一个共享客户端。
+
+    常规运行时来源按账号分片拉取，发送在可向目标频道发帖的账号间轮转；限速与 FloodWait 退避按账号独立计算，
+    账号受限时其分片在下次分配时转给其他可访问该来源的账号。实时转发与历史回填仍只使用主会话。
+    """
+
+    def __init__(self, config_store: ConfigStore, logger):
+        self.config_store = config_store
+        self.logger = logger
+        self._managers: Dict[str, TelegramClientManager] = {}
+        self._health: Dict[str, Dict[str, Any]] = {}
+        self._dialogs_loaded: Set[str] = set()
+        self._destinations: Dict[Tuple[str, str], Any] = {}
+        self.shard_map: Dict[int, str] = {}
+
+    def account_names(self) -> List[str]:
+        return account_session_names(self.config_store)
+
+    def _manager(self, name: str) -> TelegramClientManager:
+        manager = self._managers.get(name)
+        if manager is None:
+            manager = TelegramClientManager(self.config_store, self.logger, self.config_store.account_session_dir / name)
+            self._managers[name] = manager
+        return manager
+
+    @contextlib.asynccontextmanager
+    async def session_write(self, name: str):
+        """替换或删除某个账号的会话文件期间持有，并丢弃该账号已缓存的对话与目标频道信息。"""
+        self._dialogs_loaded.discard(name)
+        self._destinations = {key: value for key, value in self._destinations.items() if key[0] != name}
+        self._health.pop(name, None)
+        async with self._manager(name).session_write():
+            yield
+
+    @contextlib.asynccontextmanager
+    async def session_write_all(self):
+        """替换整个 session/accounts/ 期间持有：对现有账号与已创建客户端的账号逐一持有会话写入。"""
+        async with contextlib.AsyncExitStack() as stack:
+            for name in sorted(set(self.account_names()) | set(self._managers)):
+                await stack.enter_async_context(self.session_write(name))
+            yield
+
+    async def close(self) -> None:
+        for manager in self._managers.values():
+            await manager.close()
+
+    @contextlib.asynccontextmanager
+    async def lease(self, source_channel_ids: List[int], destination_channel: str):
+        """租用账号池中所有可用账号；无法连接或未授权的账号记录错误后跳过。"""
+        async with contextlib.AsyncExitStack() as stack:
+            accounts: List[PoolAccount] = []
+            for name in self.account_names():
+                try:
+                    client = await stack.enter_async_context(self._manager(name).lease())
+                    with account_scope(name):
+                        account = await self._inspect(name, client, source_channel_ids, destination_channel)
+                except Exception as exc:
+                    self.logger.warning("👥 账号 %s 不可用，本次运行跳过: %s", name, exc)
+                    self._health[name] = {"ok": False, "last_error": str(exc), "checked_at": now_shanghai_iso()}
+                    continue
+
+                health = self._health.setdefault(name, {})
+                health.update(
+                    {
+                        "ok": True,
+                        "last_error": "",
+                        "checked_at": now_shanghai_iso(),
+                        "source_count": len(account.channel_ids),
+                        "can_send": account.destination is not None,
+                    }
+                )
+                accounts.append(account)
+            yield accounts
+
+    async def _inspect(
+        self,
+        name: str,
+        client: TelegramClient,
+        source_channel_ids: List[int],
+        destination_channel: str,
+    ) -> PoolAccount:
+        from telethon.utils import get_input_peer
+
+        if name not in self._dialogs_loaded:
+            # 会话缓存中可能还没有来源频道的 access_hash，首次使用时遍历一次对话列表补全。
+            async for _ in governor.iterate(client.iter_dialogs()):
+                pass
+            self._dialogs_loaded.add(name)
+
+        channel_ids: Set[int] = set()
+        for channel_id in source_channel_ids:
+            try:
+                await client.get_input_entity(channel_id)
+            except (ValueError, TypeError):
+                continue
+            channel_ids.add(channel_id)
+
+        key = (name, destination_channel)
+        if key not in self._destinations:
+            destination = None
+            try:
+                async with governor.request("resolve"):
+                    entity = await client.get_entity(destination_channel)
+                if _can_post(entity):
+                    destination = get_input_peer(entity)
+                else:
+                    self.logger.info("👥 账号 %s 没有目标频道的发帖权限，只参与拉取。", name)
+            except Exception as exc:
+                self.logger.info("👥 账号 %s 无法访问目标频道，只参与拉取: %s", name, exc)
+            self._destinations[key] = destination
+        return PoolAccount(name, client, channel_ids, self._destinations[key])
+
+    def assign(self, channel_ids: List[int], accounts: List[PoolAccount], weights: Dict[int, float]) -> Dict[int, str]:
+        access = {account.name: account.channel_ids for account in accounts}
+        limited = {
+            name
+            for name in [PRIMARY_ACCOUNT, *access]
+            if governor.flood_wait_remaining(name, "history") > 0
+        }
+        assignment = assign_shards(channel_ids, access, weights, self.shard_map, limited)
+        moved = [
+            channel_id
+            for channel_id, name in assignment.items()
+            if channel_id in self.shard_map and self.shard_map[channel_id] != name
+        ]
+        if moved and limited:
+            self.logger.info("👥 账号 %s 受限，%s 个来源已改由其他账号拉取。", sorted(limited), len(moved))
+        # 多个转发任务共用账号池，各任务只更新自己来源的归属，同一来源在各任务间保持同一账号。
+        self.shard_map = {**self.shard_map, **assignment}
+        return assignment
+
+    def forget_channels(self, channel_ids: Iterable[int]) -> None:
+        """不再有任务订阅的来源从分片归属中移除。"""
+        removed = set(channel_ids)
+        self.shard_map = {channel_id: name for channel_id, name in self.shard_map.items() if channel_id not in removed}
+
+    def note_activity(self, name: str, fetched: int = 0, sent: int = 0) -> None:
+        if name == PRIMARY_ACCOUNT:
+            return
+        health = self._health.setdefault(name, {})
+        health["fetched_total"] = int(health.get("fetched_total", 0)) + fetched
+        health["sent_total"] = int(health.get("sent_total", 0)) + sent
+
+    def status_payload(self) -> Dict[str, Any]:
+        shard_counts: Dict[str, int] = {}
+        for name in self.shard_map.values():
+            shard_counts[name or "primary"] = shard_counts.get(name or "primary", 0) + 1
+        return {
+            "accounts": {
+                name: {
+                    **self._health.get(name, {}),
+                    "connected": self._managers[name].is_connected if name in self._managers else False,
+                    "flood_wait_remaining": {
+                        method_class: round(governor.flood_wait_remaining(name, method_class), 1)
+                        for method_class in ("history", "send")
+                        if governor.flood_wait_remaining(name, method_class) > 0
+                    },
+                }
+                for name in self.account_names()
+            },
+            "shard_counts": shard_counts,
+        }
+
+
+def lease_pool_accounts(account_pool: Optional[AccountPool], source_channel_ids: List[int], destination_channel: str):
+    if account_pool is None:
+        return contextlib.nullcontext([])
+    return account_pool.lease(source_channel_ids, destination_channel)
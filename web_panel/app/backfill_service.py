@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+from .backfill_store import BackfillJobStore
+from .checkpoint_writer import CheckpointWriteBuffer
+from .client_manager import open_telegram_client
+from .config_store import ConfigStore, ForwarderConfig
+from .forward_ledger_store import ForwardLedgerStore
+from .forwarder_service import (
+    SEND_INTERVAL_SECONDS,
+    ForwarderRunner,
+    _bootstrap_channel_start_id,
+    _collect_destination_links,
+    _compile_text_replacement_regex,
+    _extract_message_quark_link,
+    _forward_single_message,
+    _queue_failed_send,
+    _record_ledger,
+    _resolve_destination_peer,
+    _resolve_link_via_bot,
+)
+from .message_envelope import MessageEnvelope
+from .request_governor import governor, subsystem_scope
+from .retry_queue_store import SendRetryQueueStore
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+    from telethon.hints import EntityLike
+
+
+BACKFILL_DEFAULT_WINDOW_SIZE = 200
+BACKFILL_IDLE_SECONDS = 5
+
+
+class BackfillRunner:
+    """历史回填执行器：逐窗口导入旧消息，常规转发运行期间让出会话，优先级低于常规运行。"""
+
+    def __init__(
+        self,
+        config_store: ConfigStore,
+        job_store: BackfillJobStore,
+        forwarder_runner: ForwarderRunner,
+        logger,
+        ledger_store: Optional[ForwardLedgerStore] = None,
+        retry_store: Optional[SendRetryQueueStore] = None,
+    ):
+        self.config_store = config_store
+        self.job_store = job_store
+        self.forwarder_runner = forwarder_runner
+        self.logger = logger
+        self.ledger_store = ledger_store
+        self.retry_store = retry_store
+        self._task: Optional[Any] = None
+        self._current_job_id: Optional[int] = None
+        self._pause_requested = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def current_job_id(self) -> Optional[int]:
+        return self._current_job_id if self.is_running else None
+
+    async def start_job(self, job_id: int) -> bool:
+        if self.is_running:
+            return False
+
+        job = self.job_store.get_job(job_id)
+        if job is None or job["status"] == "done":
+            return False
+
+        self._pause_requested = False
+        self._current_job_id = int(job_id)
+        self.job_store.set_status(job_id, "running")
+        self._task = asyncio.create_task(self._run(int(job_id)))
+        return True
+
+    def request_pause(self) -> bool:
+        if not self.is_running:
+            return False
+        self._pause_requested = True
+        return True
+
+    async def wait(self) -> None:
+        """等待当前回填任务结束（完成、暂停或出错）。"""
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self, job_id: int) -> None:
+        historical_links: Optional[Set[str]] = None
+        bot_link_cache: Dict[str, Optional[str]] = {}
+
+        try:
+            while True:
+                job = self.job_store.get_job(job_id)
+                if job is None:
+                    return
+
+                # 终点不含在内：终点通常取自当前断点，该消息已由常规运行转发过。
+                if job["cursor_id"] is not None and int(job["cursor_id"]) >= job["end_id"] - 1:
+                    self.job_store.set_status(job_id, "done")
+                    self.logger.info("📚 回填任务 %s 已完成：频道 %s，转发 %s 条。", job_id, job["channel_id"], job["forwarded"])
+                    return
+
+                if self._pause_requested:
+                    self.job_store.set_status(job_id, "paused")
+                    self.logger.info("📚 回填任务 %s 已暂停，游标 %s。", job_id, job["cursor_id"])
+                    return
+
+                # 常规转发优先：运行中时等待其结束，窗口之间再争用会话锁。
+                while self.forwarder_runner.is_running:
+                    await asyncio.sleep(BACKFILL_IDLE_SECONDS)
+
+                async with self.forwarder_runner.hold_session():
+                    with subsystem_scope("backfill"):
+                        historical_links = await self._run_window(job, historical_links, bot_link_cache)
+
+                await asyncio.sleep(BACKFILL_IDLE_SECONDS)
+        except asyncio.CancelledError:
+            self.job_store.set_status(job_id, "paused")
+            raise
+        except Exception as exc:
+            self.logger.exception("📚 回填任务 %s 失败: %s", job_id, exc)
+            self.job_store.set_status(job_id, "failed", str(exc))
+        finally:
+            self._current_job_id = None
+
+    async def _run_window(
+        self,
+        job: Dict[str, Any],
+        historical_links: Optional[Set[str]],
+        bot_link_cache: Dict[str, Optional[str]],
+    ) -> Set[str]:
+        config = self.config_store.build_forwarder_config()
+        panel_settings = self.config_store.build_panel_settings()
+        if panel_settings.test_mode_enabled:
+            raise RuntimeError("测试模式开启时不执行历史回填，请关闭测试模式后再继续。")
+        if not self.config_store.session_file.exists():
+            raise FileNotFoundError("会话文件缺失，请先上传或创建 t2rss.session。")
+
+        job_id = job["id"]
+        channel_id = job["channel_id"]
+        regex_rules = _compile_text_replacement_regex(config.text_replacement_regex, self.logger)
+        window_started = time.perf_counter()
+
+        async with open_telegram_client(self.config_store, self.forwarder_runner.client_manager) as client:
+            cursor_id = job["cursor_id"]
+            if cursor_id is None:
+                cursor_id = await _bootstrap_channel_start_id(client, channel_id, "since", job["start_date"], self.logger)
+                self.job_store.set_start(job_id, cursor_id)
+                if int(cursor_id) >= job["end_id"] - 1:
+                    # 起始日期之后的第一条消息已到达终点，无需回填。
+                    return historical_links or set()
+
+            destination = await _resolve_destination_peer(
+                client,
+                config.destination_channel,
+                self.forwarder_runner.peer_cache_store,
+                self.logger,
+            )
+            if historical_links is None:
+                historical_links = (
+                    await _collect_destination_links(client, destination, config) if config.deduplication_enabled else set()
+                )
+
+            # window_end 为本窗口最后一条（含）消息 ID，不超过终点之前的一条。
+            window_end = min(job["end_id"] - 1, int(cursor_id) + job["window_size"])
+            counts = await self._process_window(
+                client,
+                job,
+                int(cursor_id),
+                window_end,
+                destination,
+                config,
+                regex_rules,
+                historical_links,
+                bot_link_cache,
+            )
+
+        covered_until = counts["stopped_at"] or window_end
+        self.job_store.record_window(
+            job_id,
+            covered_until,
+            counts["fetched"],
+            counts["forwarded"],
+            counts["skipped"],
+            counts["errors"],
+            time.perf_counter() - window_started,
+        )
+        self.logger.info(
+            "📚 回填任务 %s：频道 %s 已覆盖至 ID %s/%s，本窗口抓取 %s 条，转发 %s 条。",
+            job_id,
+            channel_id,
+            covered_until,
+            job["end_id"],
+            counts["fetched"],
+            counts["forwarded"],
+        )
+        return historical_links
+
+    async def _process_window(
+        self,
+        client: TelegramClient,
+        job: Dict[str, Any],
+        cursor_id: int,
+        window_end: int,
+        destination: EntityLike,
+        config: ForwarderConfig,
+        regex_rules,
+        historical_links: Set[str],
+        bot_link_cache: Dict[str, Optional[str]],
+    ) -> Dict[str, int]:
+        from telethon.errors import TakeoutInitDelayError
+
+        counts = {"fetched": 0, "forwarded": 0, "skipped": 0, "errors": 0, "stopped_at": 0}
+        # 台账条目与重试队列变更经写后缓冲批量落库，窗口结束（含中断）时写入剩余条目。
+        ledger_writer = CheckpointWriteBuffer(None, self.ledger_store, self.retry_store)
+        ledger_writer.start()
+        try:
+            if job["use_takeout"]:
+                try:
+                    async with client.takeout(channels=True, finalize=True) as takeout:
+                        await self._forward_range(
+                            takeout,
+                            client,
+                            ledger_writer,
+                            job,
+                            cursor_id,
+                            window_end,
+                            destination,
+                            config,
+                            regex_rules,
+                            historical_links,
+                            bot_link_cache,
+                            counts,
+                        )
+                    return counts
+                except TakeoutInitDelayError as exc:
+                    self.logger.warning("📚 Takeout 会话需等待 %s 秒后才可使用，本窗口改用普通会话。", exc.seconds)
+
+            await self._forward_range(
+                client,
+                client,
+                ledger_writer,
+                job,
+                cursor_id,
+                window_end,
+                destination,
+                config,
+                regex_rules,
+                historical_links,
+                bot_link_cache,
+                counts,
+            )
+            return counts
+        finally:
+            ledger_writer.close()
+
+    async def _forward_range(
+        self,
+        fetch_client,
+        client: TelegramClient,
+        ledger_writer: CheckpointWriteBuffer,
+        job: Dict[str, Any],
+        cursor_id: int,
+        window_end: int,
+        destination: EntityLike,
+        config: ForwarderConfig,
+        regex_rules,
+        historical_links: Set[str],
+        bot_link_cache: Dict[str, Optional[str]],
+        counts: Dict[str, int],
+    ) -> None:
+        channel_id = job["channel_id"]
+        async for msg in governor.iterate(
+            fetch_client.iter_messages(channel_id, min_id=cursor_id, max_id=window_end + 1, reverse=True)
+        ):
+            envelope = MessageEnvelope.from_message(channel_id, msg)
+            counts["fetched"] += 1
+            if self.ledger_store is not None and self.ledger_store.forwarded_ids(channel_id, [envelope.message_id]):
+                # 台账中已转发过（例如与常规运行范围重叠），不重复发送。
+                counts["skipped"] += 1
+                envelope.release_raw()
+                continue
+
+            link = None
+            if config.deduplication_enabled and not envelope.is_service:
+                if not envelope.analysis.share_key:
+                    envelope.resolved_url = await _resolve_link_via_bot(
+                        client,
+                        envelope.message_id,
+                        envelope.analysis,
+                        self.logger,
+                        bot_link_cache,
+                    )
+                link = _extract_message_quark_link(envelope.analysis, envelope.resolved_url)
+                if link and link in historical_links:
+                    counts["skipped"] += 1
+                    envelope.release_raw()
+                    continue
+
+            reason = await _forward_single_message(
+                client=client,
+                envelope=envelope,
+                destination_channel=destination,
+                keyword_blacklist=config.keyword_blacklist,
+                user_blacklist=config.user_id_blacklist,
+                download_dir=self.config_store.download_dir,
+                logger=self.logger,
+                test_mode_enabled=False,
+                bot_link_cache=bot_link_cache,
+                text_replacement_terms=config.text_replacement_terms,
+                text_replacement_regex_rules=regex_rules,
+            )
+            _record_ledger(ledger_writer, envelope, reason)
+            if reason == "forwarded":
+                counts["forwarded"] += 1
+                if link:
+                    historical_links.add(link)
+            elif reason == "error":
+                counts["errors"] += 1
+                _queue_failed_send(ledger_writer, envelope, self.logger)
+            else:
+                counts["skipped"] += 1
+
+            if reason in {"forwarded", "error"}:
+                await asyncio.sleep(SEND_INTERVAL_SECONDS)
+
+            # 游标逐条保存，进程被强杀后也不会重发本窗口已处理的消息。
+            self.job_store.advance_cursor(job["id"], envelope.message_id)
+            if self._pause_requested or self.forwarder_runner.session_wanted:
+                # 暂停或常规运行等待会话时立即让出，游标只推进到已处理的消息，下个窗口从这里继续。
+                counts["stopped_at"] = envelope.message_id
+                break
@@ -0,0 +1,215 @@
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .time_utils import normalize_to_shanghai_iso, now_shanghai_iso
+
+
+BACKFILL_STATUS_LABELS = {
+    "pending": "待开始",
+    "running": "回填中",
+    "paused": "已暂停",
+    "done": "已完成",
+    "failed": "失败",
+}
+
+
+class BackfillJobStore:
+    """历史回填任务存储：每个任务按固定 ID 窗口推进，每个窗口结束后持久化游标。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backfill_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel_id INTEGER NOT NULL,
+                    start_date TEXT NOT NULL DEFAULT '',
+                    start_id INTEGER,
+                    end_id INTEGER NOT NULL,
+                    cursor_id INTEGER,
+                    window_size INTEGER NOT NULL,
+                    use_takeout INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    fetched INTEGER NOT NULL DEFAULT 0,
+                    forwarded INTEGER NOT NULL DEFAULT 0,
+                    skipped INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    active_seconds REAL NOT NULL DEFAULT 0,
+                    last_error TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            connection.commit()
+
+    def create_job(
+        self,
+        channel_id: int,
+        end_id: int,
+        window_size: int,
+        start_id: Optional[int] = None,
+        start_date: str = "",
+        use_takeout: bool = False,
+    ) -> int:
+        now_text = now_shanghai_iso()
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute(
+                """
+                INSERT INTO backfill_jobs (
+                    channel_id, start_date, start_id, end_id, cursor_id, window_size,
+                    use_takeout, status, created_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?, ?)
+                """,
+                (
+                    int(channel_id),
+                    str(start_date or ""),
+                    start_id,
+                    int(end_id),
+                    start_id,
+                    int(window_size),
+                    1 if use_takeout else 0,
+                    now_text,
+                    now_text,
+                ),
+            )
+            connection.commit()
+            return int(cursor.lastrowid)
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            row = connection.execute("SELECT * FROM backfill_jobs WHERE id = ?", (int(job_id),)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute("SELECT * FROM backfill_jobs ORDER BY id DESC").fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def set_start(self, job_id: int, start_id: int) -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                "UPDATE backfill_jobs SET start_id = ?, cursor_id = ?, updated_at = ? WHERE id = ?",
+                (int(start_id), int(start_id), now_shanghai_iso(), int(job_id)),
+            )
+            connection.commit()
+
+    def advance_cursor(self, job_id: int, cursor_id: int) -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                "UPDATE backfill_jobs SET cursor_id = ?, updated_at = ? WHERE id = ?",
+                (int(cursor_id), now_shanghai_iso(), int(job_id)),
+            )
+            connection.commit()
+
+    def record_window(
+        self,
+        job_id: int,
+        cursor_id: int,
+        fetched: int,
+        forwarded: int,
+        skipped: int,
+        errors: int,
+        active_seconds: float,
+    ) -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                UPDATE backfill_jobs
+                SET cursor_id = ?,
+                    fetched = fetched + ?,
+                    forwarded = forwarded + ?,
+                    skipped = skipped + ?,
+                    errors = errors + ?,
+                    active_seconds = active_seconds + ?,
+                    updated_at = ?
+                WHERE id = ?
+                """,
+                (
+                    int(cursor_id),
+                    int(fetched),
+                    int(forwarded),
+                    int(skipped),
+                    int(errors),
+                    float(active_seconds),
+                    now_shanghai_iso(),
+                    int(job_id),
+                ),
+            )
+            connection.commit()
+
+    def set_status(self, job_id: int, status: str, last_error: str = "") -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                "UPDATE backfill_jobs SET status = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, str(last_error or ""), now_shanghai_iso(), int(job_id)),
+            )
+            connection.commit()
+
+    def pause_running_jobs(self) -> int:
+        """进程重启后，把遗留的“回填中”任务标记为已暂停，可从游标处继续。"""
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute(
+                "UPDATE backfill_jobs SET status = 'paused', updated_at = ? WHERE status = 'running'",
+                (now_shanghai_iso(),),
+            )
+            connection.commit()
+            return cursor.rowcount
+
+    def delete_job(self, job_id: int) -> bool:
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute("DELETE FROM backfill_jobs WHERE id = ?", (int(job_id),))
+            connection.commit()
+            return cursor.rowcount > 0
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = {
+            "id": int(row["id"]),
+            "channel_id": int(row["channel_id"]),
+            "start_date": str(row["start_date"] or ""),
+            "start_id": row["start_id"],
+            "end_id": int(row["end_id"]),
+            "cursor_id": row["cursor_id"],
+            "window_size": int(row["window_size"]),
+            "use_takeout": bool(row["use_takeout"]),
+            "status": str(row["status"]),
+            "status_label": BACKFILL_STATUS_LABELS.get(str(row["status"]), str(row["status"])),
+            "fetched": int(row["fetched"]),
+            "forwarded": int(row["forwarded"]),
+            "skipped": int(row["skipped"]),
+            "errors": int(row["errors"]),
+            "active_seconds": round(float(row["active_seconds"]), 1),
+            "last_error": str(row["last_error"] or ""),
+            "created_at": normalize_to_shanghai_iso(row["created_at"]),
+            "updated_at": normalize_to_shanghai_iso(row["updated_at"]),
+            "ids_covered": 0,
+            "ids_total": 0,
+            "percent": 0.0,
+            "messages_per_minute": 0.0,
+            "eta_seconds": None,
+        }
+
+        if job["start_id"] is None or job["cursor_id"] is None:
+            return job
+
+        ids_total = max(0, job["end_id"] - 1 - int(job["start_id"]))
+        ids_covered = min(ids_total, max(0, int(job["cursor_id"]) - int(job["start_id"])))
+        job["ids_total"] = ids_total
+        job["ids_covered"] = ids_covered
+        job["percent"] = round(ids_covered * 100 / ids_total, 1) if ids_total else 100.0
+
+        active_seconds = float(row["active_seconds"])
+        if active_seconds > 0:
+            job["messages_per_minute"] = round(job["fetched"] * 60 / active_seconds, 1)
+            if ids_covered > 0:
+                job["eta_seconds"] = int((ids_total - ids_covered) * active_seconds / ids_covered)
+        return job
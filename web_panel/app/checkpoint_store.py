@@ -6,7 +6,11 @@ from .time_utils import normalize_to_shanghai_iso, now_shanghai_iso
 
 
 class ChannelCheckpointStore:
-    """频道断点存储，使用数据库替代 last_id 文本文件。"""
+    """频道断点存储，使用数据库替代 last_id 文本文件。
+
+    pts 为频道更新状态，供 GetChannelDifference 增量补抓；断点被调小时 pts 自动清零，
+    因为差量接口无法返回该状态之前的消息。
+    """
 
     def __init__(self, db_path: Path):
         self.db_path = Path(db_path)
@@ -19,10 +23,14 @@ class ChannelCheckpointStore:
                 CREATE TABLE IF NOT EXISTS channel_last_id (
                     channel_id INTEGER PRIMARY KEY,
                     last_id INTEGER NOT NULL DEFAULT 0,
+                    pts INTEGER NOT NULL DEFAULT 0,
                     updated_at TEXT NOT NULL
                 )
                 """
             )
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(channel_last_id)").fetchall()}
+            if "pts" not in columns:
+                connection.execute("ALTER TABLE channel_last_id ADD COLUMN pts INTEGER NOT NULL DEFAULT 0")
             connection.commit()
 
     def migrate_from_files(self, last_id_dir: Path) -> int:
@@ -100,6 +108,7 @@ class ChannelCheckpointStore:
                 VALUES (?, ?, ?)
                 ON CONFLICT(channel_id)
                 DO UPDATE SET
+                    pts = CASE WHEN excluded.last_id < channel_last_id.last_id THEN 0 ELSE channel_last_id.pts END,
                     last_id = excluded.last_id,
                     updated_at = excluded.updated_at
                 """,
@@ -112,18 +121,44 @@ class ChannelCheckpointStore:
             return
 
         with sqlite3.connect(self.db_path) as connection:
-            for channel_id, last_id in channel_last_ids.items():
-                connection.execute(
-                    """
-                    INSERT INTO channel_last_id (channel_id, last_id, updated_at)
-                    VALUES (?, ?, ?)
-                    ON CONFLICT(channel_id)
-                        DO UPDATE SET
-                            last_id = excluded.last_id,
-                            updated_at = excluded.updated_at
-                    """,
-                    (int(channel_id), int(last_id), now_shanghai_iso()),
-                )
+            self.apply_last_ids(connection, channel_last_ids)
+            connection.commit()
+
+    @staticmethod
+    def apply_last_ids(connection: sqlite3.Connection, channel_last_ids: Dict[int, int]) -> None:
+        """在调用方的事务内写入断点，由调用方提交。"""
+        now_text = now_shanghai_iso()
+        connection.executemany(
+            """
+            INSERT INTO channel_last_id (channel_id, last_id, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(channel_id)
+                DO UPDATE SET
+                    pts = CASE WHEN excluded.last_id < channel_last_id.last_id THEN 0 ELSE channel_last_id.pts END,
+                    last_id = excluded.last_id,
+                    updated_at = excluded.updated_at
+            """,
+            [(int(channel_id), int(last_id), now_text) for channel_id, last_id in channel_last_ids.items()],
+        )
+
+    def get_pts(self, channel_id: int) -> int:
+        with sqlite3.connect(self.db_path) as connection:
+            row = connection.execute(
+                "SELECT pts FROM channel_last_id WHERE channel_id = ?",
+                (int(channel_id),),
+            ).fetchone()
+
+        if not row:
+            return 0
+        return int(row[0])
+
+    def set_pts(self, channel_id: int, pts: int) -> None:
+        """记录频道更新状态（pts），只更新已有断点记录；0 表示无可用状态，改用历史拉取。"""
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                "UPDATE channel_last_id SET pts = ? WHERE channel_id = ?",
+                (max(0, int(pts)), int(channel_id)),
+            )
             connection.commit()
 
     def list_last_ids(self) -> List[Dict[str, Any]]:
@@ -131,7 +166,7 @@ class ChannelCheckpointStore:
             connection.row_factory = sqlite3.Row
             rows = connection.execute(
                 """
-                SELECT channel_id, last_id, updated_at
+                SELECT channel_id, last_id, pts, updated_at
                 FROM channel_last_id
                 ORDER BY channel_id ASC
                 """
@@ -141,6 +176,7 @@ class ChannelCheckpointStore:
             {
                 "channel_id": int(row["channel_id"]),
                 "last_id": int(row["last_id"]),
+                "pts": int(row["pts"]),
                 "updated_at": normalize_to_shanghai_iso(row["updated_at"]),
             }
             for row in rows
@@ -151,7 +187,7 @@ class ChannelCheckpointStore:
             connection.row_factory = sqlite3.Row
             row = connection.execute(
                 """
-                SELECT channel_id, last_id, updated_at
+                SELECT channel_id, last_id, pts, updated_at
                 FROM channel_last_id
                 WHERE channel_id = ?
                 """,
@@ -164,6 +200,7 @@ class ChannelCheckpointStore:
         return {
             "channel_id": int(row["channel_id"]),
             "last_id": int(row["last_id"]),
+            "pts": int(row["pts"]),
             "updated_at": normalize_to_shanghai_iso(row["updated_at"]),
         }
 
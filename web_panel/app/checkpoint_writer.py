@@ -0,0 +1,218 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .checkpoint_store import ChannelCheckpointStore
+from .forward_ledger_store import ForwardLedgerStore
+from .message_envelope import MessageEnvelope
+from .retry_queue_store import (
+    RETRY_OUTCOME_DEAD,
+    RETRY_OUTCOME_QUEUED,
+    RETRY_QUEUE_MAX_ATTEMPTS,
+    RetryFailure,
+    SendRetryQueueStore,
+)
+
+
+# 写后缓冲的刷新条件：距上次写入超过该秒数，或累计待写消息达到该数量，满足其一即合并为一个事务写入。
+CHECKPOINT_FLUSH_INTERVAL_SECONDS = 3
+CHECKPOINT_FLUSH_BATCH_SIZE = 50
+
+LedgerEntry = Tuple[int, int, str, Optional[int], str]
+# 重试队列操作按发生顺序写入：("failure", RetryFailure) 或 ("remove", (channel_id, message_id))。
+RetryOperation = Tuple[str, Any]
+
+
+class CheckpointWriteBuffer:
+    """断点、转发台账与重试队列的写后缓冲：逐条处理时只在内存中记录，按短定时器或累计条数批量落库。
+
+    台账条目、重试队列变更与断点在同一个事务内写入，进程被强杀时最多重复处理最近几秒的消息。
+    提供与 ForwardLedgerStore.record、SendRetryQueueStore.record_failure / remove 相同签名的方法，
+    可直接替代台账与重试队列存储使用。
+    start() 之后的刷新都在后台线程中执行，事件循环上的逐条处理路径只写内存；close() 同步写入剩余条目。
+    record_failure 的结果（继续重试或移入死信）按重试队列读回时的失败次数与本次运行中缓冲的失败在内存中推算。
+    """
+
+    def __init__(
+        self,
+        checkpoint_store: Optional[ChannelCheckpointStore],
+        ledger_store: Optional[ForwardLedgerStore] = None,
+        retry_store: Optional[SendRetryQueueStore] = None,
+        flush_interval_seconds: float = CHECKPOINT_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = CHECKPOINT_FLUSH_BATCH_SIZE,
+    ):
+        self.checkpoint_store = checkpoint_store
+        self.ledger_store = ledger_store
+        self.retry_store = retry_store
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = max(1, int(batch_size))
+        self._pending_last_ids: Dict[int, int] = {}
+        self._pending_entries: List[LedgerEntry] = []
+        self._pending_retry_ops: List[RetryOperation] = []
+        # 同一条消息的断点推进与台账记录只计一次，批量大小按消息数计算。
+        self._pending_keys: Set[Tuple[int, int]] = set()
+        # 本次运行中各消息已失败的次数（含尚未落库的失败），用于在内存中判断下一次失败是继续重试还是移入死信。
+        self._retry_attempts: Dict[Tuple[int, int], int] = {}
+        # 已交给后台线程、尚未提交的断点，供 get_last_id 读取。
+        self._flushing_last_ids: Dict[int, int] = {}
+        # 写入按取出顺序串行：事件循环一侧用 asyncio.Lock 排队，工作线程内按取出时领取的序号依次写入，
+        # close() 的同步写入也领取序号，排在进行中的后台写入之后。
+        self._flush_lock = asyncio.Lock()
+        self._write_turn = threading.Condition()
+        self._next_ticket = 0
+        self._serving_ticket = 0
+        self._flush_wanted = asyncio.Event()
+        self._last_flush_ts = time.monotonic()
+        self._task: Optional[Any] = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending_keys)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    def close(self) -> None:
+        """停止定时刷新并写入剩余条目；可重复调用。"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self.flush()
+
+    def advance(self, channel_id: int, last_id: int) -> None:
+        self._pending_last_ids[int(channel_id)] = int(last_id)
+        self._note_pending(channel_id, last_id)
+
+    def record(
+        self,
+        source_channel_id: int,
+        source_message_id: int,
+        status: str,
+        dest_message_id: Optional[int] = None,
+        share_key: Optional[str] = None,
+    ) -> None:
+        if self.ledger_store is None:
+            return
+        self._pending_entries.append(
+            (int(source_channel_id), int(source_message_id), status, dest_message_id, str(share_key or ""))
+        )
+        self._note_pending(source_channel_id, source_message_id)
+
+    def record_failure(self, envelope: MessageEnvelope, last_error: str = "") -> str:
+        """缓冲一次发送失败，返回写入后的结果（继续重试或移入死信）；未配置重试队列时返回空字符串。"""
+        if self.retry_store is None:
+            return ""
+        key = (int(envelope.channel_id), int(envelope.message_id))
+        attempts = self._retry_attempts.get(key, envelope.retry_attempts) + 1
+        if attempts >= RETRY_QUEUE_MAX_ATTEMPTS:
+            self._retry_attempts.pop(key, None)
+            outcome = RETRY_OUTCOME_DEAD
+        else:
+            self._retry_attempts[key] = attempts
+            outcome = RETRY_OUTCOME_QUEUED
+        failure: RetryFailure = self.retry_store.build_failure(envelope, last_error)
+        self._pending_retry_ops.append(("failure", failure))
+        self._note_pending(envelope.channel_id, envelope.message_id)
+        return outcome
+
+    def remove(self, channel_id: int, message_id: int) -> None:
+        if self.retry_store is None:
+            return
+        self._retry_attempts.pop((int(channel_id), int(message_id)), None)
+        self._pending_retry_ops.append(("remove", (int(channel_id), int(message_id))))
+        self._note_pending(channel_id, message_id)
+
+    def get_last_id(self, channel_id: int) -> int:
+        """优先返回尚未落库的断点，避免读到旧值。"""
+        for last_ids in (self._pending_last_ids, self._flushing_last_ids):
+            if int(channel_id) in last_ids:
+                return last_ids[int(channel_id)]
+        if self.checkpoint_store is None:
+            return 0
+        return self.checkpoint_store.get_last_id(channel_id)
+
+    def flush(self) -> None:
+        """在当前线程同步写入全部待写条目；有后台写入进行中时等它完成后再写。"""
+        self._write_batch(*self._take_pending())
+
+    def _take_pending(self) -> Tuple[int, Dict[int, int], List[LedgerEntry], List[RetryOperation]]:
+        """取出待写条目并领取写入序号，在事件循环线程上调用。"""
+        self._last_flush_ts = time.monotonic()
+        last_ids, self._pending_last_ids = self._pending_last_ids, {}
+        entries, self._pending_entries = self._pending_entries, []
+        retry_ops, self._pending_retry_ops = self._pending_retry_ops, []
+        self._pending_keys = set()
+        with self._write_turn:
+            # 只与工作线程写完后的计数更新互斥，不等待数据库写入。
+            self._flushing_last_ids = {**self._flushing_last_ids, **last_ids}
+            ticket = self._next_ticket
+            self._next_ticket += 1
+        return ticket, last_ids, entries, retry_ops
+
+    def _write_batch(
+        self,
+        ticket: int,
+        last_ids: Dict[int, int],
+        entries: List[LedgerEntry],
+        retry_ops: List[RetryOperation],
+    ) -> None:
+        with self._write_turn:
+            self._write_turn.wait_for(lambda: self._serving_ticket == ticket)
+        try:
+            store = self.checkpoint_store or self.ledger_store or self.retry_store
+            if store is None or not (last_ids or entries or retry_ops):
+                return
+            with sqlite3.connect(store.db_path) as connection:
+                if entries and self.ledger_store is not None:
+                    self.ledger_store.apply_entries(connection, entries)
+                for operation, payload in retry_ops:
+                    if operation == "failure":
+                        self.retry_store.apply_failure(connection, payload)
+                    else:
+                        self.retry_store.apply_removals(connection, [payload])
+                if last_ids and self.checkpoint_store is not None:
+                    self.checkpoint_store.apply_last_ids(connection, last_ids)
+                connection.commit()
+        finally:
+            with self._write_turn:
+                self._serving_ticket += 1
+                if self._serving_ticket == self._next_ticket:
+                    self._flushing_last_ids = {}
+                self._write_turn.notify_all()
+
+    def _note_pending(self, channel_id: int, message_id: int) -> None:
+        self._pending_keys.add((int(channel_id), int(message_id)))
+        if len(self._pending_keys) < self.batch_size:
+            return
+        if self._task is not None and not self._task.done():
+            # 交给后台刷新任务，发送热路径不等待数据库写入。
+            self._flush_wanted.set()
+        else:
+            self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            try:
+                # asyncio.timeout 不会像 wait_for 那样在事件与取消同时到达时吞掉取消。
+                async with asyncio.timeout(self.flush_interval_seconds):
+                    await self._flush_wanted.wait()
+            except TimeoutError:
+                if time.monotonic() - self._last_flush_ts < self.flush_interval_seconds:
+                    continue
+            self._flush_wanted.clear()
+            await self.flush_async()
+
+    async def flush_async(self) -> None:
+        """在后台线程中写入全部待写条目并等待提交，供需要读回刚写入数据的调用方使用。
+
+        调用方在事件循环上按 asyncio.Lock 排队，等待期间不阻塞事件循环。
+        """
+        async with self._flush_lock:
+            if not self._pending_keys:
+                self._last_flush_ts = time.monotonic()
+                return
+            # 领取序号与提交给线程之间没有 await，各批次按取出顺序写入。
+            await asyncio.to_thread(self._write_batch, *self._take_pending())
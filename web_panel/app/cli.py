@@ -0,0 +1,386 @@
+"""无界面的单次运行入口：python -m app.cli <命令>。
+
+适用于 cron / systemd timer 部署与冒烟测试：与面板共用同一 DATA_DIR，执行一次转发、历史回填、目标频道去重整理
+或 RSS 重建后退出，标准输出最后一行为 JSON 摘要，日志写入标准错误与 data/logs/panel.log。
+
+只导入所选命令需要的模块（不加载 FastAPI、模板与面板启动流程）；执行期间持有转发租约，
+面板或 worker 正在负责转发时直接跳过，避免两个进程同时使用同一会话文件。
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+def _process_started_at() -> float:
+    """解释器进程的启动时刻（perf_counter 时间轴）：Linux 上按 /proc 中的启动时间推算，其他系统取本模块导入时刻。"""
+    now = time.perf_counter()
+    try:
+        with open("/proc/self/stat", encoding="ascii") as stat_file:
+            start_ticks = int(stat_file.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", encoding="ascii") as uptime_file:
+            uptime_seconds = float(uptime_file.read().split()[0])
+        elapsed = uptime_seconds - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return now
+    return now - max(0.0, elapsed)
+
+
+CLI_STARTED_AT = _process_started_at()
+
+# 冷启动（解释器启动到所选命令的依赖全部导入完成）的预算，超过时在摘要中标记并记录警告。
+CLI_STARTUP_BUDGET_SECONDS = 1.5
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_BUSY = 3
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="T2RSS 单次运行入口")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="执行一次转发（等同于面板上的立即执行）")
+    run_parser.add_argument("--job", type=int, default=None, help="附加转发任务 ID，默认执行默认任务")
+
+    backfill_parser = subparsers.add_parser("backfill", help="执行历史回填任务直到完成或按 Ctrl+C 暂停")
+    backfill_parser.add_argument("job_id", type=int, help="回填任务 ID（在计划与备份页面创建）")
+
+    dedup_parser = subparsers.add_parser("dedup", help="整理目标频道：删除最近消息中夸克链接重复的旧消息")
+    dedup_parser.add_argument("--job", type=int, default=None, help="附加转发任务 ID，默认整理默认任务的目标频道")
+
+    rss_parser = subparsers.add_parser("rss", help="重建 RSS 缓存")
+    rss_parser.add_argument("--job", type=int, default=None, help="附加转发任务 ID，默认重建默认任务的 RSS")
+    rss_parser.add_argument("--base-url", required=True, help="面板的外部访问地址，用于生成条目图片链接，例如 https://rss.example.com")
+    return parser
+
+
+class CliContext:
+    """命令共用的配置、日志与状态库；按需创建，未用到的模块不会被导入。"""
+
+    def __init__(self, job_id: Optional[int]):
+        from .config_store import ConfigStore
+        from .logging_utils import create_logger
+
+        self.base_config_store = ConfigStore()
+        self.base_config_store.ensure_directories()
+        self.logger = create_logger(self.base_config_store.log_file)
+        self.job_id = job_id
+        self.ready_at: Optional[float] = None
+        self.config_store = self.base_config_store
+        if job_id is not None:
+            from .forward_job_service import JobConfigStore
+            from .forward_job_store import ForwardJobStore
+
+            job_store = ForwardJobStore(self.base_config_store.db_path)
+            job_store.init_db()
+            if job_store.get_job(job_id) is None:
+                raise LookupError(f"转发任务 #{job_id} 不存在。")
+            self.config_store = JobConfigStore(self.base_config_store, job_store, job_id)
+            self.config_store.ensure_directories()
+
+    def mark_ready(self, *preload: str) -> None:
+        """命令的依赖已导入、即将开始实际工作，冷启动计时到此为止。
+
+        preload 为随后必然用到、首次使用时才导入的重量级依赖（如 Telethon），先导入以计入冷启动。
+        """
+        for module in preload:
+            importlib.import_module(module)
+        if self.ready_at is None:
+            self.ready_at = time.perf_counter()
+
+    def peer_cache_store(self):
+        from .peer_cache_store import PeerCacheStore
+
+        store = PeerCacheStore(self.base_config_store.db_path)
+        store.init_db()
+        return store
+
+
+def summary(command: str, status: str, message: str, **extra: Any) -> Dict[str, Any]:
+    return {"command": command, "status": status, "message": message, **extra}
+
+
+async def command_run(context: CliContext, args) -> Dict[str, Any]:
+    from .account_pool import AccountPool
+    from .corpus_store import MessageCorpusStore
+
+    corpus_store = MessageCorpusStore(context.base_config_store.db_path)
+    corpus_store.init_db()
+    peer_cache_store = context.peer_cache_store()
+    account_pool = AccountPool(context.base_config_store, context.logger)
+
+    if context.job_id is None:
+        from .checkpoint_store import ChannelCheckpointStore
+        from .forward_ledger_store import ForwardLedgerStore
+        from .forwarder_service import ForwarderRunner
+        from .history_store import RunHistoryStore
+        from .poll_schedule_store import SourcePollScheduleStore
+        from .retry_queue_store import SendRetryQueueStore
+        from .staging_store import StagingQueueStore
+
+        db_path = context.config_store.db_path
+        checkpoint_store = ChannelCheckpointStore(db_path)
+        history_store = RunHistoryStore(db_path)
+        stores = {
+            "staging_store": StagingQueueStore(db_path),
+            "poll_schedule_store": SourcePollScheduleStore(db_path),
+            "ledger_store": ForwardLedgerStore(db_path),
+            "retry_store": SendRetryQueueStore(db_path),
+        }
+        for store in (checkpoint_store, history_store, *stores.values()):
+            store.init_db()
+        runner = ForwarderRunner(
+            context.config_store,
+            checkpoint_store,
+            history_store,
+            context.logger,
+            corpus_store=corpus_store,
+            peer_cache_store=peer_cache_store,
+            account_pool=account_pool,
+            **stores,
+        )
+    else:
+        from .forward_job_service import ForwardJobManager
+
+        manager = ForwardJobManager(
+            context.base_config_store,
+            context.config_store.job_store,
+            context.logger,
+            corpus_store=corpus_store,
+            peer_cache_store=peer_cache_store,
+            account_pool=account_pool,
+        )
+        runner = manager.build_runtime(context.job_id).runner
+
+    context.mark_ready("telethon")
+    try:
+        result = await runner.run_once(trigger="cli") or {}
+    finally:
+        await account_pool.close()
+    return summary(
+        "run",
+        str(result.get("status", "error")),
+        str(result.get("message", "")),
+        job_id=context.job_id,
+        started_at=result.get("started_at"),
+        finished_at=result.get("finished_at"),
+        stats=result.get("stats", {}),
+    )
+
+
+async def command_backfill(context: CliContext, args) -> Dict[str, Any]:
+    import signal
+
+    from .backfill_service import BackfillRunner
+    from .backfill_store import BackfillJobStore
+    from .checkpoint_store import ChannelCheckpointStore
+    from .forward_ledger_store import ForwardLedgerStore
+    from .forwarder_service import ForwarderRunner
+    from .history_store import RunHistoryStore
+    from .retry_queue_store import SendRetryQueueStore
+
+    db_path = context.config_store.db_path
+    backfill_store = BackfillJobStore(db_path)
+    checkpoint_store = ChannelCheckpointStore(db_path)
+    history_store = RunHistoryStore(db_path)
+    ledger_store = ForwardLedgerStore(db_path)
+    retry_store = SendRetryQueueStore(db_path)
+    for store in (backfill_store, checkpoint_store, history_store, ledger_store, retry_store):
+        store.init_db()
+
+    runner = ForwarderRunner(
+        context.config_store,
+        checkpoint_store,
+        history_store,
+        context.logger,
+        peer_cache_store=context.peer_cache_store(),
+    )
+    backfill_runner = BackfillRunner(
+        context.config_store,
+        backfill_store,
+        runner,
+        context.logger,
+        ledger_store=ledger_store,
+        retry_store=retry_store,
+    )
+    context.mark_ready("telethon")
+    if not await backfill_runner.start_job(args.job_id):
+        return summary("backfill", "skipped", "回填任务不存在或已完成。", backfill_job_id=args.job_id)
+
+    # Ctrl+C / SIGTERM 时请求暂停：当前窗口处理完并保存游标后退出，之后可继续。
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, backfill_runner.request_pause)
+    await backfill_runner.wait()
+
+    job = backfill_store.get_job(args.job_id) or {}
+    job_status = str(job.get("status", ""))
+    return summary(
+        "backfill",
+        "success" if job_status in {"done", "paused"} else "error",
+        str(job.get("last_error") or job_status),
+        backfill_job_id=args.job_id,
+        job=job,
+    )
+
+
+async def command_dedup(context: CliContext, args) -> Dict[str, Any]:
+    import dataclasses
+
+    from .client_manager import open_telegram_client
+    from .forwarder_service import _build_empty_stats, _cleanup_and_get_historical_links, _resolve_destination_peer
+    from .request_governor import subsystem_scope
+
+    config = dataclasses.replace(context.config_store.build_forwarder_config(), deduplication_enabled=True)
+    test_mode_enabled = context.config_store.build_panel_settings().test_mode_enabled
+    stats = _build_empty_stats()
+    context.mark_ready("telethon")
+    with subsystem_scope("forwarder"):
+        async with open_telegram_client(context.config_store) as client:
+            destination = await _resolve_destination_peer(
+                client, config.destination_channel, context.peer_cache_store(), context.logger
+            )
+            links = await _cleanup_and_get_historical_links(
+                client, destination, config, context.logger, stats, test_mode_enabled
+            )
+    return summary(
+        "dedup",
+        "success",
+        f"扫描目标频道最近 {config.deduplication_cache_size} 条消息，夸克链接 {len(links)} 个。",
+        job_id=context.job_id,
+        test_mode=test_mode_enabled,
+        distinct_links=len(links),
+        duplicates_deleted=stats["destination_duplicates_deleted"],
+        duplicates_detected=stats["destination_duplicates_detected"],
+    )
+
+
+async def command_rss(context: CliContext, args) -> Dict[str, Any]:
+    from .config_store import parse_bool
+    from .rss_feed import refresh_rss_cache_in_background, rss_cache_file
+
+    raw_config = context.config_store.load_raw_config()
+    token = str(raw_config.get("PANEL_RSS_TOKEN", "")).strip()
+    if not token or not parse_bool(raw_config.get("PANEL_RSS_ENABLED", "true"), True):
+        return summary("rss", "skipped", "RSS 未开启或尚未生成 token。", job_id=context.job_id)
+
+    base_url = str(args.base_url).rstrip("/")
+    context.mark_ready()
+    refreshed = await refresh_rss_cache_in_background(context.config_store, base_url, token, raw_config, context.logger)
+    cache_file = rss_cache_file(context.config_store)
+    return summary(
+        "rss",
+        "success" if refreshed else "error",
+        "RSS 缓存已重建。" if refreshed else "RSS 重建失败，已保留旧缓存，详见日志。",
+        job_id=context.job_id,
+        cache_file=str(cache_file),
+        cache_bytes=cache_file.stat().st_size if cache_file.exists() else 0,
+    )
+
+
+COMMANDS: Dict[str, Callable[[CliContext, Any], Any]] = {
+    "run": command_run,
+    "backfill": command_backfill,
+    "dedup": command_dedup,
+    "rss": command_rss,
+}
+
+
+async def run_with_lease(context: CliContext, args) -> Dict[str, Any]:
+    """持有转发租约执行命令；面板或 worker 正在负责转发时返回 busy，执行中续期失败时中止命令。"""
+    import sqlite3
+
+    from .leader_store import (
+        LEADER_LEASE_NAME,
+        LEADER_LEASE_SECONDS,
+        LEADER_RENEW_SECONDS,
+        LeaderLeaseStore,
+        local_holder_id,
+    )
+
+    lease_store = LeaderLeaseStore(context.base_config_store.db_path)
+    lease_store.init_db()
+    holder = local_holder_id()
+    if not lease_store.try_acquire(LEADER_LEASE_NAME, holder, LEADER_LEASE_SECONDS):
+        lease = lease_store.read(LEADER_LEASE_NAME) or {}
+        return summary(args.command, "busy", f"转发租约由 {lease.get('holder', '其他进程')} 持有，本次未执行。")
+
+    command_task = asyncio.create_task(COMMANDS[args.command](context, args))
+    lost_reason = ""
+
+    async def renew() -> None:
+        nonlocal lost_reason
+        renewed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(LEADER_RENEW_SECONDS)
+            try:
+                held = await asyncio.to_thread(lease_store.try_acquire, LEADER_LEASE_NAME, holder, LEADER_LEASE_SECONDS)
+            except sqlite3.Error as exc:
+                # 与面板相同：数据库暂时被锁时在租期内重试，租约即将过期仍未续上才中止。
+                if time.monotonic() - renewed_at < LEADER_LEASE_SECONDS - LEADER_RENEW_SECONDS:
+                    context.logger.warning("续期转发租约失败，稍后重试: %s", exc)
+                    continue
+                lost_reason = f"续期转发租约失败: {exc}"
+            else:
+                if held:
+                    renewed_at = time.monotonic()
+                    continue
+                lease = lease_store.read(LEADER_LEASE_NAME) or {}
+                lost_reason = f"转发租约已由 {lease.get('holder', '其他进程')} 接管"
+            context.logger.error("%s，中止命令 %s，避免两个进程同时使用同一会话。", lost_reason, args.command)
+            command_task.cancel()
+            return
+
+    renew_task = asyncio.create_task(renew())
+    try:
+        return await command_task
+    except asyncio.CancelledError:
+        if not lost_reason:
+            raise
+        return summary(args.command, "error", f"{lost_reason}，命令已中止。")
+    finally:
+        renew_task.cancel()
+        try:
+            lease_store.release(LEADER_LEASE_NAME, holder)
+        except sqlite3.Error as exc:
+            context.logger.warning("释放转发租约失败，将在租约过期后由其他进程接管: %s", exc)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    command_started_at = time.perf_counter()
+    try:
+        context = CliContext(getattr(args, "job", None))
+    except LookupError as exc:
+        result = summary(args.command, "error", str(exc))
+        context = None
+    else:
+        try:
+            result = asyncio.run(run_with_lease(context, args))
+        except Exception as exc:
+            context.logger.exception("命令 %s 执行失败。", args.command)
+            result = summary(args.command, "error", str(exc))
+        # 命令未走到 mark_ready（如租约被占用、提前出错）时按当前时刻计算。
+        startup_seconds = (context.ready_at or time.perf_counter()) - CLI_STARTED_AT
+        result["startup_seconds"] = round(startup_seconds, 3)
+        result["startup_budget_seconds"] = CLI_STARTUP_BUDGET_SECONDS
+        if startup_seconds > CLI_STARTUP_BUDGET_SECONDS:
+            result["startup_over_budget"] = True
+            context.logger.warning("命令行冷启动耗时 %.2f 秒，超过预算 %.2f 秒。", startup_seconds, CLI_STARTUP_BUDGET_SECONDS)
+
+    result["duration_seconds"] = round(time.perf_counter() - command_started_at, 3)
+    print(json.dumps(result, ensure_ascii=False, default=str))
+    sys.stdout.flush()
+    if result["status"] == "busy":
+        return EXIT_BUSY
+    return EXIT_OK if result["status"] in {"success", "skipped"} else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from .config_store import ConfigStore
+from .time_utils import now_shanghai_iso
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+
+
+class SessionUnauthorizedError(RuntimeError):
+    """会话文件存在但未登录（或授权已失效）。"""
+
+
+# 当前协程上下文已持有租约的管理器；同一上下文内嵌套租借不等待会话写入，避免与 session_write 互相等待。
+_held_managers: contextvars.ContextVar[frozenset] = contextvars.ContextVar("held_telegram_managers", default=frozenset())
+
+
+def _read_credentials(config_store: ConfigStore, session_base_path: Optional[Path] = None) -> Tuple[int, str]:
+    raw_config = config_store.load_raw_config()
+    api_id = str(raw_config.get("API_ID", "")).strip()
+    api_hash = str(raw_config.get("API_HASH", "")).strip()
+    if not api_id or not api_hash:
+        raise ValueError("尚未配置 API_ID 和 API_HASH。")
+    if session_base_path is not None:
+        if not Path(f"{session_base_path}.session").exists():
+            raise FileNotFoundError(f"会话文件缺失：{session_base_path.name}.session。")
+    elif not config_store.session_file.exists():
+        raise FileNotFoundError("会话文件缺失，请先上传或创建 t2rss.session。")
+    try:
+        return int(api_id), api_hash
+    except ValueError as exc:
+        raise ValueError("API_ID 必须是整数。") from exc
+
+
+class TelegramClientManager:
+    """进程内共享的 Telegram 客户端：保持一个已连接、已授权的客户端，按需租借给转发、RSS 与解析等子系统。
+
+    同一事件循环内的多个租约可以并发使用同一客户端；连接断开或授权失效时丢弃客户端，下次租借时重建。
+    会话文件只由这一个客户端持有，替换或删除会话文件前需经 session_write()：先停止发放新租约，
+    等待已发出的租约全部归还后再断开连接。
+    媒体下载所需的跨数据中心连接由 Telethon 按需借用，无需另行维护。
+    """
+
+    def __init__(self, config_store: ConfigStore, logger, session_base_path: Optional[Path] = None):
+        """session_base_path 为空时使用主会话 t2rss.session；账号池中的其他账号各自传入自己的会话路径。"""
+        self.config_store = config_store
+        self.logger = logger
+        self.session_base_path = session_base_path
+        self._client: Optional[TelegramClient] = None
+        self._credentials: Optional[Tuple[int, str]] = None
+        self._lock = asyncio.Lock()
+        self._lease_changed = asyncio.Condition()
+        # 每个客户端对象上未归还的租约数；出错被丢弃的客户端在最后一个租约归还后才断开。
+        self._lease_counts: Dict[Any, int] = {}
+        # 已通过写入检查、正在等待客户端建立的租约：计入活跃租约，会话写入不会在此期间断开刚发出的客户端。
+        self._pending_leases = 0
+        self._writing = False
+        self._connected_since: Optional[str] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._client is not None and self._client.is_connected()
+
+    @property
+    def write_pending(self) -> bool:
+        """是否有会话写入在等待租约归还；长时间持有租约的子系统据此主动让出。"""
+        return self._writing
+
+    @property
+    def _active_leases(self) -> int:
+        return self._pending_leases + sum(self._lease_counts.values())
+
+    def status_payload(self) -> Dict[str, Any]:
+        return {
+            "connected": self.is_connected,
+            "connected_since": self._connected_since if self.is_connected else None,
+            "active_leases": self._active_leases,
+        }
+
+    @contextlib.asynccontextmanager
+    async def lease(self):
+        from telethon.errors import AuthKeyError, UnauthorizedError
+
+        held = _held_managers.get()
+        async with self._lease_changed:
+            if self not in held:
+                await self._lease_changed.wait_for(lambda: not self._writing)
+            self._pending_leases += 1
+        try:
+            client = await self._ensure_client()
+        except BaseException:
+            async with self._lease_changed:
+                self._pending_leases -= 1
+                self._lease_changed.notify_all()
+            raise
+        # 与预留的计数在同一步内转换（中间没有 await），会话写入看到的活跃租约数不会短暂归零。
+        self._pending_leases -= 1
+        self._lease_counts[client] = self._lease_counts.get(client, 0) + 1
+        token = _held_managers.set(held | {self})
+        try:
+            yield client
+        except (ConnectionError, AuthKeyError, UnauthorizedError):
+            # 连接层或授权错误：只丢弃本租约所用的客户端，其他租约用完后再断开，下次租借时重新连接并校验授权。
+            async with self._lock:
+                if self._client is client:
+                    self._detach_locked()
+            raise
+        finally:
+            _held_managers.reset(token)
+            await self._release(client)
+
+    @contextlib.asynccontextmanager
+    async def session_write(self):
+        """替换、删除或恢复会话文件期间持有：停止发放新租约，等待已发出的租约归还后断开共享客户端，写入完成前不建立新连接。"""
+        async with self._lease_changed:
+            await self._lease_changed.wait_for(lambda: not self._writing)
+            self._writing = True
+            try:
+                await self._lease_changed.wait_for(lambda: self._active_leases == 0)
+            except BaseException:
+                self._writing = False
+                self._lease_changed.notify_all()
+                raise
+        try:
+            async with self._lock:
+                await self._disconnect_locked()
+                yield
+        finally:
+            async with self._lease_changed:
+                self._writing = False
+                self._lease_changed.notify_all()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect_locked()
+
+    async def _ensure_client(self) -> TelegramClient:
+        # Telethon 在首次需要客户端时才导入，面板启动、健康检查与只读页面不加载它。
+        from telethon import TelegramClient
+
+        credentials = _read_credentials(self.config_store, self.session_base_path)
+        async with self._lock:
+            if self._client is not None and self._credentials != credentials:
+                self.logger.info("🔌 API 配置已变更，重新建立共享 Telegram 客户端。")
+                if self._lease_counts.get(self._client):
+                    # 旧客户端仍有租约在用，归还后再断开。
+                    self._detach_locked()
+                else:
+                    await self._disconnect_locked()
+
+            if self._client is None:
+                self._client = TelegramClient(str(self.session_base_path or self.config_store.session_base_path), *credentials)
+                self._credentials = credentials
+
+            if not self._client.is_connected():
+                try:
+                    await self._client.connect()
+                    authorized = await self._client.is_user_authorized()
+                except Exception:
+                    await self._disconnect_locked()
+                    raise
+                if not authorized:
+                    await self._disconnect_locked()
+                    raise SessionUnauthorizedError("Telegram 会话未授权，请重新创建 t2rss.session。")
+                self._connected_since = now_shanghai_iso()
+                self.logger.info("🔌 共享 Telegram 客户端已连接。")
+
+            return self._client
+
+    async def _release(self, client: TelegramClient) -> None:
+        async with self._lease_changed:
+            remaining = self._lease_counts.get(client, 1) - 1
+            if remaining > 0:
+                self._lease_counts[client] = remaining
+            else:
+                self._lease_counts.pop(client, None)
+            self._lease_changed.notify_all()
+        if remaining <= 0 and client is not self._client:
+            # 已被丢弃或替换的客户端在最后一个租约归还后断开。
+            await self._disconnect_client(client)
+
+    def _detach_locked(self) -> None:
+        self._client = None
+        self._credentials = None
+        self._connected_since = None
+
+    async def _disconnect_locked(self) -> None:
+        client = self._client
+        self._detach_locked()
+        if client is not None:
+            await self._disconnect_client(client)
+
+    async def _disconnect_client(self, client: TelegramClient) -> None:
+        try:
+            await client.disconnect()
+        except Exception as exc:
+            self.logger.warning("断开 Telegram 客户端时出错: %s", exc)
+
+
+@contextlib.asynccontextmanager
+async def open_telegram_client(config_store: ConfigStore, client_manager: Optional[TelegramClientManager] = None):
+    """有共享客户端时租借使用；否则（如独立脚本调用）临时建立一个连接，用完即断开。"""
+    if client_manager is not None:
+        async with client_manager.lease() as client:
+            yield client
+        return
+
+    from telethon import TelegramClient
+
+    api_id, api_hash = _read_credentials(config_store)
+    async with TelegramClient(str(config_store.session_base_path), api_id, api_hash) as client:
+        if not await client.is_user_authorized():
+            raise SessionUnauthorizedError("Telegram 会话未授权，请重新创建 t2rss.session。")
+        yield client
@@ -1,11 +1,15 @@
 import os
 import json
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 from dotenv import dotenv_values
 
+from .time_utils import SHANGHAI_TZ
+
 
 FORWARDER_ENV_KEYS = [
     "API_ID",
@@ -39,6 +43,15 @@ PANEL_ENV_KEYS = [
     "PANEL_RSS_ENABLED",
     "PANEL_RSS_TOKEN",
     "PANEL_RSS_ITEM_LIMIT",
+    "PANEL_RULE_LAB_CORPUS_SIZE",
+    "PANEL_TEXT_POOL_THRESHOLD",
+    "PANEL_RUN_MESSAGE_BUDGET",
+    "PANEL_CHANNEL_MESSAGE_BUDGET",
+    "PANEL_REALTIME_ENABLED",
+    "PANEL_ADAPTIVE_POLL_ENABLED",
+    "PANEL_POLL_MIN_MINUTES",
+    "PANEL_POLL_MAX_MINUTES",
+    "PANEL_POLL_TARGET_LATENCY_MINUTES",
 ]
 
 ALL_ENV_KEYS = FORWARDER_ENV_KEYS + PANEL_ENV_KEYS
@@ -72,8 +85,21 @@ DEFAULT_ENV_VALUES = {
     "PANEL_RSS_ENABLED": "true",
     "PANEL_RSS_TOKEN": "",
     "PANEL_RSS_ITEM_LIMIT": "500",
+    "PANEL_RULE_LAB_CORPUS_SIZE": "2000",
+    "PANEL_TEXT_POOL_THRESHOLD": "500",
+    "PANEL_RUN_MESSAGE_BUDGET": "600",
+    "PANEL_CHANNEL_MESSAGE_BUDGET": "200",
+    "PANEL_REALTIME_ENABLED": "false",
+    "PANEL_ADAPTIVE_POLL_ENABLED": "false",
+    "PANEL_POLL_MIN_MINUTES": "5",
+    "PANEL_POLL_MAX_MINUTES": "360",
+    "PANEL_POLL_TARGET_LATENCY_MINUTES": "30",
 }
 
+# 新来源首次运行（无断点记录）时的起点策略：从最新消息开始 / 导入最近 N 条 / 导入指定日期之后。
+SOURCE_BOOTSTRAP_POLICIES = ("latest", "last_n", "since")
+DEFAULT_SOURCE_BOOTSTRAP = "latest"
+
 MULTILINE_ESCAPED_ENV_KEYS = {
     "TEXT_REPLACEMENT_REGEX",
 }
@@ -103,6 +129,15 @@ class PanelSettings:
     auto_run_interval_minutes: int
     total_timeout_seconds: int
     test_mode_enabled: bool
+    rule_lab_corpus_size: int
+    text_pool_threshold: int
+    run_message_budget: int
+    channel_message_budget: int
+    realtime_enabled: bool
+    adaptive_poll_enabled: bool
+    poll_min_minutes: int
+    poll_max_minutes: int
+    poll_target_latency_minutes: int
 
 
 def parse_bool(value: str, default: bool = False) -> bool:
@@ -142,6 +177,35 @@ def parse_positive_int(value: str, field_name: str, default: int) -> int:
     return parsed
 
 
+def parse_bootstrap_since(value: str) -> datetime:
+    """解析“导入指定日期之后”的起始时间，无时区信息时按上海时间解释。"""
+    raw = str(value or "").strip()
+    try:
+        parsed = datetime.fromisoformat(raw)
+    except ValueError as exc:
+        raise ValueError("起始日期格式无效，请使用 YYYY-MM-DD 或 YYYY-MM-DD HH:MM。") from exc
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=SHANGHAI_TZ)
+    return parsed
+
+
+def normalize_source_bootstrap(policy: str, value: str) -> Tuple[str, str]:
+    bootstrap = str(policy or "").strip()
+    if bootstrap not in SOURCE_BOOTSTRAP_POLICIES:
+        bootstrap = DEFAULT_SOURCE_BOOTSTRAP
+
+    raw_value = str(value or "").strip()
+    if bootstrap == "last_n":
+        return bootstrap, str(parse_positive_int(raw_value, "导入最近条数", default=100))
+    if bootstrap == "since":
+        if not raw_value:
+            raise ValueError("选择“导入指定日期之后”时必须填写起始日期。")
+        parse_bootstrap_since(raw_value)
+        return bootstrap, raw_value
+    return bootstrap, ""
+
+
 def parse_channel_sources(value: str) -> List[Dict[str, Any]]:
     if not value:
         return []
@@ -177,6 +241,15 @@ def parse_channel_sources(value: str) -> List[Dict[str, Any]]:
         else:
             enabled = parse_bool(str(enabled_raw), True)
 
+        # 手工编辑或旧版写入的无效初始化参数按“最新消息起”处理，不让一个来源的坏值拖垮整次运行。
+        try:
+            bootstrap, bootstrap_value = normalize_source_bootstrap(
+                str(row.get("bootstrap", "") or ""),
+                str(row.get("bootstrap_value", "") or ""),
+            )
+        except ValueError:
+            bootstrap, bootstrap_value = DEFAULT_SOURCE_BOOTSTRAP, ""
+
         items.append(
             {
                 "source": source,
@@ -184,12 +257,19 @@ def parse_channel_sources(value: str) -> List[Dict[str, Any]]:
                 "enabled": enabled,
                 "status": str(row.get("status", "")),
                 "error": str(row.get("error", "")),
+                "bootstrap": bootstrap,
+                "bootstrap_value": bootstrap_value,
             }
         )
 
     return items
 
 
+# config.env 的解析结果，按文件路径缓存，进程内所有 ConfigStore 实例共用：
+# 路径 -> (文件签名, 只读快照)。签名为 (mtime_ns, 大小, inode)，文件不存在时为 None。
+_raw_config_snapshots: Dict[Path, Tuple[Optional[Tuple[int, int, int]], Mapping[str, str]]] = {}
+
+
 class ConfigStore:
     def __init__(self, data_dir: Optional[Path] = None):
         base_dir = data_dir or Path(os.environ.get("DATA_DIR", "data"))
@@ -202,11 +282,13 @@ class ConfigStore:
         self.session_dir = self.data_dir / "session"
         self.session_base_path = self.session_dir / "t2rss"
         self.session_file = self.session_dir / "t2rss.session"
+        self.account_session_dir = self.session_dir / "accounts"
         self.legacy_session_base_path = self.session_dir / "session_name"
         self.legacy_session_file = self.session_dir / "session_name.session"
         self.backups_dir = self.data_dir / "backups"
         self.log_dir = self.data_dir / "logs"
         self.log_file = self.log_dir / "panel.log"
+        self.worker_log_file = self.log_dir / "worker.log"
         self.db_path = self.data_dir / "panel.db"
 
     def ensure_directories(self) -> None:
@@ -215,6 +297,7 @@ class ConfigStore:
         self.last_id_dir.mkdir(parents=True, exist_ok=True)
         self.download_dir.mkdir(parents=True, exist_ok=True)
         self.session_dir.mkdir(parents=True, exist_ok=True)
+        self.account_session_dir.mkdir(parents=True, exist_ok=True)
         self.backups_dir.mkdir(parents=True, exist_ok=True)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
@@ -234,7 +317,31 @@ class ConfigStore:
 
         return moved
 
+    def _env_file_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self.env_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _raw_config_snapshot(self) -> Mapping[str, str]:
+        """config.env 的只读快照：文件签名未变时直接复用，变化时（含其他进程写入、备份恢复）重新解析一次并整体替换。
+
+        先取签名再解析：解析期间文件被改写时，下次调用签名不符会再解析，不会把新签名配上旧内容。
+        """
+        signature = self._env_file_signature()
+        cached = _raw_config_snapshots.get(self.env_file)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        snapshot = MappingProxyType(self._parse_raw_config())
+        _raw_config_snapshots[self.env_file] = (signature, snapshot)
+        return snapshot
+
     def load_raw_config(self) -> Dict[str, str]:
+        """返回配置的可修改副本；config.env 只在内容变化后解析，调用方频繁读取（每次运行、每个 RSS 请求）不再重复解析。"""
+        return dict(self._raw_config_snapshot())
+
+    def _parse_raw_config(self) -> Dict[str, str]:
         values: Dict[str, str] = {}
 
         if self.env_file.exists():
@@ -283,7 +390,13 @@ class ConfigStore:
             value = merged.get(key, "")
             lines.append(f"{key}={value}")
 
-        self.env_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        # 先写临时文件再整体替换，其他进程不会读到写了一半的配置；替换后 inode 变化，各进程的快照随之失效。
+        temp_file = self.env_file.with_name(f".{self.env_file.name}.{os.getpid()}.tmp")
+        temp_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        if self.env_file.exists():
+            os.chmod(temp_file, self.env_file.stat().st_mode & 0o7777)
+        os.replace(temp_file, self.env_file)
+        self._raw_config_snapshot()
 
     def build_forwarder_config(self) -> ForwarderConfig:
         raw = self.load_raw_config()
@@ -328,6 +441,43 @@ class ConfigStore:
                 default=600,
             ),
             test_mode_enabled=parse_bool(raw.get("PANEL_TEST_MODE_ENABLED", "false"), False),
+            rule_lab_corpus_size=parse_positive_int(
+                raw.get("PANEL_RULE_LAB_CORPUS_SIZE", "2000"),
+                "PANEL_RULE_LAB_CORPUS_SIZE",
+                default=2000,
+            ),
+            text_pool_threshold=parse_positive_int(
+                raw.get("PANEL_TEXT_POOL_THRESHOLD", "500"),
+                "PANEL_TEXT_POOL_THRESHOLD",
+                default=500,
+            ),
+            run_message_budget=parse_positive_int(
+                raw.get("PANEL_RUN_MESSAGE_BUDGET", "600"),
+                "PANEL_RUN_MESSAGE_BUDGET",
+                default=600,
+            ),
+            channel_message_budget=parse_positive_int(
+                raw.get("PANEL_CHANNEL_MESSAGE_BUDGET", "200"),
+                "PANEL_CHANNEL_MESSAGE_BUDGET",
+                default=200,
+            ),
+            realtime_enabled=parse_bool(raw.get("PANEL_REALTIME_ENABLED", "false"), False),
+            adaptive_poll_enabled=parse_bool(raw.get("PANEL_ADAPTIVE_POLL_ENABLED", "false"), False),
+            poll_min_minutes=parse_positive_int(
+                raw.get("PANEL_POLL_MIN_MINUTES", "5"),
+                "PANEL_POLL_MIN_MINUTES",
+                default=5,
+            ),
+            poll_max_minutes=parse_positive_int(
+                raw.get("PANEL_POLL_MAX_MINUTES", "360"),
+                "PANEL_POLL_MAX_MINUTES",
+                default=360,
+            ),
+            poll_target_latency_minutes=parse_positive_int(
+                raw.get("PANEL_POLL_TARGET_LATENCY_MINUTES", "30"),
+                "PANEL_POLL_TARGET_LATENCY_MINUTES",
+                default=30,
+            ),
         )
 
     def list_last_ids(self) -> List[Dict[str, Any]]:
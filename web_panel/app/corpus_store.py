@@ -0,0 +1,113 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from .time_utils import normalize_to_shanghai_iso, now_shanghai_iso
+
+
+class MessageCorpusStore:
+    """源消息语料存储：保留最近抓取的消息文本，供规则实验室离线评估。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS message_corpus (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel_id INTEGER NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    captured_at TEXT NOT NULL,
+                    analysis_json TEXT NOT NULL DEFAULT '',
+                    has_entities INTEGER NOT NULL DEFAULT 0,
+                    UNIQUE (channel_id, message_id)
+                )
+                """
+            )
+            # 旧版只保存正文；补上分析结果列后，规则实验室可按转发流程还原蓝字链接与触发词替换。
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(message_corpus)").fetchall()}
+            if "analysis_json" not in columns:
+                connection.execute("ALTER TABLE message_corpus ADD COLUMN analysis_json TEXT NOT NULL DEFAULT ''")
+            if "has_entities" not in columns:
+                connection.execute("ALTER TABLE message_corpus ADD COLUMN has_entities INTEGER NOT NULL DEFAULT 0")
+            connection.commit()
+
+    def add_messages(self, rows: Iterable[Dict[str, Any]], max_rows: int) -> int:
+        """写入语料并裁剪到最近 max_rows 条，返回新增条数。"""
+        payload = [
+            (
+                int(row["channel_id"]),
+                int(row["message_id"]),
+                str(row.get("text", "") or ""),
+                now_shanghai_iso(),
+                json.dumps(row["analysis"], ensure_ascii=False) if row.get("analysis") else "",
+                1 if row.get("has_entities") else 0,
+            )
+            for row in rows
+            if str(row.get("text", "") or "").strip()
+        ]
+        if not payload:
+            return 0
+
+        with sqlite3.connect(self.db_path) as connection:
+            before = connection.total_changes
+            connection.executemany(
+                """
+                INSERT OR IGNORE INTO message_corpus (channel_id, message_id, text, captured_at, analysis_json, has_entities)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                payload,
+            )
+            inserted = connection.total_changes - before
+            connection.execute(
+                """
+                DELETE FROM message_corpus
+                WHERE id <= (
+                    SELECT id FROM message_corpus ORDER BY id DESC LIMIT 1 OFFSET ?
+                )
+                """,
+                (max(1, int(max_rows)),),
+            )
+            connection.commit()
+        return inserted
+
+    def count(self) -> int:
+        with sqlite3.connect(self.db_path) as connection:
+            row = connection.execute("SELECT COUNT(*) FROM message_corpus").fetchone()
+        return int(row[0]) if row else 0
+
+    def list_samples(self, limit: int) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                """
+                SELECT channel_id, message_id, text, captured_at, analysis_json, has_entities
+                FROM message_corpus
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (max(1, int(limit)),),
+            ).fetchall()
+
+        return [
+            {
+                "channel_id": int(row["channel_id"]),
+                "message_id": int(row["message_id"]),
+                "text": str(row["text"]),
+                "captured_at": normalize_to_shanghai_iso(row["captured_at"]),
+                "analysis": json.loads(row["analysis_json"]) if row["analysis_json"] else None,
+                "has_entities": bool(row["has_entities"]),
+            }
+            for row in rows
+        ]
+
+    def clear(self) -> int:
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute("DELETE FROM message_corpus")
+            connection.commit()
+            return cursor.rowcount
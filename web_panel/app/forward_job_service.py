@@ -0,0 +1,245 @@
+import logging
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from .account_pool import AccountPool
+from .checkpoint_store import ChannelCheckpointStore
+from .client_manager import TelegramClientManager
+from .config_store import DEFAULT_ENV_VALUES, ConfigStore, parse_bool
+from .corpus_store import MessageCorpusStore
+from .forward_job_store import ForwardJobStore
+from .forward_ledger_store import ForwardLedgerStore
+from .forwarder_service import ForwarderRunner
+from .history_store import RunHistoryStore
+from .peer_cache_store import PeerCacheStore
+from .poll_schedule_store import SourcePollScheduleStore
+from .retry_queue_store import SendRetryQueueStore
+from .staging_store import StagingQueueStore
+
+
+# 每个附加任务独立设置的配置项；其余配置（API、会话、超时、预算、测试模式等）沿用 config.env。
+JOB_ENV_KEYS = [
+    "DESTINATION_CHANNEL",
+    "CHANNEL_IDS",
+    "CHANNEL_IDENTIFIERS",
+    "CHANNEL_SOURCES_JSON",
+    "KEYWORD_BLACKLIST",
+    "TEXT_REPLACEMENT_TERMS",
+    "TEXT_REPLACEMENT_REGEX",
+    "USER_ID_BLACKLIST",
+    "DEDUPLICATION_ENABLED",
+    "DEDUPLICATION_CACHE_SIZE",
+    "PANEL_AUTO_RUN_ENABLED",
+    "PANEL_AUTO_RUN_INTERVAL_MINUTES",
+    "PANEL_RSS_ENABLED",
+    "PANEL_RSS_TOKEN",
+    "PANEL_RSS_ITEM_LIMIT",
+]
+
+
+# 附加任务合并后的配置快照，按任务状态库路径缓存，进程内共用：路径 -> ((config.env 签名, 任务配置版本), 只读快照)。
+_job_config_snapshots: Dict[Path, Tuple[Tuple[Any, Optional[int]], Mapping[str, str]]] = {}
+
+
+class JobConfigStore(ConfigStore):
+    """附加任务的配置视图：任务自身的配置项覆盖 config.env，锁文件、下载目录、RSS 缓存与运行状态库放在 data/jobs/<ID>/ 下。
+
+    断点、暂存、台账、重试队列与轮询计划都按来源频道 ID 记录，不同任务可能订阅同一来源，因此每个任务使用自己的
+    job.db；任务定义、频道解析缓存与规则实验室语料仍在 panel.db 中共享。实时转发只服务默认任务。
+    """
+
+    def __init__(self, base: ConfigStore, job_store: ForwardJobStore, job_id: int):
+        super().__init__(base.data_dir)
+        self.base = base
+        self.job_store = job_store
+        self.job_id = int(job_id)
+        self.state_dir = base.data_dir / "jobs" / str(self.job_id)
+        self.last_id_dir = self.state_dir / "last_ids"
+        self.download_dir = self.state_dir / "downloads"
+        self.lock_file = self.state_dir / "forwarder.lock"
+        self.job_db_path = self.state_dir / "job.db"
+
+    def ensure_directories(self) -> None:
+        self.base.ensure_directories()
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+
+    def _raw_config_snapshot(self) -> Mapping[str, str]:
+        """合并 config.env 与任务配置后的只读快照：config.env 签名与任务配置版本都未变时直接复用。
+
+        与 ConfigStore 相同，先取版本再合并：合并期间有写入时下次版本不符会重新合并。
+        """
+        version = (self._env_file_signature(), self.job_store.settings_version(self.job_id))
+        cached = _job_config_snapshots.get(self.job_db_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        values = self.base.load_raw_config()
+        job = self.job_store.get_job(self.job_id)
+        settings = job["settings"] if job else {}
+        for key in JOB_ENV_KEYS:
+            values[key] = settings.get(key, DEFAULT_ENV_VALUES.get(key, ""))
+        values["PANEL_REALTIME_ENABLED"] = "false"
+        snapshot = MappingProxyType(values)
+        _job_config_snapshots[self.job_db_path] = (version, snapshot)
+        return snapshot
+
+    def save_raw_config(self, updated_config: Dict[str, str]) -> None:
+        settings = {
+            key: "" if value is None else str(value).replace("\r\n", "\n").replace("\r", "\n").strip()
+            for key, value in updated_config.items()
+            if key in JOB_ENV_KEYS
+        }
+        self.job_store.update_job(self.job_id, settings=settings)
+
+
+def _config_channel_ids(config_store: ConfigStore) -> Set[int]:
+    """配置中的来源频道 ID；配置无法解析时视为空。"""
+    try:
+        return set(config_store.build_forwarder_config().channel_ids)
+    except ValueError:
+        return set()
+
+
+class _JobLogAdapter(logging.LoggerAdapter):
+    def process(self, msg, kwargs):
+        return f"[{self.extra['label']}] {msg}", kwargs
+
+
+@dataclass
+class ForwardJobRuntime:
+    job_id: int
+    config_store: JobConfigStore
+    checkpoint_store: ChannelCheckpointStore
+    history_store: RunHistoryStore
+    poll_schedule_store: SourcePollScheduleStore
+    retry_store: SendRetryQueueStore
+    runner: ForwarderRunner
+
+
+class ForwardJobManager:
+    """附加转发任务调度：每个任务一个 ForwarderRunner，按各自的自动运行间隔独立调度。
+
+    所有任务共用同一个共享客户端、请求调度、频道解析缓存与账号池，新增任务不增加 Telegram 连接，
+    只增加一个调度协程与一个小的状态库；不同任务的运行可以并发，发送节奏由请求调度按账号统一控制。
+    """
+
+    def __init__(
+        self,
+        config_store: ConfigStore,
+        job_store: ForwardJobStore,
+        logger,
+        corpus_store: Optional[MessageCorpusStore] = None,
+        client_manager: Optional[TelegramClientManager] = None,
+        peer_cache_store: Optional[PeerCacheStore] = None,
+        account_pool: Optional[AccountPool] = None,
+    ):
+        self.config_store = config_store
+        self.job_store = job_store
+        self.logger = logger
+        self.corpus_store = corpus_store
+        self.client_manager = client_manager
+        self.peer_cache_store = peer_cache_store
+        self.account_pool = account_pool
+        self._jobs: Dict[int, ForwardJobRuntime] = {}
+
+    def get(self, job_id: int) -> Optional[ForwardJobRuntime]:
+        return self._jobs.get(int(job_id))
+
+    @property
+    def any_running(self) -> bool:
+        return any(job.runner.is_running for job in self._jobs.values())
+
+    def runtimes(self) -> List[ForwardJobRuntime]:
+        return [self._jobs[job_id] for job_id in sorted(self._jobs)]
+
+    async def start(self) -> None:
+        await self.sync()
+        # 重新获得转发租约时，已加载但被停止的任务也要恢复调度。
+        for runtime in self.runtimes():
+            await runtime.runner.start()
+
+    async def sync(self) -> None:
+        """按 forward_jobs 表启动新增任务、停止已删除任务。"""
+        job_ids = {job["id"] for job in self.job_store.list_jobs()}
+        for job_id in sorted(set(self._jobs) - job_ids):
+            await self._jobs.pop(job_id).runner.stop()
+        for job_id in sorted(job_ids - set(self._jobs)):
+            runtime = self.build_runtime(job_id)
+            self._jobs[job_id] = runtime
+            await runtime.runner.start()
+
+    async def stop(self) -> None:
+        for runtime in self._jobs.values():
+            await runtime.runner.stop()
+
+    async def delete_job(self, job_id: int) -> bool:
+        runtime = self._jobs.pop(int(job_id), None)
+        if runtime is not None:
+            await runtime.runner.stop()
+        job_config = runtime.config_store if runtime else JobConfigStore(self.config_store, self.job_store, job_id)
+        job_channel_ids = _config_channel_ids(job_config)
+        deleted = self.job_store.delete_job(job_id)
+        if runtime is not None:
+            shutil.rmtree(runtime.config_store.state_dir, ignore_errors=True)
+        if self.account_pool is not None:
+            # 分片归属按来源在各任务间共用，只移除默认任务与其余任务都不再订阅的来源。
+            still_used = _config_channel_ids(self.config_store)
+            for other in self._jobs.values():
+                still_used |= _config_channel_ids(other.config_store)
+            self.account_pool.forget_channels(job_channel_ids - still_used)
+        return deleted
+
+    def status_payload(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {}
+        for job in self.job_store.list_jobs():
+            runtime = self._jobs.get(job["id"])
+            settings = job["settings"]
+            payload[str(job["id"])] = {
+                "name": job["name"],
+                "destination_channel": settings.get("DESTINATION_CHANNEL", ""),
+                "auto_run_enabled": parse_bool(settings.get("PANEL_AUTO_RUN_ENABLED", "false"), False),
+                **(runtime.runner.status_payload() if runtime else {"is_running": False}),
+            }
+        return payload
+
+    def build_runtime(self, job_id: int) -> ForwardJobRuntime:
+        """建立任务的配置视图、状态库与执行器（不启动调度）。"""
+        job = self.job_store.get_job(job_id) or {"name": str(job_id)}
+        job_config = JobConfigStore(self.config_store, self.job_store, job_id)
+        job_config.ensure_directories()
+
+        db_path = job_config.job_db_path
+        checkpoint_store = ChannelCheckpointStore(db_path)
+        history_store = RunHistoryStore(db_path)
+        staging_store = StagingQueueStore(db_path)
+        poll_schedule_store = SourcePollScheduleStore(db_path)
+        ledger_store = ForwardLedgerStore(db_path)
+        retry_store = SendRetryQueueStore(db_path)
+        for store in (checkpoint_store, history_store, staging_store, poll_schedule_store, ledger_store, retry_store):
+            store.init_db()
+
+        runner = ForwarderRunner(
+            job_config,
+            checkpoint_store,
+            history_store,
+            _JobLogAdapter(self.logger, {"label": f"任务 {job['name']}"}),
+            corpus_store=self.corpus_store,
+            staging_store=staging_store,
+            poll_schedule_store=poll_schedule_store,
+            ledger_store=ledger_store,
+            retry_store=retry_store,
+            client_manager=self.client_manager,
+            peer_cache_store=self.peer_cache_store,
+            account_pool=self.account_pool,
+        )
+        return ForwardJobRuntime(
+            job_id=int(job_id),
+            config_store=job_config,
+            checkpoint_store=checkpoint_store,
+            history_store=history_store,
+            poll_schedule_store=poll_schedule_store,
+            retry_store=retry_store,
+            runner=runner,
+        )
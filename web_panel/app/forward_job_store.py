@@ -0,0 +1,151 @@
+import itertools
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .time_utils import normalize_to_shanghai_iso, now_shanghai_iso
+
+
+# forward_jobs 的解析结果，按数据库路径缓存，进程内所有 ForwardJobStore 实例共用：
+# 路径 -> (数据库文件签名, 任务 ID -> 任务, 任务 ID -> (行内容, 配置版本))。本进程写入任务时直接让缓存失效；
+# 其他进程写入或备份恢复会改变 panel.db 的签名 (mtime_ns, 大小, inode)，下次读取时重新加载。
+_jobs_snapshots: Dict[
+    Path, Tuple[Optional[Tuple[int, int, int]], Dict[int, Dict[str, Any]], Dict[int, Tuple[Tuple[str, str, str], int]]]
+] = {}
+# 配置版本号：重新加载时行内容（名称、配置、updated_at）未变的任务沿用原版本号，变化时取新号。
+_job_versions = itertools.count(1)
+
+
+class ForwardJobStore:
+    """附加转发任务存储：每个任务保存名称与自身的转发配置（来源、目标频道、规则、调度、RSS），
+    未列出的配置项沿用 config.env。默认任务即 config.env 本身，不在此表中。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS forward_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    settings_json TEXT NOT NULL DEFAULT '{}',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            connection.commit()
+
+    def create_job(self, name: str, settings: Dict[str, str]) -> int:
+        now_text = now_shanghai_iso()
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute(
+                "INSERT INTO forward_jobs (name, settings_json, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (str(name), json.dumps(settings, ensure_ascii=False), now_text, now_text),
+            )
+            connection.commit()
+        self._invalidate_snapshot()
+        return int(cursor.lastrowid)
+
+    def _db_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self.db_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _jobs_snapshot(self) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Tuple[Tuple[str, str, str], int]]]:
+        """全部任务的缓存：任务配置在每次运行、每个 RSS 请求时读取，只在 panel.db 变化后重新查询与解析。
+
+        先取签名再查询：查询期间有写入时下次签名不符会重新加载，不会把新签名配上旧内容。
+        """
+        signature = self._db_signature()
+        cached = _jobs_snapshots.get(self.db_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute("SELECT * FROM forward_jobs ORDER BY id").fetchall()
+        previous_versions = cached[2] if cached is not None else {}
+        jobs: Dict[int, Dict[str, Any]] = {}
+        versions: Dict[int, Tuple[Tuple[str, str, str], int]] = {}
+        for row in rows:
+            job = self._row_to_job(row)
+            row_key = (str(row["name"]), str(row["settings_json"]), str(row["updated_at"]))
+            previous = previous_versions.get(job["id"])
+            version = previous[1] if previous is not None and previous[0] == row_key else next(_job_versions)
+            jobs[job["id"]] = job
+            versions[job["id"]] = (row_key, version)
+        _jobs_snapshots[self.db_path] = (signature, jobs, versions)
+        return jobs, versions
+
+    def _invalidate_snapshot(self) -> None:
+        """本进程写入任务后让缓存失效；保留各任务的版本号，下次加载时未变的任务沿用。"""
+        cached = _jobs_snapshots.get(self.db_path)
+        if cached is not None:
+            _jobs_snapshots[self.db_path] = ((-1, -1, -1), cached[1], cached[2])
+
+    def settings_version(self, job_id: int) -> Optional[int]:
+        """任务配置的版本号，配置变化（含其他进程写入）后改变；任务不存在时为 None。供按任务缓存合并后的配置。"""
+        entry = self._jobs_snapshot()[1].get(int(job_id))
+        return entry[1] if entry is not None else None
+
+    @staticmethod
+    def _copy_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {**job, "settings": dict(job["settings"])}
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        job = self._jobs_snapshot()[0].get(int(job_id))
+        return self._copy_job(job) if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [self._copy_job(job) for job in self._jobs_snapshot()[0].values()]
+
+    def update_job(self, job_id: int, name: Optional[str] = None, settings: Optional[Dict[str, str]] = None) -> bool:
+        """settings 与已有配置合并后整体写回；name 为空时保持原名。"""
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            row = connection.execute("SELECT * FROM forward_jobs WHERE id = ?", (int(job_id),)).fetchone()
+            if row is None:
+                return False
+            job = self._row_to_job(row)
+            merged = {**job["settings"], **(settings or {})}
+            connection.execute(
+                "UPDATE forward_jobs SET name = ?, settings_json = ?, updated_at = ? WHERE id = ?",
+                (
+                    str(name or job["name"]),
+                    json.dumps(merged, ensure_ascii=False),
+                    now_shanghai_iso(),
+                    int(job_id),
+                ),
+            )
+            connection.commit()
+        self._invalidate_snapshot()
+        return True
+
+    def delete_job(self, job_id: int) -> bool:
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute("DELETE FROM forward_jobs WHERE id = ?", (int(job_id),))
+            connection.commit()
+        self._invalidate_snapshot()
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        try:
+            settings = json.loads(row["settings_json"] or "{}")
+        except json.JSONDecodeError:
+            settings = {}
+        if not isinstance(settings, dict):
+            settings = {}
+        return {
+            "id": int(row["id"]),
+            "name": str(row["name"]),
+            "settings": {str(key): str(value) for key, value in settings.items()},
+            "created_at": normalize_to_shanghai_iso(row["created_at"]),
+            "updated_at": normalize_to_shanghai_iso(row["updated_at"]),
+        }
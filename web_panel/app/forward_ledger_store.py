@@ -0,0 +1,138 @@
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .time_utils import normalize_to_shanghai_iso, now_shanghai_iso
+
+
+LEDGER_STATUS_FORWARDED = "forwarded"
+LEDGER_STATUS_FAILED = "failed"
+
+
+class ForwardLedgerStore:
+    """转发台账：每条源消息发送结束后立即记录对应的目标消息 ID 与状态，重跑时据此跳过已发送的消息。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS forward_ledger (
+                    source_channel_id INTEGER NOT NULL,
+                    source_message_id INTEGER NOT NULL,
+                    dest_message_id INTEGER,
+                    share_key TEXT NOT NULL DEFAULT '',
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (source_channel_id, source_message_id)
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_forward_ledger_share_key ON forward_ledger (share_key) WHERE share_key != ''"
+            )
+            connection.commit()
+
+    def record(
+        self,
+        source_channel_id: int,
+        source_message_id: int,
+        status: str,
+        dest_message_id: Optional[int] = None,
+        share_key: Optional[str] = None,
+    ) -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            self.apply_entries(
+                connection,
+                [(source_channel_id, source_message_id, status, dest_message_id, share_key)],
+            )
+            connection.commit()
+
+    @staticmethod
+    def apply_entries(
+        connection: sqlite3.Connection,
+        entries: Iterable[Tuple[int, int, str, Optional[int], Optional[str]]],
+    ) -> None:
+        """在调用方的事务内批量写入台账条目，由调用方提交。"""
+        now_text = now_shanghai_iso()
+        connection.executemany(
+            """
+            INSERT INTO forward_ledger (
+                source_channel_id, source_message_id, dest_message_id, share_key,
+                status, attempts, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT(source_channel_id, source_message_id)
+            DO UPDATE SET
+                dest_message_id = COALESCE(excluded.dest_message_id, forward_ledger.dest_message_id),
+                share_key = CASE WHEN excluded.share_key != '' THEN excluded.share_key ELSE forward_ledger.share_key END,
+                status = excluded.status,
+                attempts = forward_ledger.attempts + 1,
+                updated_at = excluded.updated_at
+            """,
+            [
+                (
+                    int(source_channel_id),
+                    int(source_message_id),
+                    int(dest_message_id) if dest_message_id else None,
+                    str(share_key or ""),
+                    status,
+                    now_text,
+                    now_text,
+                )
+                for source_channel_id, source_message_id, status, dest_message_id, share_key in entries
+            ],
+        )
+
+    def forwarded_ids(self, source_channel_id: int, source_message_ids: Iterable[int]) -> Set[int]:
+        """返回给定源消息中已成功转发过的消息 ID。"""
+        message_ids = [int(item) for item in source_message_ids]
+        if not message_ids:
+            return set()
+
+        placeholders = ",".join("?" for _ in message_ids)
+        with sqlite3.connect(self.db_path) as connection:
+            rows = connection.execute(
+                f"""
+                SELECT source_message_id FROM forward_ledger
+                WHERE source_channel_id = ? AND status = ? AND source_message_id IN ({placeholders})
+                """,
+                (int(source_channel_id), LEDGER_STATUS_FORWARDED, *message_ids),
+            ).fetchall()
+        return {int(row[0]) for row in rows}
+
+    def find_by_share_key(self, share_key: str) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                "SELECT * FROM forward_ledger WHERE share_key = ? ORDER BY updated_at DESC",
+                (str(share_key or ""),),
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def get_entry(self, source_channel_id: int, source_message_id: int) -> Optional[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            row = connection.execute(
+                "SELECT * FROM forward_ledger WHERE source_channel_id = ? AND source_message_id = ?",
+                (int(source_channel_id), int(source_message_id)),
+            ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "source_channel_id": int(row["source_channel_id"]),
+            "source_message_id": int(row["source_message_id"]),
+            "dest_message_id": int(row["dest_message_id"]) if row["dest_message_id"] is not None else None,
+            "share_key": str(row["share_key"] or ""),
+            "status": str(row["status"]),
+            "attempts": int(row["attempts"]),
+            "created_at": normalize_to_shanghai_iso(row["created_at"]),
+            "updated_at": normalize_to_shanghai_iso(row["updated_at"]),
+        }
@@ -1,66 +1,66 @@
+from __future__ import annotations
+
 import asyncio
 import collections
+import contextlib
 import os
 import re
+import tempfile
 import time
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
-from typing import Any, Dict, List, Optional, Set
-
-from telethon import TelegramClient
-from telethon.errors import FloodWaitError
-from telethon.tl.types import MessageEntityMentionName, MessageEntityTextUrl, MessageService
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
 
+from .account_pool import AccountPool, SendRotation, lease_pool_accounts
 from .checkpoint_store import ChannelCheckpointStore
-from .config_store import ConfigStore, ForwarderConfig
+from .checkpoint_writer import CheckpointWriteBuffer
+from .client_manager import TelegramClientManager, open_telegram_client
+from .config_store import DEFAULT_SOURCE_BOOTSTRAP, ConfigStore, ForwarderConfig, parse_bootstrap_since
+from .corpus_store import MessageCorpusStore
+from .forward_ledger_store import LEDGER_STATUS_FAILED, LEDGER_STATUS_FORWARDED, ForwardLedgerStore
+from .message_analysis import (
+    MessageAnalysis,
+    _clean_url_token,
+    _extract_button_urls,
+    _extract_urls_from_text,
+    analysis_to_record,
+    extract_quark_link,
+    message_formatted_text_of,
+)
+from .message_envelope import MessageEnvelope
+from .peer_cache_store import PeerCacheStore
+from .poll_schedule_store import SourcePollScheduleStore
+from .request_governor import PRIMARY_ACCOUNT, account_scope, governor, subsystem_scope
+from .retry_queue_store import RETRY_OUTCOME_DEAD, SendRetryQueueStore
+from .staging_store import MessageKey, StagingQueueStore
+from .text_pipeline import (
+    PreparedOutbound,
+    build_in_pool,
+    build_outbound_text,
+    open_text_pool,
+    screen_in_pool,
+    screen_message,
+)
 from .time_utils import now_shanghai_iso
 
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+    from telethon.hints import EntityLike
+
 
-QUARK_LINK_PATTERN = re.compile(r"https://pan\.quark\.cn/s/[a-zA-Z0-9]+")
-URL_PATTERN = re.compile(r'https?://[^\s<>"]+')
-BOT_TRIGGER_PHRASE = "点击获取夸克链接"
 SEND_RETRY_MAX_ATTEMPTS = 3
 SEND_RETRY_BASE_DELAY_SECONDS = 2
 SEND_INTERVAL_SECONDS = 3
+STAGING_CHUNK_SIZE = 200
+TOP_MESSAGE_PROBE_BATCH_SIZE = 100
+RETRY_DRAIN_BATCH_SIZE = 50
+# 批量解析标识符时的并发数；实际请求间隔仍由全局请求调度控制。
+PEER_RESOLVE_CONCURRENCY = 4
+CHANNEL_DIFFERENCE_LIMIT = 100
 
 
-QUARK_TRIGGER_LINK_PAREN_PATTERN = re.compile(
-    rf"{re.escape(BOT_TRIGGER_PHRASE)}\s*[（(]\s*(?P<url>(?:https?://t\.me/[^\s)）]+|tg://resolve[^\s)）]+))\s*[)）]"
-)
-QUARK_TRIGGER_LINK_INLINE_PATTERN = re.compile(
-    rf"{re.escape(BOT_TRIGGER_PHRASE)}\s*(?P<url>(?:https?://t\.me/\S+|tg://resolve\S+))"
-)
-QUARK_TRIGGER_MARKDOWN_PATTERN = re.compile(
-    rf"\[[^\]]*{re.escape(BOT_TRIGGER_PHRASE)}[^\]]*\]\((?P<url>(?:https?://t\.me/[^\s)]+|tg://resolve[^\s)]+))\)"
-)
-TME_JUMP_LINK_PATTERN = re.compile(r"(?:https?://t\.me/\S+|tg://resolve\S+)")
-
-
-def _has_quark_trigger_phrase(text: Optional[str]) -> bool:
-    return BOT_TRIGGER_PHRASE in str(text or "")
-
-
-def _is_quark_jump_link(url: str) -> bool:
-    lower = str(url or "").lower()
-    if not lower:
-        return False
-    if "quark" in lower:
-        return True
-    if "start=" in lower and "_quark" in lower:
-        return True
-    return False
-
-
-def extract_quark_link(text: Optional[str]) -> Optional[str]:
-    if not text:
-        return None
-    match = QUARK_LINK_PATTERN.search(text)
-    return match.group(0) if match else None
-
-
-def _extract_message_quark_link(message, resolved_url: Optional[str] = None) -> Optional[str]:
-    message_text = getattr(message, "text", None) or getattr(message, "caption", None)
-    link = extract_quark_link(message_text)
+def _extract_message_quark_link(analysis: MessageAnalysis, resolved_url: Optional[str] = None) -> Optional[str]:
+    link = analysis.share_key
     if link:
         return link
     if resolved_url:
@@ -68,53 +68,6 @@ def _extract_message_quark_link(message, resolved_url: Optional[str] = None) ->
     return None
 
 
-def _clean_url_token(url: str) -> str:
-    return str(url or "").strip().rstrip(").,，。!！?？\"'")
-
-
-def _extract_urls_from_text(text: Optional[str]) -> List[str]:
-    if not text:
-        return []
-
-    urls: List[str] = []
-    seen: Set[str] = set()
-    for item in URL_PATTERN.findall(str(text)):
-        normalized = _clean_url_token(item)
-        if not normalized or normalized in seen:
-            continue
-        seen.add(normalized)
-        urls.append(normalized)
-    return urls
-
-
-def _extract_button_urls(message) -> List[str]:
-    urls: List[str] = []
-    seen: Set[str] = set()
-    rows = getattr(message, "buttons", None) or []
-
-    for row in rows:
-        if row is None:
-            continue
-
-        button_items = row if isinstance(row, (list, tuple)) else [row]
-        for button in button_items:
-            if button is None:
-                continue
-
-            url = getattr(button, "url", None)
-            if not url:
-                raw_button = getattr(button, "button", None)
-                url = getattr(raw_button, "url", None)
-
-            normalized = _clean_url_token(str(url or ""))
-            if not normalized or normalized in seen:
-                continue
-            seen.add(normalized)
-            urls.append(normalized)
-
-    return urls
-
-
 def _parse_bot_command_from_link(raw_url: str) -> Optional[tuple[str, str, str]]:
     url = str(raw_url or "").strip()
     if not url:
@@ -168,6 +121,8 @@ def _extract_bot_links_from_message(message) -> List[str]:
             seen.add(url)
             links.append(url)
 
+    from telethon.tl.types import MessageEntityTextUrl
+
     entities = getattr(message, "entities", None) or []
     for entity in entities:
         if not isinstance(entity, MessageEntityTextUrl):
@@ -189,212 +144,6 @@ def _extract_bot_links_from_message(message) -> List[str]:
     return links
 
 
-def _extract_quark_trigger_bot_links_from_text(text: Optional[str]) -> List[str]:
-    content = str(text or "")
-    urls: List[str] = []
-    seen: Set[str] = set()
-
-    for match in QUARK_TRIGGER_LINK_PAREN_PATTERN.finditer(content):
-        url = _clean_url_token(match.group("url"))
-        if not url or url in seen:
-            continue
-        seen.add(url)
-        urls.append(url)
-
-    for match in QUARK_TRIGGER_LINK_INLINE_PATTERN.finditer(content):
-        url = _clean_url_token(match.group("url"))
-        if not url or url in seen:
-            continue
-        seen.add(url)
-        urls.append(url)
-
-    trigger_index = content.find(BOT_TRIGGER_PHRASE)
-    if trigger_index >= 0:
-        after_text = content[trigger_index + len(BOT_TRIGGER_PHRASE) :]
-        next_match = TME_JUMP_LINK_PATTERN.search(after_text)
-        if next_match:
-            url = _clean_url_token(next_match.group(0))
-            if url and url not in seen:
-                seen.add(url)
-                urls.append(url)
-
-    return urls
-
-
-def _extract_quark_trigger_bot_links(message) -> List[str]:
-    links: List[str] = []
-    seen: Set[str] = set()
-    message_text = (
-        getattr(message, "raw_text", None)
-        or getattr(message, "message", None)
-        or getattr(message, "text", None)
-        or getattr(message, "caption", None)
-        or ""
-    )
-
-    for url in _extract_quark_trigger_bot_links_from_text(message_text):
-        if url in seen:
-            continue
-        seen.add(url)
-        links.append(url)
-
-    entities = getattr(message, "entities", None) or []
-    for entity in entities:
-        if not isinstance(entity, MessageEntityTextUrl):
-            continue
-
-        start = int(getattr(entity, "offset", 0) or 0)
-        length = int(getattr(entity, "length", 0) or 0)
-        end = start + max(length, 0)
-        entity_text = message_text[start:end] if length > 0 and start >= 0 and end <= len(message_text) else ""
-
-        entity_url = _clean_url_token(str(getattr(entity, "url", "") or ""))
-        lower_url = entity_url.lower()
-        if "t.me/" not in lower_url and not lower_url.startswith("tg://"):
-            continue
-
-        if BOT_TRIGGER_PHRASE not in entity_text and not _is_quark_jump_link(entity_url):
-            continue
-
-        if not entity_url or entity_url in seen:
-            continue
-        seen.add(entity_url)
-        links.append(entity_url)
-
-    rows = getattr(message, "buttons", None) or []
-    for row in rows:
-        if row is None:
-            continue
-        button_items = row if isinstance(row, (list, tuple)) else [row]
-        for button in button_items:
-            if button is None:
-                continue
-            button_text = str(getattr(button, "text", "") or "")
-
-            button_url = _clean_url_token(str(getattr(button, "url", "") or ""))
-            if not button_url:
-                raw_button = getattr(button, "button", None)
-                button_url = _clean_url_token(str(getattr(raw_button, "url", "") or ""))
-
-            lower_url = button_url.lower()
-            if "t.me/" not in lower_url and not lower_url.startswith("tg://"):
-                continue
-
-            if BOT_TRIGGER_PHRASE not in button_text and not _is_quark_jump_link(button_url):
-                continue
-
-            if not button_url or button_url in seen:
-                continue
-            seen.add(button_url)
-            links.append(button_url)
-    return links
-
-
-def _replace_quark_trigger_segment(text: str, resolved_url: str) -> str:
-    content = str(text or "")
-    replacement = str(resolved_url or "").strip()
-    if not replacement:
-        return content
-
-    content = QUARK_TRIGGER_MARKDOWN_PATTERN.sub(replacement, content)
-
-    content = QUARK_TRIGGER_LINK_PAREN_PATTERN.sub(f"{replacement} ({replacement})", content)
-    content = QUARK_TRIGGER_LINK_INLINE_PATTERN.sub(f"{replacement} {replacement}", content)
-
-    if BOT_TRIGGER_PHRASE in content:
-        content = content.replace(BOT_TRIGGER_PHRASE, replacement)
-    return content
-
-
-def _materialize_text_url_entities(
-    text: str,
-    entities,
-    skip_urls: Optional[Set[str]] = None,
-    message=None,
-) -> str:
-    content = str(text or "")
-    if not content or not entities:
-        return content
-
-    skip_link_set = {_clean_url_token(item) for item in (skip_urls or set()) if str(item).strip()}
-
-    get_entities_text = getattr(message, "get_entities_text", None)
-    if callable(get_entities_text):
-        try:
-            pair_candidates: List[tuple[str, str]] = []
-            raw_pairs = get_entities_text(MessageEntityTextUrl)
-            try:
-                raw_pairs_iter = iter(raw_pairs)
-            except TypeError:
-                raw_pairs_iter = iter(())
-
-            for pair in raw_pairs_iter:
-                if not isinstance(pair, (list, tuple)) or len(pair) != 2:
-                    continue
-                entity, entity_text = pair
-                entity_url = _clean_url_token(str(getattr(entity, "url", "") or ""))
-                anchor_text = str(entity_text or "").strip()
-                if not entity_url or entity_url in skip_link_set:
-                    continue
-                if BOT_TRIGGER_PHRASE in anchor_text:
-                    continue
-                pair_candidates.append((anchor_text, entity_url))
-
-            if pair_candidates:
-                append_later: List[str] = []
-                for anchor_text, entity_url in pair_candidates:
-                    if entity_url in content:
-                        continue
-
-                    replacement = f"{anchor_text} ({entity_url})" if anchor_text else entity_url
-                    if anchor_text and anchor_text in content:
-                        content = content.replace(anchor_text, replacement, 1)
-                    else:
-                        append_later.append(replacement)
-
-                for item in append_later:
-                    normalized_item = str(item or "").strip()
-                    if not normalized_item or normalized_item in content:
-                        continue
-                    content = f"{content}\n{normalized_item}" if content else normalized_item
-
-                return content
-        except Exception:
-            pass
-
-    candidates: List[tuple[int, int, str]] = []
-
-    for entity in entities:
-        if not isinstance(entity, MessageEntityTextUrl):
-            continue
-
-        entity_url = _clean_url_token(str(getattr(entity, "url", "") or ""))
-        if not entity_url or entity_url in skip_link_set:
-            continue
-
-        start = int(getattr(entity, "offset", 0) or 0)
-        length = int(getattr(entity, "length", 0) or 0)
-        end = start + length
-        if length <= 0 or start < 0 or end > len(content):
-            continue
-
-        candidates.append((start, length, entity_url))
-
-    if not candidates:
-        return content
-
-    for start, length, entity_url in sorted(candidates, key=lambda item: item[0], reverse=True):
-        anchor_text = content[start : start + length]
-        if BOT_TRIGGER_PHRASE in anchor_text:
-            continue
-
-        if entity_url in anchor_text:
-            replacement = anchor_text
-        else:
-            replacement = f"{anchor_text} ({entity_url})"
-        content = content[:start] + replacement + content[start + length :]
-
-    return content
 
 
 def _extract_url_from_bot_message(message) -> Optional[str]:
@@ -422,22 +171,15 @@ def _extract_url_from_bot_message(message) -> Optional[str]:
 
 async def _resolve_link_via_bot(
     client: TelegramClient,
-    message,
+    message_id: Any,
+    analysis: MessageAnalysis,
     logger,
     bot_link_cache: Dict[str, Optional[str]],
 ) -> Optional[str]:
-    message_text = (
-        getattr(message, "raw_text", None)
-        or getattr(message, "message", None)
-        or getattr(message, "text", None)
-        or getattr(message, "caption", None)
-        or ""
-    )
-    if not _has_quark_trigger_phrase(message_text):
+    if not analysis.has_trigger_phrase:
         return None
 
-    message_id = getattr(message, "id", "unknown")
-    bot_links = _extract_quark_trigger_bot_links(message)
+    bot_links = analysis.trigger_bot_links
     if not bot_links:
         logger.info("消息 %s 含夸克触发词，但未找到关联的 Bot 跳转链接。", message_id)
         return None
@@ -456,7 +198,7 @@ async def _resolve_link_via_bot(
 
         resolved_url: Optional[str] = None
         try:
-            async with client.conversation(bot_username, timeout=25) as conversation:
+            async with governor.request("bot"), client.conversation(bot_username, timeout=25) as conversation:
                 await conversation.send_message(command)
                 for _ in range(4):
                     response = await conversation.get_response(timeout=15)
@@ -477,25 +219,29 @@ async def _resolve_link_via_bot(
 
 async def _send_message_with_retry(
     client: TelegramClient,
-    destination_channel: str,
+    destination_channel: EntityLike,
     outbound_text: Optional[str],
     media_path: Optional[str],
     formatting_entities,
     logger,
     message_id: Any,
-) -> bool:
+) -> Optional[int]:
+    """发送成功时返回目标消息 ID，失败返回 None。"""
+    from telethon.errors import FloodWaitError
+
     for attempt in range(1, SEND_RETRY_MAX_ATTEMPTS + 1):
         try:
-            await client.send_message(
-                destination_channel,
-                outbound_text or None,
-                file=media_path,
-                parse_mode=None,
-                formatting_entities=formatting_entities,
-            )
+            async with governor.request("send"):
+                sent = await client.send_message(
+                    destination_channel,
+                    outbound_text or None,
+                    file=media_path,
+                    parse_mode=None,
+                    formatting_entities=formatting_entities,
+                )
             if attempt > 1:
                 logger.info("消息 %s 重试后发送成功（第 %s 次）。", message_id, attempt)
-            return True
+            return int(getattr(sent, "id", 0) or 0)
         except FloodWaitError as exc:
             wait_seconds = int(getattr(exc, "seconds", 0) or 0)
             if attempt >= SEND_RETRY_MAX_ATTEMPTS:
@@ -505,20 +251,19 @@ async def _send_message_with_retry(
                     SEND_RETRY_MAX_ATTEMPTS,
                     wait_seconds,
                 )
-                return False
+                return None
 
-            sleep_seconds = max(wait_seconds, SEND_RETRY_BASE_DELAY_SECONDS)
+            # 等待期已登记到全局调度，下次发送（包括其他子系统的发送）会排队到等待期结束。
             logger.warning(
                 "消息 %s 发送触发 FloodWait，将在 %s 秒后进行第 %s 次重试。",
                 message_id,
-                sleep_seconds,
+                max(wait_seconds, 1),
                 attempt + 1,
             )
-            await asyncio.sleep(sleep_seconds)
         except Exception as exc:
             if attempt >= SEND_RETRY_MAX_ATTEMPTS:
                 logger.exception("消息 %s 发送最终失败（已重试 %s 次）: %s", message_id, SEND_RETRY_MAX_ATTEMPTS, exc)
-                return False
+                return None
 
             sleep_seconds = min(SEND_RETRY_BASE_DELAY_SECONDS * attempt, 10)
             logger.warning(
@@ -531,7 +276,7 @@ async def _send_message_with_retry(
             )
             await asyncio.sleep(sleep_seconds)
 
-    return False
+    return None
 
 
 def _compile_text_replacement_regex(patterns_text: str, logger) -> List[re.Pattern[str]]:
@@ -552,45 +297,96 @@ def _compile_text_replacement_regex(patterns_text: str, logger) -> List[re.Patte
     return compiled
 
 
-def _apply_text_replacements(
-    text: str,
-    replacement_terms: List[str],
-    replacement_regex_rules: List[re.Pattern[str]],
-) -> tuple[str, int, int]:
-    updated = str(text or "")
-    term_hits = 0
-    regex_hits = 0
+def _peer_entry_from_entity(entity) -> Dict[str, Any]:
+    from telethon import utils
+    from telethon.tl.types import Channel, Chat
 
-    for term in replacement_terms:
-        token = str(term or "")
-        if not token:
-            continue
-        hit_count = updated.count(token)
-        if hit_count > 0:
-            updated = updated.replace(token, "")
-            term_hits += hit_count
+    if isinstance(entity, Channel):
+        peer_type = "channel"
+    elif isinstance(entity, Chat):
+        peer_type = "chat"
+    else:
+        peer_type = "user"
+    return {
+        "peer_id": int(entity.id),
+        "access_hash": int(getattr(entity, "access_hash", 0) or 0),
+        "peer_type": peer_type,
+        "title": utils.get_display_name(entity),
+    }
 
-    for pattern in replacement_regex_rules:
-        updated, hit_count = pattern.subn("", updated)
-        regex_hits += int(hit_count)
 
-    return updated, term_hits, regex_hits
+def _input_peer_from_entry(entry: Dict[str, Any]):
+    from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
 
-async def _resolve_identifier(client: TelegramClient, identifier: str, logger) -> Optional[int]:
-    entity_to_get = identifier
-    if identifier.startswith("+"):
-        entity_to_get = f"https://t.me/{identifier}"
+    if entry["peer_type"] == "channel":
+        return InputPeerChannel(entry["peer_id"], entry["access_hash"])
+    if entry["peer_type"] == "chat":
+        return InputPeerChat(entry["peer_id"])
+    return InputPeerUser(entry["peer_id"], entry["access_hash"])
 
-    try:
-        entity = await client.get_entity(entity_to_get)
-        logger.info("标识符解析成功 '%s' -> %s", identifier, entity.id)
-        return entity.id
-    except Exception as exc:
-        logger.warning("标识符解析失败 '%s': %s", identifier, exc)
-        return None
+
+async def _resolve_peer_entries(
+    client: TelegramClient,
+    identifiers: List[str],
+    peer_cache: Optional[PeerCacheStore],
+    logger,
+) -> Dict[str, Union[Dict[str, Any], Exception]]:
+    """先查解析缓存，缺失或过期的标识符并发解析并写回缓存；过期条目重新解析失败时沿用旧结果。"""
+    unique_identifiers = list(dict.fromkeys(identifiers))
+    cached = peer_cache.get_many(unique_identifiers) if peer_cache is not None else {}
+    results: Dict[str, Union[Dict[str, Any], Exception]] = {
+        identifier: cached[identifier]
+        for identifier in unique_identifiers
+        if identifier in cached and cached[identifier]["fresh"]
+    }
+    pending = [identifier for identifier in unique_identifiers if identifier not in results]
+    semaphore = asyncio.Semaphore(PEER_RESOLVE_CONCURRENCY)
+
+    async def resolve_one(identifier: str) -> Union[Dict[str, Any], Exception]:
+        entity_to_get = f"https://t.me/{identifier}" if identifier.startswith("+") else identifier
+        try:
+            async with semaphore, governor.request("resolve"):
+                entity = await client.get_entity(entity_to_get)
+        except Exception as exc:
+            stale = cached.get(identifier)
+            if stale is not None:
+                logger.warning("标识符 '%s' 重新解析失败，沿用 %s 的缓存结果: %s", identifier, stale["resolved_at"], exc)
+                return stale
+            return exc
+
+        entry = _peer_entry_from_entity(entity)
+        if peer_cache is not None:
+            peer_cache.upsert(identifier, **entry)
+        return entry
+
+    outcomes = await asyncio.gather(*(resolve_one(identifier) for identifier in pending))
+    results.update(zip(pending, outcomes))
+    return results
 
 
-async def resolve_identifiers_preview(config_store: ConfigStore, identifiers: List[str], logger) -> List[Dict[str, Any]]:
+async def _resolve_destination_peer(
+    client: TelegramClient,
+    destination_channel: str,
+    peer_cache: Optional[PeerCacheStore],
+    logger,
+):
+    """目标频道经解析缓存转为 InputPeer，之后的读取与发送不再按用户名解析；解析失败时原样返回交由 Telethon 处理。"""
+    if peer_cache is None:
+        return destination_channel
+    outcome = (await _resolve_peer_entries(client, [destination_channel], peer_cache, logger))[destination_channel]
+    if isinstance(outcome, Exception):
+        logger.warning("目标频道 '%s' 解析失败，将直接使用原始标识符: %s", destination_channel, outcome)
+        return destination_channel
+    return _input_peer_from_entry(outcome)
+
+
+async def resolve_identifiers_preview(
+    config_store: ConfigStore,
+    identifiers: List[str],
+    logger,
+    client_manager: Optional[TelegramClientManager] = None,
+    peer_cache_store: Optional[PeerCacheStore] = None,
+) -> List[Dict[str, Any]]:
     raw_config = config_store.load_raw_config()
     api_id = raw_config.get("API_ID", "").strip()
     api_hash = raw_config.get("API_HASH", "").strip()
@@ -601,41 +397,83 @@ async def resolve_identifiers_preview(config_store: ConfigStore, identifiers: Li
     if not config_store.session_file.exists():
         raise FileNotFoundError("会话文件缺失，请先上传或创建 t2rss.session。")
 
-    results: List[Dict[str, Any]] = []
-    async with TelegramClient(str(config_store.session_base_path), int(api_id), api_hash) as client:
-        if not await client.is_user_authorized():
-            raise RuntimeError("当前会话未授权，请重新创建 Telegram 会话。")
+    if peer_cache_store is None:
+        peer_cache_store = PeerCacheStore(config_store.db_path)
+        peer_cache_store.init_db()
 
-        for identifier in identifiers:
-            entity_to_get = identifier
-            if identifier.startswith("+"):
-                entity_to_get = f"https://t.me/{identifier}"
+    with subsystem_scope("resolver"):
+        async with open_telegram_client(config_store, client_manager) as client:
+            outcomes = await _resolve_peer_entries(client, identifiers, peer_cache_store, logger)
 
-            try:
-                entity = await client.get_entity(entity_to_get)
-                results.append(
-                    {
-                        "identifier": identifier,
-                        "ok": True,
-                        "channel_id": entity.id,
-                        "error": "",
-                    }
-                )
-            except Exception as exc:
-                logger.warning("预解析失败 '%s': %s", identifier, exc)
-                results.append(
-                    {
-                        "identifier": identifier,
-                        "ok": False,
-                        "channel_id": "",
-                        "error": str(exc),
-                    }
-                )
+    results: List[Dict[str, Any]] = []
+    for identifier in identifiers:
+        outcome = outcomes[identifier]
+        if isinstance(outcome, Exception):
+            logger.warning("预解析失败 '%s': %s", identifier, outcome)
+            results.append(
+                {
+                    "identifier": identifier,
+                    "ok": False,
+                    "channel_id": "",
+                    "error": str(outcome),
+                }
+            )
+        else:
+            results.append(
+                {
+                    "identifier": identifier,
+                    "ok": True,
+                    "channel_id": outcome["peer_id"],
+                    "error": "",
+                }
+            )
     return results
 
 
+async def warm_peer_cache(
+    config_store: ConfigStore,
+    peer_cache_store: PeerCacheStore,
+    logger,
+    client_manager: Optional[TelegramClientManager] = None,
+) -> int:
+    """启动时预先解析目标频道与来源标识符中缺失或过期的缓存条目，返回实际发起解析的数量。"""
+    config = config_store.build_forwarder_config()
+    identifiers = [config.destination_channel, *config.channel_identifiers]
+    identifiers = [identifier for identifier in dict.fromkeys(identifiers) if identifier]
+    if not identifiers or not config_store.session_file.exists():
+        return 0
+
+    cached = peer_cache_store.get_many(identifiers)
+    stale = [identifier for identifier in identifiers if not cached.get(identifier, {}).get("fresh")]
+    if not stale:
+        return 0
+
+    with subsystem_scope("resolver"):
+        async with open_telegram_client(config_store, client_manager) as client:
+            outcomes = await _resolve_peer_entries(client, stale, peer_cache_store, logger)
+    failed = [identifier for identifier, outcome in outcomes.items() if isinstance(outcome, Exception)]
+    logger.info("🗂️ 频道解析缓存预热完成：解析 %s 个，失败 %s 个。", len(stale), len(failed))
+    return len(stale)
+
+
+async def _collect_destination_links(client: TelegramClient, destination: EntityLike, config: ForwarderConfig) -> Set[str]:
+    """只读取目标频道最近消息中的夸克链接，不做清理。"""
+    from telethon.tl.types import MessageService
+
+    links: Set[str] = set()
+    history = client.iter_messages(destination, limit=config.deduplication_cache_size)
+    async for message in governor.iterate(history):
+        if isinstance(message, MessageService):
+            continue
+        link = extract_quark_link(message_formatted_text_of(message))
+        if link:
+            links.add(link)
+    return links
+
+
 async def _cleanup_and_get_historical_links(
     client: TelegramClient,
+    destination: EntityLike,
     config: ForwarderConfig,
     logger,
     stats: Dict[str, Any],
@@ -643,37 +481,35 @@ async def _cleanup_and_get_historical_links(
 ) -> Set[str]:
     if not config.deduplication_enabled:
         return set()
+    from telethon.tl.types import MessageService
 
     logger.info("🧹 --- 开始预清理目标频道 ---")
     logger.info("🔍 正在加载目标频道最近的 %s 条消息进行预清理...", config.deduplication_cache_size)
 
     link_groups = collections.defaultdict(list)
-    async for message in client.iter_messages(config.destination_channel, limit=config.deduplication_cache_size):
+    history = client.iter_messages(destination, limit=config.deduplication_cache_size)
+    async for message in governor.iterate(history):
         if isinstance(message, MessageService):
             continue
 
-        message_text = getattr(message, "text", None) or getattr(message, "caption", None)
-        if not message_text:
-            continue
-
-        link = extract_quark_link(message_text)
+        link = extract_quark_link(message_formatted_text_of(message))
         if link:
-            link_groups[link].append(message)
+            link_groups[link].append(message.id)
 
     ids_to_delete: List[int] = []
     final_links: Set[str] = set()
-    for link, messages in link_groups.items():
-        messages.sort(key=lambda item: item.id, reverse=True)
+    for link, message_ids in link_groups.items():
+        message_ids.sort(reverse=True)
         final_links.add(link)
-        if len(messages) > 1:
-            ids_to_delete.extend(msg.id for msg in messages[1:])
+        if len(message_ids) > 1:
+            ids_to_delete.extend(message_ids[1:])
 
     if ids_to_delete:
         if test_mode_enabled:
             stats["destination_duplicates_detected"] += len(ids_to_delete)
             logger.info("🧪 测试模式：检测到目标频道可清理重复消息 %s 条（未执行删除）。", len(ids_to_delete))
         else:
-            await client.delete_messages(config.destination_channel, ids_to_delete)
+            await client.delete_messages(destination, ids_to_delete)
             stats["destination_duplicates_deleted"] += len(ids_to_delete)
             logger.info("✅ 目标频道预清理阶段删除重复消息 %s 条。", len(ids_to_delete))
     else:
@@ -684,10 +520,73 @@ async def _cleanup_and_get_historical_links(
     return final_links
 
 
+async def _bootstrap_channel_start_id(
+    client: TelegramClient,
+    channel_id: int,
+    policy: str,
+    value: str,
+    logger,
+) -> int:
+    """无断点记录的新来源：按初始化策略用一次 getHistory 请求确定起点，避免从 last_id=0 拉取全部历史。"""
+    try:
+        count = max(1, int(value or 100)) if policy == "last_n" else 0
+        since = parse_bootstrap_since(value) if policy == "since" else None
+    except ValueError as exc:
+        logger.warning("频道 %s 的初始化参数无效（%s %r），改为从最新消息开始: %s", channel_id, policy, value, exc)
+        policy, value = DEFAULT_SOURCE_BOOTSTRAP, ""
+
+    if policy == "last_n":
+        # 第 count+1 新的消息作为 min_id，恰好导入最近 count 条。
+        async with governor.request("history"):
+            anchor = await client.get_messages(channel_id, limit=1, add_offset=count)
+    elif policy == "since":
+        async with governor.request("history"):
+            anchor = await client.get_messages(channel_id, limit=1, offset_date=since)
+    else:
+        async with governor.request("history"):
+            anchor = await client.get_messages(channel_id, limit=1)
+
+    start_id = int(getattr(anchor[0], "id", 0) or 0) if anchor else 0
+    logger.info("🆕 频道 %s 首次运行，初始化策略 %s%s，起点 last_id=%s。", channel_id, policy, f"（{value}）" if value else "", start_id)
+    return start_id
+
+
+async def _probe_dialog_states(client: TelegramClient, channel_ids: List[int], logger) -> Dict[int, Tuple[int, int]]:
+    """批量读取来源对话的 (top_message, pts)，每批一次 GetPeerDialogs 请求；未加入（不在对话列表中）的来源不在结果中。"""
+    from telethon import utils
+    from telethon.errors import FloodWaitError
+    from telethon.tl.functions.messages import GetPeerDialogsRequest
+    from telethon.tl.types import InputDialogPeer
+
+    states: Dict[int, Tuple[int, int]] = {}
+    peers = []
+    for channel_id in channel_ids:
+        try:
+            peers.append(InputDialogPeer(await client.get_input_entity(channel_id)))
+        except (ValueError, TypeError) as exc:
+            logger.warning("频道 %s 无法从会话缓存解析，跳过探测: %s", channel_id, exc)
+
+    for batch_start in range(0, len(peers), TOP_MESSAGE_PROBE_BATCH_SIZE):
+        try:
+            async with governor.request("history"):
+                result = await client(GetPeerDialogsRequest(peers=peers[batch_start : batch_start + TOP_MESSAGE_PROBE_BATCH_SIZE]))
+        except FloodWaitError:
+            raise
+        except Exception as exc:
+            logger.warning("来源最新消息探测失败，本批来源改为直接拉取: %s", exc)
+            continue
+        for dialog in result.dialogs:
+            states[utils.get_peer_id(dialog.peer, add_mark=False)] = (
+                int(dialog.top_message or 0),
+                int(getattr(dialog, "pts", 0) or 0),
+            )
+    return states
+
+
 async def _forward_single_message(
     client: TelegramClient,
-    message,
-    destination_channel: str,
+    envelope: MessageEnvelope,
+    destination_channel: EntityLike,
     keyword_blacklist: List[str],
     user_blacklist: Set[int],
     download_dir: Path,
@@ -696,92 +595,67 @@ async def _forward_single_message(
     bot_link_cache: Dict[str, Optional[str]],
     text_replacement_terms: List[str],
     text_replacement_regex_rules: List[re.Pattern[str]],
-    pre_resolved_url: Optional[str] = None,
+    bot_client: Optional[TelegramClient] = None,
 ) -> str:
+    """发送一条消息；bot_client 为向解析 Bot 查询链接所用的客户端（默认同 client），账号池轮转发送时仍走主会话。"""
     media_path = None
+    message_id = envelope.message_id
+    analysis = envelope.analysis
     try:
-        if isinstance(message, MessageService):
+        if envelope.is_service:
             return "skipped_service"
 
-        message_text = (
-            getattr(message, "raw_text", None)
-            or getattr(message, "message", None)
-            or getattr(message, "text", None)
-            or getattr(message, "caption", None)
-        )
-        original_text = message_text or ""
-        outbound_text = message_text or ""
-        full_text = (message_text or "").lower()
-        original_entities = getattr(message, "entities", None)
-
-        if keyword_blacklist and full_text:
-            if any(keyword in full_text for keyword in keyword_blacklist):
-                return "skipped_keyword"
-
-        entities = getattr(message, "entities", None)
-        if user_blacklist and entities:
-            for entity in entities:
-                if isinstance(entity, MessageEntityMentionName) and entity.user_id in user_blacklist:
-                    return "skipped_user_blacklist"
-
-        if not outbound_text and not message.media:
-            return "skipped_no_content"
+        prepared = envelope.prepared
+        if prepared is not None:
+            skip_reason = prepared.skip_reason
+        else:
+            skip_reason = screen_message(analysis, envelope.media is not None, keyword_blacklist, user_blacklist)
+        if skip_reason:
+            return skip_reason
 
         if test_mode_enabled:
             return "simulated_forwarded"
 
-        resolved_url = pre_resolved_url
-        if not resolved_url:
-            resolved_url = await _resolve_link_via_bot(client, message, logger, bot_link_cache)
-        if resolved_url and _has_quark_trigger_phrase(outbound_text):
-            outbound_text = _replace_quark_trigger_segment(outbound_text, resolved_url)
-        elif resolved_url:
-            logger.info("消息 %s 获取到夸克链接，但正文无触发词，保持原文发送。", getattr(message, "id", "unknown"))
-
-        if outbound_text:
-            replaced_text, term_hits, regex_hits = _apply_text_replacements(
-                outbound_text,
+        resolved_url = envelope.resolved_url
+        if prepared is None or prepared.text is None:
+            if not resolved_url:
+                resolved_url = await _resolve_link_via_bot(
+                    bot_client or client, message_id, analysis, logger, bot_link_cache
+                )
+            prepared = build_outbound_text(
+                analysis,
+                bool(envelope.entities),
+                resolved_url,
                 text_replacement_terms,
                 text_replacement_regex_rules,
             )
-            outbound_text = replaced_text
-            if term_hits > 0 or regex_hits > 0:
-                logger.info(
-                    "🧽 择词替换：消息 %s 命中关键词 %s 次，命中正则 %s 次。",
-                    getattr(message, "id", "unknown"),
-                    term_hits,
-                    regex_hits,
-                )
-            outbound_text = outbound_text.strip()
-
-        text_changed = outbound_text != original_text
-
-        if text_changed and original_entities:
-            skip_links = set(_extract_quark_trigger_bot_links(message))
-            outbound_with_links = _materialize_text_url_entities(original_text, original_entities, skip_links, message)
-
-            if resolved_url and _has_quark_trigger_phrase(outbound_with_links):
-                outbound_with_links = _replace_quark_trigger_segment(outbound_with_links, resolved_url)
 
-            outbound_with_links, _, _ = _apply_text_replacements(
-                outbound_with_links,
-                text_replacement_terms,
-                text_replacement_regex_rules,
+        if resolved_url and not analysis.has_trigger_phrase:
+            logger.info("消息 %s 获取到夸克链接，但正文无触发词，保持原文发送。", message_id)
+        if prepared.term_hits > 0 or prepared.regex_hits > 0:
+            logger.info(
+                "🧽 择词替换：消息 %s 命中关键词 %s 次，命中正则 %s 次。",
+                message_id,
+                prepared.term_hits,
+                prepared.regex_hits,
             )
-            outbound_text = outbound_with_links.strip()
 
-        if not outbound_text and not message.media:
+        original_text = analysis.text
+        outbound_text = prepared.text
+        text_changed = prepared.text_changed
+
+        if not outbound_text and (envelope.media is None or envelope.raw is None):
             return "skipped_no_content"
 
-        if message.media:
+        if envelope.media is not None and envelope.raw is not None:
             download_dir.mkdir(parents=True, exist_ok=True)
-            media_path = await message.download_media(file=str(download_dir))
+            async with governor.request("download"):
+                media_path = await envelope.raw.download_media(file=str(download_dir))
 
-        message_id = getattr(message, "id", "unknown")
         entities_for_send = None
-        if not text_changed and outbound_text == original_text and original_entities:
-            entities_for_send = list(original_entities)
-        send_ok = await _send_message_with_retry(
+        if not text_changed and outbound_text == original_text and envelope.entities:
+            entities_for_send = list(envelope.entities)
+        sent_message_id = await _send_message_with_retry(
             client=client,
             destination_channel=destination_channel,
             outbound_text=outbound_text,
@@ -790,13 +664,17 @@ async def _forward_single_message(
             logger=logger,
             message_id=message_id,
         )
-        if not send_ok:
+        if sent_message_id is None:
+            envelope.send_error = "发送重试已达上限"
             return "error"
+        envelope.sent_message_id = sent_message_id
         return "forwarded"
-    except Exception:
-        logger.exception("转发消息失败，消息 ID: %s", getattr(message, "id", "unknown"))
+    except Exception as exc:
+        logger.exception("转发消息失败，消息 ID: %s", message_id)
+        envelope.send_error = str(exc) or type(exc).__name__
         return "error"
     finally:
+        envelope.release_raw()
         if media_path and os.path.exists(media_path):
             try:
                 os.remove(media_path)
@@ -804,6 +682,99 @@ async def _forward_single_message(
                 logger.warning("删除临时媒体文件失败: %s", media_path)
 
 
+async def _prepare_outbound_in_pool(
+    pool,
+    client: TelegramClient,
+    envelopes: List[MessageEnvelope],
+    config: ForwarderConfig,
+    text_replacement_regex_rules: List[re.Pattern[str]],
+    logger,
+    test_mode_enabled: bool,
+    bot_link_cache: Dict[str, Optional[str]],
+) -> None:
+    """积压较大时把过滤与文本改写分块交给进程池，事件循环只负责 Bot 解析等网络请求。"""
+    candidates = [envelope for envelope in envelopes if not envelope.is_service]
+    if not candidates:
+        return
+
+    started = time.perf_counter()
+    skip_reasons = await screen_in_pool(
+        pool,
+        [(envelope.analysis, envelope.media is not None) for envelope in candidates],
+        config.keyword_blacklist,
+        config.user_id_blacklist,
+    )
+    survivors: List[MessageEnvelope] = []
+    for envelope, skip_reason in zip(candidates, skip_reasons):
+        envelope.prepared = PreparedOutbound(skip_reason=skip_reason)
+        if not skip_reason:
+            survivors.append(envelope)
+
+    if test_mode_enabled or not survivors:
+        return
+
+    for envelope in survivors:
+        if not envelope.resolved_url:
+            envelope.resolved_url = await _resolve_link_via_bot(
+                client,
+                envelope.message_id,
+                envelope.analysis,
+                logger,
+                bot_link_cache,
+            )
+
+    prepared_items = await build_in_pool(
+        pool,
+        [(envelope.analysis, bool(envelope.entities), envelope.resolved_url) for envelope in survivors],
+        config.text_replacement_terms,
+        text_replacement_regex_rules,
+    )
+    for envelope, prepared in zip(survivors, prepared_items):
+        envelope.prepared = prepared
+
+    logger.info(
+        "🧮 批量文本处理完成：%s 条消息，其中 %s 条待发送，耗时 %.2f 秒。",
+        len(candidates),
+        len(survivors),
+        time.perf_counter() - started,
+    )
+
+
+def _enabled_source_channels(config: ForwarderConfig) -> Dict[int, tuple[str, str]]:
+    """启用的来源 CID 及其初始化策略；来源列表为空时回退到 CHANNEL_IDS（使用默认策略）。"""
+    sources: Dict[int, tuple[str, str]] = {}
+    for item in config.channel_sources or []:
+        cid = item.get("cid")
+        if not bool(item.get("enabled", True)) or not isinstance(cid, int):
+            continue
+        sources[cid] = (
+            str(item.get("bootstrap", DEFAULT_SOURCE_BOOTSTRAP)),
+            str(item.get("bootstrap_value", "")),
+        )
+
+    if not sources:
+        sources = {cid: (DEFAULT_SOURCE_BOOTSTRAP, "") for cid in config.channel_ids}
+    return sources
+
+
+def _schedule_round_robin(
+    channel_batches: Dict[int, List[MessageKey]],
+    run_budget: int,
+) -> List[MessageKey]:
+    """各来源按消息 ID 正序轮流取一条，直到用完单次运行预算；每个来源被选中的都是其积压的前缀。"""
+    queues = {channel_id: collections.deque(batch) for channel_id, batch in channel_batches.items() if batch}
+    scheduled: List[MessageKey] = []
+    while queues and len(scheduled) < run_budget:
+        for channel_id in list(queues):
+            queue = queues[channel_id]
+            scheduled.append(queue.popleft())
+            if not queue:
+                del queues[channel_id]
+            if len(scheduled) >= run_budget:
+                break
+    return scheduled
+
+
 def _build_empty_stats() -> Dict[str, Any]:
     return {
         "cid_required": True,
@@ -812,8 +783,17 @@ def _build_empty_stats() -> Dict[str, Any]:
         "per_channel_last_id_before": {},
         "per_channel_last_id_after": {},
         "per_channel_fetched": {},
+        "per_channel_scheduled": {},
+        "per_channel_deferred": {},
+        "bootstrapped_channels": [],
+        "probe_idle_channels": [],
+        "difference_channels": [],
+        "not_due_channels": [],
         "messages_collected_total": 0,
         "fetched_total": 0,
+        "deferred_total": 0,
+        "run_message_budget": 0,
+        "channel_message_budget": 0,
         "before_dedup_total": 0,
         "after_stage1_total": 0,
         "after_dedup_total": 0,
@@ -825,6 +805,10 @@ def _build_empty_stats() -> Dict[str, Any]:
         "skipped_no_content": 0,
         "skipped_historical_link": 0,
         "skipped_intra_run_link": 0,
+        "skipped_already_forwarded": 0,
+        "retry_forwarded": 0,
+        "retry_queued": 0,
+        "dead_lettered": 0,
         "test_mode_enabled": False,
         "dedup_enabled": False,
         "dedup_cache_size": 0,
@@ -834,30 +818,366 @@ def _build_empty_stats() -> Dict[str, Any]:
         "partial_checkpoint_updated": False,
         "timeout_seconds": 0,
         "error_total": 0,
+        "pool_account_count": 0,
     }
 
 
+def _capture_corpus_samples(
+    corpus_store: Optional[MessageCorpusStore],
+    envelopes: List[MessageEnvelope],
+    max_rows: int,
+    logger,
+) -> None:
+    if corpus_store is None or not envelopes:
+        return
+
+    rows = [
+        {
+            "channel_id": envelope.channel_id,
+            "message_id": envelope.message_id,
+            "text": envelope.analysis.text,
+            "analysis": analysis_to_record(envelope.analysis),
+            "has_entities": bool(envelope.entities),
+        }
+        for envelope in envelopes
+        if not envelope.is_service
+    ]
+
+    try:
+        corpus_store.add_messages(rows, max_rows)
+    except Exception as exc:
+        logger.warning("写入规则实验室语料失败（不影响转发）：%s", exc)
+
+
+def _stage_envelopes(
+    staging_store: StagingQueueStore,
+    corpus_store: Optional[MessageCorpusStore],
+    envelopes: List[MessageEnvelope],
+    max_corpus_rows: int,
+    logger,
+) -> int:
+    if not envelopes:
+        return 0
+
+    _capture_corpus_samples(corpus_store, envelopes, max_corpus_rows, logger)
+    staging_store.add_envelopes(envelopes)
+    for envelope in envelopes:
+        envelope.release_raw()
+    return len(envelopes)
+
+
+async def _stage_channel_history(
+    client: TelegramClient,
+    channel_id: int,
+    fetch_from: int,
+    fetch_limit: int,
+    staging_store: StagingQueueStore,
+    corpus_store: Optional[MessageCorpusStore],
+    max_corpus_rows: int,
+    logger,
+) -> int:
+    """从断点起按 ID 正序只取预算内的最早积压，按块写入暂存队列，内存中只保留当前块。"""
+    staged = 0
+    pending: List[MessageEnvelope] = []
+    history = client.iter_messages(channel_id, min_id=fetch_from, reverse=True, limit=fetch_limit)
+    async for msg in governor.iterate(history):
+        pending.append(MessageEnvelope.from_message(channel_id, msg))
+        if len(pending) >= STAGING_CHUNK_SIZE:
+            staged += _stage_envelopes(staging_store, corpus_store, pending, max_corpus_rows, logger)
+            pending = []
+    staged += _stage_envelopes(staging_store, corpus_store, pending, max_corpus_rows, logger)
+    return staged
+
+
+async def _stage_channel_difference(
+    client: TelegramClient,
+    channel_id: int,
+    pts: int,
+    fetch_from: int,
+    fetch_limit: int,
+    staging_store: StagingQueueStore,
+    corpus_store: Optional[MessageCorpusStore],
+    max_corpus_rows: int,
+    logger,
+) -> Optional[Tuple[int, int]]:
+    """从已保存的 pts 起用 GetChannelDifference 增量补抓新消息并写入暂存队列，返回 (暂存条数, 新 pts)。
+
+    每批消息写入暂存后才推进 pts，因此中途停止不会漏消息；状态过旧时返回 None，由调用方改用历史拉取。
+    """
+    from telethon import utils
+    from telethon.tl.functions.updates import GetChannelDifferenceRequest
+    from telethon.tl.types import ChannelMessagesFilterEmpty, Message, MessageService
+    from telethon.tl.types.updates import ChannelDifferenceEmpty, ChannelDifferenceTooLong
+
+    input_peer = await client.get_input_entity(channel_id)
+    input_channel = utils.get_input_channel(input_peer)
+    staged = 0
+    while staged < fetch_limit:
+        async with governor.request("history"):
+            result = await client(
+                GetChannelDifferenceRequest(
+                    channel=input_channel,
+                    filter=ChannelMessagesFilterEmpty(),
+                    pts=pts,
+                    limit=min(CHANNEL_DIFFERENCE_LIMIT, fetch_limit - staged),
+                    force=True,
+                )
+            )
+        if isinstance(result, ChannelDifferenceTooLong):
+            return None
+        if isinstance(result, ChannelDifferenceEmpty):
+            pts = int(result.pts)
+            break
+
+        # 差量结果中也可能包含已暂存或已处理的消息，按断点过滤；编辑、删除等其他更新忽略。
+        new_ids = sorted(
+            message.id
+            for message in result.new_messages
+            if isinstance(message, (Message, MessageService)) and message.id > fetch_from
+        )
+        envelopes: List[MessageEnvelope] = []
+        if new_ids:
+            # 差量只用于确定新消息 ID，再按 ID 取回完整消息对象（含发送者、按钮等关联实体）。
+            async with governor.request("history"):
+                messages = await client.get_messages(input_peer, ids=new_ids)
+            envelopes = [MessageEnvelope.from_message(channel_id, message) for message in messages if message is not None]
+
+        staged += _stage_envelopes(staging_store, corpus_store, envelopes, max_corpus_rows, logger)
+        pts = int(result.pts)
+        if result.final:
+            break
+    return staged, pts
+
+
+def _record_ledger(
+    ledger: Union[ForwardLedgerStore, CheckpointWriteBuffer, None],
+    envelope: MessageEnvelope,
+    reason: str,
+) -> None:
+    """发送结束后记录转发台账（可经写后缓冲批量落库）；未发送（过滤、跳过）的消息不入账。"""
+    if ledger is None or reason not in {"forwarded", "error"}:
+        return
+    ledger.record(
+        envelope.channel_id,
+        envelope.message_id,
+        LEDGER_STATUS_FORWARDED if reason == "forwarded" else LEDGER_STATUS_FAILED,
+        dest_message_id=envelope.sent_message_id,
+        share_key=_extract_message_quark_link(envelope.analysis, envelope.resolved_url),
+    )
+
+
+def _queue_failed_send(
+    retry_store: Union[SendRetryQueueStore, CheckpointWriteBuffer, None],
+    envelope: MessageEnvelope,
+    logger,
+) -> str:
+    """发送失败的消息写入重试队列（可经写后缓冲批量落库），断点可照常推进；尝试次数用尽时移入死信表。"""
+    if retry_store is None:
+        return ""
+    outcome = retry_store.record_failure(envelope, envelope.send_error or "")
+    if not outcome:
+        return ""
+    if outcome == RETRY_OUTCOME_DEAD:
+        logger.error("☠️ 重试次数已用尽，移入死信表：源频道 %s，消息 %s", envelope.channel_id, envelope.message_id)
+    else:
+        logger.warning("🔁 已加入重试队列：源频道 %s，消息 %s", envelope.channel_id, envelope.message_id)
+    return outcome
+
+
+async def _drain_retry_queue(
+    client: TelegramClient,
+    send_rotation: SendRotation,
+    fetch_clients: Dict[int, Tuple[str, TelegramClient]],
+    retry_store: SendRetryQueueStore,
+    ledger_store: ForwardLedgerStore,
+    checkpoint_writer: CheckpointWriteBuffer,
+    config: ForwarderConfig,
+    download_dir: Path,
+    text_replacement_regex_rules: List[re.Pattern[str]],
+    historical_links: Set[str],
+    bot_link_cache: Dict[str, Optional[str]],
+    max_messages: int,
+    logger,
+    stats: Dict[str, Any],
+    account_pool: Optional[AccountPool] = None,
+) -> int:
+    """在处理新消息前分批重发已到期的失败消息；再次失败的按退避重新排期。
+
+    与新消息相同，媒体由来源分片所属的账号重新获取，发送在可发帖的账号间轮转，Bot 解析仍走主会话。
+    台账与重试队列的变更经写后缓冲批量落库；返回实际发送（含再次失败）的条数，计入本次运行预算。
+    """
+    drained = 0
+    sent = 0
+    while drained < max_messages:
+        envelopes = retry_store.load_due(min(RETRY_DRAIN_BATCH_SIZE, max_messages - drained))
+        if not envelopes:
+            break
+        if drained == 0:
+            logger.info("🔁 重试队列中有到期的失败消息，先行重发。")
+        drained += len(envelopes)
+
+        await _attach_media_sources(client, envelopes, logger, fetch_clients)
+        for envelope in envelopes:
+            if ledger_store.forwarded_ids(envelope.channel_id, [envelope.message_id]):
+                envelope.release_raw()
+                checkpoint_writer.remove(envelope.channel_id, envelope.message_id)
+                continue
+
+            reason = None
+            link = None
+            if config.deduplication_enabled and not envelope.is_service:
+                # 排队期间同一链接可能已由其他消息发出，重发前与目标频道历史链接比对。
+                if not envelope.analysis.share_key and not envelope.resolved_url:
+                    envelope.resolved_url = await _resolve_link_via_bot(
+                        client,
+                        envelope.message_id,
+                        envelope.analysis,
+                        logger,
+                        bot_link_cache,
+                    )
+                link = _extract_message_quark_link(envelope.analysis, envelope.resolved_url)
+                if link and link in historical_links:
+                    reason = "skipped_historical_link"
+                    stats["skipped_historical_link"] += 1
+                    envelope.release_raw()
+                    logger.info("⏭️ 重试跳过（目标频道已有相同链接）：源频道 %s，消息 %s", envelope.channel_id, envelope.message_id)
+
+            if reason is None:
+                sender_account, sender_client, sender_destination = send_rotation.next()
+                with account_scope(sender_account):
+                    reason = await _forward_single_message(
+                        client=sender_client,
+                        envelope=envelope,
+                        destination_channel=sender_destination,
+                        keyword_blacklist=config.keyword_blacklist,
+                        user_blacklist=config.user_id_blacklist,
+                        download_dir=download_dir,
+                        logger=logger,
+                        test_mode_enabled=False,
+                        bot_link_cache=bot_link_cache,
+                        text_replacement_terms=config.text_replacement_terms,
+                        text_replacement_regex_rules=text_replacement_regex_rules,
+                        bot_client=client,
+                    )
+                if reason == "forwarded" and account_pool is not None:
+                    account_pool.note_activity(sender_account, sent=1)
+            _record_ledger(checkpoint_writer, envelope, reason)
+            if reason == "error":
+                stats["error_total"] += 1
+                if _queue_failed_send(checkpoint_writer, envelope, logger) == RETRY_OUTCOME_DEAD:
+                    stats["dead_lettered"] += 1
+            else:
+                # 发送成功，或按当前规则已不需要发送（例如新增了黑名单、链接已在目标频道）。
+                checkpoint_writer.remove(envelope.channel_id, envelope.message_id)
+                if reason == "forwarded":
+                    stats["retry_forwarded"] += 1
+                    if link:
+                        historical_links.add(link)
+                    logger.info("✅ 重试发送成功：源频道 %s，消息 %s", envelope.channel_id, envelope.message_id)
+
+            if reason in {"forwarded", "error"}:
+                sent += 1
+                await asyncio.sleep(SEND_INTERVAL_SECONDS / send_rotation.available_count)
+
+        # 每批提交一次，下一批读取到期消息时不会再读到本批已处理的记录。
+        await checkpoint_writer.flush_async()
+    return sent
+
+
+async def _attach_media_sources(
+    client: TelegramClient,
+    envelopes: List[MessageEnvelope],
+    logger,
+    fetch_clients: Optional[Dict[int, Tuple[str, TelegramClient]]] = None,
+) -> None:
+    """暂存记录不含媒体本体，发送前按频道批量重新获取带媒体的原始消息；分片到其他账号的来源用该账号获取。"""
+    ids_by_channel: Dict[int, List[int]] = collections.defaultdict(list)
+    for envelope in envelopes:
+        if envelope.media is not None and envelope.raw is None:
+            ids_by_channel[envelope.channel_id].append(envelope.message_id)
+
+    for channel_id, message_ids in ids_by_channel.items():
+        account_name, fetch_client = (fetch_clients or {}).get(channel_id, (PRIMARY_ACCOUNT, client))
+        with account_scope(account_name):
+            async with governor.request("history"):
+                messages = await fetch_client.get_messages(channel_id, ids=message_ids)
+        raw_by_id = {message.id: message for message in messages if message is not None}
+        for envelope in envelopes:
+            if envelope.channel_id != channel_id or envelope.media is None or envelope.raw is not None:
+                continue
+            envelope.raw = raw_by_id.get(envelope.message_id)
+            if envelope.raw is None:
+                # 消息可能在暂存等待期间被删除：按无媒体处理，有正文时只发文本，没有正文时作为空消息跳过，不再进入发送重试。
+                envelope.media = None
+                logger.warning(
+                    "频道 %s 消息 %s 的媒体已无法获取（可能已被删除），%s。",
+                    channel_id,
+                    envelope.message_id,
+                    "将仅发送文本" if envelope.analysis.text else "消息无正文，跳过",
+                )
+
+
+def _group_channels_by_account(
+    channel_ids: List[int],
+    fetch_clients: Dict[int, Tuple[str, TelegramClient]],
+    client: TelegramClient,
+) -> List[Tuple[str, TelegramClient, List[int]]]:
+    groups: Dict[str, Tuple[TelegramClient, List[int]]] = {}
+    for channel_id in channel_ids:
+        account_name, fetch_client = fetch_clients.get(channel_id, (PRIMARY_ACCOUNT, client))
+        groups.setdefault(account_name, (fetch_client, []))[1].append(channel_id)
+    return [(account_name, fetch_client, ids) for account_name, (fetch_client, ids) in groups.items()]
+
+
 async def run_forwarder_once(
     config_store: ConfigStore,
     checkpoint_store: ChannelCheckpointStore,
     logger,
+    corpus_store: Optional[MessageCorpusStore] = None,
+    staging_store: Optional[StagingQueueStore] = None,
+    poll_schedule_store: Optional[SourcePollScheduleStore] = None,
+    poll_channel_ids: Optional[Set[int]] = None,
+    ledger_store: Optional[ForwardLedgerStore] = None,
+    retry_store: Optional[SendRetryQueueStore] = None,
+    client_manager: Optional[TelegramClientManager] = None,
+    peer_cache_store: Optional[PeerCacheStore] = None,
+    account_pool: Optional[AccountPool] = None,
 ) -> Dict[str, Any]:
+    """执行一次轮询转发；poll_channel_ids 不为空时只拉取其中的来源（自适应轮询），其余来源仍处理已暂存的积压。"""
     stats = _build_empty_stats()
+    if staging_store is None:
+        staging_store = StagingQueueStore(checkpoint_store.db_path)
+        staging_store.init_db()
+    if ledger_store is None:
+        ledger_store = ForwardLedgerStore(checkpoint_store.db_path)
+        ledger_store.init_db()
+    if retry_store is None:
+        retry_store = SendRetryQueueStore(checkpoint_store.db_path)
+        retry_store.init_db()
+    if peer_cache_store is None:
+        peer_cache_store = PeerCacheStore(checkpoint_store.db_path)
+        peer_cache_store.init_db()
     lock_created = False
     run_start_ts = time.time()
     test_mode_enabled = False
     source_channel_ids: List[int] = []
     latest_ids_map: Dict[int, int] = {}
-    forwarded_ids_map: Dict[int, int] = {}
-    channel_by_message_obj: Dict[int, int] = {}
+    # 已提交的断点；每条消息处理完即经写后缓冲推进，发送失败的消息转入重试队列后断点照常推进。
+    committed_ids_map: Dict[int, int] = {}
+    checkpoint_writer = CheckpointWriteBuffer(checkpoint_store, ledger_store, retry_store)
     bot_link_cache: Dict[str, Optional[str]] = {}
-    pre_resolved_url_by_message_obj: Dict[int, str] = {}
     text_replacement_regex_rules: List[re.Pattern[str]] = []
+    scratch_dir: Optional[tempfile.TemporaryDirectory] = None
 
     try:
         config = config_store.build_forwarder_config()
         panel_settings = config_store.build_panel_settings()
         test_mode_enabled = panel_settings.test_mode_enabled
+        if test_mode_enabled:
+            # 测试模式不推进断点，抓取结果写入临时暂存库，避免污染正式积压。
+            scratch_dir = tempfile.TemporaryDirectory(prefix="forwarder-test-")
+            staging_store = StagingQueueStore(Path(scratch_dir.name) / "staging.db")
+            staging_store.init_db()
 
         stats["test_mode_enabled"] = test_mode_enabled
         stats["dedup_enabled"] = config.deduplication_enabled
@@ -878,18 +1198,8 @@ async def run_forwarder_once(
         if not all([config.api_id, config.api_hash, config.destination_channel]):
             raise ValueError("API_ID、API_HASH 和 DESTINATION_CHANNEL 为必填项。")
 
-        source_channel_ids: List[int] = []
-        if config.channel_sources:
-            for item in config.channel_sources:
-                cid = item.get("cid")
-                enabled = bool(item.get("enabled", True))
-                if not enabled:
-                    continue
-                if isinstance(cid, int):
-                    source_channel_ids.append(cid)
-
-        if not source_channel_ids:
-            source_channel_ids = list(config.channel_ids)
+        bootstrap_by_channel = _enabled_source_channels(config)
+        source_channel_ids: List[int] = list(bootstrap_by_channel)
 
         if not source_channel_ids:
             raise ValueError("新增频道转发前必须先解析 CID 并写入来源列表（至少启用一个来源）。")
@@ -898,6 +1208,9 @@ async def run_forwarder_once(
             raise FileNotFoundError("会话文件缺失，请先上传或创建 t2rss.session。")
 
         source_channel_ids = sorted(set(source_channel_ids))
+        pruned = staging_store.prune_channels(source_channel_ids)
+        if pruned:
+            logger.info("🧹 已清理 %s 条已移除来源的暂存消息。", pruned)
         stats["source_channel_ids"] = source_channel_ids
         stats["source_channel_count"] = len(source_channel_ids)
         logger.info("📡 程序将从以下源频道ID进行转发: %s", source_channel_ids)
@@ -913,126 +1226,317 @@ async def run_forwarder_once(
         config_store.lock_file.write_text(str(os.getpid()), encoding="utf-8")
         lock_created = True
 
-        async with TelegramClient(str(config_store.session_base_path), int(config.api_id), config.api_hash) as client:
-            if not await client.is_user_authorized():
-                raise RuntimeError("Telegram 会话未授权，请重新创建 t2rss.session。")
-
+        async with (
+            open_telegram_client(config_store, client_manager) as client,
+            lease_pool_accounts(account_pool, source_channel_ids, config.destination_channel) as pool_accounts,
+        ):
+            destination = await _resolve_destination_peer(client, config.destination_channel, peer_cache_store, logger)
             historical_links = await _cleanup_and_get_historical_links(
                 client,
+                destination,
                 config,
                 logger,
                 stats,
                 test_mode_enabled,
             )
 
-            all_new_messages = []
+            # 账号池：来源按负载分片给可访问它的账号拉取，发送在可发帖的账号间轮转；重试队列的重发同样适用。
+            fetch_clients: Dict[int, Tuple[str, TelegramClient]] = {}
+            senders = [(PRIMARY_ACCOUNT, client, destination)]
+            if account_pool is not None and pool_accounts:
+                schedule = poll_schedule_store.list_schedule() if poll_schedule_store is not None else {}
+                weights = {channel_id: 1.0 + item["rate_per_hour"] for channel_id, item in schedule.items()}
+                shard_map = account_pool.assign(source_channel_ids, pool_accounts, weights)
+                clients_by_name = {account.name: account.client for account in pool_accounts}
+                fetch_clients = {
+                    channel_id: (account_name, clients_by_name[account_name])
+                    for channel_id, account_name in shard_map.items()
+                    if account_name != PRIMARY_ACCOUNT
+                }
+                senders.extend(
+                    (account.name, account.client, account.destination)
+                    for account in pool_accounts
+                    if account.destination is not None
+                )
+                stats["pool_account_count"] = len(pool_accounts)
+                logger.info(
+                    "👥 账号池：%s 个账号可用，%s 个来源由其他账号拉取，%s 个账号轮流发送。",
+                    len(pool_accounts),
+                    len(fetch_clients),
+                    len(senders),
+                )
+            send_rotation = SendRotation(senders)
+
+            # 重试队列的重发与新消息共用单次运行预算。
+            run_budget = panel_settings.run_message_budget
+            if not test_mode_enabled:
+                checkpoint_writer.start()
+                run_budget -= await _drain_retry_queue(
+                    client,
+                    send_rotation,
+                    fetch_clients,
+                    retry_store,
+                    ledger_store,
+                    checkpoint_writer,
+                    config,
+                    config_store.download_dir,
+                    text_replacement_regex_rules,
+                    historical_links,
+                    bot_link_cache,
+                    panel_settings.run_message_budget,
+                    logger,
+                    stats,
+                    account_pool=account_pool,
+                )
+
+            stats["run_message_budget"] = panel_settings.run_message_budget
+            stats["channel_message_budget"] = panel_settings.channel_message_budget
+            staged_counts: Dict[int, int] = {}
+            # 先批量探测各来源最新消息 ID，没有新消息的来源不再发起 GetHistory。
+            polled_channel_ids = [
+                channel_id
+                for channel_id in source_channel_ids
+                if poll_channel_ids is None
+                or channel_id in poll_channel_ids
+                or checkpoint_store.get_record(channel_id) is None
+            ]
+
+            dialog_states: Dict[int, Tuple[int, int]] = {}
+            for account_name, account_client, channel_ids in _group_channels_by_account(polled_channel_ids, fetch_clients, client):
+                with account_scope(account_name):
+                    dialog_states.update(await _probe_dialog_states(account_client, channel_ids, logger))
 
             for channel_id in source_channel_ids:
-                last_id = checkpoint_store.get_last_id(channel_id)
+                fetch_account, fetch_client = fetch_clients.get(channel_id, (PRIMARY_ACCOUNT, client))
+                if checkpoint_store.get_record(channel_id) is None:
+                    policy, policy_value = bootstrap_by_channel.get(channel_id, (DEFAULT_SOURCE_BOOTSTRAP, ""))
+                    with account_scope(fetch_account):
+                        last_id = await _bootstrap_channel_start_id(fetch_client, channel_id, policy, policy_value, logger)
+                    stats["bootstrapped_channels"].append(channel_id)
+                    if not test_mode_enabled:
+                        checkpoint_store.set_last_id(channel_id, last_id)
+                else:
+                    last_id = checkpoint_store.get_last_id(channel_id)
                 stats["per_channel_last_id_before"][str(channel_id)] = last_id
 
-                logger.info("📥 正在从频道 %s 收集自 ID %s 以来的新消息...", channel_id, last_id + 1)
+                staged_count, staged_max_id = staging_store.sync_checkpoint(channel_id, last_id)
+                fetch_from = max(last_id, staged_max_id)
+                fetch_limit = panel_settings.channel_message_budget - staged_count
+
+                fetched_count = 0
+                top_id, dialog_pts = dialog_states.get(channel_id, (None, 0))
+                stored_pts = checkpoint_store.get_pts(channel_id)
+                if channel_id not in polled_channel_ids:
+                    stats["not_due_channels"].append(channel_id)
+                elif top_id is not None and top_id <= fetch_from:
+                    stats["probe_idle_channels"].append(channel_id)
+                    if stored_pts <= 0 and dialog_pts > 0 and not test_mode_enabled:
+                        # 已追平的来源记录当前 pts，之后有新消息时改用差量补抓。
+                        checkpoint_store.set_pts(channel_id, dialog_pts)
+                elif fetch_limit > 0:
+                    logger.info(
+                        "📥 正在从频道 %s 收集自 ID %s 以来的新消息（本次最多 %s 条）...",
+                        channel_id,
+                        fetch_from + 1,
+                        fetch_limit,
+                    )
+                    difference = None
+                    if stored_pts > 0:
+                        with account_scope(fetch_account):
+                            difference = await _stage_channel_difference(
+                                fetch_client,
+                                channel_id,
+                                stored_pts,
+                                fetch_from,
+                                fetch_limit,
+                                staging_store,
+                                corpus_store,
+                                panel_settings.rule_lab_corpus_size,
+                                logger,
+                            )
+                        if difference is None:
+                            logger.info("♻️ 频道 %s 的更新状态已过旧，改用历史拉取。", channel_id)
+                            if not test_mode_enabled:
+                                checkpoint_store.set_pts(channel_id, 0)
+
+                    if difference is not None:
+                        fetched_count, new_pts = difference
+                        stats["difference_channels"].append(channel_id)
+                        if not test_mode_enabled:
+                            checkpoint_store.set_pts(channel_id, new_pts)
+                    else:
+                        with account_scope(fetch_account):
+                            fetched_count = await _stage_channel_history(
+                                fetch_client,
+                                channel_id,
+                                fetch_from,
+                                fetch_limit,
+                                staging_store,
+                                corpus_store,
+                                panel_settings.rule_lab_corpus_size,
+                                logger,
+                            )
+                        if fetched_count < fetch_limit and dialog_pts > 0 and not test_mode_enabled:
+                            # 历史拉取已到达频道最新消息，记录探测时的 pts，下次改用差量补抓。
+                            checkpoint_store.set_pts(channel_id, dialog_pts)
+                else:
+                    logger.info("📦 频道 %s 暂存队列已有 %s 条待处理积压，本次不再抓取。", channel_id, staged_count)
 
-                channel_messages = [msg async for msg in client.iter_messages(channel_id, min_id=last_id)]
-                fetched_count = len(channel_messages)
+                staged_counts[channel_id] = staged_count + fetched_count
+                if account_pool is not None:
+                    account_pool.note_activity(fetch_account, fetched=fetched_count)
                 stats["per_channel_fetched"][str(channel_id)] = fetched_count
                 stats["fetched_total"] += fetched_count
-                logger.info("✅ 频道 %s 收集完成，新消息 %s 条（当前断点 last_id=%s）", channel_id, fetched_count, last_id)
+                logger.info(
+                    "✅ 频道 %s 收集完成，新消息 %s 条，暂存积压 %s 条（当前断点 last_id=%s）",
+                    channel_id,
+                    fetched_count,
+                    staged_counts[channel_id],
+                    last_id,
+                )
 
-                if channel_messages:
-                    all_new_messages.extend(channel_messages)
-                    latest_ids_map[channel_id] = max(msg.id for msg in channel_messages)
-                    for msg in channel_messages:
-                        channel_by_message_obj[id(msg)] = channel_id
+            if stats["not_due_channels"]:
+                logger.info("🗓️ 自适应轮询：%s 个来源尚未到期，本次不拉取。", len(stats["not_due_channels"]))
+            if poll_schedule_store is not None and not test_mode_enabled:
+                poll_schedule_store.record_polls(
+                    {channel_id: int(stats["per_channel_fetched"].get(str(channel_id), 0)) for channel_id in polled_channel_ids},
+                    panel_settings.poll_target_latency_minutes,
+                    panel_settings.poll_min_minutes,
+                    panel_settings.poll_max_minutes,
+                )
 
-            stats["messages_collected_total"] = len(all_new_messages)
-            stats["before_dedup_total"] = len(all_new_messages)
+            if stats["probe_idle_channels"]:
+                logger.info(
+                    "🔎 探测到 %s/%s 个来源没有新消息，已跳过历史拉取。",
+                    len(stats["probe_idle_channels"]),
+                    len(source_channel_ids),
+                )
 
-            if not all_new_messages:
+            backlog_ids = staging_store.list_backlog_ids(source_channel_ids, panel_settings.channel_message_budget)
+            scheduled_keys = _schedule_round_robin(
+                {
+                    channel_id: [(channel_id, message_id) for message_id in message_ids]
+                    for channel_id, message_ids in backlog_ids.items()
+                },
+                max(0, run_budget),
+            )
+            backlog_ids.clear()
+            for channel_id, message_id in scheduled_keys:
+                if message_id > latest_ids_map.get(channel_id, 0):
+                    latest_ids_map[channel_id] = message_id
+
+            for channel_id, staged_total in staged_counts.items():
+                scheduled_count = sum(1 for key in scheduled_keys if key[0] == channel_id)
+                deferred_count = staged_total - scheduled_count
+                stats["per_channel_scheduled"][str(channel_id)] = scheduled_count
+                stats["per_channel_deferred"][str(channel_id)] = deferred_count
+                stats["deferred_total"] += deferred_count
+            if stats["deferred_total"] > 0:
+                logger.info(
+                    "⚖️ 本次运行预算 %s 条（重试已用 %s 条），按来源轮转调度 %s 条，留在暂存队列待下次运行 %s 条。",
+                    panel_settings.run_message_budget,
+                    panel_settings.run_message_budget - run_budget,
+                    len(scheduled_keys),
+                    stats["deferred_total"],
+                )
+
+            stats["messages_collected_total"] = len(scheduled_keys)
+            stats["before_dedup_total"] = len(scheduled_keys)
+
+            if not scheduled_keys:
                 for channel_id in source_channel_ids:
                     old_last_id = stats["per_channel_last_id_before"].get(str(channel_id), 0)
                     stats["per_channel_last_id_after"][str(channel_id)] = old_last_id
                 stats["duration_seconds"] = round(time.time() - run_start_ts, 2)
-                logger.info("ℹ️ 所有源频道都没有找到新消息。程序退出。")
+                if stats["deferred_total"] > 0:
+                    logger.info("ℹ️ 本次运行预算已用于重发失败消息，新消息留在暂存队列待下次运行。")
+                    message = "本次运行预算已用于重发失败消息，新消息待下次运行。"
+                else:
+                    logger.info("ℹ️ 所有源频道都没有找到新消息。程序退出。")
+                    message = "源频道暂无新消息。"
                 return {
                     "status": "success",
-                    "message": "源频道暂无新消息。",
+                    "message": message,
                     "stats": stats,
                 }
 
-            all_new_messages.sort(key=lambda item: item.date)
-            final_messages = all_new_messages
+            final_keys = scheduled_keys
 
-            logger.info("📊 从所有频道共收集到 %s 条新消息，开始统一过滤...", len(all_new_messages))
+            logger.info("📊 从所有频道共收集到 %s 条新消息，开始统一过滤...", len(scheduled_keys))
 
-            if config.deduplication_enabled and not test_mode_enabled:
+            if config.deduplication_enabled:
+                # 去重只需要每条消息的链接，按块读回暂存记录计算，Bot 预解析结果写回队列供续跑复用。
+                link_by_key: Dict[MessageKey, Optional[str]] = {}
                 resolved_for_dedup = 0
-                for message in all_new_messages:
-                    resolved_url = await _resolve_link_via_bot(client, message, logger, bot_link_cache)
-                    if not resolved_url:
-                        continue
-                    pre_resolved_url_by_message_obj[id(message)] = resolved_url
-                    resolved_for_dedup += 1
+                for chunk_start in range(0, len(scheduled_keys), STAGING_CHUNK_SIZE):
+                    for envelope in staging_store.load(scheduled_keys[chunk_start : chunk_start + STAGING_CHUNK_SIZE]):
+                        if envelope.is_service:
+                            continue
+
+                        if not test_mode_enabled and not envelope.resolved_url:
+                            resolved_url = await _resolve_link_via_bot(
+                                client,
+                                envelope.message_id,
+                                envelope.analysis,
+                                logger,
+                                bot_link_cache,
+                            )
+                            if resolved_url:
+                                envelope.resolved_url = resolved_url
+                                staging_store.set_resolved_url(envelope.channel_id, envelope.message_id, resolved_url)
+                                resolved_for_dedup += 1
+
+                        link_by_key[(envelope.channel_id, envelope.message_id)] = _extract_message_quark_link(
+                            envelope.analysis,
+                            envelope.resolved_url,
+                        )
 
                 if resolved_for_dedup > 0:
                     logger.info("  - 预解析完成：%s 条消息通过 Bot 拿到夸克链接并纳入去重。", resolved_for_dedup)
 
-            if config.deduplication_enabled:
                 logger.info("  - 阶段一：处理本次运行内的重复链接...")
-                link_map = {}
-                messages_without_link_stage1 = []
+                link_map: Dict[str, MessageKey] = {}
+                keys_without_link_stage1: Set[MessageKey] = set()
 
-                for message in all_new_messages:
-                    if isinstance(message, MessageService):
+                for key in scheduled_keys:
+                    if key not in link_by_key:
                         continue
 
-                    message_text = getattr(message, "text", None) or getattr(message, "caption", None)
-                    if not message_text:
-                        pre_resolved = pre_resolved_url_by_message_obj.get(id(message))
-                        link = _extract_message_quark_link(message, pre_resolved)
-                        if not link:
-                            messages_without_link_stage1.append(message)
-                            continue
-                    else:
-                        pre_resolved = pre_resolved_url_by_message_obj.get(id(message))
-                        link = _extract_message_quark_link(message, pre_resolved)
+                    link = link_by_key[key]
                     if not link:
-                        messages_without_link_stage1.append(message)
+                        keys_without_link_stage1.add(key)
                         continue
 
                     existing = link_map.get(link)
                     if existing is None:
-                        link_map[link] = message
-                    elif message.id > existing.id:
-                        link_map[link] = message
+                        link_map[link] = key
+                    elif key[1] > existing[1]:
+                        link_map[link] = key
                         stats["skipped_intra_run_link"] += 1
                     else:
                         stats["skipped_intra_run_link"] += 1
 
-                messages_after_stage1 = list(link_map.values()) + messages_without_link_stage1
-                messages_after_stage1.sort(key=lambda item: item.date)
-                stats["after_stage1_total"] = len(messages_after_stage1)
-                logger.info("  - 阶段一后剩余 %s 条消息。", len(messages_after_stage1))
+                kept_stage1 = set(link_map.values()) | keys_without_link_stage1
+                keys_after_stage1 = [key for key in scheduled_keys if key in kept_stage1]
+                stats["after_stage1_total"] = len(keys_after_stage1)
+                logger.info("  - 阶段一后剩余 %s 条消息。", len(keys_after_stage1))
 
                 logger.info("  - 阶段二：与目标频道历史链接比对...")
-                messages_after_stage2 = []
-                for message in messages_after_stage1:
-                    if isinstance(message, MessageService):
-                        continue
-
-                    pre_resolved = pre_resolved_url_by_message_obj.get(id(message))
-                    link = _extract_message_quark_link(message, pre_resolved)
+                keys_after_stage2 = []
+                for key in keys_after_stage1:
+                    link = link_by_key[key]
                     if link and link in historical_links:
                         stats["skipped_historical_link"] += 1
                     else:
-                        messages_after_stage2.append(message)
+                        keys_after_stage2.append(key)
 
-                final_messages = messages_after_stage2
-                logger.info("  - 阶段二后剩余 %s 条消息。", len(final_messages))
+                final_keys = keys_after_stage2
+                link_by_key.clear()
+                logger.info("  - 阶段二后剩余 %s 条消息。", len(final_keys))
             else:
-                stats["after_stage1_total"] = len(all_new_messages)
+                stats["after_stage1_total"] = len(scheduled_keys)
 
-            stats["after_dedup_total"] = len(final_messages)
+            stats["after_dedup_total"] = len(final_keys)
             logger.info(
                 "消息统计：抓取=%s，去重后=%s，站内去重跳过=%s，历史去重跳过=%s",
                 stats["fetched_total"],
@@ -1040,70 +1544,142 @@ async def run_forwarder_once(
                 stats["skipped_intra_run_link"],
                 stats["skipped_historical_link"],
             )
-            logger.info("✅ 过滤完成，最终有 %s 条消息准备处理。", len(final_messages))
+            logger.info("✅ 过滤完成，最终有 %s 条消息准备处理。", len(final_keys))
 
-            processed_count = 0
-            for message in final_messages:
-                source_channel_id = channel_by_message_obj.get(id(message), "unknown")
-                message_id = getattr(message, "id", "unknown")
-                reason = await _forward_single_message(
-                    client=client,
-                    message=message,
-                    destination_channel=config.destination_channel,
-                    keyword_blacklist=config.keyword_blacklist,
-                    user_blacklist=config.user_id_blacklist,
-                    download_dir=config_store.download_dir,
-                    logger=logger,
-                    test_mode_enabled=test_mode_enabled,
-                    bot_link_cache=bot_link_cache,
-                    text_replacement_terms=config.text_replacement_terms,
-                    text_replacement_regex_rules=text_replacement_regex_rules,
-                    pre_resolved_url=pre_resolved_url_by_message_obj.get(id(message)),
+            text_pool = None
+            text_pool_threshold = panel_settings.text_pool_threshold
+            if len(final_keys) >= text_pool_threshold:
+                logger.info(
+                    "📦 待处理消息 %s 条，超过阈值 %s，启用多进程批量文本处理。",
+                    len(final_keys),
+                    text_pool_threshold,
                 )
+                text_pool = open_text_pool(len(final_keys))
 
-                if reason == "forwarded":
-                    stats["forwarded_total"] += 1
-                    logger.info("✅ 发送成功：源频道 %s，消息 %s", source_channel_id, message_id)
-                    if isinstance(source_channel_id, int):
-                        current_forwarded = forwarded_ids_map.get(source_channel_id, 0)
-                        if message.id > current_forwarded:
-                            forwarded_ids_map[source_channel_id] = message.id
-                elif reason == "simulated_forwarded":
-                    stats["simulated_forwarded_total"] += 1
-                elif reason == "skipped_keyword":
-                    stats["skipped_keyword"] += 1
-                    logger.info("⏭️ 跳过（关键词黑名单）：源频道 %s，消息 %s", source_channel_id, message_id)
-                elif reason == "skipped_user_blacklist":
-                    stats["skipped_user_blacklist"] += 1
-                    logger.info("⏭️ 跳过（用户黑名单）：源频道 %s，消息 %s", source_channel_id, message_id)
-                elif reason == "skipped_service":
-                    stats["skipped_service"] += 1
-                    logger.info("⏭️ 跳过（服务消息）：源频道 %s，消息 %s", source_channel_id, message_id)
-                elif reason == "skipped_no_content":
-                    stats["skipped_no_content"] += 1
-                    logger.info("⏭️ 跳过（空内容）：源频道 %s，消息 %s", source_channel_id, message_id)
-                elif reason == "error":
-                    stats["error_total"] += 1
-                    logger.error("❌ 发送失败：源频道 %s，消息 %s", source_channel_id, message_id)
-
-                processed_count += 1
-                if processed_count % 500 == 0 or processed_count == len(final_messages):
-                    logger.info("⏳ 处理进度：%s/%s", processed_count, len(final_messages))
-
-                if (
-                    not test_mode_enabled
-                    and reason in {"forwarded", "error"}
-                    and processed_count < len(final_messages)
-                ):
-                    logger.info("⏱️ 发送间隔等待 %s 秒，避免风控。", SEND_INTERVAL_SECONDS)
-                    await asyncio.sleep(SEND_INTERVAL_SECONDS)
+            processed_count = 0
+            if not test_mode_enabled:
+                checkpoint_writer.start()
+            try:
+                for chunk_start in range(0, len(final_keys), STAGING_CHUNK_SIZE):
+                    chunk_envelopes = staging_store.load(final_keys[chunk_start : chunk_start + STAGING_CHUNK_SIZE])
+                    if not test_mode_enabled:
+                        await _attach_media_sources(client, chunk_envelopes, logger, fetch_clients)
+                    if text_pool is not None:
+                        await _prepare_outbound_in_pool(
+                            text_pool,
+                            client,
+                            chunk_envelopes,
+                            config,
+                            text_replacement_regex_rules,
+                            logger,
+                            test_mode_enabled,
+                            bot_link_cache,
+                        )
+
+                    already_forwarded: Set[MessageKey] = set()
+                    chunk_ids_by_channel: Dict[int, List[int]] = collections.defaultdict(list)
+                    for envelope in chunk_envelopes:
+                        chunk_ids_by_channel[envelope.channel_id].append(envelope.message_id)
+                    for channel_id, message_ids in chunk_ids_by_channel.items():
+                        already_forwarded.update(
+                            (channel_id, message_id) for message_id in ledger_store.forwarded_ids(channel_id, message_ids)
+                        )
+
+                    for envelope in chunk_envelopes:
+                        source_channel_id = envelope.channel_id
+                        message_id = envelope.message_id
+                        if (source_channel_id, message_id) in already_forwarded:
+                            # 台账显示上次已发送成功（发送后断点未及时写入），不再重复发送。
+                            envelope.release_raw()
+                            reason = "skipped_already_forwarded"
+                        else:
+                            sender_account, sender_client, sender_destination = send_rotation.next()
+                            with account_scope(sender_account):
+                                reason = await _forward_single_message(
+                                    client=sender_client,
+                                    envelope=envelope,
+                                    destination_channel=sender_destination,
+                                    keyword_blacklist=config.keyword_blacklist,
+                                    user_blacklist=config.user_id_blacklist,
+                                    download_dir=config_store.download_dir,
+                                    logger=logger,
+                                    test_mode_enabled=test_mode_enabled,
+                                    bot_link_cache=bot_link_cache,
+                                    text_replacement_terms=config.text_replacement_terms,
+                                    text_replacement_regex_rules=text_replacement_regex_rules,
+                                    bot_client=client,
+                                )
+                            if reason == "forwarded" and account_pool is not None:
+                                account_pool.note_activity(sender_account, sent=1)
+
+                        if not test_mode_enabled:
+                            _record_ledger(checkpoint_writer, envelope, reason)
+                            if reason == "error":
+                                if _queue_failed_send(checkpoint_writer, envelope, logger) == RETRY_OUTCOME_DEAD:
+                                    stats["dead_lettered"] += 1
+                                else:
+                                    stats["retry_queued"] += 1
+                            checkpoint_writer.advance(source_channel_id, message_id)
+                            committed_ids_map[source_channel_id] = message_id
+
+                        if reason == "forwarded":
+                            stats["forwarded_total"] += 1
+                            logger.info("✅ 发送成功：源频道 %s，消息 %s", source_channel_id, message_id)
+                        elif reason == "skipped_already_forwarded":
+                            stats["skipped_already_forwarded"] += 1
+                            logger.info("⏭️ 跳过（台账显示已转发）：源频道 %s，消息 %s", source_channel_id, message_id)
+                        elif reason == "simulated_forwarded":
+                            stats["simulated_forwarded_total"] += 1
+                        elif reason == "skipped_keyword":
+                            stats["skipped_keyword"] += 1
+                            logger.info("⏭️ 跳过（关键词黑名单）：源频道 %s，消息 %s", source_channel_id, message_id)
+                        elif reason == "skipped_user_blacklist":
+                            stats["skipped_user_blacklist"] += 1
+                            logger.info("⏭️ 跳过（用户黑名单）：源频道 %s，消息 %s", source_channel_id, message_id)
+                        elif reason == "skipped_service":
+                            stats["skipped_service"] += 1
+                            logger.info("⏭️ 跳过（服务消息）：源频道 %s，消息 %s", source_channel_id, message_id)
+                        elif reason == "skipped_no_content":
+                            stats["skipped_no_content"] += 1
+                            logger.info("⏭️ 跳过（空内容）：源频道 %s，消息 %s", source_channel_id, message_id)
+                        elif reason == "error":
+                            stats["error_total"] += 1
+                            logger.error("❌ 发送失败：源频道 %s，消息 %s", source_channel_id, message_id)
+
+                        processed_count += 1
+                        if processed_count % 500 == 0 or processed_count == len(final_keys):
+                            logger.info("⏳ 处理进度：%s/%s", processed_count, len(final_keys))
+
+                        if (
+                            not test_mode_enabled
+                            and reason in {"forwarded", "error"}
+                            and processed_count < len(final_keys)
+                        ):
+                            # 多个账号轮流发送时，每个账号自身的发送间隔不变，整体间隔按当前未受 FloodWait 限制的账号数缩短。
+                            send_interval = SEND_INTERVAL_SECONDS / send_rotation.available_count
+                            logger.info("⏱️ 发送间隔等待 %s 秒，避免风控。", round(send_interval, 2))
+                            await asyncio.sleep(send_interval)
+            finally:
+                # 中止或异常时也写入缓冲中的断点与台账，之后才清理暂存。
+                checkpoint_writer.close()
+                if text_pool is not None:
+                    text_pool.shutdown(wait=False, cancel_futures=True)
 
             if test_mode_enabled:
                 stats["checkpoint_updated"] = False
                 logger.info("🧪 测试模式开启：已跳过真实发送后的断点更新。")
             else:
+                # 各频道推进到本次调度的最后一条（含被去重跳过的尾部消息）。
                 checkpoint_store.bulk_update(latest_ids_map)
+                committed_ids_map.update(latest_ids_map)
+                staging_store.purge_through(committed_ids_map)
                 stats["checkpoint_updated"] = True
+                if stats["retry_queued"] or stats["dead_lettered"]:
+                    logger.warning(
+                        "⚠️ 本次有 %s 条消息发送失败已加入重试队列，%s 条移入死信表。",
+                        stats["retry_queued"],
+                        stats["dead_lettered"],
+                    )
                 logger.info("💾 --- 更新所有频道的 last_id 到数据库 ---")
                 logger.info("✅ 断点已更新到数据库。")
 
@@ -1112,7 +1688,7 @@ async def run_forwarder_once(
                 if test_mode_enabled:
                     new_last_id = old_last_id
                 else:
-                    new_last_id = int(latest_ids_map.get(channel_id, old_last_id))
+                    new_last_id = int(committed_ids_map.get(channel_id, old_last_id))
                 stats["per_channel_last_id_after"][str(channel_id)] = new_last_id
 
             stats["duration_seconds"] = round(time.time() - run_start_ts, 2)
@@ -1154,30 +1730,30 @@ async def run_forwarder_once(
             }
 
     except asyncio.CancelledError:
-        if not test_mode_enabled and forwarded_ids_map:
-            checkpoint_store.bulk_update(forwarded_ids_map)
+        if not test_mode_enabled and committed_ids_map:
+            staging_store.purge_through(committed_ids_map)
             stats["checkpoint_updated"] = True
             stats["partial_checkpoint_updated"] = True
-            logger.warning("⚠️ 任务中止：已将断点更新到已转发的最后消息 ID。")
+            logger.warning("⚠️ 任务中止：断点已逐条更新到最后处理完成的消息 ID。")
 
             for channel_id in source_channel_ids:
                 old_last_id = int(stats["per_channel_last_id_before"].get(str(channel_id), 0))
-                new_last_id = int(forwarded_ids_map.get(channel_id, old_last_id))
+                new_last_id = int(committed_ids_map.get(channel_id, old_last_id))
                 stats["per_channel_last_id_after"][str(channel_id)] = new_last_id
 
         stats["duration_seconds"] = round(time.time() - run_start_ts, 2)
         raise
 
     except Exception as exc:
-        if not test_mode_enabled and forwarded_ids_map:
-            checkpoint_store.bulk_update(forwarded_ids_map)
+        if not test_mode_enabled and committed_ids_map:
+            staging_store.purge_through(committed_ids_map)
             stats["checkpoint_updated"] = True
             stats["partial_checkpoint_updated"] = True
-            logger.warning("⚠️ 任务异常中断：已将断点更新到已转发的最后消息 ID。")
+            logger.warning("⚠️ 任务异常中断：断点已逐条更新到最后处理完成的消息 ID。")
 
             for channel_id in source_channel_ids:
                 old_last_id = int(stats["per_channel_last_id_before"].get(str(channel_id), 0))
-                new_last_id = int(forwarded_ids_map.get(channel_id, old_last_id))
+                new_last_id = int(committed_ids_map.get(channel_id, old_last_id))
                 stats["per_channel_last_id_after"][str(channel_id)] = new_last_id
 
         logger.exception("❌ 转发任务执行失败: %s", exc)
@@ -1189,30 +1765,78 @@ async def run_forwarder_once(
             "stats": stats,
         }
     finally:
+        # 重试阶段之后、逐条处理之前出错时，缓冲中的台账与重试队列变更也要写入。
+        checkpoint_writer.close()
         if lock_created and config_store.lock_file.exists():
             try:
                 config_store.lock_file.unlink()
             except OSError:
                 logger.warning("移除锁文件失败: %s", config_store.lock_file)
+        if scratch_dir is not None:
+            scratch_dir.cleanup()
 
 
 class ForwarderRunner:
-    def __init__(self, config_store: ConfigStore, checkpoint_store: ChannelCheckpointStore, history_store, logger):
+    def __init__(
+        self,
+        config_store: ConfigStore,
+        checkpoint_store: ChannelCheckpointStore,
+        history_store,
+        logger,
+        corpus_store: Optional[MessageCorpusStore] = None,
+        staging_store: Optional[StagingQueueStore] = None,
+        poll_schedule_store: Optional[SourcePollScheduleStore] = None,
+        ledger_store: Optional[ForwardLedgerStore] = None,
+        retry_store: Optional[SendRetryQueueStore] = None,
+        client_manager: Optional[TelegramClientManager] = None,
+        peer_cache_store: Optional[PeerCacheStore] = None,
+        account_pool: Optional[AccountPool] = None,
+    ):
         self.config_store = config_store
         self.checkpoint_store = checkpoint_store
         self.history_store = history_store
         self.logger = logger
+        self.corpus_store = corpus_store
+        self.staging_store = staging_store
+        self.poll_schedule_store = poll_schedule_store
+        self.ledger_store = ledger_store
+        self.retry_store = retry_store
+        self.client_manager = client_manager
+        self.peer_cache_store = peer_cache_store
+        self.account_pool = account_pool
         self._current_task: Optional[Any] = None
         self._auto_task: Optional[Any] = None
         self._stop_event = asyncio.Event()
         self._manual_stop_requested = False
         self._current_started_at: Optional[str] = None
         self.last_result: Optional[Dict[str, Any]] = None
+        # 常规运行、历史回填与实时转发共用同一客户端连接，但同一时刻只允许一方发送并推进断点。
+        self.session_lock = asyncio.Lock()
+        self._session_waiters = 0
 
     @property
     def is_running(self) -> bool:
         return self._current_task is not None and not self._current_task.done()
 
+    @property
+    def session_wanted(self) -> bool:
+        """是否有任务在排队等待会话（含等待租约归还的会话文件写入）；实时转发与历史回填据此让出会话。"""
+        if self.client_manager is not None and self.client_manager.write_pending:
+            return True
+        return self._session_waiters > 0
+
+    @contextlib.asynccontextmanager
+    async def hold_session(self):
+        self._session_waiters += 1
+        try:
+            await self.session_lock.acquire()
+        finally:
+            self._session_waiters -= 1
+        try:
+            yield
+        finally:
+            self.session_lock.release()
+
     def status_payload(self) -> Dict[str, Any]:
         return {
             "is_running": self.is_running,
@@ -1228,6 +1852,14 @@ class ForwarderRunner:
         self._current_task = asyncio.create_task(self._run_job(trigger))
         return True
 
+    async def run_once(self, trigger: str = "manual") -> Optional[Dict[str, Any]]:
+        """在当前协程中执行一次运行并返回结果（同样计入运行记录），供命令行入口等不启动自动调度的场景使用。"""
+        if self.is_running:
+            return None
+        self._current_task = asyncio.current_task()
+        await self._run_job(trigger)
+        return self.last_result
+
     async def abort_current_run(self) -> bool:
         if not self.is_running:
             return False
@@ -1251,11 +1883,27 @@ class ForwarderRunner:
         try:
             panel_settings = self.config_store.build_panel_settings()
             timeout_seconds = max(60, panel_settings.total_timeout_seconds)
-
-            result = await asyncio.wait_for(
-                run_forwarder_once(self.config_store, self.checkpoint_store, self.logger),
-                timeout=timeout_seconds,
-            )
+            poll_channel_ids = self._due_channel_ids() if trigger == "auto" else None
+
+            async with self.hold_session():
+                with subsystem_scope("forwarder"):
+                    result = await asyncio.wait_for(
+                        run_forwarder_once(
+                            self.config_store,
+                            self.checkpoint_store,
+                            self.logger,
+                            corpus_store=self.corpus_store,
+                            staging_store=self.staging_store,
+                            poll_schedule_store=self.poll_schedule_store,
+                            poll_channel_ids=poll_channel_ids,
+                            ledger_store=self.ledger_store,
+                            retry_store=self.retry_store,
+                            client_manager=self.client_manager,
+                            peer_cache_store=self.peer_cache_store,
+                            account_pool=self.account_pool,
+                        ),
+                        timeout=timeout_seconds,
+                    )
             finished_at = now_shanghai_iso()
 
             payload = {
@@ -1315,6 +1963,13 @@ class ForwarderRunner:
             self._current_started_at = None
             self._manual_stop_requested = False
 
+    def _due_channel_ids(self) -> Optional[Set[int]]:
+        """自适应轮询开启时返回已到期的来源；未开启时返回 None（拉取全部来源）。"""
+        if self.poll_schedule_store is None or not self.config_store.build_panel_settings().adaptive_poll_enabled:
+            return None
+        source_channel_ids = _enabled_source_channels(self.config_store.build_forwarder_config())
+        return self.poll_schedule_store.due_channel_ids(source_channel_ids)
+
     async def start(self) -> None:
         if self._auto_task is None or self._auto_task.done():
             self._stop_event.clear()
@@ -1343,11 +1998,21 @@ class ForwarderRunner:
             try:
                 panel_settings = self.config_store.build_panel_settings()
                 interval_minutes = max(1, panel_settings.auto_run_interval_minutes)
+                due_channel_ids = None
+                if panel_settings.auto_run_enabled and panel_settings.adaptive_poll_enabled:
+                    # 自适应轮询：按最短间隔检查，只有存在到期来源时才启动运行。
+                    interval_minutes = max(1, panel_settings.poll_min_minutes)
+                    due_channel_ids = self._due_channel_ids()
 
-                if panel_settings.auto_run_enabled and not self.is_running:
+                if panel_settings.auto_run_enabled and not self.is_running and due_channel_ids != set():
                     started = await self.trigger(trigger="auto")
                     if started:
                         self.logger.info("自动转发任务已启动。")
+                elif panel_settings.realtime_enabled and not self.is_running:
+                    # 实时模式下轮询运行作为定期补漏，沿用自动运行间隔。
+                    started = await self.trigger(trigger="catchup")
+                    if started:
+                        self.logger.info("实时模式补漏运行已启动。")
 
             except Exception as exc:
                 self.logger.exception("自动运行循环异常: %s", exc)
@@ -0,0 +1,122 @@
+import contextlib
+import os
+import socket
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from .time_utils import now_shanghai_iso
+
+
+# 转发租约：面板进程、worker 与命令行共用同一个租约，持有者负责调度与 Telegram 请求。
+# 持有者每 LEADER_RENEW_SECONDS 秒续期一次，超过 LEADER_LEASE_SECONDS 秒未续期时由其他进程接管。
+LEADER_LEASE_NAME = "forwarding"
+LEADER_LEASE_SECONDS = 30
+LEADER_RENEW_SECONDS = 5
+# 获取、续期与释放租约时等待 panel.db 写锁的最长秒数：须远小于租期余量（LEADER_LEASE_SECONDS - LEADER_RENEW_SECONDS），
+# 锁等待超时按续期失败处理，下一轮重试。
+LEADER_LEASE_BUSY_TIMEOUT_SECONDS = 5
+
+
+def local_holder_id() -> str:
+    """租约持有者标识：主机名与进程号。"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _holder_process_gone(holder: str) -> bool:
+    """持有者是本机上已退出的进程时返回 True（如被强杀后重启），此时无需等待租约过期。"""
+    host, _, pid_text = str(holder).rpartition(":")
+    if host != socket.gethostname() or not pid_text.isdigit():
+        return False
+    try:
+        os.kill(int(pid_text), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class LeaderLeaseStore:
+    """panel.db 中的租约表：多个面板进程（如 uvicorn --workers N）竞争同一租约，持有者负责调度与 Telegram 请求。
+
+    持有者需在租约到期前续期；进程退出或卡死未续期时，租约过期后由其他进程接管。
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS leader_lease (
+                    name TEXT PRIMARY KEY,
+                    holder TEXT NOT NULL,
+                    acquired_at TEXT NOT NULL,
+                    renewed_ts REAL NOT NULL,
+                    expires_ts REAL NOT NULL
+                )
+                """
+            )
+            connection.commit()
+
+    def try_acquire(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """获取或续期租约：租约空闲、已过期、已归自己或持有进程已退出时成功。
+
+        会等待数据库写锁，事件循环中应经 asyncio.to_thread 调用。
+        """
+        now_ts = time.time()
+        with sqlite3.connect(self.db_path, isolation_level=None, timeout=LEADER_LEASE_BUSY_TIMEOUT_SECONDS) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT holder, acquired_at, expires_ts FROM leader_lease WHERE name = ?",
+                (name,),
+            ).fetchone()
+            if row is not None and row[0] != holder and float(row[2]) > now_ts and not _holder_process_gone(row[0]):
+                connection.execute("COMMIT")
+                return False
+            acquired_at = str(row[1]) if row is not None and row[0] == holder else now_shanghai_iso()
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO leader_lease (name, holder, acquired_at, renewed_ts, expires_ts)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (name, holder, acquired_at, now_ts, now_ts + ttl_seconds),
+            )
+            connection.execute("COMMIT")
+        return True
+
+    def release(self, name: str, holder: str) -> bool:
+        with sqlite3.connect(self.db_path, timeout=LEADER_LEASE_BUSY_TIMEOUT_SECONDS) as connection:
+            cursor = connection.execute("DELETE FROM leader_lease WHERE name = ? AND holder = ?", (name, holder))
+            connection.commit()
+            return cursor.rowcount > 0
+
+    def read(self, name: str) -> Optional[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            row = connection.execute("SELECT * FROM leader_lease WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "holder": str(row["holder"]),
+            "acquired_at": str(row["acquired_at"]),
+            "expires_in_seconds": round(float(row["expires_ts"]) - time.time(), 1),
+        }
+
+    @contextlib.contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """持有 panel.db 写锁期间执行：多个进程同时首次启动时串行生成管理员密码、会话密钥等初始配置。"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.db_path, isolation_level=None, timeout=60)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            finally:
+                connection.execute("COMMIT")
+        finally:
+            connection.close()
@@ -2,6 +2,7 @@ import logging
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
 from .time_utils import SHANGHAI_TZ
 
@@ -20,24 +21,25 @@ def _build_default_formatter() -> logging.Formatter:
     return ShanghaiFormatter("%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 
 
-def create_logger(log_file: Path) -> logging.Logger:
+def create_logger(log_file: Optional[Path] = None) -> logging.Logger:
+    """log_file 为空时只输出到标准错误，由启动流程在建立目录后经 rebind_logger_file_handler 挂上日志文件。"""
     logger = logging.getLogger("t2rss_panel")
     if logger.handlers:
         return logger
 
     logger.setLevel(logging.INFO)
-    log_file.parent.mkdir(parents=True, exist_ok=True)
-
     formatter = _build_default_formatter()
 
-    file_handler = RotatingFileHandler(
-        filename=log_file,
-        maxBytes=2 * 1024 * 1024,
-        backupCount=5,
-        encoding="utf-8",
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    if log_file is not None:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            filename=log_file,
+            maxBytes=2 * 1024 * 1024,
+            backupCount=5,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
 
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
@@ -1,75 +1,178 @@
 import asyncio
+import contextlib
 import hmac
-import html
 import json
 import os
 import re
 import secrets
 import shutil
-from datetime import datetime, timezone
-from email.utils import format_datetime
-from io import BytesIO
+import sqlite3
+import time
 from pathlib import Path
 from typing import Any, Dict
 from urllib.parse import urlencode
 
-from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from PIL import Image, ImageOps, UnidentifiedImageError
 from starlette.middleware.sessions import SessionMiddleware
 
+from .account_pool import ACCOUNT_NAME_PATTERN, ALL_SESSIONS, AccountPool
 from .auth_security import LoginGuardStore, build_password_hash, ensure_auth_baseline, verify_password
+from .backfill_service import BACKFILL_DEFAULT_WINDOW_SIZE, BackfillRunner
+from .backfill_store import BackfillJobStore
+from .client_manager import TelegramClientManager
 from .backup_manager import BackupManager
 from .checkpoint_store import ChannelCheckpointStore
-from .config_store import ConfigStore, parse_bool, parse_channel_sources, parse_csv, parse_int_csv
-from .forwarder_service import ForwarderRunner, resolve_identifiers_preview
+from .config_store import (
+    DEFAULT_ENV_VALUES,
+    DEFAULT_SOURCE_BOOTSTRAP,
+    ConfigStore,
+    normalize_source_bootstrap,
+    parse_bool,
+    parse_bootstrap_since,
+    parse_channel_sources,
+    parse_csv,
+    parse_int_csv,
+    parse_positive_int,
+)
+from .corpus_store import MessageCorpusStore
+from .forward_job_service import ForwardJobManager, JobConfigStore
+from .forward_job_store import ForwardJobStore
+from .forwarder_service import ForwarderRunner, resolve_identifiers_preview, warm_peer_cache
 from .history_store import RunHistoryStore
+from .leader_store import (
+    LEADER_LEASE_NAME,
+    LEADER_LEASE_SECONDS,
+    LEADER_RENEW_SECONDS,
+    LeaderLeaseStore,
+    local_holder_id,
+)
 from .logging_utils import create_logger, rebind_logger_file_handler
+from .forward_ledger_store import ForwardLedgerStore
+from .peer_cache_store import PeerCacheStore
+from .poll_schedule_store import SourcePollScheduleStore
+from .retry_queue_store import RETRY_QUEUE_MAX_ATTEMPTS, SendRetryQueueStore
+from .realtime_service import RealtimeForwarder
+from .request_governor import governor
+from .rss_feed import (
+    RSS_MEDIA_FILENAME_RE,
+    RssRefreshUnavailable,
+    build_live_rss_xml,
+    build_rss_url,
+    build_rss_xml,
+    build_tme_link,
+    read_rss_cache,
+    refresh_rss_cache_in_background,
+    rss_media_dir,
+    rss_media_type_for_path,
+    safe_rss_limit,
+    write_rss_cache,
+)
+from .rule_lab import evaluate_rule_set
+from .staging_store import StagingQueueStore
 from .time_utils import now_shanghai_iso, timestamp_to_shanghai_iso
-from telethon import TelegramClient
-from telethon.tl.types import MessageEntityTextUrl, MessageEntityUrl
+from .worker_link import WORKER_CALL_TIMEOUT_SECONDS, WorkerCommandServer, WorkerLink, WorkerUnavailableError
+from .worker_store import WorkerChannelStore
 
 
 BASE_DIR = Path(__file__).resolve().parent
 
+# 模块导入时只创建对象，不读写数据目录：建目录、日志文件、建表与初始配置都在 startup_panel() 中按顺序执行，
+# 健康检查与容器重启不必等待这些 I/O 完成导入。
 config_store = ConfigStore()
-config_store.ensure_directories()
-
-logger = create_logger(config_store.log_file)
+logger = create_logger()
 history_store = RunHistoryStore(config_store.db_path)
 login_guard_store = LoginGuardStore(config_store.db_path)
 checkpoint_store = ChannelCheckpointStore(config_store.db_path)
+corpus_store = MessageCorpusStore(config_store.db_path)
+staging_store = StagingQueueStore(config_store.db_path)
+backfill_store = BackfillJobStore(config_store.db_path)
+poll_schedule_store = SourcePollScheduleStore(config_store.db_path)
+ledger_store = ForwardLedgerStore(config_store.db_path)
+retry_store = SendRetryQueueStore(config_store.db_path)
+peer_cache_store = PeerCacheStore(config_store.db_path)
+forward_job_store = ForwardJobStore(config_store.db_path)
+worker_channel_store = WorkerChannelStore(config_store.db_path)
+leader_lease_store = LeaderLeaseStore(config_store.db_path)
 backup_manager = BackupManager(config_store.data_dir, config_store.backups_dir)
-runner = ForwarderRunner(config_store, checkpoint_store, history_store, logger)
-
-bootstrap_updates, bootstrap_password = ensure_auth_baseline(config_store.load_raw_config())
-if bootstrap_updates:
-    config_store.save_raw_config(bootstrap_updates)
-if bootstrap_password:
-    bootstrap_username = bootstrap_updates.get("PANEL_ADMIN_USERNAME", "admin")
-    logger.warning(
-        "首次启动已自动生成管理员账户，用户名: %s，初始密码: %s，请登录后立即修改。",
-        bootstrap_username,
-        bootstrap_password,
-    )
-
-rss_token_config = config_store.load_raw_config()
-if not str(rss_token_config.get("PANEL_RSS_TOKEN", "")).strip():
-    config_store.save_raw_config({"PANEL_RSS_TOKEN": secrets.token_urlsafe(24)})
-    logger.info("已生成 RSS 订阅 token。")
+client_manager = TelegramClientManager(config_store, logger)
+account_pool = AccountPool(config_store, logger)
+runner = ForwarderRunner(
+    config_store,
+    checkpoint_store,
+    history_store,
+    logger,
+    corpus_store=corpus_store,
+    staging_store=staging_store,
+    poll_schedule_store=poll_schedule_store,
+    ledger_store=ledger_store,
+    retry_store=retry_store,
+    client_manager=client_manager,
+    peer_cache_store=peer_cache_store,
+    account_pool=account_pool,
+)
+backfill_runner = BackfillRunner(
+    config_store,
+    backfill_store,
+    runner,
+    logger,
+    ledger_store=ledger_store,
+    retry_store=retry_store,
+)
+job_manager = ForwardJobManager(
+    config_store,
+    forward_job_store,
+    logger,
+    corpus_store=corpus_store,
+    client_manager=client_manager,
+    peer_cache_store=peer_cache_store,
+    account_pool=account_pool,
+)
+realtime_forwarder = RealtimeForwarder(
+    config_store,
+    checkpoint_store,
+    runner,
+    logger,
+    corpus_store=corpus_store,
+    staging_store=staging_store,
+    ledger_store=ledger_store,
+    retry_store=retry_store,
+)
+# PANEL_WORKER_MODE=external 时面板只提供页面与 RSS，转发由独立的 worker 进程执行，两者经 panel.db 通信。
+# 其余情况下同一数据目录的各面板进程（如 uvicorn --workers N）竞争 panel.db 中的租约，
+# 持有者负责调度与 Telegram 请求，其他进程只处理 HTTP 请求，操作经同一通道转交持有者。
+WORKER_MODE = os.environ.get("PANEL_WORKER_MODE", "").strip().lower()
+worker_link = WorkerLink(worker_channel_store, logger)
+leader_holder = local_holder_id()
+forwarding_leader = False
+leader_renewed_at = 0.0
+
+# 会话密钥由 startup_panel() 读取配置后确定，在此之前不处理 HTTP 请求。
+session_secret = ""
+
+
+class PanelSessionMiddleware:
+    """登录会话中间件：会话密钥在启动流程中才确定，首次处理 HTTP 请求时再按该密钥建立 SessionMiddleware。"""
+
+    def __init__(self, app, **options: Any):
+        self.app = app
+        self.options = options
+        self._session_middleware: SessionMiddleware | None = None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] not in {"http", "websocket"}:
+            await self.app(scope, receive, send)
+            return
+        if self._session_middleware is None:
+            self._session_middleware = SessionMiddleware(self.app, secret_key=session_secret, **self.options)
+        await self._session_middleware(scope, receive, send)
 
-raw_for_secret = config_store.load_raw_config()
-session_secret = str(raw_for_secret.get("PANEL_SESSION_SECRET", "")).strip() or os.environ.get("PANEL_SESSION_SECRET", "")
-if not session_secret:
-    session_secret = secrets.token_urlsafe(48)
-    logger.warning("未配置 PANEL_SESSION_SECRET，当前进程使用临时会话密钥。建议在配置页中设置固定值。")
 
 app = FastAPI(title="T2RSS 管理面板", version="1.0.0")
 app.add_middleware(
-    SessionMiddleware,
-    secret_key=session_secret,
+    PanelSessionMiddleware,
     session_cookie="t2rss_panel_session",
     max_age=60 * 60 * 12,
     same_site="lax",
@@ -78,50 +181,221 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 RSS_REFRESH_TIMEOUT_SECONDS = 20
-RSS_BACKGROUND_REFRESH_TIMEOUT_SECONDS = 300
-RSS_IMAGE_DISPLAY_WIDTH = 720
-RSS_IMAGE_DISPLAY_MAX_HEIGHT = 960
-RSS_IMAGE_JPEG_QUALITY = 85
-RSS_IMAGE_CACHE_VERSION = f"img{RSS_IMAGE_DISPLAY_WIDTH}x{RSS_IMAGE_DISPLAY_MAX_HEIGHT}"
-RSS_HTTP_URL_RE = re.compile(r"https?://[^\s<>\"']+", re.IGNORECASE)
-RSS_URL_TRAILING_CHARS = ".,;:!?)]}，。！？、；：）】》"
-RSS_MEDIA_FILENAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
-RSS_IMAGE_EXT_BY_MIME = {
-    "image/jpeg": ".jpg",
-    "image/jpg": ".jpg",
-    "image/png": ".png",
-    "image/webp": ".webp",
-    "image/gif": ".gif",
-}
-RSS_IMAGE_MEDIA_TYPES = {
-    ".jpg": "image/jpeg",
-    ".jpeg": "image/jpeg",
-    ".png": "image/png",
-    ".webp": "image/webp",
-    ".gif": "image/gif",
-}
-rss_refresh_task: asyncio.Task | None = None
+# 每个 RSS（默认任务与各附加任务）各自最多一个后台刷新，按状态目录区分。
+rss_refresh_tasks: Dict[Path, asyncio.Task] = {}
+peer_cache_warm_task: asyncio.Task | None = None
+leadership_task: asyncio.Task | None = None
+command_server_task: asyncio.Task | None = None
+command_server_stop: asyncio.Event | None = None
+
+
+def bootstrap_panel_config() -> None:
+    """首次启动时生成管理员账户与 RSS token。
+
+    多个进程同时首次启动时，在 panel.db 写锁内串行生成，避免各自生成不同的管理员密码与会话密钥。
+    """
+    with leader_lease_store.exclusive():
+        bootstrap_updates, bootstrap_password = ensure_auth_baseline(config_store.load_raw_config())
+        if bootstrap_updates:
+            config_store.save_raw_config(bootstrap_updates)
+        if bootstrap_password:
+            bootstrap_username = bootstrap_updates.get("PANEL_ADMIN_USERNAME", "admin")
+            logger.warning(
+                "首次启动已自动生成管理员账户，用户名: %s，初始密码: %s，请登录后立即修改。",
+                bootstrap_username,
+                bootstrap_password,
+            )
 
+        rss_token_config = config_store.load_raw_config()
+        if not str(rss_token_config.get("PANEL_RSS_TOKEN", "")).strip():
+            config_store.save_raw_config({"PANEL_RSS_TOKEN": secrets.token_urlsafe(24)})
+            logger.info("已生成 RSS 订阅 token。")
 
-@app.on_event("startup")
-async def on_startup() -> None:
+
+def resolve_session_secret() -> str:
+    raw_config = config_store.load_raw_config()
+    secret = str(raw_config.get("PANEL_SESSION_SECRET", "")).strip() or os.environ.get("PANEL_SESSION_SECRET", "")
+    if not secret:
+        secret = secrets.token_urlsafe(48)
+        logger.warning("未配置 PANEL_SESSION_SECRET，当前进程使用临时会话密钥。建议在配置页中设置固定值。")
+    return secret
+
+
+def startup_panel() -> None:
+    """面板进程的启动流程，按顺序执行：挂上日志文件 → 建目录与数据表 → 生成初始配置 → 确定会话密钥。"""
+    global session_secret
+    started = time.perf_counter()
+    rebind_logger_file_handler(logger, config_store.log_file)
+    prepare_storage()
+    bootstrap_panel_config()
+    session_secret = resolve_session_secret()
+    logger.info("面板启动流程完成，用时 %.2f 秒。", time.perf_counter() - started)
+
+
+def prepare_storage() -> None:
+    """建立目录与数据库表并迁移旧版数据；面板与独立 worker 进程启动时都会执行。"""
     config_store.ensure_directories()
     moved_sessions = config_store.migrate_legacy_session_files()
     if moved_sessions > 0:
         logger.info("已将旧会话文件迁移到 t2rss.session，迁移文件数: %s", moved_sessions)
+    # 旧版 RSS 刷新使用的会话副本目录，改用共享客户端后不再需要。
+    shutil.rmtree(config_store.state_dir / "rss_session", ignore_errors=True)
     backup_manager.ensure_directory()
     history_store.init_db()
     login_guard_store.init_db()
     checkpoint_store.init_db()
+    corpus_store.init_db()
+    staging_store.init_db()
+    backfill_store.init_db()
+    poll_schedule_store.init_db()
+    ledger_store.init_db()
+    retry_store.init_db()
+    peer_cache_store.init_db()
+    forward_job_store.init_db()
+    worker_channel_store.init_db()
+    leader_lease_store.init_db()
     migrated = checkpoint_store.migrate_from_files(config_store.last_id_dir)
     if migrated > 0:
         logger.info("已将旧版 last_id 文本记录迁移到数据库，共 %s 条。", migrated)
+
+
+async def start_forwarding_services() -> None:
+    """启动转发、附加任务、实时转发与解析缓存预热；只在持有转发租约的进程中执行。"""
+    # 持有租约时本进程是唯一的转发进程，上一持有者被强杀时遗留的运行锁可以直接清除。
+    stale_locks = [config_store.lock_file] + [
+        JobConfigStore(config_store, forward_job_store, job["id"]).lock_file for job in forward_job_store.list_jobs()
+    ]
+    for lock_file in stale_locks:
+        if lock_file.exists():
+            lock_file.unlink(missing_ok=True)
+            logger.info("已清除上一转发进程遗留的运行锁: %s", lock_file)
+    paused_backfills = backfill_store.pause_running_jobs()
+    if paused_backfills > 0:
+        logger.info("上次退出时有 %s 个历史回填任务未完成，已标记为暂停，可在计划与备份页面继续。", paused_backfills)
     await runner.start()
+    await job_manager.start()
+    await realtime_forwarder.start()
+    global peer_cache_warm_task
+    peer_cache_warm_task = asyncio.create_task(warm_peer_cache_in_background())
+
+
+async def stop_forwarding_services() -> None:
+    if peer_cache_warm_task is not None and not peer_cache_warm_task.done():
+        peer_cache_warm_task.cancel()
+    await realtime_forwarder.stop()
+    await backfill_runner.stop()
+    await runner.stop()
+    await job_manager.stop()
+    await client_manager.close()
+    await account_pool.close()
+
+
+async def update_forwarding_leadership() -> None:
+    """获取或续期转发租约：刚获得时启动转发服务与命令处理，失去租约时立即停止，由新的持有者接管。"""
+    global forwarding_leader, leader_renewed_at, command_server_task, command_server_stop
+    try:
+        # 在线程中执行：其他进程持有 panel.db 写锁时等待锁不阻塞本进程的页面与 RSS 请求。
+        held = await asyncio.to_thread(
+            leader_lease_store.try_acquire, LEADER_LEASE_NAME, leader_holder, LEADER_LEASE_SECONDS
+        )
+    except sqlite3.Error as exc:
+        # 数据库暂时被锁等错误不等于失去租约：已持有且距上次续期成功仍在租期内时，保持现状，下一轮再续期。
+        if forwarding_leader and time.monotonic() - leader_renewed_at < LEADER_LEASE_SECONDS - LEADER_RENEW_SECONDS:
+            logger.warning("续期转发租约失败，稍后重试: %s", exc)
+            return
+        logger.warning("续期转发租约失败: %s", exc)
+        held = False
+    if held:
+        leader_renewed_at = time.monotonic()
+
+    if held and not forwarding_leader:
+        forwarding_leader = True
+        try:
+            await start_forwarding_services()
+            command_server_stop = asyncio.Event()
+            command_server_task = asyncio.create_task(command_server.serve(command_server_stop))
+        except Exception:
+            logger.exception("启动转发服务失败，释放转发租约，由其他进程或下一轮重试接管。")
+            await release_forwarding_leadership()
+            return
+        logger.info("本进程（%s）已持有转发租约，负责调度与 Telegram 请求。", leader_holder)
+    elif not held and forwarding_leader:
+        logger.warning("本进程（%s）失去转发租约，停止调度，由其他进程接管。", leader_holder)
+        await release_forwarding_leadership(release_lease=False)
+
+
+async def release_forwarding_leadership(release_lease: bool = True) -> None:
+    """停止命令处理与转发服务；其中某一步出错时仍继续后续步骤并释放租约。"""
+    global forwarding_leader, command_server_task, command_server_stop
+    forwarding_leader = False
+    try:
+        if command_server_stop is not None:
+            command_server_stop.set()
+        if command_server_task is not None:
+            await command_server_task
+    except Exception:
+        logger.exception("停止命令处理失败")
+    finally:
+        command_server_task = None
+        command_server_stop = None
+    try:
+        await stop_forwarding_services()
+    except Exception:
+        logger.exception("停止转发服务失败")
+    if release_lease:
+        try:
+            await asyncio.to_thread(leader_lease_store.release, LEADER_LEASE_NAME, leader_holder)
+        except sqlite3.Error as exc:
+            logger.warning("释放转发租约失败，将在租约过期后由其他进程接管: %s", exc)
+
+
+async def renew_forwarding_leadership() -> None:
+    """周期续期的一轮：出现意外错误时停止转发服务并释放租约，续期循环本身不退出。"""
+    try:
+        await update_forwarding_leadership()
+    except Exception:
+        logger.exception("维护转发租约失败")
+        if forwarding_leader:
+            await release_forwarding_leadership()
+
+
+async def maintain_forwarding_leadership() -> None:
+    while True:
+        await asyncio.sleep(LEADER_RENEW_SECONDS)
+        await renew_forwarding_leadership()
+
+
+def forwarding_is_local() -> bool:
+    """本进程是否持有转发服务；否则控制命令、状态与会话写入都经 panel.db 转交持有租约的进程。"""
+    return forwarding_leader
+
+
+@app.on_event("startup")
+async def on_startup() -> None:
+    startup_panel()
+    if WORKER_MODE == "external":
+        logger.info("独立 worker 模式：转发、实时转发、历史回填与 RSS 刷新由 python -m app.worker 进程执行。")
+        return
+    await update_forwarding_leadership()
+    if not forwarding_leader:
+        logger.info("其他进程持有转发租约，本进程只处理页面与 RSS 请求，并在其退出后接管。")
+    global leadership_task
+    leadership_task = asyncio.create_task(maintain_forwarding_leadership())
+
+
+async def warm_peer_cache_in_background() -> None:
+    try:
+        await warm_peer_cache(config_store, peer_cache_store, logger, client_manager)
+    except Exception as exc:
+        logger.warning("频道解析缓存预热失败，将在使用时再解析: %s", exc)
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
-    await runner.stop()
+    if leadership_task is not None:
+        leadership_task.cancel()
+    if forwarding_leader:
+        await release_forwarding_leadership()
 
 
 def redirect_with_message(path: str, message: str, level: str = "info") -> RedirectResponse:
@@ -156,19 +430,43 @@ def read_panel_log_tail(log_file: Path, line_limit: int = 300) -> str:
     return "\n".join(lines[-safe_limit:])
 
 
+LOG_RECORD_PREFIX = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} ")
+
+
+def read_merged_log_tail(log_files: list[Path], line_limit: int = 300) -> str:
+    """合并面板与 worker 的日志尾部：按记录开头的时间排序，多行记录（如异常堆栈）随其首行一起移动。"""
+    safe_limit = max(20, min(int(line_limit), 2000))
+    records: list[tuple[str, int, list[str]]] = []
+    for file_index, log_file in enumerate(log_files):
+        if not log_file.exists():
+            continue
+        try:
+            content = log_file.read_text(encoding="utf-8", errors="replace")
+        except OSError as exc:
+            return f"读取日志失败: {exc}"
+        file_records: list[tuple[str, int, list[str]]] = []
+        for line in content.splitlines()[-safe_limit:]:
+            if LOG_RECORD_PREFIX.match(line) or not file_records:
+                file_records.append((line[:19], file_index, [line]))
+            else:
+                file_records[-1][2].append(line)
+        records.extend(file_records)
+
+    if not records:
+        return "暂无日志输出。"
+    records.sort(key=lambda record: (record[0], record[1]))
+    lines = [line for _, _, record_lines in records for line in record_lines]
+    return "\n".join(lines[-safe_limit:])
+
+
 def clear_panel_log(log_file: Path) -> None:
     log_file.parent.mkdir(parents=True, exist_ok=True)
     log_file.write_text("", encoding="utf-8")
 
 
-def ensure_channel_checkpoints(channel_ids: list[int]) -> int:
-    """为新频道自动补齐断点记录，默认 last_id=0。"""
-    created_count = 0
-    for channel_id in sorted(set(channel_ids)):
-        if checkpoint_store.get_record(channel_id) is None:
-            checkpoint_store.set_last_id(channel_id, 0)
-            created_count += 1
-    return created_count
+def count_pending_bootstrap(channel_ids: list[int]) -> int:
+    """统计尚无断点记录的频道数，这些频道会在首次运行时按初始化策略确定起点。"""
+    return len([channel_id for channel_id in set(channel_ids) if checkpoint_store.get_record(channel_id) is None])
 
 
 def collect_session_view_data() -> Dict[str, Any]:
@@ -181,10 +479,25 @@ def collect_session_view_data() -> Dict[str, Any]:
             "updated_at": timestamp_to_shanghai_iso(stat.st_mtime),
         }
 
+    pool_status = runtime_status()["account_pool"]["accounts"]
+    account_sessions = []
+    for name in account_pool.account_names():
+        stat = (config_store.account_session_dir / f"{name}.session").stat()
+        account_sessions.append(
+            {
+                "name": name,
+                "size_bytes": stat.st_size,
+                "updated_at": timestamp_to_shanghai_iso(stat.st_mtime),
+                **pool_status.get(name, {}),
+            }
+        )
+
     return {
         "session_exists": session_exists,
         "session_info": session_info,
         "session_path": str(config_store.session_file),
+        "account_sessions": account_sessions,
+        "account_session_dir": str(config_store.account_session_dir),
     }
 
 
@@ -218,568 +531,192 @@ def normalize_source_token(token: Any) -> str:
     return raw.strip()
 
 
-def build_tme_link(channel_text: str) -> tuple[str, str]:
-    raw = str(channel_text or "").strip()
-    if not raw:
-        return "", ""
-
-    if raw.startswith("https://t.me/") or raw.startswith("http://t.me/"):
-        url = raw.replace("http://", "https://", 1)
-        display = url.replace("https://", "", 1)
-        return display, url
-
-    token = raw.lstrip("@")
-    if not token:
-        return "", ""
-
-    url = f"https://t.me/{token}"
-    display = f"t.me/{token}"
-    return display, url
-
-
-def build_rss_url(request: Request, token: str) -> str:
-    base_url = str(request.base_url).rstrip("/")
-    return f"{base_url}/rss/{token}.xml"
-
-
-def build_message_link(destination_channel: str, message_id: int) -> str:
-    raw = str(destination_channel or "").strip()
-    if not raw:
-        return ""
-
-    if raw.startswith("https://t.me/") or raw.startswith("http://t.me/"):
-        base = raw.replace("http://", "https://", 1).rstrip("/")
-        return f"{base}/{message_id}"
-
-    token = raw.lstrip("@").strip()
-    if not token:
-        return ""
-    return f"https://t.me/{token}/{message_id}"
-
-
-def xml_escape(value: Any) -> str:
-    return html.escape(str(value or ""), quote=True)
-
-
-def safe_rss_limit(raw_value: str) -> int:
-    try:
-        parsed = int(str(raw_value or "").strip())
-    except ValueError:
-        return 500
-    return max(50, min(parsed, 2000))
+def panel_base_url(request: Request) -> str:
+    return str(request.base_url).rstrip("/")
 
 
-def message_text_for_feed(message) -> str:
-    return (
-        getattr(message, "raw_text", None)
-        or getattr(message, "message", None)
-        or getattr(message, "text", None)
-        or getattr(message, "caption", None)
-        or ""
+def schedule_rss_cache_refresh(
+    feed_store: ConfigStore,
+    base_url: str,
+    token: str,
+    raw_config: Dict[str, str],
+) -> asyncio.Task:
+    refresh_task = rss_refresh_tasks.get(feed_store.state_dir)
+    if refresh_task and not refresh_task.done():
+        return refresh_task
+    refresh_task = asyncio.create_task(
+        refresh_rss_cache_in_background(feed_store, base_url, token, dict(raw_config), logger, client_manager)
     )
+    rss_refresh_tasks[feed_store.state_dir] = refresh_task
+    return refresh_task
 
 
-def rss_title_from_text(text: str, fallback: str) -> str:
-    for line in str(text or "").splitlines():
-        cleaned = line.strip()
-        if cleaned:
-            return cleaned
-    return fallback
-
-
-def rss_pub_date(message) -> str:
-    date_value = getattr(message, "date", None)
-    if not date_value:
-        return format_datetime(datetime.now(timezone.utc))
-    if date_value.tzinfo is None:
-        date_value = date_value.replace(tzinfo=timezone.utc)
-    return format_datetime(date_value)
-
-
-def rss_linkify_plain_text(raw: str) -> str:
-    pieces: list[str] = []
-    position = 0
-    for match in RSS_HTTP_URL_RE.finditer(str(raw or "")):
-        url = match.group(0)
-        while url and url[-1] in RSS_URL_TRAILING_CHARS:
-            url = url[:-1]
-        if not url:
-            continue
-
-        link_end = match.start() + len(url)
-        pieces.append(html.escape(raw[position : match.start()], quote=False))
-        escaped_href = html.escape(url, quote=True)
-        pieces.append(f'<a href="{escaped_href}">{html.escape(url, quote=False)}</a>')
-        pieces.append(html.escape(raw[link_end : match.end()], quote=False))
-        position = match.end()
-
-    pieces.append(html.escape(raw[position:], quote=False))
-    return "".join(pieces)
-
-
-def rss_utf16_boundaries(text: str) -> dict[int, int]:
-    boundaries = {0: 0}
-    units = 0
-    for index, char in enumerate(str(text or "")):
-        units += len(char.encode("utf-16-le")) // 2
-        boundaries[units] = index + 1
-    return boundaries
-
-
-def rss_entity_text_map(message) -> dict[int, str]:
-    get_entities_text = getattr(message, "get_entities_text", None)
-    if not callable(get_entities_text):
-        return {}
-
-    results: dict[int, str] = {}
-    for entity_type in (MessageEntityTextUrl, MessageEntityUrl):
-        try:
-            pairs = get_entities_text(entity_type)
-        except Exception:
-            continue
-        try:
-            iterator = iter(pairs)
-        except TypeError:
-            continue
-        for pair in iterator:
-            if not isinstance(pair, (list, tuple)) or len(pair) != 2:
-                continue
-            entity, entity_text = pair
-            results[id(entity)] = str(entity_text or "")
-    return results
-
-
-def rss_entity_span(content: str, entity, expected_text: str, utf16_boundaries: dict[int, int]) -> tuple[int, int] | None:
-    offset = int(getattr(entity, "offset", 0) or 0)
-    length = int(getattr(entity, "length", 0) or 0)
-    if length <= 0 or offset < 0:
-        return None
-
-    raw_span = None
-    raw_end = offset + length
-    if raw_end <= len(content):
-        raw_span = (offset, raw_end)
-
-    utf16_span = None
-    utf16_start = utf16_boundaries.get(offset)
-    utf16_end = utf16_boundaries.get(raw_end)
-    if utf16_start is not None and utf16_end is not None and utf16_start <= utf16_end:
-        utf16_span = (utf16_start, utf16_end)
-
-    if expected_text:
-        if utf16_span and content[utf16_span[0] : utf16_span[1]] == expected_text:
-            return utf16_span
-        if raw_span and content[raw_span[0] : raw_span[1]] == expected_text:
-            return raw_span
-
-    if utf16_span and raw_span and utf16_span != raw_span:
-        if any(ord(char) > 0xFFFF for char in content[:offset]):
-            return utf16_span
-
-    return raw_span or utf16_span
-
-
-def rss_link_entities_from_message(message, text: str) -> list[tuple[int, int, str]]:
-    content = str(text or "")
-    if not content:
-        return []
-
-    candidates: list[tuple[int, int, str]] = []
-    utf16_boundaries = rss_utf16_boundaries(content)
-    expected_by_entity = rss_entity_text_map(message)
-    for entity in getattr(message, "entities", None) or []:
-        if isinstance(entity, MessageEntityTextUrl):
-            href = str(getattr(entity, "url", "") or "").strip()
-        elif isinstance(entity, MessageEntityUrl):
-            href = ""
-        else:
-            continue
-
-        expected_text = expected_by_entity.get(id(entity), "")
-        span = rss_entity_span(content, entity, expected_text, utf16_boundaries)
-        if not span:
-            continue
-
-        start, end = span
-        if isinstance(entity, MessageEntityUrl):
-            href = content[start:end].strip()
-        if not href:
-            continue
-        candidates.append((start, end, href))
-
-    results: list[tuple[int, int, str]] = []
-    cursor = 0
-    for start, end, href in sorted(candidates, key=lambda item: (item[0], item[1])):
-        if start < cursor:
-            continue
-        results.append((start, end, href))
-        cursor = end
-    return results
-
-
-def rss_description_cdata(text: str, image_url: str = "", link_entities: list[tuple[int, int, str]] | None = None) -> str:
-    raw = str(text or "（媒体消息）")
-    pieces: list[str] = []
-
-    if image_url:
-        escaped_image_url = html.escape(image_url, quote=True)
-        pieces.append(
-            (
-                f'<p><img src="{escaped_image_url}" alt="" width="{RSS_IMAGE_DISPLAY_WIDTH}" '
-                f'style="width:100%;max-width:{RSS_IMAGE_DISPLAY_WIDTH}px;'
-                f'height:auto;max-height:{RSS_IMAGE_DISPLAY_MAX_HEIGHT}px;'
-                'object-fit:contain;display:block;margin:0 0 12px 0;border-radius:8px;" /></p>'
-            )
-        )
-
-    position = 0
-    for start, end, href in link_entities or []:
-        if start < position or end > len(raw):
-            continue
-        pieces.append(rss_linkify_plain_text(raw[position:start]))
-        anchor_text = raw[start:end]
-        escaped_href = html.escape(href, quote=True)
-        pieces.append(f'<a href="{escaped_href}">{html.escape(anchor_text, quote=False)}</a>')
-        position = end
-
-    pieces.append(rss_linkify_plain_text(raw[position:]))
-    html_body = "".join(pieces).replace("\n", "<br />")
-    return f"<![CDATA[{html_body.replace(']]>', ']]]]><![CDATA[>')}]]>"
-
-
-class RssRefreshUnavailable(Exception):
-    pass
-
-
-def rss_cache_file() -> Path:
-    return config_store.state_dir / "rss_feed.xml"
-
-
-def rss_media_dir() -> Path:
-    return config_store.state_dir / "rss_media"
-
-
-def rss_media_type_for_path(path: Path) -> str:
-    return RSS_IMAGE_MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
-
-
-def build_rss_media_url(request: Request, token: str, filename: str) -> str:
-    base_url = str(request.base_url).rstrip("/")
-    return f"{base_url}/rss-media/{token}/{filename}"
-
-
-def rss_media_payload(path: Path, request: Request, token: str) -> Dict[str, Any]:
-    return {
-        "filename": path.name,
-        "url": build_rss_media_url(request, token, path.name),
-        "length": path.stat().st_size,
-        "mime_type": rss_media_type_for_path(path),
-    }
-
-
-def rss_message_image_metadata(message) -> tuple[str, str] | None:
-    if getattr(message, "photo", None):
-        return ".jpg", "image/jpeg"
-
-    file_info = getattr(message, "file", None)
-    mime_type = str(getattr(file_info, "mime_type", "") or "").lower()
-    if mime_type.startswith("image/"):
-        ext = str(getattr(file_info, "ext", "") or "").lower()
-        if ext == ".jpe":
-            ext = ".jpg"
-        if ext not in RSS_IMAGE_MEDIA_TYPES:
-            ext = RSS_IMAGE_EXT_BY_MIME.get(mime_type, ".jpg")
-        return ext, RSS_IMAGE_MEDIA_TYPES.get(ext, mime_type)
-
-    media = getattr(message, "media", None)
-    if getattr(media, "photo", None):
-        return ".jpg", "image/jpeg"
+def request_rss_refresh(feed_store: ConfigStore, base_url: str, token: str, raw_config: Dict[str, str]) -> None:
+    if not forwarding_is_local():
+        worker_link.send("rss_refresh", {"token": token, "base_url": base_url})
+        return
+    schedule_rss_cache_refresh(feed_store, base_url, token, raw_config)
 
-    webpage = getattr(media, "webpage", None)
-    if getattr(webpage, "photo", None):
-        return ".jpg", "image/jpeg"
 
+def rss_feed_owner(token: str) -> tuple[ConfigStore, int | None] | None:
+    """按 token 找到 RSS 所属的任务：默认任务（config.env，任务 ID 为 None）或某个附加转发任务。"""
+    raw_config = config_store.load_raw_config()
+    expected_token = str(raw_config.get("PANEL_RSS_TOKEN", "")).strip()
+    if expected_token and hmac.compare_digest(str(token or ""), expected_token):
+        return config_store, None
+    for job in forward_job_store.list_jobs():
+        expected_token = str(job["settings"].get("PANEL_RSS_TOKEN", "")).strip()
+        if expected_token and hmac.compare_digest(str(token or ""), expected_token):
+            runtime = job_manager.get(job["id"])
+            job_config = runtime.config_store if runtime else JobConfigStore(config_store, forward_job_store, job["id"])
+            return job_config, job["id"]
     return None
 
 
-def rss_media_prefix(destination_channel: str, message_id: int) -> str:
-    channel_slug = re.sub(r"[^A-Za-z0-9_-]+", "_", str(destination_channel or "channel")).strip("_")
-    channel_slug = channel_slug[:80] or "channel"
-    return f"{channel_slug}_{message_id}_{RSS_IMAGE_CACHE_VERSION}"
-
-
-def standardize_rss_image_payload(payload: bytes, fallback_ext: str, fallback_mime_type: str) -> tuple[bytes, str, str]:
-    try:
-        with Image.open(BytesIO(payload)) as image:
-            image = ImageOps.exif_transpose(image)
-            resampling_filter = getattr(getattr(Image, "Resampling", Image), "LANCZOS")
-            image.thumbnail((RSS_IMAGE_DISPLAY_WIDTH, RSS_IMAGE_DISPLAY_MAX_HEIGHT), resampling_filter)
-
-            if image.mode in {"RGBA", "LA"} or (image.mode == "P" and "transparency" in image.info):
-                alpha = image.convert("RGBA").getchannel("A")
-                background = Image.new("RGB", image.size, (255, 255, 255))
-                background.paste(image.convert("RGBA"), mask=alpha)
-                image = background
-            elif image.mode != "RGB":
-                image = image.convert("RGB")
-
-            output = BytesIO()
-            image.save(
-                output,
-                format="JPEG",
-                quality=RSS_IMAGE_JPEG_QUALITY,
-                optimize=True,
-                progressive=True,
-            )
-            return output.getvalue(), ".jpg", "image/jpeg"
-    except (OSError, ValueError, UnidentifiedImageError):
-        return payload, fallback_ext, fallback_mime_type
-
-
-async def cache_rss_message_image(
-    client: TelegramClient,
-    message,
-    request: Request,
-    token: str,
-    destination_channel: str,
-) -> Dict[str, Any] | None:
-    metadata = rss_message_image_metadata(message)
-    if not metadata:
-        return None
-
-    message_id = int(getattr(message, "id", 0) or 0)
-    if message_id <= 0:
-        return None
-
-    ext, mime_type = metadata
-    media_dir = rss_media_dir()
-    media_dir.mkdir(parents=True, exist_ok=True)
-    prefix = rss_media_prefix(destination_channel, message_id)
-
-    for existing in media_dir.glob(f"{prefix}.*"):
-        if existing.is_file() and existing.suffix.lower() in RSS_IMAGE_MEDIA_TYPES:
-            return rss_media_payload(existing, request, token)
-
-    temporary_path = media_dir / f"{prefix}.{secrets.token_hex(8)}.tmp"
-    try:
-        payload = await client.download_media(message, file=bytes)
-        if not payload:
-            return None
-        payload, ext, mime_type = standardize_rss_image_payload(payload, ext, mime_type)
-        target_path = media_dir / f"{prefix}{ext}"
-        temporary_path.write_bytes(payload)
-        temporary_path.replace(target_path)
-    finally:
-        temporary_path.unlink(missing_ok=True)
-
+def collect_runtime_status() -> Dict[str, Any]:
+    """本进程中转发相关组件的状态；持有转发租约的进程定期写入状态快照供其他进程读取。"""
     return {
-        "filename": target_path.name,
-        "url": build_rss_media_url(request, token, target_path.name),
-        "length": target_path.stat().st_size,
-        "mime_type": mime_type,
+        "runner": runner.status_payload(),
+        "realtime": realtime_forwarder.status_payload(),
+        "telegram_client": client_manager.status_payload(),
+        "request_governor": governor.status_payload(),
+        "account_pool": account_pool.status_payload(),
+        "jobs": job_manager.status_payload(),
+        "backfill": {
+            "is_running": backfill_runner.is_running,
+            "current_job_id": backfill_runner.current_job_id,
+        },
     }
 
 
-def cleanup_stale_rss_media(active_filenames: set[str]) -> None:
-    media_dir = rss_media_dir()
-    if not media_dir.exists():
-        return
-    for item in media_dir.iterdir():
-        if not item.is_file():
-            continue
-        if item.name in active_filenames:
-            continue
-        if item.suffix.lower() not in RSS_IMAGE_MEDIA_TYPES and item.suffix.lower() != ".tmp":
-            continue
-        try:
-            item.unlink(missing_ok=True)
-        except OSError:
-            pass
-
-
-def read_rss_cache() -> str | None:
-    path = rss_cache_file()
-    if not path.exists():
-        return None
-    try:
-        return path.read_text(encoding="utf-8")
-    except OSError:
-        return None
-
-
-def write_rss_cache(content: str) -> None:
-    path = rss_cache_file()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    temporary_path = path.with_name(f"{path.name}.{secrets.token_hex(8)}.tmp")
-    temporary_path.write_text(content, encoding="utf-8")
-    temporary_path.replace(path)
-
-
-def create_rss_session_copy() -> Path:
-    rss_session_dir = config_store.state_dir / "rss_session"
-    rss_session_dir.mkdir(parents=True, exist_ok=True)
-    session_base = rss_session_dir / f"t2rss_rss_{secrets.token_hex(8)}"
-
-    source_candidates = [
-        (config_store.session_file, Path(f"{session_base}.session")),
-        (Path(f"{config_store.session_base_path}.session-journal"), Path(f"{session_base}.session-journal")),
-        (Path(f"{config_store.session_base_path}.session-shm"), Path(f"{session_base}.session-shm")),
-        (Path(f"{config_store.session_base_path}.session-wal"), Path(f"{session_base}.session-wal")),
-    ]
-    for source, destination in source_candidates:
-        if source.exists():
-            shutil.copy2(source, destination)
-
-    return session_base
-
-
-def cleanup_rss_session_copy(session_base: Path) -> None:
-    for candidate in [
-        Path(f"{session_base}.session"),
-        Path(f"{session_base}.session-journal"),
-        Path(f"{session_base}.session-shm"),
-        Path(f"{session_base}.session-wal"),
-    ]:
-        try:
-            candidate.unlink(missing_ok=True)
-        except OSError:
-            pass
-
-
-def build_rss_xml(
-    request: Request,
-    token: str,
-    raw_config: Dict[str, str],
-    items_xml: list[str],
-    note: str = "T2RSS 目标频道消息订阅",
-) -> str:
-    destination_channel = str(raw_config.get("DESTINATION_CHANNEL", "")).strip()
-    destination_display, destination_url = build_tme_link(destination_channel)
-    feed_title = f"T2RSS - {destination_display or destination_channel or 'Feed'}"
-    feed_link = destination_url or str(request.base_url).rstrip("/")
-    self_url = build_rss_url(request, token)
-
-    return "\n".join(
-        [
-            '<?xml version="1.0" encoding="UTF-8"?>',
-            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:content="http://purl.org/rss/1.0/modules/content/">',
-            "  <channel>",
-            f"    <title>{xml_escape(feed_title)}</title>",
-            f"    <link>{xml_escape(feed_link)}</link>",
-            f"    <atom:link href=\"{xml_escape(self_url)}\" rel=\"self\" type=\"application/rss+xml\" />",
-            f"    <description>{xml_escape(note)}</description>",
-            "    <language>zh-CN</language>",
-            f"    <lastBuildDate>{xml_escape(format_datetime(datetime.now(timezone.utc)))}</lastBuildDate>",
-            *items_xml,
-            "  </channel>",
-            "</rss>",
-        ]
-    )
-
-
-async def build_live_rss_xml(request: Request, token: str, raw_config: Dict[str, str]) -> str:
-    api_id = str(raw_config.get("API_ID", "")).strip()
-    api_hash = str(raw_config.get("API_HASH", "")).strip()
-    destination_channel = str(raw_config.get("DESTINATION_CHANNEL", "")).strip()
-    if not api_id or not api_hash or not destination_channel:
-        raise RssRefreshUnavailable("RSS 尚未配置 API 或目标频道")
-    if not config_store.session_file.exists():
-        raise RssRefreshUnavailable("Telegram 会话缺失，暂时无法刷新 RSS")
-
-    try:
-        api_id_int = int(api_id)
-    except ValueError as exc:
-        raise RssRefreshUnavailable("API_ID 无效，暂时无法刷新 RSS") from exc
-    item_limit = safe_rss_limit(raw_config.get("PANEL_RSS_ITEM_LIMIT", "500"))
-    _, destination_url = build_tme_link(destination_channel)
-    feed_link = destination_url or str(request.base_url).rstrip("/")
-    items_xml: list[str] = []
-    active_image_filenames: set[str] = set()
-    image_download_failed = False
-
-    session_copy_base = create_rss_session_copy()
-    try:
-        async with TelegramClient(str(session_copy_base), api_id_int, api_hash) as client:
-            if not await client.is_user_authorized():
-                raise RssRefreshUnavailable("Telegram 会话未授权，暂时无法刷新 RSS")
-
-            async for message in client.iter_messages(destination_channel, limit=item_limit):
-                message_id = int(getattr(message, "id", 0) or 0)
-                text = message_text_for_feed(message)
-                title = rss_title_from_text(text, f"Telegram 消息 {message_id}")
-                link = build_message_link(destination_channel, message_id) or feed_link
-                image_info = None
-                try:
-                    image_info = await cache_rss_message_image(client, message, request, token, destination_channel)
-                except Exception as exc:
-                    image_download_failed = True
-                    logger.warning("RSS 图片缓存失败，消息 %s：%s", message_id, exc)
-
-                if image_info:
-                    active_image_filenames.add(str(image_info["filename"]))
-
-                link_entities = rss_link_entities_from_message(message, text)
-                description = rss_description_cdata(
-                    text,
-                    str(image_info["url"]) if image_info else "",
-                    link_entities,
-                )
-                guid = link or f"t2rss:{destination_channel}:{message_id}"
-                pub_date = rss_pub_date(message)
-
-                item_lines = [
-                    "    <item>",
-                    f"      <title>{xml_escape(title)}</title>",
-                    f"      <link>{xml_escape(link)}</link>",
-                    f"      <guid isPermaLink=\"false\">{xml_escape(guid)}</guid>",
-                    f"      <pubDate>{xml_escape(pub_date)}</pubDate>",
-                ]
-                if image_info:
-                    item_lines.append(
-                        (
-                            f"      <enclosure url=\"{xml_escape(str(image_info['url']))}\" "
-                            f"length=\"{int(image_info['length'])}\" "
-                            f"type=\"{xml_escape(str(image_info['mime_type']))}\" />"
-                        )
-                    )
-                item_lines.extend(
-                    [
-                        f"      <description>{description}</description>",
-                        f"      <content:encoded>{description}</content:encoded>",
-                        "    </item>",
-                    ]
-                )
-
-                items_xml.append("\n".join(item_lines))
-    finally:
-        cleanup_rss_session_copy(session_copy_base)
+def runtime_status() -> Dict[str, Any]:
+    if not forwarding_is_local():
+        record = worker_link.status_record()
+        if record is not None:
+            return record["payload"]
+    return collect_runtime_status()
+
+
+def forwarding_busy(job_id: int | None = None, any_job: bool = False) -> bool:
+    """默认任务（或指定附加任务）是否在运行；any_job 为真时任一任务在运行即返回真。"""
+    status = runtime_status()
+    if any_job:
+        return bool(status["runner"]["is_running"]) or any(job.get("is_running") for job in status["jobs"].values())
+    if job_id is None:
+        return bool(status["runner"]["is_running"])
+    return bool(status["jobs"].get(str(job_id), {}).get("is_running"))
+
+
+def telegram_session_write(account_name: str = ""):
+    """替换或删除会话文件期间持有：先断开使用该会话的客户端（由持有转发租约的进程断开）。"""
+    if not forwarding_is_local():
+        return worker_link.session_write(account_name)
+    return local_session_write(account_name)
+
+
+def local_session_write(account_name: str = ""):
+    if account_name == ALL_SESSIONS:
+        return all_sessions_write()
+    if account_name:
+        return account_pool.session_write(account_name)
+    return client_manager.session_write()
+
+
+@contextlib.asynccontextmanager
+async def all_sessions_write():
+    """备份恢复会整体替换 session/：同时持有主会话与账号池全部账号的会话写入。"""
+    async with client_manager.session_write(), account_pool.session_write_all():
+        yield
+
+
+async def control_run(action: str, job_id: int | None = None) -> tuple[str, str]:
+    """立即执行或强制中止默认任务（job_id 为空）或某个附加任务，返回提示信息与级别。"""
+    if job_id is None:
+        if action == "run":
+            if not await runner.trigger(trigger="manual"):
+                return "当前已有转发任务在运行。", "warn"
+            return "转发任务已在后台启动。", "success"
+        if action == "stop":
+            if not await runner.abort_current_run():
+                return "当前没有可中止的运行任务。", "warn"
+            return "已发送强制中止指令。", "success"
+        return "未知操作。", "warn"
+
+    runtime = job_manager.get(job_id)
+    if runtime is None:
+        return "任务不存在。", "warn"
+    if action == "run":
+        if not await runtime.runner.trigger(trigger="manual"):
+            return "该任务已在运行。", "warn"
+        return "任务已在后台启动。", "success"
+    if action == "stop":
+        if not await runtime.runner.abort_current_run():
+            return "该任务当前没有运行。", "warn"
+        return "已发送强制中止指令。", "success"
+    return "未知操作。", "warn"
+
+
+async def control_backfill(action: str, job_id: int) -> tuple[str, str]:
+    if action == "start":
+        if backfill_runner.is_running:
+            return "已有回填任务在执行，请先暂停。", "warn"
+        if not await backfill_runner.start_job(job_id):
+            return "回填任务不存在或已完成。", "warn"
+        return f"回填任务 #{job_id} 已开始。", "success"
+    if action == "pause":
+        if backfill_runner.current_job_id != job_id or not backfill_runner.request_pause():
+            return "该回填任务当前未在执行。", "warn"
+        return f"回填任务 #{job_id} 将在当前消息处理完后暂停。", "success"
+    return "未知操作。", "warn"
+
+
+async def control_jobs_sync() -> None:
+    await job_manager.sync()
+
+
+async def control_job_delete(job_id: int) -> bool:
+    return await job_manager.delete_job(job_id)
+
+
+async def control_resolve(identifiers: list[str]) -> list[Dict[str, Any]]:
+    return await resolve_identifiers_preview(config_store, identifiers, logger, client_manager, peer_cache_store)
+
+
+async def control_rss_refresh(token: str, base_url: str) -> bool:
+    """刷新 token 对应 RSS 的缓存；该 RSS 已有刷新在进行时等待它完成。"""
+    owner = rss_feed_owner(token)
+    if owner is None:
+        return False
+    feed_store, _ = owner
+    await asyncio.shield(schedule_rss_cache_refresh(feed_store, base_url, token, feed_store.load_raw_config()))
+    return True
+
+
+# 需要 Telegram 客户端或转发运行状态的操作；独立 worker 模式下由 worker 进程按命令名执行。
+CONTROL_HANDLERS = {
+    "run": control_run,
+    "backfill": control_backfill,
+    "jobs_sync": control_jobs_sync,
+    "job_delete": control_job_delete,
+    "resolve": control_resolve,
+    "rss_refresh": control_rss_refresh,
+}
 
-    if not image_download_failed:
-        cleanup_stale_rss_media(active_image_filenames)
 
-    return build_rss_xml(request, token, raw_config, items_xml)
+async def dispatch_control(command: str, timeout: float = WORKER_CALL_TIMEOUT_SECONDS, **payload) -> Any:
+    """在持有转发租约的本进程直接执行控制命令，否则转交持有者执行并等待结果。"""
+    if forwarding_is_local():
+        return await CONTROL_HANDLERS[command](**payload)
+    return await worker_link.call(command, payload, timeout=timeout)
 
 
-async def refresh_rss_cache_in_background(request: Request, token: str, raw_config: Dict[str, str]) -> None:
-    try:
-        rss_xml = await asyncio.wait_for(
-            build_live_rss_xml(request, token, raw_config),
-            timeout=RSS_BACKGROUND_REFRESH_TIMEOUT_SECONDS,
-        )
-        write_rss_cache(rss_xml)
-    except RssRefreshUnavailable as exc:
-        logger.info("RSS 后台刷新不可用，已保留旧缓存：%s", exc)
-    except asyncio.TimeoutError:
-        logger.warning("RSS 后台刷新超过 %s 秒，已保留旧缓存。", RSS_BACKGROUND_REFRESH_TIMEOUT_SECONDS)
-    except Exception:
-        logger.exception("RSS 后台刷新失败，已保留旧缓存。")
-
-
-def schedule_rss_cache_refresh(request: Request, token: str, raw_config: Dict[str, str]) -> None:
-    global rss_refresh_task
-    if rss_refresh_task and not rss_refresh_task.done():
-        return
-    rss_refresh_task = asyncio.create_task(refresh_rss_cache_in_background(request, token, dict(raw_config)))
+command_server = WorkerCommandServer(
+    worker_channel_store,
+    logger,
+    CONTROL_HANDLERS,
+    collect_runtime_status,
+    local_session_write,
+)
 
 
 def parse_sources_input(text: str) -> list[str]:
@@ -868,6 +805,14 @@ def build_forward_settings_context(
         "source_items": items,
         "sources_input": source_items_to_input_text(items),
         "last_ids": checkpoint_store.list_last_ids(),
+        "rule_lab_corpus_count": corpus_store.count(),
+        "rule_lab_form": {
+            "keyword_blacklist": config_view.get("KEYWORD_BLACKLIST", ""),
+            "text_replacement_terms": config_view.get("TEXT_REPLACEMENT_TERMS", ""),
+            "text_replacement_regex": config_view.get("TEXT_REPLACEMENT_REGEX", ""),
+            "sample_limit": config_view.get("PANEL_RULE_LAB_CORPUS_SIZE", "2000"),
+        },
+        "rule_lab_result": None,
     }
 
 
@@ -890,6 +835,8 @@ def build_checkpoint_rows(raw_config: Dict[str, str]) -> list[Dict[str, Any]]:
         resolved_cids_all = set(fallback_channel_ids)
 
     last_ids = checkpoint_store.list_last_ids()
+    poll_schedule = poll_schedule_store.list_schedule()
+    adaptive_poll_enabled = config_store.build_panel_settings().adaptive_poll_enabled
     for row in last_ids:
         cid = int(row.get("channel_id", 0))
         if cid in resolved_cids_enabled:
@@ -899,6 +846,14 @@ def build_checkpoint_rows(raw_config: Dict[str, str]) -> list[Dict[str, Any]]:
         else:
             row["status_text"] = "停用"
 
+        schedule = poll_schedule.get(cid)
+        if not adaptive_poll_enabled or cid not in resolved_cids_enabled:
+            row["next_poll_text"] = "-"
+        elif schedule is None:
+            row["next_poll_text"] = "下次运行"
+        else:
+            row["next_poll_text"] = f"{schedule['next_due_at']}（约 {schedule['rate_per_hour']} 条/小时）"
+
     return last_ids
 
 
@@ -1020,16 +975,17 @@ async def health() -> JSONResponse:
 
 @app.get("/rss-media/{token}/{filename}")
 async def rss_media(token: str, filename: str):
-    raw_config = config_store.load_raw_config()
-    expected_token = str(raw_config.get("PANEL_RSS_TOKEN", "")).strip()
-    if not expected_token or not hmac.compare_digest(str(token or ""), expected_token):
+    owner = rss_feed_owner(token)
+    if owner is None:
         raise HTTPException(status_code=404, detail="RSS media not found")
+    feed_store, _ = owner
+    raw_config = feed_store.load_raw_config()
     if not parse_bool(raw_config.get("PANEL_RSS_ENABLED", "true"), True):
         raise HTTPException(status_code=404, detail="RSS media not found")
     if not RSS_MEDIA_FILENAME_RE.fullmatch(str(filename or "")):
         raise HTTPException(status_code=404, detail="RSS media not found")
 
-    media_path = rss_media_dir() / filename
+    media_path = rss_media_dir(feed_store) / filename
     if not media_path.exists() or not media_path.is_file():
         raise HTTPException(status_code=404, detail="RSS media not found")
     return FileResponse(path=str(media_path), media_type=rss_media_type_for_path(media_path))
@@ -1037,51 +993,69 @@ async def rss_media(token: str, filename: str):
 
 @app.get("/rss/{token}.xml")
 async def rss_feed(token: str, request: Request):
-    raw_config = config_store.load_raw_config()
-    expected_token = str(raw_config.get("PANEL_RSS_TOKEN", "")).strip()
-    if not expected_token or not hmac.compare_digest(str(token or ""), expected_token):
+    owner = rss_feed_owner(token)
+    if owner is None:
         raise HTTPException(status_code=404, detail="RSS feed not found")
+    feed_store, feed_job_id = owner
+    raw_config = feed_store.load_raw_config()
+    expected_token = str(raw_config.get("PANEL_RSS_TOKEN", "")).strip()
     if not parse_bool(raw_config.get("PANEL_RSS_ENABLED", "true"), True):
         raise HTTPException(status_code=404, detail="RSS feed not found")
+    base_url = panel_base_url(request)
 
-    cached_xml = read_rss_cache()
+    cached_xml = read_rss_cache(feed_store)
     if cached_xml:
-        schedule_rss_cache_refresh(request, expected_token, raw_config)
+        request_rss_refresh(feed_store, base_url, expected_token, raw_config)
         return Response(content=cached_xml, media_type="application/rss+xml; charset=utf-8")
 
-    if runner.is_running:
-        schedule_rss_cache_refresh(request, expected_token, raw_config)
-        rss_xml = build_rss_xml(request, expected_token, raw_config, [], note="转发任务运行中，RSS 稍后会自动刷新")
+    if not forwarding_is_local():
+        # 由持有转发租约的进程刷新缓存，本进程最多等待 RSS_REFRESH_TIMEOUT_SECONDS 后读取。
+        try:
+            await worker_link.call(
+                "rss_refresh",
+                {"token": expected_token, "base_url": base_url},
+                timeout=RSS_REFRESH_TIMEOUT_SECONDS,
+            )
+        except Exception as exc:
+            logger.info("RSS 由转发进程刷新未完成：%s", exc)
+        rss_xml = read_rss_cache(feed_store) or build_rss_xml(
+            base_url, expected_token, raw_config, [], note="RSS 正在后台刷新，稍后会自动恢复"
+        )
+        return Response(content=rss_xml, media_type="application/rss+xml; charset=utf-8")
+
+    if forwarding_busy(feed_job_id):
+        request_rss_refresh(feed_store, base_url, expected_token, raw_config)
+        rss_xml = build_rss_xml(base_url, expected_token, raw_config, [], note="转发任务运行中，RSS 稍后会自动刷新")
         return Response(content=rss_xml, media_type="application/rss+xml; charset=utf-8")
 
     try:
         rss_xml = await asyncio.wait_for(
-            build_live_rss_xml(request, expected_token, raw_config),
+            build_live_rss_xml(feed_store, base_url, expected_token, raw_config, logger, client_manager),
             timeout=RSS_REFRESH_TIMEOUT_SECONDS,
         )
-        write_rss_cache(rss_xml)
+        write_rss_cache(feed_store, rss_xml)
     except RssRefreshUnavailable as exc:
-        cached_xml = cached_xml or read_rss_cache()
+        cached_xml = cached_xml or read_rss_cache(feed_store)
         if cached_xml:
             logger.info("RSS 实时刷新不可用，已返回缓存内容：%s", exc)
             rss_xml = cached_xml
         else:
-            rss_xml = build_rss_xml(request, expected_token, raw_config, [], note=str(exc))
+            rss_xml = build_rss_xml(base_url, expected_token, raw_config, [], note=str(exc))
     except asyncio.TimeoutError:
-        cached_xml = cached_xml or read_rss_cache()
+        cached_xml = cached_xml or read_rss_cache(feed_store)
         if cached_xml:
             logger.warning("RSS 实时刷新超过 %s 秒，已返回缓存内容。", RSS_REFRESH_TIMEOUT_SECONDS)
             rss_xml = cached_xml
         else:
-            schedule_rss_cache_refresh(request, expected_token, raw_config)
-            rss_xml = build_rss_xml(request, expected_token, raw_config, [], note="RSS 实时刷新超时，稍后会自动恢复")
+            request_rss_refresh(feed_store, base_url, expected_token, raw_config)
+            rss_xml = build_rss_xml(base_url, expected_token, raw_config, [], note="RSS 实时刷新超时，稍后会自动恢复")
     except Exception:
-        cached_xml = cached_xml or read_rss_cache()
+        cached_xml = cached_xml or read_rss_cache(feed_store)
         logger.exception("RSS 实时刷新失败，已尝试返回缓存内容。")
         if cached_xml:
             rss_xml = cached_xml
         else:
-            rss_xml = build_rss_xml(request, expected_token, raw_config, [], note="RSS 暂时无法刷新，稍后会自动恢复")
+            rss_xml = build_rss_xml(base_url, expected_token, raw_config, [], note="RSS 暂时无法刷新，稍后会自动恢复")
 
     return Response(content=rss_xml, media_type="application/rss+xml; charset=utf-8")
 
@@ -1128,6 +1102,7 @@ async def dashboard(request: Request):
         resolved_cids_all = set(fallback_channel_ids)
 
     last_ids = build_checkpoint_rows(raw_config)
+    status = runtime_status()
 
     context = common_context(request, "仪表盘")
     context.update(
@@ -1135,14 +1110,15 @@ async def dashboard(request: Request):
             "session_exists": config_store.session_file.exists(),
             "lock_exists": config_store.lock_file.exists(),
             "last_ids": last_ids,
-            "runner_status": runner.status_payload(),
+            "runner_status": status["runner"],
+            "realtime_status": status["realtime"],
             "config_preview": {
                 "destination_channel": raw_config.get("DESTINATION_CHANNEL", ""),
                 "destination_display": destination_display,
                 "destination_url": destination_url,
                 "rss_enabled": rss_enabled,
                 "rss_item_limit": rss_item_limit,
-                "rss_url": build_rss_url(request, rss_token) if rss_enabled and rss_token else "",
+                "rss_url": build_rss_url(panel_base_url(request), rss_token) if rss_enabled and rss_token else "",
                 "source_summary": f"{enabled_source_count}/{total_source_count}",
                 "keyword_blacklist_text": "，".join(keyword_blacklist),
                 "keyword_blacklist_count": len(keyword_blacklist),
@@ -1153,6 +1129,7 @@ async def dashboard(request: Request):
                 "deduplication_cache_size": raw_config.get("DEDUPLICATION_CACHE_SIZE", "200"),
                 "auto_run_enabled": panel_settings.auto_run_enabled,
                 "auto_run_interval_minutes": panel_settings.auto_run_interval_minutes,
+                "realtime_enabled": panel_settings.realtime_enabled,
                 "total_timeout_seconds": panel_settings.total_timeout_seconds,
                 "test_mode_enabled": panel_settings.test_mode_enabled,
             },
@@ -1167,10 +1144,11 @@ async def run_now(request: Request):
     if auth_redirect:
         return auth_redirect
 
-    started = await runner.trigger(trigger="manual")
-    if not started:
-        return redirect_with_message("/", "当前已有转发任务在运行。", "warn")
-    return redirect_with_message("/", "转发任务已在后台启动。", "success")
+    try:
+        message, level = await dispatch_control("run", action="run")
+    except WorkerUnavailableError as exc:
+        return redirect_with_message("/", str(exc), "error")
+    return redirect_with_message("/", message, level)
 
 
 @app.post("/run/stop")
@@ -1179,10 +1157,11 @@ async def force_stop_run(request: Request):
     if auth_redirect:
         return auth_redirect
 
-    stopped = await runner.abort_current_run()
-    if not stopped:
-        return redirect_with_message("/", "当前没有可中止的运行任务。", "warn")
-    return redirect_with_message("/", "已发送强制中止指令。", "success")
+    try:
+        message, level = await dispatch_control("run", action="stop")
+    except WorkerUnavailableError as exc:
+        return redirect_with_message("/", str(exc), "error")
+    return redirect_with_message("/", message, level)
 
 
 @app.get("/setup")
@@ -1312,6 +1291,20 @@ async def forward_settings_page(request: Request):
     return templates.TemplateResponse("forward_settings.html", context)
 
 
+def text_pool_threshold_note() -> str:
+    """多进程文本处理阈值高于单次运行消息预算时，保存设置的提示中说明它不会启用。"""
+    try:
+        panel_settings = config_store.build_panel_settings()
+    except ValueError:
+        return ""
+    if panel_settings.text_pool_threshold <= panel_settings.run_message_budget:
+        return ""
+    return (
+        f" 注意：PANEL_TEXT_POOL_THRESHOLD（{panel_settings.text_pool_threshold}）高于单次运行消息预算"
+        f"（{panel_settings.run_message_budget}），多进程文本处理不会启用。"
+    )
+
+
 @app.post("/forward-settings/save")
 async def forward_settings_save(request: Request):
     auth_redirect = auth_redirect_if_needed(request)
@@ -1333,6 +1326,8 @@ async def forward_settings_save(request: Request):
         row_cids_raw = form.getlist("row_cid")
         row_status_raw = form.getlist("row_status")
         row_error_raw = form.getlist("row_error")
+        row_bootstrap_raw = form.getlist("row_bootstrap")
+        row_bootstrap_value_raw = form.getlist("row_bootstrap_value")
         enabled_source_set = {normalize_source_token(item) for item in form.getlist("row_enabled_source") if item}
 
         row_map: Dict[str, Dict[str, Any]] = {}
@@ -1344,6 +1339,12 @@ async def forward_settings_save(request: Request):
             cid_value = row_cids_raw[index] if index < len(row_cids_raw) else ""
             status_value = row_status_raw[index] if index < len(row_status_raw) else ""
             error_value = row_error_raw[index] if index < len(row_error_raw) else ""
+            bootstrap_raw = row_bootstrap_raw[index] if index < len(row_bootstrap_raw) else ""
+            bootstrap_value_raw = row_bootstrap_value_raw[index] if index < len(row_bootstrap_value_raw) else ""
+            try:
+                bootstrap, bootstrap_value = normalize_source_bootstrap(bootstrap_raw, bootstrap_value_raw)
+            except ValueError as exc:
+                return redirect_with_message("/forward-settings", f"来源 {source} 的初始化策略无效：{exc}", "error")
 
             cid: int | None = None
             if str(cid_value).strip():
@@ -1357,6 +1358,8 @@ async def forward_settings_save(request: Request):
                 "enabled": source in enabled_source_set and cid is not None,
                 "status": str(status_value or ("ok" if cid is not None else "failed")),
                 "error": str(error_value or ""),
+                "bootstrap": bootstrap,
+                "bootstrap_value": bootstrap_value,
             }
 
         for source in parsed_sources:
@@ -1369,6 +1372,8 @@ async def forward_settings_save(request: Request):
                         "enabled": False,
                         "status": "pending",
                         "error": "待解析",
+                        "bootstrap": DEFAULT_SOURCE_BOOTSTRAP,
+                        "bootstrap_value": "",
                     }
                 )
                 continue
@@ -1380,13 +1385,13 @@ async def forward_settings_save(request: Request):
                     "enabled": bool(row.get("enabled", False)),
                     "status": str(row.get("status", "pending")),
                     "error": str(row.get("error", "")),
+                    "bootstrap": row["bootstrap"],
+                    "bootstrap_value": row["bootstrap_value"],
                 }
             )
 
     enabled_cids = sorted({item["cid"] for item in source_items if isinstance(item.get("cid"), int) and item.get("enabled")})
 
-    all_resolved_cids = sorted({item["cid"] for item in source_items if isinstance(item.get("cid"), int)})
-
     keys = [
         "KEYWORD_BLACKLIST",
         "TEXT_REPLACEMENT_TERMS",
@@ -1394,6 +1399,10 @@ async def forward_settings_save(request: Request):
         "USER_ID_BLACKLIST",
         "DEDUPLICATION_ENABLED",
         "DEDUPLICATION_CACHE_SIZE",
+        "PANEL_RULE_LAB_CORPUS_SIZE",
+        "PANEL_TEXT_POOL_THRESHOLD",
+        "PANEL_RUN_MESSAGE_BUDGET",
+        "PANEL_CHANNEL_MESSAGE_BUDGET",
     ]
     payload = collect_form_payload(form, current, keys, bool_keys={"DEDUPLICATION_ENABLED"})
 
@@ -1403,26 +1412,27 @@ async def forward_settings_save(request: Request):
     payload["CHANNEL_SOURCES_JSON"] = json.dumps(source_items, ensure_ascii=False, separators=(",", ":"))
 
     config_store.save_raw_config(payload)
-    created_count = ensure_channel_checkpoints(all_resolved_cids)
+    pending_count = count_pending_bootstrap(enabled_cids)
+    pool_note = text_pool_threshold_note()
     disabled_count = len([item for item in source_items if not item.get("enabled")])
 
     if not source_items:
-        return redirect_with_message("/forward-settings", "已保存：来源频道列表为空。", "success")
+        return redirect_with_message("/forward-settings", f"已保存：来源频道列表为空。{pool_note}", "success")
 
-    if created_count > 0:
+    if pending_count > 0:
         return redirect_with_message(
             "/forward-settings",
             (
                 f"已保存：启用来源 {len(enabled_cids)} 个，关闭来源 {disabled_count} 个，"
-                f"自动新增断点 {created_count} 条。"
+                f"{pending_count} 个新来源将在首次运行时按初始化策略确定断点。{pool_note}"
             ),
             "success",
         )
     if len(enabled_cids) == 0:
-        return redirect_with_message("/forward-settings", "已保存：当前没有启用的来源频道。", "warn")
+        return redirect_with_message("/forward-settings", f"已保存：当前没有启用的来源频道。{pool_note}", "warn")
     return redirect_with_message(
         "/forward-settings",
-        f"已保存：启用来源 {len(enabled_cids)} 个，关闭来源 {disabled_count} 个。",
+        f"已保存：启用来源 {len(enabled_cids)} 个，关闭来源 {disabled_count} 个。{pool_note}",
         "success",
     )
 
@@ -1452,6 +1462,8 @@ async def resolve_identifiers(request: Request):
     old_source_rows = form.getlist("row_source")
     old_source_cids = form.getlist("row_cid")
     old_enabled = {normalize_source_token(item) for item in form.getlist("row_enabled_source") if item}
+    old_bootstraps = form.getlist("row_bootstrap")
+    old_bootstrap_values = form.getlist("row_bootstrap_value")
 
     old_map: Dict[str, Dict[str, Any]] = {}
     for idx, src in enumerate(old_source_rows):
@@ -1468,11 +1480,13 @@ async def resolve_identifiers(request: Request):
         old_map[key] = {
             "cid": cid_value,
             "enabled": key in old_enabled,
+            "bootstrap": old_bootstraps[idx] if idx < len(old_bootstraps) else DEFAULT_SOURCE_BOOTSTRAP,
+            "bootstrap_value": old_bootstrap_values[idx] if idx < len(old_bootstrap_values) else "",
         }
 
     source_items: list[Dict[str, Any]] = []
     try:
-        resolved_rows = await resolve_identifiers_preview(config_store, identifiers, logger)
+        resolved_rows = await dispatch_control("resolve", timeout=60, identifiers=identifiers)
         resolved_map = {str(row.get("identifier", "")).strip(): row for row in resolved_rows}
 
         for source in identifiers:
@@ -1501,18 +1515,20 @@ async def resolve_identifiers(request: Request):
                     "enabled": bool(enabled_default),
                     "status": "ok" if cid_val is not None else "failed",
                     "error": "" if cid_val is not None else str(resolved.get("error", "解析失败")),
+                    "bootstrap": str(previous.get("bootstrap", DEFAULT_SOURCE_BOOTSTRAP)),
+                    "bootstrap_value": str(previous.get("bootstrap_value", "")),
                 }
             )
 
         resolved_cids = sorted({item["cid"] for item in source_items if isinstance(item.get("cid"), int)})
-        created_count = ensure_channel_checkpoints(resolved_cids)
+        pending_count = count_pending_bootstrap(resolved_cids)
 
         context = build_forward_settings_context(request, raw_config, source_items=source_items, override_destination=destination_channel)
         context["sources_input"] = "\n".join(identifiers)
-        if created_count > 0:
+        if pending_count > 0:
             context["msg"] = (
-                f"来源频道解析完成，已自动创建 {created_count} 条断点记录（默认 last_id=0）。"
-                "请确认启用状态后保存通道配置。"
+                f"来源频道解析完成，{pending_count} 个新来源尚无断点，首次运行时将按所选初始化策略"
+                "（默认从最新消息开始）确定起点。请确认启用状态与初始化策略后保存通道配置。"
             )
         else:
             context["msg"] = "来源频道解析完成，断点记录已就绪。请确认启用状态后保存通道配置。"
@@ -1527,6 +1543,65 @@ async def resolve_identifiers(request: Request):
     return templates.TemplateResponse("forward_settings.html", context)
 
 
+@app.post("/forward-settings/rule-lab")
+async def rule_lab_evaluate(request: Request):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    form = await request.form()
+    raw_config = config_store.load_raw_config()
+    lab_form = {
+        "keyword_blacklist": str(form.get("LAB_KEYWORD_BLACKLIST", "")).strip(),
+        "text_replacement_terms": str(form.get("LAB_TEXT_REPLACEMENT_TERMS", "")).strip(),
+        "text_replacement_regex": str(form.get("LAB_TEXT_REPLACEMENT_REGEX", "")).replace("\r\n", "\n").strip(),
+        "sample_limit": str(form.get("LAB_SAMPLE_LIMIT", "")).strip(),
+    }
+
+    try:
+        sample_limit = max(1, min(int(lab_form["sample_limit"] or "2000"), 50000))
+    except ValueError:
+        sample_limit = 2000
+    lab_form["sample_limit"] = str(sample_limit)
+
+    context = build_forward_settings_context(request, raw_config)
+    context["rule_lab_form"] = lab_form
+
+    samples = corpus_store.list_samples(sample_limit)
+    if not samples:
+        context["msg"] = "规则实验室暂无语料：请先执行一次转发任务（测试模式亦可）以采集源消息。"
+        context["level"] = "warn"
+        return templates.TemplateResponse("forward_settings.html", context)
+
+    try:
+        user_blacklist = config_store.build_forwarder_config().user_id_blacklist
+    except ValueError:
+        user_blacklist = set()
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            None,
+            evaluate_rule_set,
+            samples,
+            [item.lower() for item in parse_csv(lab_form["keyword_blacklist"])],
+            parse_csv(lab_form["text_replacement_terms"]),
+            lab_form["text_replacement_regex"],
+            user_blacklist,
+        )
+    except Exception as exc:
+        logger.exception("规则实验室评估失败。")
+        context["msg"] = f"规则实验室评估失败：{exc}"
+        context["level"] = "error"
+        return templates.TemplateResponse("forward_settings.html", context)
+
+    context["rule_lab_result"] = result
+    context["msg"] = (
+        f"规则实验室评估完成：{result['processed']} 条语料，拦截 {result['blocked']} 条，"
+        f"改写 {result['changed']} 条，吞吐 {result['messages_per_second']} 条/秒。"
+    )
+    context["level"] = "success"
+    return templates.TemplateResponse("forward_settings.html", context)
+
+
 @app.post("/settings/add-cid")
 @app.post("/forward-settings/add-cid")
 async def add_cid_to_channel_ids(request: Request):
@@ -1608,15 +1683,115 @@ async def plan_backup_page(request: Request):
         return auth_redirect
 
     context = common_context(request, "计划与备份")
+    retry_pending_count, dead_letter_count = retry_store.counts()
     context.update(
         {
             "config": config_store.load_raw_config(),
             "backups": backup_manager.list_backups(),
+            "backfill_jobs": backfill_store.list_jobs(),
+            "backfill_sources": [
+                item
+                for item in parse_channel_sources(config_store.load_raw_config().get("CHANNEL_SOURCES_JSON", "[]"))
+                if isinstance(item.get("cid"), int)
+            ],
+            "backfill_default_window_size": BACKFILL_DEFAULT_WINDOW_SIZE,
+            "retry_pending": retry_store.list_pending(),
+            "retry_pending_count": retry_pending_count,
+            "dead_letters": retry_store.list_dead_letters(),
+            "dead_letter_count": dead_letter_count,
+            "retry_max_attempts": RETRY_QUEUE_MAX_ATTEMPTS,
         }
     )
     return templates.TemplateResponse("plan_backup.html", context)
 
 
+@app.post("/plan-backup/backfill/create")
+async def backfill_create(request: Request):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    form = await request.form()
+    try:
+        channel_id = int(str(form.get("channel_id", "")).strip())
+        start_raw = str(form.get("start", "")).strip()
+        end_raw = str(form.get("end_id", "")).strip()
+        window_size = parse_positive_int(str(form.get("window_size", "")), "窗口大小", default=BACKFILL_DEFAULT_WINDOW_SIZE)
+
+        start_id = None
+        start_date = ""
+        if start_raw.isdigit():
+            start_id = int(start_raw)
+        else:
+            parse_bootstrap_since(start_raw)
+            start_date = start_raw
+
+        end_id = int(end_raw) if end_raw else checkpoint_store.get_last_id(channel_id)
+        if end_id <= 0:
+            raise ValueError("该频道尚无断点，请手动填写终点消息 ID。")
+        if start_id is not None and start_id + 1 >= end_id:
+            raise ValueError("起点与终点之间没有可回填的消息（终点本身不会回填）。")
+    except ValueError as exc:
+        return redirect_with_message("/plan-backup", f"创建回填任务失败：{exc}", "error")
+
+    job_id = backfill_store.create_job(
+        channel_id,
+        end_id,
+        window_size,
+        start_id=start_id,
+        start_date=start_date,
+        use_takeout=parse_bool(str(form.get("use_takeout", "")), False),
+    )
+    return redirect_with_message("/plan-backup", f"已创建回填任务 #{job_id}，点击“开始 / 继续”执行。", "success")
+
+
+@app.post("/plan-backup/backfill/{job_id}/action")
+async def backfill_action(request: Request, job_id: int):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    form = await request.form()
+    action = str(form.get("action", "")).strip()
+
+    if action in {"start", "pause"}:
+        try:
+            message, level = await dispatch_control("backfill", action=action, job_id=job_id)
+        except WorkerUnavailableError as exc:
+            return redirect_with_message("/plan-backup", str(exc), "error")
+        return redirect_with_message("/plan-backup", message, level)
+
+    if action == "delete":
+        if runtime_status()["backfill"]["current_job_id"] == job_id:
+            return redirect_with_message("/plan-backup", "请先暂停该回填任务再删除。", "warn")
+        backfill_store.delete_job(job_id)
+        return redirect_with_message("/plan-backup", f"回填任务 #{job_id} 已删除。", "success")
+
+    return redirect_with_message("/plan-backup", "未知操作。", "warn")
+
+
+@app.post("/plan-backup/dead-letters/{channel_id}/{message_id}/action")
+async def dead_letter_action(request: Request, channel_id: int, message_id: int):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    form = await request.form()
+    action = str(form.get("action", "")).strip()
+
+    if action == "requeue":
+        if not retry_store.requeue_dead_letter(channel_id, message_id):
+            return redirect_with_message("/plan-backup", "死信记录不存在。", "warn")
+        return redirect_with_message("/plan-backup", f"频道 {channel_id} 消息 {message_id} 已重新排队，下次运行时重发。", "success")
+
+    if action == "delete":
+        if not retry_store.delete_dead_letter(channel_id, message_id):
+            return redirect_with_message("/plan-backup", "死信记录不存在。", "warn")
+        return redirect_with_message("/plan-backup", f"频道 {channel_id} 消息 {message_id} 的死信已删除。", "success")
+
+    return redirect_with_message("/plan-backup", "未知操作。", "warn")
+
+
 @app.post("/plan-backup/save")
 async def plan_backup_save(request: Request):
     auth_redirect = auth_redirect_if_needed(request)
@@ -1631,12 +1806,22 @@ async def plan_backup_save(request: Request):
         "PANEL_TOTAL_TIMEOUT_SECONDS",
         "PANEL_AUTO_RUN_ENABLED",
         "PANEL_AUTO_RUN_INTERVAL_MINUTES",
+        "PANEL_REALTIME_ENABLED",
+        "PANEL_ADAPTIVE_POLL_ENABLED",
+        "PANEL_POLL_MIN_MINUTES",
+        "PANEL_POLL_MAX_MINUTES",
+        "PANEL_POLL_TARGET_LATENCY_MINUTES",
     ]
     payload = collect_form_payload(
         form,
         current,
         keys,
-        bool_keys={"PANEL_TEST_MODE_ENABLED", "PANEL_AUTO_RUN_ENABLED"},
+        bool_keys={
+            "PANEL_TEST_MODE_ENABLED",
+            "PANEL_AUTO_RUN_ENABLED",
+            "PANEL_REALTIME_ENABLED",
+            "PANEL_ADAPTIVE_POLL_ENABLED",
+        },
     )
     config_store.save_raw_config(payload)
     return redirect_with_message("/plan-backup", "计划与调度配置已保存。", "success")
@@ -1694,9 +1879,20 @@ async def cleanup_runtime_files(request: Request):
             if entry.name.startswith("tmp_") and entry.is_dir():
                 remove_tree(entry)
 
-    if not runner.is_running and config_store.lock_file.exists():
+    if not forwarding_busy() and config_store.lock_file.exists():
         remove_file(config_store.lock_file)
 
+    for job in forward_job_store.list_jobs():
+        job_config = JobConfigStore(config_store, forward_job_store, job["id"])
+        if job_config.download_dir.exists():
+            for entry in job_config.download_dir.iterdir():
+                if entry.is_dir():
+                    remove_tree(entry)
+                else:
+                    remove_file(entry)
+        if not forwarding_busy(job["id"]) and job_config.lock_file.exists():
+            remove_file(job_config.lock_file)
+
     session_sidecars = [
         Path(f"{config_store.session_base_path}.session-journal"),
         Path(f"{config_store.session_base_path}.session-shm"),
@@ -1705,9 +1901,13 @@ async def cleanup_runtime_files(request: Request):
         Path(f"{config_store.legacy_session_base_path}.session-shm"),
         Path(f"{config_store.legacy_session_base_path}.session-wal"),
     ]
-    for sidecar in session_sidecars:
-        if sidecar.exists():
-            remove_file(sidecar)
+    try:
+        async with telegram_session_write():
+            for sidecar in session_sidecars:
+                if sidecar.exists():
+                    remove_file(sidecar)
+    except WorkerUnavailableError as exc:
+        logger.warning("跳过会话附属文件清理：%s", exc)
 
     for tmp_backup in backup_manager.backups_dir.glob("uploaded_restore_*.zip"):
         remove_file(tmp_backup)
@@ -1766,7 +1966,7 @@ async def restore_backup(request: Request, backup_name: str):
     if auth_redirect:
         return auth_redirect
 
-    if runner.is_running:
+    if forwarding_busy(any_job=True):
         return redirect_with_message("/plan-backup", "当前有转发任务运行中，请先停止后再恢复备份。", "warn")
 
     backup_file = backup_manager.resolve_backup(backup_name)
@@ -1775,7 +1975,11 @@ async def restore_backup(request: Request, backup_name: str):
 
     try:
         rollback_backup = backup_manager.create_backup_with_prefix("pre_restore_auto")
-        result = backup_manager.restore_from_backup(backup_file)
+        async with telegram_session_write(ALL_SESSIONS):
+            result = backup_manager.restore_from_backup(backup_file)
+            # 恢复的会话可能属于其他账号，缓存的 access_hash 随之失效。
+            peer_cache_store.init_db()
+            peer_cache_store.clear()
         rebind_count = rebind_logger_file_handler(logger, config_store.log_file)
         logger.info("日志文件句柄已重绑，已替换 file handler: %s", rebind_count)
         logger.warning("♻️ 已从备份恢复数据: %s", backup_file.name)
@@ -1797,7 +2001,7 @@ async def restore_backup_upload(request: Request, file: UploadFile = File(...)):
     if auth_redirect:
         return auth_redirect
 
-    if runner.is_running:
+    if forwarding_busy(any_job=True):
         return redirect_with_message("/plan-backup", "当前有转发任务运行中，请先停止后再恢复备份。", "warn")
 
     if not file.filename or not file.filename.lower().endswith(".zip"):
@@ -1814,7 +2018,11 @@ async def restore_backup_upload(request: Request, file: UploadFile = File(...)):
 
     try:
         rollback_backup = backup_manager.create_backup_with_prefix("pre_restore_auto")
-        result = backup_manager.restore_from_backup(upload_backup)
+        async with telegram_session_write(ALL_SESSIONS):
+            result = backup_manager.restore_from_backup(upload_backup)
+            # 恢复的会话可能属于其他账号，缓存的 access_hash 随之失效。
+            peer_cache_store.init_db()
+            peer_cache_store.clear()
         rebind_count = rebind_logger_file_handler(logger, config_store.log_file)
         logger.info("日志文件句柄已重绑，已替换 file handler: %s", rebind_count)
         logger.warning("♻️ 已从上传备份恢复数据: %s", upload_backup.name)
@@ -1830,6 +2038,185 @@ async def restore_backup_upload(request: Request, file: UploadFile = File(...)):
         return redirect_with_message("/plan-backup", f"上传备份恢复失败：{exc}", "error")
 
 
+JOB_FORM_KEYS = [
+    "KEYWORD_BLACKLIST",
+    "TEXT_REPLACEMENT_TERMS",
+    "TEXT_REPLACEMENT_REGEX",
+    "USER_ID_BLACKLIST",
+    "DEDUPLICATION_ENABLED",
+    "DEDUPLICATION_CACHE_SIZE",
+    "PANEL_AUTO_RUN_ENABLED",
+    "PANEL_AUTO_RUN_INTERVAL_MINUTES",
+    "PANEL_RSS_ENABLED",
+    "PANEL_RSS_ITEM_LIMIT",
+]
+JOB_FORM_BOOL_KEYS = {"DEDUPLICATION_ENABLED", "PANEL_AUTO_RUN_ENABLED", "PANEL_RSS_ENABLED"}
+
+
+async def build_job_settings(form, current: Dict[str, str]) -> tuple[Dict[str, str], int]:
+    """把任务表单转换为任务配置，返回配置与未解析出 CID 的来源数。
+
+    来源标识符经频道解析缓存解析出 CID，已解析过的来源沿用原有启用状态与初始化策略；解析失败的来源保存为未启用。
+    """
+    payload = collect_form_payload(form, current, JOB_FORM_KEYS, bool_keys=JOB_FORM_BOOL_KEYS)
+    payload["DESTINATION_CHANNEL"] = str(form.get("DESTINATION_CHANNEL", "")).strip()
+
+    identifiers = parse_sources_input(str(form.get("sources_input", "")))
+    previous_items = {item["source"]: item for item in parse_channel_sources(current.get("CHANNEL_SOURCES_JSON", "[]"))}
+    resolved_map: Dict[str, Dict[str, Any]] = {}
+    resolve_error = ""
+    if identifiers:
+        try:
+            resolved_rows = await dispatch_control("resolve", timeout=60, identifiers=identifiers)
+            resolved_map = {str(row.get("identifier", "")).strip(): row for row in resolved_rows}
+        except Exception as exc:
+            resolve_error = str(exc)
+
+    source_items: list[Dict[str, Any]] = []
+    for source in identifiers:
+        previous = previous_items.get(source, {})
+        resolved = resolved_map.get(source, {})
+        cid: int | None = previous.get("cid")
+        if resolved.get("ok"):
+            try:
+                cid = int(str(resolved.get("channel_id", "")).strip())
+            except ValueError:
+                cid = None
+        source_items.append(
+            {
+                "source": source,
+                "cid": cid,
+                "enabled": cid is not None and bool(previous.get("enabled", True)),
+                "status": "ok" if cid is not None else "failed",
+                "error": "" if cid is not None else str(resolved.get("error") or resolve_error or "解析失败"),
+                "bootstrap": str(previous.get("bootstrap", DEFAULT_SOURCE_BOOTSTRAP)),
+                "bootstrap_value": str(previous.get("bootstrap_value", "")),
+            }
+        )
+
+    enabled_cids = sorted({item["cid"] for item in source_items if isinstance(item.get("cid"), int) and item.get("enabled")})
+    payload["CHANNEL_IDS"] = ",".join(str(cid) for cid in enabled_cids)
+    payload["CHANNEL_IDENTIFIERS"] = ",".join(item["source"] for item in source_items)
+    payload["CHANNEL_SOURCES_JSON"] = json.dumps(source_items, ensure_ascii=False, separators=(",", ":"))
+    failed_count = len([item for item in source_items if item["cid"] is None])
+    return payload, failed_count
+
+
+def build_job_rows(request: Request) -> list[Dict[str, Any]]:
+    jobs_status = runtime_status()["jobs"]
+    rows: list[Dict[str, Any]] = []
+    for job in forward_job_store.list_jobs():
+        settings = job["settings"]
+        source_items = parse_channel_sources(settings.get("CHANNEL_SOURCES_JSON", "[]"))
+        destination_display, destination_url = build_tme_link(settings.get("DESTINATION_CHANNEL", ""))
+        rss_token = str(settings.get("PANEL_RSS_TOKEN", "")).strip()
+        rss_enabled = parse_bool(settings.get("PANEL_RSS_ENABLED", "true"), True)
+        rows.append(
+            {
+                "id": job["id"],
+                "name": job["name"],
+                "config": settings,
+                "sources_input": "\n".join(item["source"] for item in source_items),
+                "source_items": source_items,
+                "destination_display": destination_display,
+                "destination_url": destination_url,
+                "rss_url": build_rss_url(panel_base_url(request), rss_token) if rss_enabled and rss_token else "",
+                "status": jobs_status.get(str(job["id"]), {"is_running": False}),
+                "updated_at": job["updated_at"],
+            }
+        )
+    return rows
+
+
+@app.get("/jobs")
+async def jobs_page(request: Request):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    context = common_context(request, "多任务")
+    context.update({"jobs": build_job_rows(request), "defaults": DEFAULT_ENV_VALUES})
+    return templates.TemplateResponse("jobs.html", context)
+
+
+@app.post("/jobs/create")
+async def jobs_create(request: Request):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    form = await request.form()
+    name = str(form.get("name", "")).strip()
+    if not name or not str(form.get("DESTINATION_CHANNEL", "")).strip():
+        return redirect_with_message("/jobs", "请填写任务名称与目标频道。", "warn")
+
+    settings, failed_count = await build_job_settings(form, {})
+    settings["PANEL_RSS_TOKEN"] = secrets.token_urlsafe(24)
+    job_id = forward_job_store.create_job(name, settings)
+    try:
+        await dispatch_control("jobs_sync")
+    except WorkerUnavailableError:
+        # worker 离线时新任务在其下次启动时加载。
+        pass
+    logger.info("已创建转发任务 #%s：%s", job_id, name)
+    if failed_count > 0:
+        return redirect_with_message("/jobs", f"任务已创建，{failed_count} 个来源未能解析 CID，已保存为未启用。", "warn")
+    return redirect_with_message("/jobs", "任务已创建。", "success")
+
+
+@app.post("/jobs/{job_id}/save")
+async def jobs_save(request: Request, job_id: int):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    job = forward_job_store.get_job(job_id)
+    if job is None:
+        return redirect_with_message("/jobs", "任务不存在。", "warn")
+
+    form = await request.form()
+    if not str(form.get("DESTINATION_CHANNEL", "")).strip():
+        return redirect_with_message("/jobs", "请填写目标频道。", "warn")
+
+    settings, failed_count = await build_job_settings(form, job["settings"])
+    forward_job_store.update_job(job_id, name=str(form.get("name", "")).strip(), settings=settings)
+    if failed_count > 0:
+        return redirect_with_message("/jobs", f"任务已保存，{failed_count} 个来源未能解析 CID，已保存为未启用。", "warn")
+    return redirect_with_message("/jobs", "任务已保存。", "success")
+
+
+@app.post("/jobs/{job_id}/action")
+async def jobs_action(request: Request, job_id: int):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    if forward_job_store.get_job(job_id) is None:
+        return redirect_with_message("/jobs", "任务不存在。", "warn")
+
+    form = await request.form()
+    action = str(form.get("action", "")).strip()
+    if action in {"run", "stop"}:
+        try:
+            message, level = await dispatch_control("run", action=action, job_id=job_id)
+        except WorkerUnavailableError as exc:
+            return redirect_with_message("/jobs", str(exc), "error")
+        return redirect_with_message("/jobs", message, level)
+    if action == "rotate_rss":
+        forward_job_store.update_job(job_id, settings={"PANEL_RSS_TOKEN": secrets.token_urlsafe(24)})
+        return redirect_with_message("/jobs", "已重新生成该任务的 RSS 地址，旧地址失效。", "success")
+    if action == "delete":
+        try:
+            await dispatch_control("job_delete", job_id=job_id)
+        except WorkerUnavailableError:
+            # worker 离线时没有进程在使用该任务的状态目录，由面板直接删除。
+            forward_job_store.delete_job(job_id)
+            shutil.rmtree(JobConfigStore(config_store, forward_job_store, job_id).state_dir, ignore_errors=True)
+        logger.info("已删除转发任务 #%s", job_id)
+        return redirect_with_message("/jobs", "任务已删除，其断点与运行记录一并清除。", "success")
+    return redirect_with_message("/jobs", "未知操作。", "warn")
+
+
 @app.get("/settings")
 async def settings_redirect(request: Request):
     auth_redirect = auth_redirect_if_needed(request)
@@ -1894,14 +2281,66 @@ async def upload_session(request: Request, file: UploadFile = File(...)):
         Path(f"{config_store.legacy_session_base_path}.session-shm"),
         Path(f"{config_store.legacy_session_base_path}.session-wal"),
     ]
-    for candidate in cleanup_candidates:
-        if candidate.exists():
-            candidate.unlink(missing_ok=True)
-
-    config_store.session_file.write_bytes(payload)
+    try:
+        async with telegram_session_write():
+            for candidate in cleanup_candidates:
+                if candidate.exists():
+                    candidate.unlink(missing_ok=True)
+
+            config_store.session_file.write_bytes(payload)
+            peer_cache_store.clear()
+    except WorkerUnavailableError as exc:
+        return redirect_with_message("/setup", str(exc), "error")
     return redirect_with_message("/setup", "会话文件上传成功，已保存为 t2rss.session。", "success")
 
 
+@app.post("/session/accounts/upload")
+async def upload_account_session(request: Request, name: str = Form(""), file: UploadFile = File(...)):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    account_name = name.strip()
+    if not ACCOUNT_NAME_PATTERN.match(account_name):
+        return redirect_with_message("/setup", "账号名称只能包含字母、数字、下划线和短横线（最多 32 个字符）。", "error")
+    if not file.filename or not file.filename.lower().endswith(".session"):
+        return redirect_with_message("/setup", "请上传有效的 .session 文件。", "error")
+
+    payload = await file.read()
+    if not payload:
+        return redirect_with_message("/setup", "上传文件为空。", "error")
+
+    config_store.account_session_dir.mkdir(parents=True, exist_ok=True)
+    base_path = config_store.account_session_dir / account_name
+    try:
+        async with telegram_session_write(account_name):
+            for suffix in (".session-journal", ".session-shm", ".session-wal"):
+                Path(f"{base_path}{suffix}").unlink(missing_ok=True)
+            Path(f"{base_path}.session").write_bytes(payload)
+    except WorkerUnavailableError as exc:
+        return redirect_with_message("/setup", str(exc), "error")
+    return redirect_with_message("/setup", f"账号池会话已保存：{account_name}.session。", "success")
+
+
+@app.post("/session/accounts/{account_name}/delete")
+async def delete_account_session(request: Request, account_name: str):
+    auth_redirect = auth_redirect_if_needed(request)
+    if auth_redirect:
+        return auth_redirect
+
+    if account_name not in account_pool.account_names():
+        return redirect_with_message("/setup", f"未找到账号池会话：{account_name}", "warn")
+
+    base_path = config_store.account_session_dir / account_name
+    try:
+        async with telegram_session_write(account_name):
+            for suffix in (".session", ".session-journal", ".session-shm", ".session-wal"):
+                Path(f"{base_path}{suffix}").unlink(missing_ok=True)
+    except WorkerUnavailableError as exc:
+        return redirect_with_message("/setup", str(exc), "error")
+    return redirect_with_message("/setup", f"已从账号池移除：{account_name}", "success")
+
+
 @app.post("/checkpoints/delete")
 @app.post("/forward-settings/checkpoints/delete")
 async def delete_checkpoint(request: Request):
@@ -1943,10 +2382,15 @@ async def delete_session_file(request: Request):
     ]
 
     deleted_any = False
-    for candidate in candidates:
-        if candidate.exists():
-            candidate.unlink(missing_ok=True)
-            deleted_any = True
+    try:
+        async with telegram_session_write():
+            for candidate in candidates:
+                if candidate.exists():
+                    candidate.unlink(missing_ok=True)
+                    deleted_any = True
+            peer_cache_store.clear()
+    except WorkerUnavailableError as exc:
+        return redirect_with_message("/setup", str(exc), "error")
 
     if deleted_any:
         return redirect_with_message("/setup", "会话文件已删除。", "success")
@@ -1959,7 +2403,17 @@ async def api_status(request: Request):
     if auth_redirect:
         return auth_redirect
 
-    return JSONResponse(runner.status_payload())
+    status = runtime_status()
+    payload = dict(status["runner"])
+    payload["realtime"] = status["realtime"]
+    payload["telegram_client"] = status["telegram_client"]
+    payload["request_governor"] = status["request_governor"]
+    payload["account_pool"] = status["account_pool"]
+    payload["jobs"] = status["jobs"]
+    payload["worker"] = worker_link.status_payload(WORKER_MODE or "inline")
+    payload["worker"]["leader_lease"] = leader_lease_store.read(LEADER_LEASE_NAME)
+    payload["worker"]["this_process"] = {"pid": os.getpid(), "leader": forwarding_leader}
+    return JSONResponse(payload)
 
 
 @app.get("/api/checkpoints")
@@ -1984,7 +2438,10 @@ async def api_logs_tail(request: Request):
         line_limit = 300
 
     line_limit = max(20, min(line_limit, 2000))
-    log_text = read_panel_log_tail(config_store.log_file, line_limit=line_limit)
+    if WORKER_MODE == "external":
+        log_text = read_merged_log_tail([config_store.log_file, config_store.worker_log_file], line_limit=line_limit)
+    else:
+        log_text = read_panel_log_tail(config_store.log_file, line_limit=line_limit)
 
     return JSONResponse(
         {
@@ -2001,6 +2458,8 @@ async def api_logs_clear(request: Request):
         return JSONResponse({"error": "unauthorized"}, status_code=401)
 
     clear_panel_log(config_store.log_file)
+    if config_store.worker_log_file.exists():
+        clear_panel_log(config_store.worker_log_file)
     return JSONResponse(
         {
             "ok": True,
@@ -0,0 +1,308 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+
+QUARK_LINK_PATTERN = re.compile(r"https://pan\.quark\.cn/s/[a-zA-Z0-9]+")
+URL_PATTERN = re.compile(r'https?://[^\s<>"]+')
+BOT_TRIGGER_PHRASE = "点击获取夸克链接"
+
+QUARK_TRIGGER_LINK_PAREN_PATTERN = re.compile(
+    rf"{re.escape(BOT_TRIGGER_PHRASE)}\s*[（(]\s*(?P<url>(?:https?://t\.me/[^\s)）]+|tg://resolve[^\s)）]+))\s*[)）]"
+)
+QUARK_TRIGGER_LINK_INLINE_PATTERN = re.compile(
+    rf"{re.escape(BOT_TRIGGER_PHRASE)}\s*(?P<url>(?:https?://t\.me/\S+|tg://resolve\S+))"
+)
+QUARK_TRIGGER_MARKDOWN_PATTERN = re.compile(
+    rf"\[[^\]]*{re.escape(BOT_TRIGGER_PHRASE)}[^\]]*\]\((?P<url>(?:https?://t\.me/[^\s)]+|tg://resolve[^\s)]+))\)"
+)
+TME_JUMP_LINK_PATTERN = re.compile(r"(?:https?://t\.me/\S+|tg://resolve\S+)")
+
+
+def _has_quark_trigger_phrase(text: Optional[str]) -> bool:
+    return BOT_TRIGGER_PHRASE in str(text or "")
+
+
+def _is_quark_jump_link(url: str) -> bool:
+    lower = str(url or "").lower()
+    if not lower:
+        return False
+    if "quark" in lower:
+        return True
+    if "start=" in lower and "_quark" in lower:
+        return True
+    return False
+
+
+def _is_tme_link(url: str) -> bool:
+    lower_url = str(url or "").lower()
+    return "t.me/" in lower_url or lower_url.startswith("tg://")
+
+
+def extract_quark_link(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    match = QUARK_LINK_PATTERN.search(text)
+    return match.group(0) if match else None
+
+
+def _clean_url_token(url: str) -> str:
+    return str(url or "").strip().rstrip(").,，。!！?？\"'")
+
+
+def _extract_urls_from_text(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+
+    urls: List[str] = []
+    seen: Set[str] = set()
+    for item in URL_PATTERN.findall(str(text)):
+        normalized = _clean_url_token(item)
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        urls.append(normalized)
+    return urls
+
+
+def _iter_buttons(message):
+    rows = getattr(message, "buttons", None) or []
+    for row in rows:
+        if row is None:
+            continue
+        button_items = row if isinstance(row, (list, tuple)) else [row]
+        for button in button_items:
+            if button is not None:
+                yield button
+
+
+def _button_url(button) -> str:
+    url = getattr(button, "url", None)
+    if not url:
+        raw_button = getattr(button, "button", None)
+        url = getattr(raw_button, "url", None)
+    return _clean_url_token(str(url or ""))
+
+
+def _extract_button_urls(message) -> List[str]:
+    urls: List[str] = []
+    seen: Set[str] = set()
+    for button in _iter_buttons(message):
+        normalized = _button_url(button)
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        urls.append(normalized)
+    return urls
+
+
+def _extract_quark_trigger_bot_links_from_text(text: Optional[str]) -> List[str]:
+    content = str(text or "")
+    urls: List[str] = []
+    seen: Set[str] = set()
+
+    for match in QUARK_TRIGGER_LINK_PAREN_PATTERN.finditer(content):
+        url = _clean_url_token(match.group("url"))
+        if not url or url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+
+    for match in QUARK_TRIGGER_LINK_INLINE_PATTERN.finditer(content):
+        url = _clean_url_token(match.group("url"))
+        if not url or url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+
+    trigger_index = content.find(BOT_TRIGGER_PHRASE)
+    if trigger_index >= 0:
+        after_text = content[trigger_index + len(BOT_TRIGGER_PHRASE) :]
+        next_match = TME_JUMP_LINK_PATTERN.search(after_text)
+        if next_match:
+            url = _clean_url_token(next_match.group(0))
+            if url and url not in seen:
+                seen.add(url)
+                urls.append(url)
+
+    return urls
+
+
+def message_text_of(message) -> str:
+    """消息纯文本（实体偏移量以此为基准）。"""
+    return (
+        getattr(message, "raw_text", None)
+        or getattr(message, "message", None)
+        or getattr(message, "text", None)
+        or getattr(message, "caption", None)
+        or ""
+    )
+
+
+def message_formatted_text_of(message) -> str:
+    """消息格式化文本（Telethon 会把蓝字链接还原为 Markdown，夸克链接识别以此为准）。"""
+    return getattr(message, "text", None) or getattr(message, "caption", None) or ""
+
+
+def build_utf16_boundaries(text: str) -> Optional[Dict[int, int]]:
+    """UTF-16 偏移到字符下标的映射；全部为 BMP 字符时返回 None，表示两者一致。"""
+    content = str(text or "")
+    if len(content.encode("utf-16-le")) == len(content) * 2:
+        return None
+
+    boundaries = {0: 0}
+    units = 0
+    for index, char in enumerate(content):
+        units += 2 if ord(char) > 0xFFFF else 1
+        boundaries[units] = index + 1
+    return boundaries
+
+
+def utf16_span(
+    text: str,
+    boundaries: Optional[Dict[int, int]],
+    offset: int,
+    length: int,
+) -> Optional[Tuple[int, int]]:
+    if length <= 0 or offset < 0:
+        return None
+
+    if boundaries is None:
+        start, end = offset, offset + length
+    else:
+        start = boundaries.get(offset)
+        end = boundaries.get(offset + length)
+        if start is None or end is None:
+            return None
+
+    if start > end or end > len(text):
+        return None
+    return start, end
+
+
+@dataclass(frozen=True)
+class MessageAnalysis:
+    """单条消息的一次性分析结果，抓取后计算一次，后续各阶段只读复用。"""
+
+    text: str
+    lower_text: str
+    utf16_boundaries: Optional[Dict[int, int]]
+    urls: Tuple[str, ...]
+    button_urls: Tuple[str, ...]
+    trigger_bot_links: Tuple[str, ...]
+    share_keys: Tuple[str, ...]
+    text_url_links: Tuple[Tuple[str, str], ...]
+    mention_user_ids: FrozenSet[int]
+    has_trigger_phrase: bool
+
+    @property
+    def share_key(self) -> Optional[str]:
+        return self.share_keys[0] if self.share_keys else None
+
+
+def analyze_message(message) -> MessageAnalysis:
+    from telethon.tl.types import MessageEntityMentionName, MessageEntityTextUrl
+
+    text = message_text_of(message)
+    formatted_text = message_formatted_text_of(message)
+    boundaries = build_utf16_boundaries(text)
+
+    trigger_links: List[str] = []
+    trigger_seen: Set[str] = set()
+
+    def add_trigger_link(url: str) -> None:
+        if not url or url in trigger_seen:
+            return
+        trigger_seen.add(url)
+        trigger_links.append(url)
+
+    for url in _extract_quark_trigger_bot_links_from_text(text):
+        add_trigger_link(url)
+
+    text_url_links: List[Tuple[str, str]] = []
+    mention_user_ids: Set[int] = set()
+    for entity in getattr(message, "entities", None) or []:
+        if isinstance(entity, MessageEntityMentionName):
+            mention_user_ids.add(int(entity.user_id))
+            continue
+        if not isinstance(entity, MessageEntityTextUrl):
+            continue
+
+        span = utf16_span(
+            text,
+            boundaries,
+            int(getattr(entity, "offset", 0) or 0),
+            int(getattr(entity, "length", 0) or 0),
+        )
+        entity_text = text[span[0] : span[1]] if span else ""
+        entity_url = _clean_url_token(str(getattr(entity, "url", "") or ""))
+        if entity_url:
+            text_url_links.append((entity_text, entity_url))
+
+        if not _is_tme_link(entity_url):
+            continue
+        if BOT_TRIGGER_PHRASE not in entity_text and not _is_quark_jump_link(entity_url):
+            continue
+        add_trigger_link(entity_url)
+
+    button_urls: List[str] = []
+    button_seen: Set[str] = set()
+    for button in _iter_buttons(message):
+        button_url = _button_url(button)
+        if button_url and button_url not in button_seen:
+            button_seen.add(button_url)
+            button_urls.append(button_url)
+
+        if not _is_tme_link(button_url):
+            continue
+        button_text = str(getattr(button, "text", "") or "")
+        if BOT_TRIGGER_PHRASE not in button_text and not _is_quark_jump_link(button_url):
+            continue
+        add_trigger_link(button_url)
+
+    share_keys: List[str] = []
+    for link in QUARK_LINK_PATTERN.findall(formatted_text):
+        if link not in share_keys:
+            share_keys.append(link)
+
+    return MessageAnalysis(
+        text=text,
+        lower_text=text.lower(),
+        utf16_boundaries=boundaries,
+        urls=tuple(_extract_urls_from_text(text)),
+        button_urls=tuple(button_urls),
+        trigger_bot_links=tuple(trigger_links),
+        share_keys=tuple(share_keys),
+        text_url_links=tuple(text_url_links),
+        mention_user_ids=frozenset(mention_user_ids),
+        has_trigger_phrase=_has_quark_trigger_phrase(text),
+    )
+
+
+def analysis_to_record(analysis: MessageAnalysis) -> Dict[str, Any]:
+    """序列化为可 JSON 化的字典；lower_text 与 UTF-16 映射可由正文重新计算，不写入。"""
+    return {
+        "text": analysis.text,
+        "urls": list(analysis.urls),
+        "button_urls": list(analysis.button_urls),
+        "trigger_bot_links": list(analysis.trigger_bot_links),
+        "share_keys": list(analysis.share_keys),
+        "text_url_links": [list(pair) for pair in analysis.text_url_links],
+        "mention_user_ids": sorted(analysis.mention_user_ids),
+    }
+
+
+def analysis_from_record(record: Dict[str, Any]) -> MessageAnalysis:
+    text = str(record.get("text", "") or "")
+    return MessageAnalysis(
+        text=text,
+        lower_text=text.lower(),
+        utf16_boundaries=build_utf16_boundaries(text),
+        urls=tuple(record.get("urls", [])),
+        button_urls=tuple(record.get("button_urls", [])),
+        trigger_bot_links=tuple(record.get("trigger_bot_links", [])),
+        share_keys=tuple(record.get("share_keys", [])),
+        text_url_links=tuple((str(anchor), str(url)) for anchor, url in record.get("text_url_links", [])),
+        mention_user_ids=frozenset(int(item) for item in record.get("mention_user_ids", [])),
+        has_trigger_phrase=_has_quark_trigger_phrase(text),
+    )
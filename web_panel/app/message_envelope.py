@@ -0,0 +1,150 @@
+import base64
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from .message_analysis import MessageAnalysis, analysis_from_record, analysis_to_record, analyze_message
+from .text_pipeline import PreparedOutbound
+
+
+class MediaDescriptor:
+    """媒体摘要：只记录转发决策需要的信息，真正下载时才使用原始消息对象。"""
+
+    __slots__ = ("kind", "mime_type", "size")
+
+    def __init__(self, kind: str, mime_type: str = "", size: int = 0):
+        self.kind = kind
+        self.mime_type = mime_type
+        self.size = size
+
+    @classmethod
+    def from_message(cls, message) -> Optional["MediaDescriptor"]:
+        media = getattr(message, "media", None)
+        if not media:
+            return None
+
+        file_info = getattr(message, "file", None)
+        kind = type(media).__name__.replace("MessageMedia", "").lower() or "media"
+        return cls(
+            kind=kind,
+            mime_type=str(getattr(file_info, "mime_type", "") or ""),
+            size=int(getattr(file_info, "size", 0) or 0),
+        )
+
+
+class MessageEnvelope:
+    """排队中的单条源消息。
+
+    仅保留转发流程需要的字段；无媒体的消息在抓取后立即丢弃 Telethon 原始对象，
+    有媒体的消息在发送完成后通过 release_raw() 释放。
+    """
+
+    __slots__ = (
+        "channel_id",
+        "message_id",
+        "date",
+        "grouped_id",
+        "is_service",
+        "analysis",
+        "entities",
+        "media",
+        "resolved_url",
+        "prepared",
+        "sent_message_id",
+        "send_error",
+        "retry_attempts",
+        "raw",
+    )
+
+    def __init__(
+        self,
+        channel_id: int,
+        message_id: int,
+        date: Optional[datetime],
+        grouped_id: Optional[int],
+        is_service: bool,
+        analysis: MessageAnalysis,
+        entities: Optional[List[Any]],
+        media: Optional[MediaDescriptor],
+        raw=None,
+    ):
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.date = date
+        self.grouped_id = grouped_id
+        self.is_service = is_service
+        self.analysis = analysis
+        self.entities = entities
+        self.media = media
+        self.resolved_url: Optional[str] = None
+        self.prepared: Optional[PreparedOutbound] = None
+        self.sent_message_id: Optional[int] = None
+        self.send_error: Optional[str] = None
+        # 从重试队列读回时为已失败次数，其余来源为 0。
+        self.retry_attempts = 0
+        self.raw = raw
+
+    @classmethod
+    def from_message(cls, channel_id: int, message) -> "MessageEnvelope":
+        from telethon.tl.types import MessageService
+
+        media = MediaDescriptor.from_message(message)
+        return cls(
+            channel_id=int(channel_id),
+            message_id=int(getattr(message, "id", 0) or 0),
+            date=getattr(message, "date", None),
+            grouped_id=getattr(message, "grouped_id", None),
+            is_service=isinstance(message, MessageService),
+            analysis=analyze_message(message),
+            entities=list(getattr(message, "entities", None) or []) or None,
+            media=media,
+            raw=message if media is not None else None,
+        )
+
+    def release_raw(self) -> None:
+        self.raw = None
+
+    def to_record(self) -> bytes:
+        """序列化为紧凑记录（zlib 压缩的 JSON），实体使用 Telegram 原生二进制编码。"""
+        payload = {
+            "date": self.date.timestamp() if self.date else None,
+            "grouped_id": self.grouped_id,
+            "is_service": self.is_service,
+            "analysis": analysis_to_record(self.analysis),
+            "entities": [base64.b64encode(bytes(entity)).decode("ascii") for entity in self.entities or []],
+            "media": [self.media.kind, self.media.mime_type, self.media.size] if self.media is not None else None,
+        }
+        return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_record(
+        cls,
+        channel_id: int,
+        message_id: int,
+        record: bytes,
+        resolved_url: Optional[str] = None,
+    ) -> "MessageEnvelope":
+        from telethon.extensions import BinaryReader
+
+        payload = json.loads(zlib.decompress(record).decode("utf-8"))
+
+        entities = []
+        for item in payload.get("entities") or []:
+            with BinaryReader(base64.b64decode(item)) as reader:
+                entities.append(reader.tgread_object())
+
+        media_row = payload.get("media")
+        timestamp = payload.get("date")
+        envelope = cls(
+            channel_id=int(channel_id),
+            message_id=int(message_id),
+            date=datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp is not None else None,
+            grouped_id=payload.get("grouped_id"),
+            is_service=bool(payload.get("is_service", False)),
+            analysis=analysis_from_record(payload.get("analysis") or {}),
+            entities=entities or None,
+            media=MediaDescriptor(*media_row) if media_row else None,
+        )
+        envelope.resolved_url = resolved_url or None
+        return envelope
@@ -0,0 +1,117 @@
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .time_utils import normalize_to_shanghai_iso, now_shanghai_iso
+
+
+# 缓存条目超过该时长后在下次使用时重新解析；重新解析失败时仍沿用旧条目。
+PEER_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+_USERNAME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]+$")
+
+
+def normalize_peer_identifier(identifier: str) -> str:
+    """用户名不区分大小写且可带 @ 前缀，统一后作为缓存键；邀请链接等其他形式原样保留。"""
+    value = str(identifier or "").strip()
+    username = value[1:] if value.startswith("@") else value
+    if _USERNAME_PATTERN.match(username):
+        return username.lower()
+    return value
+
+
+class PeerCacheStore:
+    """频道标识符解析缓存：记录用户名、邀请链接到 peer ID、access_hash、类型与标题的映射，
+    重复解析与按用户名发送时直接使用缓存，不再发起 ResolveUsername 请求。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS peer_cache (
+                    identifier TEXT PRIMARY KEY,
+                    peer_id INTEGER NOT NULL,
+                    access_hash INTEGER NOT NULL DEFAULT 0,
+                    peer_type TEXT NOT NULL,
+                    title TEXT NOT NULL DEFAULT '',
+                    resolved_ts REAL NOT NULL,
+                    resolved_at TEXT NOT NULL
+                )
+                """
+            )
+            connection.commit()
+
+    def get_many(self, identifiers: Iterable[str], now_ts: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """按原始标识符返回缓存条目，条目中的 fresh 表示是否仍在有效期内。"""
+        now_ts = time.time() if now_ts is None else now_ts
+        keys = {identifier: normalize_peer_identifier(identifier) for identifier in identifiers}
+        if not keys:
+            return {}
+
+        unique_keys = sorted(set(keys.values()))
+        placeholders = ",".join("?" for _ in unique_keys)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                f"SELECT * FROM peer_cache WHERE identifier IN ({placeholders})",
+                unique_keys,
+            ).fetchall()
+
+        by_key = {str(row["identifier"]): row for row in rows}
+        entries: Dict[str, Dict[str, Any]] = {}
+        for identifier, key in keys.items():
+            row = by_key.get(key)
+            if row is None:
+                continue
+            entries[identifier] = {
+                "peer_id": int(row["peer_id"]),
+                "access_hash": int(row["access_hash"]),
+                "peer_type": str(row["peer_type"]),
+                "title": str(row["title"] or ""),
+                "resolved_at": normalize_to_shanghai_iso(row["resolved_at"]),
+                "fresh": now_ts - float(row["resolved_ts"]) < PEER_CACHE_TTL_SECONDS,
+            }
+        return entries
+
+    def upsert(
+        self,
+        identifier: str,
+        peer_id: int,
+        access_hash: int,
+        peer_type: str,
+        title: str = "",
+        now_ts: Optional[float] = None,
+    ) -> None:
+        now_ts = time.time() if now_ts is None else now_ts
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO peer_cache (
+                    identifier, peer_id, access_hash, peer_type, title, resolved_ts, resolved_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    normalize_peer_identifier(identifier),
+                    int(peer_id),
+                    int(access_hash or 0),
+                    str(peer_type),
+                    str(title or ""),
+                    now_ts,
+                    now_shanghai_iso(),
+                ),
+            )
+            connection.commit()
+
+    def clear(self) -> int:
+        """会话文件替换后 access_hash 可能属于其他账号，整体清空后按需重新解析。"""
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute("DELETE FROM peer_cache")
+            connection.commit()
+            return cursor.rowcount
@@ -0,0 +1,122 @@
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+from .time_utils import timestamp_to_shanghai_iso
+
+
+# 消息速率的指数滑动平均权重：新观测占 30%，兼顾响应速度与抖动。
+POLL_RATE_SMOOTHING = 0.3
+
+
+def compute_poll_interval_minutes(
+    rate_per_hour: float,
+    target_latency_minutes: int,
+    min_minutes: int,
+    max_minutes: int,
+) -> float:
+    """按平方根法则计算轮询间隔：目标延迟窗口内预计产生 n 条消息的来源，每 L/√n 分钟轮询一次。
+
+    窗口内约 1 条消息的来源按目标延迟轮询；越活跃越频繁，越冷清越稀疏，结果限制在 [min, max] 内。
+    """
+    lower = max(1, int(min_minutes))
+    upper = max(lower, int(max_minutes))
+    expected = max(0.0, float(rate_per_hour)) * target_latency_minutes / 60
+    if expected <= 0:
+        return float(upper)
+    return float(min(upper, max(lower, target_latency_minutes / math.sqrt(expected))))
+
+
+class SourcePollScheduleStore:
+    """来源轮询计划：记录每个来源的消息速率估计与下次到期时间，用于自适应轮询。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS source_poll_schedule (
+                    channel_id INTEGER PRIMARY KEY,
+                    rate_per_hour REAL NOT NULL DEFAULT 0,
+                    interval_minutes REAL NOT NULL DEFAULT 0,
+                    last_polled_ts REAL NOT NULL,
+                    next_due_ts REAL NOT NULL
+                )
+                """
+            )
+            connection.commit()
+
+    def list_schedule(self) -> Dict[int, Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute("SELECT * FROM source_poll_schedule").fetchall()
+
+        return {
+            int(row["channel_id"]): {
+                "rate_per_hour": round(float(row["rate_per_hour"]), 2),
+                "interval_minutes": round(float(row["interval_minutes"]), 1),
+                "last_polled_ts": float(row["last_polled_ts"]),
+                "next_due_ts": float(row["next_due_ts"]),
+                "next_due_at": timestamp_to_shanghai_iso(float(row["next_due_ts"])),
+            }
+            for row in rows
+        }
+
+    def due_channel_ids(self, channel_ids: Iterable[int], now_ts: Optional[float] = None) -> Set[int]:
+        """返回已到期的来源；尚无计划记录的来源视为立即到期。"""
+        now_ts = time.time() if now_ts is None else now_ts
+        schedule = self.list_schedule()
+        return {
+            int(channel_id)
+            for channel_id in channel_ids
+            if int(channel_id) not in schedule or schedule[int(channel_id)]["next_due_ts"] <= now_ts
+        }
+
+    def record_polls(
+        self,
+        fetched_by_channel: Dict[int, int],
+        target_latency_minutes: int,
+        min_minutes: int,
+        max_minutes: int,
+        now_ts: Optional[float] = None,
+    ) -> None:
+        """按本次各来源抓取条数更新速率估计，并重新计算下次到期时间。"""
+        if not fetched_by_channel:
+            return
+
+        now_ts = time.time() if now_ts is None else now_ts
+        schedule = self.list_schedule()
+        payload = []
+        for channel_id, fetched in fetched_by_channel.items():
+            previous = schedule.get(int(channel_id))
+            if previous is None:
+                # 首次轮询没有可靠的时间跨度：速率从 0 起步，先按目标延迟再轮询一次，由后续观测修正。
+                rate = 0.0
+                interval = compute_poll_interval_minutes(60 / target_latency_minutes, target_latency_minutes, min_minutes, max_minutes)
+            else:
+                elapsed_hours = max((now_ts - previous["last_polled_ts"]) / 3600, 1 / 60)
+                observed = int(fetched) / elapsed_hours
+                rate = POLL_RATE_SMOOTHING * observed + (1 - POLL_RATE_SMOOTHING) * previous["rate_per_hour"]
+                interval = compute_poll_interval_minutes(rate, target_latency_minutes, min_minutes, max_minutes)
+            payload.append((int(channel_id), rate, interval, now_ts, now_ts + interval * 60))
+
+        with sqlite3.connect(self.db_path) as connection:
+            connection.executemany(
+                """
+                INSERT INTO source_poll_schedule (channel_id, rate_per_hour, interval_minutes, last_polled_ts, next_due_ts)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(channel_id)
+                DO UPDATE SET
+                    rate_per_hour = excluded.rate_per_hour,
+                    interval_minutes = excluded.interval_minutes,
+                    last_polled_ts = excluded.last_polled_ts,
+                    next_due_ts = excluded.next_due_ts
+                """,
+                payload,
+            )
+            connection.commit()
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+from .checkpoint_store import ChannelCheckpointStore
+from .checkpoint_writer import CheckpointWriteBuffer
+from .client_manager import open_telegram_client
+from .config_store import ConfigStore, ForwarderConfig
+from .corpus_store import MessageCorpusStore
+from .forward_ledger_store import ForwardLedgerStore
+from .forwarder_service import (
+    SEND_INTERVAL_SECONDS,
+    ForwarderRunner,
+    _capture_corpus_samples,
+    _collect_destination_links,
+    _compile_text_replacement_regex,
+    _enabled_source_channels,
+    _extract_message_quark_link,
+    _forward_single_message,
+    _probe_dialog_states,
+    _queue_failed_send,
+    _record_ledger,
+    _resolve_destination_peer,
+    _resolve_link_via_bot,
+)
+from .message_envelope import MessageEnvelope
+from .request_governor import governor, subsystem_scope
+from .retry_queue_store import SendRetryQueueStore
+from .staging_store import StagingQueueStore
+from .time_utils import now_shanghai_iso
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+    from telethon.hints import EntityLike
+
+
+REALTIME_YIELD_CHECK_SECONDS = 2
+REALTIME_RECONNECT_SECONDS = 10
+# 收到的消息与断点之间缺口超过该条数时不在实时链路中补抓，转交补漏运行。
+REALTIME_GAP_FILL_LIMIT = 100
+
+
+class RealtimeForwarder:
+    """实时转发：保持一个已授权客户端在线，订阅启用来源的新消息，逐条过滤、去重、改写并发送，断点逐条推进。
+
+    只有断点已追平（无暂存积压、断点等于频道最新消息）的来源会被订阅；其余来源及连接断开期间的消息
+    由轮询运行补漏。订阅先于追平探测建立，探测期间到达的消息缓存在队列中；收到的消息与断点之间有缺口时
+    先按 ID 补抓缺口内的消息，保证断点只连续推进。常规运行或历史回填需要会话时，实时订阅会主动让出，结束后再重新订阅。
+    """
+
+    def __init__(
+        self,
+        config_store: ConfigStore,
+        checkpoint_store: ChannelCheckpointStore,
+        forwarder_runner: ForwarderRunner,
+        logger,
+        corpus_store: Optional[MessageCorpusStore] = None,
+        staging_store: Optional[StagingQueueStore] = None,
+        ledger_store: Optional[ForwardLedgerStore] = None,
+        retry_store: Optional[SendRetryQueueStore] = None,
+    ):
+        self.config_store = config_store
+        self.checkpoint_store = checkpoint_store
+        self.forwarder_runner = forwarder_runner
+        self.logger = logger
+        self.corpus_store = corpus_store
+        self.staging_store = staging_store
+        self.ledger_store = ledger_store
+        self.retry_store = retry_store
+        self._task: Optional[Any] = None
+        self._stop_event = asyncio.Event()
+        self._catchup_requested = False
+        self.connected = False
+        self.live_channel_ids: List[int] = []
+        self.lagging_channel_ids: List[int] = []
+        self.forwarded_total = 0
+        self.last_message_at: Optional[str] = None
+
+    def status_payload(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "live_channel_ids": list(self.live_channel_ids),
+            "lagging_channel_ids": list(self.lagging_channel_ids),
+            "forwarded_total": self.forwarded_total,
+            "last_message_at": self.last_message_at,
+        }
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stop_event.clear()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                panel_settings = self.config_store.build_panel_settings()
+                if not panel_settings.realtime_enabled or panel_settings.test_mode_enabled:
+                    # 测试模式不推进断点，不做实时转发；重新开启时先触发一次补漏运行再进入实时订阅。
+                    self._catchup_requested = False
+                elif not self._catchup_requested:
+                    self._catchup_requested = True
+                    if await self.forwarder_runner.trigger(trigger="catchup"):
+                        self.logger.info("⚡ 实时模式已开启，先执行一次补漏运行追平断点。")
+                elif not self.forwarder_runner.is_running and not self.forwarder_runner.session_wanted:
+                    with subsystem_scope("realtime"):
+                        await self._listen()
+            except Exception as exc:
+                self.logger.exception("⚡ 实时转发连接异常: %s", exc)
+            finally:
+                self.connected = False
+
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=REALTIME_RECONNECT_SECONDS)
+            except asyncio.TimeoutError:
+                continue
+
+    def _config_mtime(self) -> float:
+        try:
+            return self.config_store.env_file.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    async def _listen(self) -> None:
+        from telethon import events, utils
+
+        config = self.config_store.build_forwarder_config()
+        if not all([config.api_id, config.api_hash, config.destination_channel]):
+            return
+        if not self.config_store.session_file.exists():
+            return
+
+        source_channel_ids = sorted(_enabled_source_channels(config))
+        if not source_channel_ids:
+            return
+
+        config_mtime = self._config_mtime()
+        regex_rules = _compile_text_replacement_regex(config.text_replacement_regex, self.logger)
+
+        async with self.forwarder_runner.session_lock:
+            async with open_telegram_client(self.config_store, self.forwarder_runner.client_manager) as client:
+                # 更新中的 chat_id 为带标记的 peer id，配置中保存的是裸 CID。
+                cid_by_peer_id: Dict[int, int] = {}
+                for cid in source_channel_ids:
+                    cid_by_peer_id[utils.get_peer_id(await client.get_input_entity(cid))] = cid
+
+                inbox: asyncio.Queue = asyncio.Queue()
+
+                async def on_new_message(event) -> None:
+                    inbox.put_nowait((cid_by_peer_id.get(event.chat_id), event.message))
+
+                # 先订阅再探测：探测与解析目标频道期间到达的消息进入队列，不会落在两者之间丢失。
+                client.add_event_handler(on_new_message, events.NewMessage(chats=list(cid_by_peer_id)))
+                checkpoint_writer: Optional[CheckpointWriteBuffer] = None
+                try:
+                    live_ids = await self._in_sync_channels(client, source_channel_ids)
+                    self.live_channel_ids = live_ids
+                    self.lagging_channel_ids = [cid for cid in source_channel_ids if cid not in live_ids]
+                    if self.lagging_channel_ids:
+                        self.logger.info("⚡ 以下来源断点未追平，暂由轮询运行补漏: %s", self.lagging_channel_ids)
+                    if not live_ids:
+                        return
+
+                    destination = await _resolve_destination_peer(
+                        client,
+                        config.destination_channel,
+                        self.forwarder_runner.peer_cache_store,
+                        self.logger,
+                    )
+                    historical_links = (
+                        await _collect_destination_links(client, destination, config) if config.deduplication_enabled else set()
+                    )
+                    bot_link_cache: Dict[str, Optional[str]] = {}
+
+                    checkpoint_writer = CheckpointWriteBuffer(self.checkpoint_store, self.ledger_store, self.retry_store)
+                    checkpoint_writer.start()
+                    self.connected = True
+                    self.logger.info("⚡ 实时转发已连接，订阅来源: %s", live_ids)
+
+                    while not self._stop_event.is_set():
+                        if self.forwarder_runner.session_wanted:
+                            self.logger.info("⚡ 其他任务需要使用会话，实时订阅暂时让出。")
+                            break
+                        if self._config_mtime() != config_mtime:
+                            self.logger.info("⚡ 配置已变更，重新建立实时订阅。")
+                            break
+                        panel_settings = self.config_store.build_panel_settings()
+                        if not panel_settings.realtime_enabled or panel_settings.test_mode_enabled:
+                            break
+                        if not client.is_connected():
+                            self.logger.warning("⚡ 实时连接已断开，稍后重连。")
+                            break
+
+                        try:
+                            channel_id, message = await asyncio.wait_for(inbox.get(), timeout=REALTIME_YIELD_CHECK_SECONDS)
+                        except asyncio.TimeoutError:
+                            continue
+                        if channel_id not in self.live_channel_ids:
+                            continue
+
+                        await self._handle_message(
+                            client,
+                            checkpoint_writer,
+                            channel_id,
+                            message,
+                            destination,
+                            config,
+                            regex_rules,
+                            historical_links,
+                            bot_link_cache,
+                        )
+                finally:
+                    client.remove_event_handler(on_new_message)
+                    if checkpoint_writer is not None:
+                        checkpoint_writer.close()
+                    # 未处理的消息不推进断点，断开后由补漏运行处理。
+                    self.connected = False
+
+    async def _in_sync_channels(self, client: TelegramClient, channel_ids: List[int]) -> List[int]:
+        live_ids: List[int] = []
+        dialog_states = await _probe_dialog_states(client, channel_ids, self.logger)
+        for channel_id in channel_ids:
+            if self.checkpoint_store.get_record(channel_id) is None:
+                continue
+            if self.staging_store is not None and self.staging_store.channel_backlog(channel_id)[0] > 0:
+                continue
+
+            last_id = self.checkpoint_store.get_last_id(channel_id)
+            latest_id = dialog_states.get(channel_id, (None, 0))[0]
+            if latest_id is None:
+                async with governor.request("history"):
+                    latest = await client.get_messages(channel_id, limit=1)
+                latest_id = int(getattr(latest[0], "id", 0) or 0) if latest else 0
+            if latest_id <= last_id:
+                live_ids.append(channel_id)
+        return live_ids
+
+    async def _handle_message(
+        self,
+        client: TelegramClient,
+        checkpoint_writer: CheckpointWriteBuffer,
+        channel_id: int,
+        message,
+        destination: EntityLike,
+        config: ForwarderConfig,
+        regex_rules,
+        historical_links: Set[str],
+        bot_link_cache: Dict[str, Optional[str]],
+    ) -> None:
+        last_id = checkpoint_writer.get_last_id(channel_id)
+        message_id = int(message.id)
+        if message_id <= last_id:
+            return
+
+        pending = [message]
+        if message_id > last_id + 1:
+            # 断点只连续推进：缺口内的消息（更新丢失、订阅前到达等）先按 ID 补抓，缺口过大时转交补漏运行。
+            if message_id - last_id - 1 > REALTIME_GAP_FILL_LIMIT:
+                self.logger.warning(
+                    "⚡ 频道 %s 的实时消息 %s 与断点 %s 之间缺口过大，暂停订阅该来源并转交补漏运行。",
+                    channel_id,
+                    message_id,
+                    last_id,
+                )
+                self.live_channel_ids = [cid for cid in self.live_channel_ids if cid != channel_id]
+                self.lagging_channel_ids = sorted({*self.lagging_channel_ids, channel_id})
+                await self.forwarder_runner.trigger(trigger="catchup")
+                return
+            async with governor.request("history"):
+                missing = await client.get_messages(channel_id, min_id=last_id, max_id=message_id, limit=None)
+            pending = sorted((item for item in missing if item is not None), key=lambda item: item.id) + pending
+
+        for item in pending:
+            await self._forward_message(
+                client,
+                checkpoint_writer,
+                channel_id,
+                item,
+                destination,
+                config,
+                regex_rules,
+                historical_links,
+                bot_link_cache,
+            )
+
+    async def _forward_message(
+        self,
+        client: TelegramClient,
+        checkpoint_writer: CheckpointWriteBuffer,
+        channel_id: int,
+        message,
+        destination: EntityLike,
+        config: ForwarderConfig,
+        regex_rules,
+        historical_links: Set[str],
+        bot_link_cache: Dict[str, Optional[str]],
+    ) -> None:
+        if self.ledger_store is not None and self.ledger_store.forwarded_ids(channel_id, [message.id]):
+            checkpoint_writer.advance(channel_id, int(message.id))
+            return
+
+        envelope = MessageEnvelope.from_message(channel_id, message)
+        panel_settings = self.config_store.build_panel_settings()
+        _capture_corpus_samples(self.corpus_store, [envelope], panel_settings.rule_lab_corpus_size, self.logger)
+
+        link = None
+        reason = None
+        if config.deduplication_enabled and not envelope.is_service:
+            if not envelope.analysis.share_key:
+                envelope.resolved_url = await _resolve_link_via_bot(
+                    client,
+                    envelope.message_id,
+                    envelope.analysis,
+                    self.logger,
+                    bot_link_cache,
+                )
+            link = _extract_message_quark_link(envelope.analysis, envelope.resolved_url)
+            if link and link in historical_links:
+                reason = "skipped_historical_link"
+                envelope.release_raw()
+
+        if reason is None:
+            reason = await _forward_single_message(
+                client=client,
+                envelope=envelope,
+                destination_channel=destination,
+                keyword_blacklist=config.keyword_blacklist,
+                user_blacklist=config.user_id_blacklist,
+                download_dir=self.config_store.download_dir,
+                logger=self.logger,
+                test_mode_enabled=False,
+                bot_link_cache=bot_link_cache,
+                text_replacement_terms=config.text_replacement_terms,
+                text_replacement_regex_rules=regex_rules,
+            )
+
+        _record_ledger(checkpoint_writer, envelope, reason)
+        if reason == "error":
+            # 失败消息转入重试队列，由之后的轮询运行重发。
+            _queue_failed_send(checkpoint_writer, envelope, self.logger)
+        checkpoint_writer.advance(channel_id, envelope.message_id)
+        self.last_message_at = now_shanghai_iso()
+
+        if reason == "forwarded":
+            self.forwarded_total += 1
+            if link:
+                historical_links.add(link)
+            self.logger.info("⚡ 实时发送成功：源频道 %s，消息 %s", channel_id, envelope.message_id)
+        elif reason == "error":
+            self.logger.error("⚡ 实时发送失败：源频道 %s，消息 %s", channel_id, envelope.message_id)
+        else:
+            self.logger.info("⚡ 实时跳过（%s）：源频道 %s，消息 %s", reason, channel_id, envelope.message_id)
+
+        if reason in {"forwarded", "error"}:
+            await asyncio.sleep(SEND_INTERVAL_SECONDS)
@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+# 各类请求的最小间隔（秒），在全进程所有调用方之间共享。
+REQUEST_CLASS_INTERVALS = {
+    "history": 0.5,
+    "send": 1.0,
+    "download": 0.2,
+    "resolve": 1.5,
+    "bot": 1.0,
+}
+# 子系统优先级，数值越小越优先：转发发送最先，RSS 刷新最后。
+SUBSYSTEM_PRIORITIES = {
+    "forwarder": 0,
+    "realtime": 0,
+    "resolver": 1,
+    "backfill": 2,
+    "rss": 3,
+}
+DEFAULT_SUBSYSTEM = "forwarder"
+# 主会话 t2rss.session 的账号名；账号池中的其他账号各自独立限速与退避。
+PRIMARY_ACCOUNT = ""
+# 迭代拉取时每批消息数，与 Telethon 单次 GetHistory 的条数一致。
+HISTORY_ITER_BATCH_SIZE = 100
+
+_current_subsystem: contextvars.ContextVar[str] = contextvars.ContextVar("request_subsystem", default=DEFAULT_SUBSYSTEM)
+_current_account: contextvars.ContextVar[str] = contextvars.ContextVar("request_account", default=PRIMARY_ACCOUNT)
+
+
+@contextlib.contextmanager
+def subsystem_scope(name: str):
+    """声明当前任务所属的子系统；在其中创建的子任务继承该声明。"""
+    token = _current_subsystem.set(name)
+    try:
+        yield
+    finally:
+        _current_subsystem.reset(token)
+
+
+@contextlib.contextmanager
+def account_scope(name: str):
+    """声明当前请求使用的账号；FloodWait 由 Telegram 按账号计算，限速与退避状态也按账号分开。"""
+    token = _current_account.set(name)
+    try:
+        yield
+    finally:
+        _current_account.reset(token)
+
+
+class _ClassState:
+    __slots__ = ("interval", "next_allowed", "flood_until", "waiters", "condition", "loop")
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_allowed = 0.0
+        self.flood_until = 0.0
+        self.waiters: List[Tuple[int, int]] = []
+        self.condition: Optional[asyncio.Condition] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def ready_at(self) -> float:
+        return max(self.next_allowed, self.flood_until)
+
+
+class RequestGovernor:
+    """全进程共享的 Telegram 请求调度：按请求类别限速，按子系统优先级排队，并共享 FloodWait 退避状态。
+
+    任一调用方遇到 FloodWait 后，同类请求在等待期结束前都会排队，避免 RSS 刷新触发的限流再打到转发发送上。
+    使用账号池时，各账号的限速与退避状态相互独立。
+    """
+
+    def __init__(self, intervals: Optional[Dict[str, float]] = None):
+        self.intervals = dict(intervals or REQUEST_CLASS_INTERVALS)
+        self._states: Dict[Tuple[str, str], _ClassState] = {}
+        self._counter = itertools.count()
+        self._wait_stats: Dict[str, Dict[str, float]] = {}
+        self._flood_events = 0
+
+    def _state(self, method_class: str, account: Optional[str] = None) -> _ClassState:
+        key = (_current_account.get() if account is None else account, method_class)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _ClassState(self.intervals[method_class])
+        return state
+
+    async def wait_turn(self, method_class: str) -> None:
+        state = self._state(method_class)
+        loop = asyncio.get_running_loop()
+        if state.condition is None or state.loop is not loop:
+            # 条件变量绑定事件循环；独立脚本多次 asyncio.run 时按新循环重建。
+            state.condition = asyncio.Condition()
+            state.loop = loop
+            state.waiters = []
+
+        subsystem = _current_subsystem.get()
+        ticket = (SUBSYSTEM_PRIORITIES.get(subsystem, len(SUBSYSTEM_PRIORITIES)), next(self._counter))
+        started = time.monotonic()
+        async with state.condition:
+            heapq.heappush(state.waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    is_head = state.waiters[0] == ticket
+                    if is_head and now >= state.ready_at():
+                        break
+                    timeout = state.ready_at() - now if is_head else None
+                    try:
+                        await asyncio.wait_for(state.condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                state.waiters.remove(ticket)
+                heapq.heapify(state.waiters)
+                state.condition.notify_all()
+            state.next_allowed = time.monotonic() + state.interval
+
+        self._record_wait(subsystem, time.monotonic() - started)
+
+    def report_flood(self, method_class: str, seconds: int) -> None:
+        state = self._state(method_class)
+        state.flood_until = max(state.flood_until, time.monotonic() + max(1, int(seconds)))
+        self._flood_events += 1
+
+    @contextlib.asynccontextmanager
+    async def request(self, method_class: str):
+        """排队等到本类请求可以发出；块内触发 FloodWait 时记录共享退避后继续抛出。"""
+        from telethon.errors import FloodWaitError
+
+        await self.wait_turn(method_class)
+        try:
+            yield
+        except FloodWaitError as exc:
+            self.report_flood(method_class, int(getattr(exc, "seconds", 0) or 0))
+            raise
+
+    async def iterate(self, iterator, method_class: str = "history") -> AsyncIterator[Any]:
+        """包装 iter_messages 等异步迭代：每取一批（约一次请求）前排队一次。"""
+        from telethon.errors import FloodWaitError
+
+        try:
+            await self.wait_turn(method_class)
+            count = 0
+            async for item in iterator:
+                yield item
+                count += 1
+                if count % HISTORY_ITER_BATCH_SIZE == 0:
+                    await self.wait_turn(method_class)
+        except FloodWaitError as exc:
+            self.report_flood(method_class, int(getattr(exc, "seconds", 0) or 0))
+            raise
+
+    def flood_wait_remaining(self, account: str, method_class: str) -> float:
+        state = self._states.get((account, method_class))
+        if state is None:
+            return 0.0
+        return max(0.0, state.flood_until - time.monotonic())
+
+    def status_payload(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        flood_by_account: Dict[str, Dict[str, float]] = {}
+        queued_by_account: Dict[str, Dict[str, int]] = {}
+        for (account, name), state in sorted(self._states.items()):
+            if state.flood_until > now:
+                flood_by_account.setdefault(account, {})[name] = round(state.flood_until - now, 1)
+            if state.waiters:
+                queued_by_account.setdefault(account, {})[name] = len(state.waiters)
+        return {
+            "flood_events": self._flood_events,
+            "flood_wait_remaining": flood_by_account.pop(PRIMARY_ACCOUNT, {}),
+            "queued": queued_by_account.pop(PRIMARY_ACCOUNT, {}),
+            "accounts": {
+                account: {
+                    "flood_wait_remaining": flood_by_account.get(account, {}),
+                    "queued": queued_by_account.get(account, {}),
+                }
+                for account in sorted(set(flood_by_account) | set(queued_by_account))
+            },
+            "subsystems": {
+                name: {
+                    "requests": int(stats["requests"]),
+                    "avg_wait_seconds": round(stats["total_wait"] / stats["requests"], 3) if stats["requests"] else 0.0,
+                    "max_wait_seconds": round(stats["max_wait"], 3),
+                }
+                for name, stats in sorted(self._wait_stats.items())
+            },
+        }
+
+    def _record_wait(self, subsystem: str, waited: float) -> None:
+        stats = self._wait_stats.setdefault(subsystem, {"requests": 0, "total_wait": 0.0, "max_wait": 0.0})
+        stats["requests"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+
+governor = RequestGovernor()
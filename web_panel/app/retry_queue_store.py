@@ -0,0 +1,269 @@
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .message_envelope import MessageEnvelope
+from .time_utils import normalize_to_shanghai_iso, now_shanghai_iso, timestamp_to_shanghai_iso
+
+
+# 失败消息最多尝试的次数（含首次发送），超过后移入死信表。
+RETRY_QUEUE_MAX_ATTEMPTS = 5
+# 退避间隔：第 n 次失败后等待 base * 2^(n-1) 秒，最长不超过上限。
+RETRY_QUEUE_BASE_DELAY_SECONDS = 300
+RETRY_QUEUE_MAX_DELAY_SECONDS = 6 * 3600
+
+RETRY_OUTCOME_QUEUED = "queued"
+RETRY_OUTCOME_DEAD = "dead"
+
+# (channel_id, message_id, payload, resolved_url, last_error, failed_at_ts)
+RetryFailure = Tuple[int, int, bytes, str, str, float]
+
+
+def compute_retry_delay_seconds(attempts: int) -> int:
+    return min(RETRY_QUEUE_MAX_DELAY_SECONDS, RETRY_QUEUE_BASE_DELAY_SECONDS * 2 ** max(0, int(attempts) - 1))
+
+
+class SendRetryQueueStore:
+    """发送失败重试队列：失败消息连同紧凑记录与退避状态落盘，断点照常推进；
+    后续运行先分批重发到期的消息，尝试次数用尽后移入死信表供人工查看。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS send_retry_queue (
+                    channel_id INTEGER NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    resolved_url TEXT NOT NULL DEFAULT '',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_ts REAL NOT NULL,
+                    last_error TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (channel_id, message_id)
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS send_dead_letters (
+                    channel_id INTEGER NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    resolved_url TEXT NOT NULL DEFAULT '',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL,
+                    dead_at TEXT NOT NULL,
+                    PRIMARY KEY (channel_id, message_id)
+                )
+                """
+            )
+            connection.commit()
+
+    def record_failure(
+        self,
+        envelope: MessageEnvelope,
+        last_error: str = "",
+        now_ts: Optional[float] = None,
+    ) -> str:
+        """记录一次发送失败：尝试次数加一并按退避重新排期，用尽次数时移入死信表。"""
+        failure = self.build_failure(envelope, last_error, now_ts)
+        with sqlite3.connect(self.db_path) as connection:
+            outcome = self.apply_failure(connection, failure)
+            connection.commit()
+        return outcome
+
+    @staticmethod
+    def build_failure(envelope: MessageEnvelope, last_error: str = "", now_ts: Optional[float] = None) -> RetryFailure:
+        """把失败消息序列化为待写记录，可稍后在批量事务中写入。"""
+        return (
+            int(envelope.channel_id),
+            int(envelope.message_id),
+            envelope.to_record(),
+            envelope.resolved_url or "",
+            str(last_error or ""),
+            time.time() if now_ts is None else now_ts,
+        )
+
+    @staticmethod
+    def apply_failure(connection: sqlite3.Connection, failure: RetryFailure) -> str:
+        """在调用方的事务内记录一次失败，由调用方提交。"""
+        channel_id, message_id, payload, resolved_url, last_error, now_ts = failure
+        now_text = now_shanghai_iso()
+        key = (channel_id, message_id)
+        row = connection.execute(
+            "SELECT attempts, created_at FROM send_retry_queue WHERE channel_id = ? AND message_id = ?",
+            key,
+        ).fetchone()
+        attempts = (int(row[0]) if row else 0) + 1
+        created_at = str(row[1]) if row else now_text
+
+        if attempts >= RETRY_QUEUE_MAX_ATTEMPTS:
+            connection.execute("DELETE FROM send_retry_queue WHERE channel_id = ? AND message_id = ?", key)
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO send_dead_letters (
+                    channel_id, message_id, payload, resolved_url, attempts, last_error, created_at, dead_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (*key, payload, resolved_url, attempts, last_error, created_at, now_text),
+            )
+            return RETRY_OUTCOME_DEAD
+
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO send_retry_queue (
+                channel_id, message_id, payload, resolved_url, attempts,
+                next_attempt_ts, last_error, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                *key,
+                payload,
+                resolved_url,
+                attempts,
+                now_ts + compute_retry_delay_seconds(attempts),
+                last_error,
+                created_at,
+                now_text,
+            ),
+        )
+        return RETRY_OUTCOME_QUEUED
+
+    def load_due(self, limit: int, now_ts: Optional[float] = None) -> List[MessageEnvelope]:
+        """按到期先后读回一批已到重试时间的消息，同一频道内保持消息 ID 顺序。"""
+        now_ts = time.time() if now_ts is None else now_ts
+        with sqlite3.connect(self.db_path) as connection:
+            rows = connection.execute(
+                """
+                SELECT channel_id, message_id, payload, resolved_url, attempts FROM send_retry_queue
+                WHERE next_attempt_ts <= ?
+                ORDER BY next_attempt_ts ASC, channel_id ASC, message_id ASC
+                LIMIT ?
+                """,
+                (now_ts, max(1, int(limit))),
+            ).fetchall()
+
+        envelopes = []
+        for channel_id, message_id, payload, resolved_url, attempts in rows:
+            envelope = MessageEnvelope.from_record(int(channel_id), int(message_id), payload, resolved_url)
+            envelope.retry_attempts = int(attempts)
+            envelopes.append(envelope)
+        envelopes.sort(key=lambda envelope: (envelope.channel_id, envelope.message_id))
+        return envelopes
+
+    def remove(self, channel_id: int, message_id: int) -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            self.apply_removals(connection, [(int(channel_id), int(message_id))])
+            connection.commit()
+
+    @staticmethod
+    def apply_removals(connection: sqlite3.Connection, keys: List[Tuple[int, int]]) -> None:
+        """在调用方的事务内删除重试记录，由调用方提交。"""
+        connection.executemany("DELETE FROM send_retry_queue WHERE channel_id = ? AND message_id = ?", keys)
+
+    def counts(self) -> Tuple[int, int]:
+        """返回 (待重试条数, 死信条数)。"""
+        with sqlite3.connect(self.db_path) as connection:
+            pending = connection.execute("SELECT COUNT(*) FROM send_retry_queue").fetchone()
+            dead = connection.execute("SELECT COUNT(*) FROM send_dead_letters").fetchone()
+        return int(pending[0]), int(dead[0])
+
+    def list_pending(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                """
+                SELECT channel_id, message_id, payload, attempts, next_attempt_ts, last_error, created_at, updated_at
+                FROM send_retry_queue
+                ORDER BY next_attempt_ts ASC
+                LIMIT ?
+                """,
+                (max(1, int(limit)),),
+            ).fetchall()
+
+        items = []
+        for row in rows:
+            item = self._row_summary(row)
+            item["next_attempt_at"] = timestamp_to_shanghai_iso(float(row["next_attempt_ts"]))
+            item["updated_at"] = normalize_to_shanghai_iso(row["updated_at"])
+            items.append(item)
+        return items
+
+    def list_dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                """
+                SELECT channel_id, message_id, payload, attempts, last_error, created_at, dead_at
+                FROM send_dead_letters
+                ORDER BY dead_at DESC
+                LIMIT ?
+                """,
+                (max(1, int(limit)),),
+            ).fetchall()
+
+        items = []
+        for row in rows:
+            item = self._row_summary(row)
+            item["dead_at"] = normalize_to_shanghai_iso(row["dead_at"])
+            items.append(item)
+        return items
+
+    def requeue_dead_letter(self, channel_id: int, message_id: int, now_ts: Optional[float] = None) -> bool:
+        """把死信移回重试队列，尝试次数清零，下次运行立即重发。"""
+        now_ts = time.time() if now_ts is None else now_ts
+        key = (int(channel_id), int(message_id))
+        with sqlite3.connect(self.db_path) as connection:
+            row = connection.execute(
+                "SELECT payload, resolved_url, last_error, created_at FROM send_dead_letters WHERE channel_id = ? AND message_id = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return False
+
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO send_retry_queue (
+                    channel_id, message_id, payload, resolved_url, attempts,
+                    next_attempt_ts, last_error, created_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)
+                """,
+                (*key, row[0], row[1], now_ts, row[2], row[3], now_shanghai_iso()),
+            )
+            connection.execute("DELETE FROM send_dead_letters WHERE channel_id = ? AND message_id = ?", key)
+            connection.commit()
+        return True
+
+    def delete_dead_letter(self, channel_id: int, message_id: int) -> bool:
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute(
+                "DELETE FROM send_dead_letters WHERE channel_id = ? AND message_id = ?",
+                (int(channel_id), int(message_id)),
+            )
+            connection.commit()
+            return cursor.rowcount > 0
+
+    @staticmethod
+    def _row_summary(row: sqlite3.Row) -> Dict[str, Any]:
+        envelope = MessageEnvelope.from_record(int(row["channel_id"]), int(row["message_id"]), row["payload"])
+        text = envelope.analysis.text or ""
+        return {
+            "channel_id": int(row["channel_id"]),
+            "message_id": int(row["message_id"]),
+            "attempts": int(row["attempts"]),
+            "last_error": str(row["last_error"] or ""),
+            "text_preview": text[:80] + ("…" if len(text) > 80 else ""),
+            "has_media": envelope.media is not None,
+            "created_at": normalize_to_shanghai_iso(row["created_at"]),
+        }
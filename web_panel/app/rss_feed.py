@@ -0,0 +1,591 @@
+from __future__ import annotations
+
+import asyncio
+import html
+import re
+import secrets
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from .client_manager import SessionUnauthorizedError, TelegramClientManager, open_telegram_client
+from .config_store import ConfigStore
+from .message_analysis import message_text_of
+from .request_governor import governor, subsystem_scope
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+
+
+RSS_BACKGROUND_REFRESH_TIMEOUT_SECONDS = 300
+RSS_IMAGE_DISPLAY_WIDTH = 720
+RSS_IMAGE_DISPLAY_MAX_HEIGHT = 960
+RSS_IMAGE_JPEG_QUALITY = 85
+RSS_IMAGE_CACHE_VERSION = f"img{RSS_IMAGE_DISPLAY_WIDTH}x{RSS_IMAGE_DISPLAY_MAX_HEIGHT}"
+RSS_HTTP_URL_RE = re.compile(r"https?://[^\s<>\"']+", re.IGNORECASE)
+RSS_URL_TRAILING_CHARS = ".,;:!?)]}，。！？、；：）】》"
+RSS_MEDIA_FILENAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+RSS_IMAGE_EXT_BY_MIME = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+RSS_IMAGE_MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+def build_tme_link(channel_text: str) -> tuple[str, str]:
+    raw = str(channel_text or "").strip()
+    if not raw:
+        return "", ""
+
+    if raw.startswith("https://t.me/") or raw.startswith("http://t.me/"):
+        url = raw.replace("http://", "https://", 1)
+        display = url.replace("https://", "", 1)
+        return display, url
+
+    token = raw.lstrip("@")
+    if not token:
+        return "", ""
+
+    url = f"https://t.me/{token}"
+    display = f"t.me/{token}"
+    return display, url
+
+
+def build_rss_url(base_url: str, token: str) -> str:
+    return f"{base_url}/rss/{token}.xml"
+
+
+def build_message_link(destination_channel: str, message_id: int) -> str:
+    raw = str(destination_channel or "").strip()
+    if not raw:
+        return ""
+
+    if raw.startswith("https://t.me/") or raw.startswith("http://t.me/"):
+        base = raw.replace("http://", "https://", 1).rstrip("/")
+        return f"{base}/{message_id}"
+
+    token = raw.lstrip("@").strip()
+    if not token:
+        return ""
+    return f"https://t.me/{token}/{message_id}"
+
+
+def xml_escape(value: Any) -> str:
+    return html.escape(str(value or ""), quote=True)
+
+
+def safe_rss_limit(raw_value: str) -> int:
+    try:
+        parsed = int(str(raw_value or "").strip())
+    except ValueError:
+        return 500
+    return max(50, min(parsed, 2000))
+
+
+def message_text_for_feed(message) -> str:
+    return message_text_of(message)
+
+
+def rss_title_from_text(text: str, fallback: str) -> str:
+    for line in str(text or "").splitlines():
+        cleaned = line.strip()
+        if cleaned:
+            return cleaned
+    return fallback
+
+
+def rss_pub_date(message) -> str:
+    date_value = getattr(message, "date", None)
+    if not date_value:
+        return format_datetime(datetime.now(timezone.utc))
+    if date_value.tzinfo is None:
+        date_value = date_value.replace(tzinfo=timezone.utc)
+    return format_datetime(date_value)
+
+
+def rss_linkify_plain_text(raw: str) -> str:
+    pieces: list[str] = []
+    position = 0
+    for match in RSS_HTTP_URL_RE.finditer(str(raw or "")):
+        url = match.group(0)
+        while url and url[-1] in RSS_URL_TRAILING_CHARS:
+            url = url[:-1]
+        if not url:
+            continue
+
+        link_end = match.start() + len(url)
+        pieces.append(html.escape(raw[position : match.start()], quote=False))
+        escaped_href = html.escape(url, quote=True)
+        pieces.append(f'<a href="{escaped_href}">{html.escape(url, quote=False)}</a>')
+        pieces.append(html.escape(raw[link_end : match.end()], quote=False))
+        position = match.end()
+
+    pieces.append(html.escape(raw[position:], quote=False))
+    return "".join(pieces)
+
+
+def rss_utf16_boundaries(text: str) -> dict[int, int]:
+    boundaries = {0: 0}
+    units = 0
+    for index, char in enumerate(str(text or "")):
+        units += len(char.encode("utf-16-le")) // 2
+        boundaries[units] = index + 1
+    return boundaries
+
+
+def rss_entity_text_map(message) -> dict[int, str]:
+    get_entities_text = getattr(message, "get_entities_text", None)
+    if not callable(get_entities_text):
+        return {}
+
+    from telethon.tl.types import MessageEntityTextUrl, MessageEntityUrl
+
+    results: dict[int, str] = {}
+    for entity_type in (MessageEntityTextUrl, MessageEntityUrl):
+        try:
+            pairs = get_entities_text(entity_type)
+        except Exception:
+            continue
+        try:
+            iterator = iter(pairs)
+        except TypeError:
+            continue
+        for pair in iterator:
+            if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+                continue
+            entity, entity_text = pair
+            results[id(entity)] = str(entity_text or "")
+    return results
+
+
+def rss_entity_span(content: str, entity, expected_text: str, utf16_boundaries: dict[int, int]) -> tuple[int, int] | None:
+    offset = int(getattr(entity, "offset", 0) or 0)
+    length = int(getattr(entity, "length", 0) or 0)
+    if length <= 0 or offset < 0:
+        return None
+
+    raw_span = None
+    raw_end = offset + length
+    if raw_end <= len(content):
+        raw_span = (offset, raw_end)
+
+    utf16_span = None
+    utf16_start = utf16_boundaries.get(offset)
+    utf16_end = utf16_boundaries.get(raw_end)
+    if utf16_start is not None and utf16_end is not None and utf16_start <= utf16_end:
+        utf16_span = (utf16_start, utf16_end)
+
+    if expected_text:
+        if utf16_span and content[utf16_span[0] : utf16_span[1]] == expected_text:
+            return utf16_span
+        if raw_span and content[raw_span[0] : raw_span[1]] == expected_text:
+            return raw_span
+
+    if utf16_span and raw_span and utf16_span != raw_span:
+        if any(ord(char) > 0xFFFF for char in content[:offset]):
+            return utf16_span
+
+    return raw_span or utf16_span
+
+
+def rss_link_entities_from_message(message, text: str) -> list[tuple[int, int, str]]:
+    content = str(text or "")
+    if not content:
+        return []
+
+    from telethon.tl.types import MessageEntityTextUrl, MessageEntityUrl
+
+    candidates: list[tuple[int, int, str]] = []
+    utf16_boundaries = rss_utf16_boundaries(content)
+    expected_by_entity = rss_entity_text_map(message)
+    for entity in getattr(message, "entities", None) or []:
+        if isinstance(entity, MessageEntityTextUrl):
+            href = str(getattr(entity, "url", "") or "").strip()
+        elif isinstance(entity, MessageEntityUrl):
+            href = ""
+        else:
+            continue
+
+        expected_text = expected_by_entity.get(id(entity), "")
+        span = rss_entity_span(content, entity, expected_text, utf16_boundaries)
+        if not span:
+            continue
+
+        start, end = span
+        if isinstance(entity, MessageEntityUrl):
+            href = content[start:end].strip()
+        if not href:
+            continue
+        candidates.append((start, end, href))
+
+    results: list[tuple[int, int, str]] = []
+    cursor = 0
+    for start, end, href in sorted(candidates, key=lambda item: (item[0], item[1])):
+        if start < cursor:
+            continue
+        results.append((start, end, href))
+        cursor = end
+    return results
+
+
+def rss_description_cdata(text: str, image_url: str = "", link_entities: list[tuple[int, int, str]] | None = None) -> str:
+    raw = str(text or "（媒体消息）")
+    pieces: list[str] = []
+
+    if image_url:
+        escaped_image_url = html.escape(image_url, quote=True)
+        pieces.append(
+            (
+                f'<p><img src="{escaped_image_url}" alt="" width="{RSS_IMAGE_DISPLAY_WIDTH}" '
+                f'style="width:100%;max-width:{RSS_IMAGE_DISPLAY_WIDTH}px;'
+                f'height:auto;max-height:{RSS_IMAGE_DISPLAY_MAX_HEIGHT}px;'
+                'object-fit:contain;display:block;margin:0 0 12px 0;border-radius:8px;" /></p>'
+            )
+        )
+
+    position = 0
+    for start, end, href in link_entities or []:
+        if start < position or end > len(raw):
+            continue
+        pieces.append(rss_linkify_plain_text(raw[position:start]))
+        anchor_text = raw[start:end]
+        escaped_href = html.escape(href, quote=True)
+        pieces.append(f'<a href="{escaped_href}">{html.escape(anchor_text, quote=False)}</a>')
+        position = end
+
+    pieces.append(rss_linkify_plain_text(raw[position:]))
+    html_body = "".join(pieces).replace("\n", "<br />")
+    return f"<![CDATA[{html_body.replace(']]>', ']]]]><![CDATA[>')}]]>"
+
+
+class RssRefreshUnavailable(Exception):
+    pass
+
+
+def rss_cache_file(feed_store: ConfigStore) -> Path:
+    return feed_store.state_dir / "rss_feed.xml"
+
+
+def rss_media_dir(feed_store: ConfigStore) -> Path:
+    return feed_store.state_dir / "rss_media"
+
+
+def rss_media_type_for_path(path: Path) -> str:
+    return RSS_IMAGE_MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
+
+
+def build_rss_media_url(base_url: str, token: str, filename: str) -> str:
+    return f"{base_url}/rss-media/{token}/{filename}"
+
+
+def rss_media_payload(path: Path, base_url: str, token: str) -> Dict[str, Any]:
+    return {
+        "filename": path.name,
+        "url": build_rss_media_url(base_url, token, path.name),
+        "length": path.stat().st_size,
+        "mime_type": rss_media_type_for_path(path),
+    }
+
+
+def rss_message_image_metadata(message) -> tuple[str, str] | None:
+    if getattr(message, "photo", None):
+        return ".jpg", "image/jpeg"
+
+    file_info = getattr(message, "file", None)
+    mime_type = str(getattr(file_info, "mime_type", "") or "").lower()
+    if mime_type.startswith("image/"):
+        ext = str(getattr(file_info, "ext", "") or "").lower()
+        if ext == ".jpe":
+            ext = ".jpg"
+        if ext not in RSS_IMAGE_MEDIA_TYPES:
+            ext = RSS_IMAGE_EXT_BY_MIME.get(mime_type, ".jpg")
+        return ext, RSS_IMAGE_MEDIA_TYPES.get(ext, mime_type)
+
+    media = getattr(message, "media", None)
+    if getattr(media, "photo", None):
+        return ".jpg", "image/jpeg"
+
+    webpage = getattr(media, "webpage", None)
+    if getattr(webpage, "photo", None):
+        return ".jpg", "image/jpeg"
+
+    return None
+
+
+def rss_media_prefix(destination_channel: str, message_id: int) -> str:
+    channel_slug = re.sub(r"[^A-Za-z0-9_-]+", "_", str(destination_channel or "channel")).strip("_")
+    channel_slug = channel_slug[:80] or "channel"
+    return f"{channel_slug}_{message_id}_{RSS_IMAGE_CACHE_VERSION}"
+
+
+def standardize_rss_image_payload(payload: bytes, fallback_ext: str, fallback_mime_type: str) -> tuple[bytes, str, str]:
+    # Pillow 只在缓存条目图片时才需要，首次转码时导入。
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(BytesIO(payload)) as image:
+            image = ImageOps.exif_transpose(image)
+            resampling_filter = getattr(getattr(Image, "Resampling", Image), "LANCZOS")
+            image.thumbnail((RSS_IMAGE_DISPLAY_WIDTH, RSS_IMAGE_DISPLAY_MAX_HEIGHT), resampling_filter)
+
+            if image.mode in {"RGBA", "LA"} or (image.mode == "P" and "transparency" in image.info):
+                alpha = image.convert("RGBA").getchannel("A")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image.convert("RGBA"), mask=alpha)
+                image = background
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+
+            output = BytesIO()
+            image.save(
+                output,
+                format="JPEG",
+                quality=RSS_IMAGE_JPEG_QUALITY,
+                optimize=True,
+                progressive=True,
+            )
+            return output.getvalue(), ".jpg", "image/jpeg"
+    except (OSError, ValueError, UnidentifiedImageError):
+        return payload, fallback_ext, fallback_mime_type
+
+
+async def cache_rss_message_image(
+    client: TelegramClient,
+    message,
+    base_url: str,
+    token: str,
+    destination_channel: str,
+    feed_store: ConfigStore,
+) -> Dict[str, Any] | None:
+    metadata = rss_message_image_metadata(message)
+    if not metadata:
+        return None
+
+    message_id = int(getattr(message, "id", 0) or 0)
+    if message_id <= 0:
+        return None
+
+    ext, mime_type = metadata
+    media_dir = rss_media_dir(feed_store)
+    media_dir.mkdir(parents=True, exist_ok=True)
+    prefix = rss_media_prefix(destination_channel, message_id)
+
+    for existing in media_dir.glob(f"{prefix}.*"):
+        if existing.is_file() and existing.suffix.lower() in RSS_IMAGE_MEDIA_TYPES:
+            return rss_media_payload(existing, base_url, token)
+
+    temporary_path = media_dir / f"{prefix}.{secrets.token_hex(8)}.tmp"
+    try:
+        async with governor.request("download"):
+            payload = await client.download_media(message, file=bytes)
+        if not payload:
+            return None
+        payload, ext, mime_type = standardize_rss_image_payload(payload, ext, mime_type)
+        target_path = media_dir / f"{prefix}{ext}"
+        temporary_path.write_bytes(payload)
+        temporary_path.replace(target_path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+    return {
+        "filename": target_path.name,
+        "url": build_rss_media_url(base_url, token, target_path.name),
+        "length": target_path.stat().st_size,
+        "mime_type": mime_type,
+    }
+
+
+def cleanup_stale_rss_media(feed_store: ConfigStore, active_filenames: set[str]) -> None:
+    media_dir = rss_media_dir(feed_store)
+    if not media_dir.exists():
+        return
+    for item in media_dir.iterdir():
+        if not item.is_file():
+            continue
+        if item.name in active_filenames:
+            continue
+        if item.suffix.lower() not in RSS_IMAGE_MEDIA_TYPES and item.suffix.lower() != ".tmp":
+            continue
+        try:
+            item.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def read_rss_cache(feed_store: ConfigStore) -> str | None:
+    path = rss_cache_file(feed_store)
+    if not path.exists():
+        return None
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def write_rss_cache(feed_store: ConfigStore, content: str) -> None:
+    path = rss_cache_file(feed_store)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.{secrets.token_hex(8)}.tmp")
+    temporary_path.write_text(content, encoding="utf-8")
+    temporary_path.replace(path)
+
+
+def build_rss_xml(
+    base_url: str,
+    token: str,
+    raw_config: Dict[str, str],
+    items_xml: list[str],
+    note: str = "T2RSS 目标频道消息订阅",
+) -> str:
+    destination_channel = str(raw_config.get("DESTINATION_CHANNEL", "")).strip()
+    destination_display, destination_url = build_tme_link(destination_channel)
+    feed_title = f"T2RSS - {destination_display or destination_channel or 'Feed'}"
+    feed_link = destination_url or base_url
+    self_url = build_rss_url(base_url, token)
+
+    return "\n".join(
+        [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:content="http://purl.org/rss/1.0/modules/content/">',
+            "  <channel>",
+            f"    <title>{xml_escape(feed_title)}</title>",
+            f"    <link>{xml_escape(feed_link)}</link>",
+            f"    <atom:link href=\"{xml_escape(self_url)}\" rel=\"self\" type=\"application/rss+xml\" />",
+            f"    <description>{xml_escape(note)}</description>",
+            "    <language>zh-CN</language>",
+            f"    <lastBuildDate>{xml_escape(format_datetime(datetime.now(timezone.utc)))}</lastBuildDate>",
+            *items_xml,
+            "  </channel>",
+            "</rss>",
+        ]
+    )
+
+
+async def build_live_rss_xml(
+    feed_store: ConfigStore,
+    base_url: str,
+    token: str,
+    raw_config: Dict[str, str],
+    logger,
+    client_manager: Optional[TelegramClientManager] = None,
+) -> str:
+    """读取目标频道最近消息生成 RSS，主图按需下载并缓存到该任务的 rss_media 目录。"""
+    api_id = str(raw_config.get("API_ID", "")).strip()
+    api_hash = str(raw_config.get("API_HASH", "")).strip()
+    destination_channel = str(raw_config.get("DESTINATION_CHANNEL", "")).strip()
+    if not api_id or not api_hash or not destination_channel:
+        raise RssRefreshUnavailable("RSS 尚未配置 API 或目标频道")
+    if not feed_store.session_file.exists():
+        raise RssRefreshUnavailable("Telegram 会话缺失，暂时无法刷新 RSS")
+
+    try:
+        int(api_id)
+    except ValueError as exc:
+        raise RssRefreshUnavailable("API_ID 无效，暂时无法刷新 RSS") from exc
+    item_limit = safe_rss_limit(raw_config.get("PANEL_RSS_ITEM_LIMIT", "500"))
+    _, destination_url = build_tme_link(destination_channel)
+    feed_link = destination_url or base_url
+    items_xml: list[str] = []
+    active_image_filenames: set[str] = set()
+    image_download_failed = False
+
+    with subsystem_scope("rss"):
+        try:
+            async with open_telegram_client(feed_store, client_manager) as client:
+                async for message in governor.iterate(client.iter_messages(destination_channel, limit=item_limit)):
+                    message_id = int(getattr(message, "id", 0) or 0)
+                    text = message_text_for_feed(message)
+                    title = rss_title_from_text(text, f"Telegram 消息 {message_id}")
+                    link = build_message_link(destination_channel, message_id) or feed_link
+                    image_info = None
+                    try:
+                        image_info = await cache_rss_message_image(
+                            client,
+                            message,
+                            base_url,
+                            token,
+                            destination_channel,
+                            feed_store,
+                        )
+                    except Exception as exc:
+                        image_download_failed = True
+                        logger.warning("RSS 图片缓存失败，消息 %s：%s", message_id, exc)
+
+                    if image_info:
+                        active_image_filenames.add(str(image_info["filename"]))
+
+                    link_entities = rss_link_entities_from_message(message, text)
+                    description = rss_description_cdata(
+                        text,
+                        str(image_info["url"]) if image_info else "",
+                        link_entities,
+                    )
+                    guid = link or f"t2rss:{destination_channel}:{message_id}"
+                    pub_date = rss_pub_date(message)
+
+                    item_lines = [
+                        "    <item>",
+                        f"      <title>{xml_escape(title)}</title>",
+                        f"      <link>{xml_escape(link)}</link>",
+                        f"      <guid isPermaLink=\"false\">{xml_escape(guid)}</guid>",
+                        f"      <pubDate>{xml_escape(pub_date)}</pubDate>",
+                    ]
+                    if image_info:
+                        item_lines.append(
+                            (
+                                f"      <enclosure url=\"{xml_escape(str(image_info['url']))}\" "
+                                f"length=\"{int(image_info['length'])}\" "
+                                f"type=\"{xml_escape(str(image_info['mime_type']))}\" />"
+                            )
+                        )
+                    item_lines.extend(
+                        [
+                            f"      <description>{description}</description>",
+                            f"      <content:encoded>{description}</content:encoded>",
+                            "    </item>",
+                        ]
+                    )
+
+                    items_xml.append("\n".join(item_lines))
+        except SessionUnauthorizedError as exc:
+            raise RssRefreshUnavailable("Telegram 会话未授权，暂时无法刷新 RSS") from exc
+
+    if not image_download_failed:
+        cleanup_stale_rss_media(feed_store, active_image_filenames)
+
+    return build_rss_xml(base_url, token, raw_config, items_xml)
+
+
+async def refresh_rss_cache_in_background(
+    feed_store: ConfigStore,
+    base_url: str,
+    token: str,
+    raw_config: Dict[str, str],
+    logger,
+    client_manager: Optional[TelegramClientManager] = None,
+) -> bool:
+    """刷新 RSS 缓存文件，成功返回 True；失败时保留旧缓存。"""
+    try:
+        rss_xml = await asyncio.wait_for(
+            build_live_rss_xml(feed_store, base_url, token, raw_config, logger, client_manager),
+            timeout=RSS_BACKGROUND_REFRESH_TIMEOUT_SECONDS,
+        )
+        write_rss_cache(feed_store, rss_xml)
+        return True
+    except RssRefreshUnavailable as exc:
+        logger.info("RSS 后台刷新不可用，已保留旧缓存：%s", exc)
+    except asyncio.TimeoutError:
+        logger.warning("RSS 后台刷新超过 %s 秒，已保留旧缓存。", RSS_BACKGROUND_REFRESH_TIMEOUT_SECONDS)
+    except Exception:
+        logger.exception("RSS 后台刷新失败，已保留旧缓存。")
+    return False
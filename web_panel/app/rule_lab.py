@@ -0,0 +1,221 @@
+import difflib
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .message_analysis import analysis_from_record
+from .text_pipeline import _apply_text_replacements, _replace_quark_trigger_segment, build_outbound_text, screen_message
+
+
+RULE_LAB_PARALLEL_THRESHOLD = 2000
+RULE_LAB_CHUNK_SIZE = 500
+RULE_LAB_MAX_WORKERS = 4
+RULE_LAB_DIFF_LIMIT = 30
+RULE_LAB_BLOCKED_SAMPLE_LIMIT = 30
+# 实验室不连接 Telegram，含触发词与跳转 Bot 链接的消息用占位链接代替 Bot 返回的夸克链接，以便预览触发词替换。
+RULE_LAB_RESOLVED_URL_PLACEHOLDER = "https://pan.quark.cn/s/（Bot解析结果）"
+
+RuleSpec = Tuple[str, str]
+
+
+def build_rule_specs(
+    keyword_blacklist: List[str],
+    replacement_terms: List[str],
+    replacement_regex_text: str,
+) -> Tuple[List[RuleSpec], List[Dict[str, str]]]:
+    """把规则集展开为按执行顺序排列的 (类型, 规则) 列表，并收集无效正则。"""
+    rules: List[RuleSpec] = []
+    invalid: List[Dict[str, str]] = []
+
+    for keyword in keyword_blacklist:
+        token = str(keyword or "").strip().lower()
+        if token:
+            rules.append(("keyword", token))
+
+    for term in replacement_terms:
+        token = str(term or "")
+        if token:
+            rules.append(("term", token))
+
+    for raw_pattern in str(replacement_regex_text or "").splitlines():
+        pattern = raw_pattern.strip()
+        if not pattern:
+            continue
+        try:
+            re.compile(pattern)
+        except re.error as exc:
+            invalid.append({"pattern": pattern, "error": str(exc)})
+            continue
+        rules.append(("regex", pattern))
+
+    return rules, invalid
+
+
+def _empty_chunk_result(rule_count: int) -> Dict[str, Any]:
+    return {
+        "processed": 0,
+        "blocked": 0,
+        "changed": 0,
+        "rule_hits": [0] * rule_count,
+        "rule_matches": [0] * rule_count,
+        "rule_cpu_ns": [0] * rule_count,
+        "diffs": [],
+        "blocked_samples": [],
+    }
+
+
+def _build_diff_text(before: str, after: str) -> str:
+    lines = difflib.unified_diff(before.splitlines(), after.splitlines(), lineterm="", n=1)
+    return "\n".join(line for line in lines if not line.startswith(("---", "+++")))
+
+
+def _evaluate_chunk(samples: List[Dict[str, Any]], rules: List[RuleSpec], user_blacklist: Set[int]) -> Dict[str, Any]:
+    """在单个进程内评估一批语料：过滤与改写调用转发流程同一组函数，另逐条规则统计命中与 CPU 耗时。"""
+    result = _empty_chunk_result(len(rules))
+    compiled = [re.compile(pattern) if kind == "regex" else None for kind, pattern in rules]
+    keyword_blacklist = [pattern for kind, pattern in rules if kind == "keyword"]
+    replacement_terms = [pattern for kind, pattern in rules if kind == "term"]
+    replacement_regex_rules = [rule for rule in compiled if rule is not None]
+    rule_hits = result["rule_hits"]
+    rule_matches = result["rule_matches"]
+    rule_cpu_ns = result["rule_cpu_ns"]
+
+    for sample in samples:
+        text = str(sample.get("text", "") or "")
+        analysis = analysis_from_record(sample.get("analysis") or {"text": text})
+        blocked_by: Optional[str] = None
+        result["processed"] += 1
+
+        for index, (kind, pattern) in enumerate(rules):
+            if kind != "keyword":
+                continue
+            started = time.process_time_ns()
+            hit = pattern in analysis.lower_text
+            rule_cpu_ns[index] += time.process_time_ns() - started
+            if hit:
+                rule_hits[index] += 1
+                rule_matches[index] += 1
+                if blocked_by is None:
+                    blocked_by = pattern
+
+        skip_reason = screen_message(analysis, False, keyword_blacklist, user_blacklist)
+        if skip_reason:
+            result["blocked"] += 1
+            if len(result["blocked_samples"]) < RULE_LAB_BLOCKED_SAMPLE_LIMIT:
+                result["blocked_samples"].append(
+                    {
+                        "channel_id": sample.get("channel_id"),
+                        "message_id": sample.get("message_id"),
+                        "keyword": blocked_by if skip_reason == "skipped_keyword" else skip_reason,
+                    }
+                )
+            continue
+
+        resolved_url = (
+            RULE_LAB_RESOLVED_URL_PLACEHOLDER if analysis.has_trigger_phrase and analysis.trigger_bot_links else None
+        )
+        # 逐条规则统计：与 build_outbound_text 第一轮相同，先替换触发词，再按顺序执行择词与正则。
+        updated = _replace_quark_trigger_segment(analysis.text, resolved_url) if resolved_url else analysis.text
+        for index, (kind, pattern) in enumerate(rules):
+            if kind == "keyword":
+                continue
+            started = time.process_time_ns()
+            if kind == "term":
+                updated, hit_count, _ = _apply_text_replacements(updated, [pattern], [])
+            else:
+                updated, _, hit_count = _apply_text_replacements(updated, [], [compiled[index]])
+            rule_cpu_ns[index] += time.process_time_ns() - started
+            if hit_count > 0:
+                rule_hits[index] += 1
+                rule_matches[index] += int(hit_count)
+
+        prepared = build_outbound_text(
+            analysis,
+            bool(sample.get("has_entities")),
+            resolved_url,
+            replacement_terms,
+            replacement_regex_rules,
+        )
+        outbound_text = prepared.text or ""
+        if outbound_text != text:
+            result["changed"] += 1
+            if len(result["diffs"]) < RULE_LAB_DIFF_LIMIT:
+                result["diffs"].append(
+                    {
+                        "channel_id": sample.get("channel_id"),
+                        "message_id": sample.get("message_id"),
+                        "before": text,
+                        "after": outbound_text,
+                        "diff": _build_diff_text(text, outbound_text),
+                    }
+                )
+
+    return result
+
+
+def _merge_chunk_results(target: Dict[str, Any], chunk: Dict[str, Any]) -> None:
+    target["processed"] += chunk["processed"]
+    target["blocked"] += chunk["blocked"]
+    target["changed"] += chunk["changed"]
+    for key in ("rule_hits", "rule_matches", "rule_cpu_ns"):
+        target[key] = [left + right for left, right in zip(target[key], chunk[key])]
+    target["diffs"].extend(chunk["diffs"][: max(0, RULE_LAB_DIFF_LIMIT - len(target["diffs"]))])
+    target["blocked_samples"].extend(
+        chunk["blocked_samples"][: max(0, RULE_LAB_BLOCKED_SAMPLE_LIMIT - len(target["blocked_samples"]))]
+    )
+
+
+def evaluate_rule_set(
+    samples: List[Dict[str, Any]],
+    keyword_blacklist: List[str],
+    replacement_terms: List[str],
+    replacement_regex_text: str,
+    user_blacklist: Optional[Set[int]] = None,
+    max_workers: int = RULE_LAB_MAX_WORKERS,
+) -> Dict[str, Any]:
+    """对本地语料批量评估一组候选规则，语料较大时分块交给工作进程并行执行；用户黑名单沿用当前转发配置。"""
+    user_blacklist = set(user_blacklist or set())
+    rules, invalid_regex = build_rule_specs(keyword_blacklist, replacement_terms, replacement_regex_text)
+    merged = _empty_chunk_result(len(rules))
+    worker_count = 1
+
+    wall_started = time.perf_counter()
+    if len(samples) >= RULE_LAB_PARALLEL_THRESHOLD and max_workers > 1:
+        chunks = [samples[index : index + RULE_LAB_CHUNK_SIZE] for index in range(0, len(samples), RULE_LAB_CHUNK_SIZE)]
+        worker_count = min(max_workers, len(chunks))
+        # 面板进程内有事件循环与线程，使用 spawn 避免 fork 继承锁状态。
+        with ProcessPoolExecutor(max_workers=worker_count, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for chunk_result in pool.map(_evaluate_chunk, chunks, [rules] * len(chunks), [user_blacklist] * len(chunks)):
+                _merge_chunk_results(merged, chunk_result)
+    elif samples:
+        _merge_chunk_results(merged, _evaluate_chunk(samples, rules, user_blacklist))
+    wall_seconds = time.perf_counter() - wall_started
+
+    rule_rows: List[Dict[str, Any]] = []
+    for index, (kind, pattern) in enumerate(rules):
+        rule_rows.append(
+            {
+                "kind": kind,
+                "pattern": pattern,
+                "hits": merged["rule_hits"][index],
+                "matches": merged["rule_matches"][index],
+                "cpu_ms": round(merged["rule_cpu_ns"][index] / 1_000_000, 3),
+            }
+        )
+
+    return {
+        "sample_total": len(samples),
+        "processed": merged["processed"],
+        "blocked": merged["blocked"],
+        "changed": merged["changed"],
+        "unchanged": merged["processed"] - merged["blocked"] - merged["changed"],
+        "rules": rule_rows,
+        "invalid_regex": invalid_regex,
+        "diffs": merged["diffs"],
+        "blocked_samples": merged["blocked_samples"],
+        "workers": worker_count,
+        "wall_seconds": round(wall_seconds, 3),
+        "messages_per_second": round(merged["processed"] / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+    }
@@ -0,0 +1,188 @@
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .message_envelope import MessageEnvelope
+from .time_utils import now_shanghai_iso
+
+
+MessageKey = Tuple[int, int]
+
+
+class StagingQueueStore:
+    """待处理消息暂存队列：抓取结果以紧凑记录落盘，按块读回处理，中断后可直接续跑而无需重新抓取。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS staging_queue (
+                    channel_id INTEGER NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    resolved_url TEXT NOT NULL DEFAULT '',
+                    staged_at TEXT NOT NULL,
+                    PRIMARY KEY (channel_id, message_id)
+                )
+                """
+            )
+            # 每个频道暂存积压所基于的断点；断点被回拨到它之前时，已暂存的消息不再连续，需要整体丢弃重抓。
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS staging_base (
+                    channel_id INTEGER PRIMARY KEY,
+                    base_id INTEGER NOT NULL
+                )
+                """
+            )
+            connection.commit()
+
+    def add_envelopes(self, envelopes: Iterable[MessageEnvelope]) -> int:
+        payload = [
+            (envelope.channel_id, envelope.message_id, envelope.to_record(), envelope.resolved_url or "", now_shanghai_iso())
+            for envelope in envelopes
+        ]
+        if not payload:
+            return 0
+
+        with sqlite3.connect(self.db_path) as connection:
+            before = connection.total_changes
+            connection.executemany(
+                """
+                INSERT OR IGNORE INTO staging_queue (channel_id, message_id, payload, resolved_url, staged_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                payload,
+            )
+            inserted = connection.total_changes - before
+            connection.commit()
+        return inserted
+
+    def channel_backlog(self, channel_id: int) -> Tuple[int, int]:
+        """返回 (暂存条数, 暂存最大消息 ID)。"""
+        with sqlite3.connect(self.db_path) as connection:
+            row = connection.execute(
+                "SELECT COUNT(*), COALESCE(MAX(message_id), 0) FROM staging_queue WHERE channel_id = ?",
+                (int(channel_id),),
+            ).fetchone()
+        return int(row[0]), int(row[1])
+
+    def sync_checkpoint(self, channel_id: int, last_id: int) -> Tuple[int, int]:
+        """按当前断点整理频道积压并返回 (暂存条数, 暂存最大消息 ID)。
+
+        断点之前（含）的消息直接删除；若断点低于积压所基于的断点（手工回拨），整体丢弃该频道积压，
+        让本次从断点重新抓取，避免跳过回拨区间内的消息。
+        """
+        channel_id, last_id = int(channel_id), int(last_id)
+        with sqlite3.connect(self.db_path) as connection:
+            row = connection.execute("SELECT base_id FROM staging_base WHERE channel_id = ?", (channel_id,)).fetchone()
+            if row is not None and last_id < int(row[0]):
+                connection.execute("DELETE FROM staging_queue WHERE channel_id = ?", (channel_id,))
+            else:
+                connection.execute(
+                    "DELETE FROM staging_queue WHERE channel_id = ? AND message_id <= ?",
+                    (channel_id, last_id),
+                )
+            connection.execute(
+                """
+                INSERT INTO staging_base (channel_id, base_id) VALUES (?, ?)
+                ON CONFLICT(channel_id) DO UPDATE SET base_id = excluded.base_id
+                """,
+                (channel_id, last_id),
+            )
+            row = connection.execute(
+                "SELECT COUNT(*), COALESCE(MAX(message_id), 0) FROM staging_queue WHERE channel_id = ?",
+                (channel_id,),
+            ).fetchone()
+            connection.commit()
+        return int(row[0]), int(row[1])
+
+    def prune_channels(self, keep_channel_ids: Iterable[int]) -> int:
+        """删除已不在来源列表中的频道的暂存消息，返回删除条数。"""
+        keep = sorted({int(channel_id) for channel_id in keep_channel_ids})
+        placeholders = ",".join("?" for _ in keep)
+        condition = f"channel_id NOT IN ({placeholders})" if keep else "1 = 1"
+        with sqlite3.connect(self.db_path) as connection:
+            before = connection.total_changes
+            connection.execute(f"DELETE FROM staging_queue WHERE {condition}", keep)
+            deleted = connection.total_changes - before
+            connection.execute(f"DELETE FROM staging_base WHERE {condition}", keep)
+            connection.commit()
+        return deleted
+
+    def list_backlog_ids(self, channel_ids: Iterable[int], per_channel_limit: int) -> Dict[int, List[int]]:
+        """每个频道按消息 ID 正序返回最早的 per_channel_limit 条暂存消息 ID。"""
+        backlog: Dict[int, List[int]] = {}
+        with sqlite3.connect(self.db_path) as connection:
+            for channel_id in channel_ids:
+                rows = connection.execute(
+                    """
+                    SELECT message_id FROM staging_queue
+                    WHERE channel_id = ?
+                    ORDER BY message_id ASC
+                    LIMIT ?
+                    """,
+                    (int(channel_id), max(1, int(per_channel_limit))),
+                ).fetchall()
+                if rows:
+                    backlog[int(channel_id)] = [int(row[0]) for row in rows]
+        return backlog
+
+    def load(self, keys: List[MessageKey]) -> List[MessageEnvelope]:
+        """按给定顺序读回消息；已不在队列中的键会被忽略。"""
+        ids_by_channel: Dict[int, List[int]] = {}
+        for channel_id, message_id in keys:
+            ids_by_channel.setdefault(int(channel_id), []).append(int(message_id))
+
+        loaded: Dict[MessageKey, MessageEnvelope] = {}
+        with sqlite3.connect(self.db_path) as connection:
+            for channel_id, message_ids in ids_by_channel.items():
+                placeholders = ",".join("?" for _ in message_ids)
+                rows = connection.execute(
+                    f"""
+                    SELECT message_id, payload, resolved_url FROM staging_queue
+                    WHERE channel_id = ? AND message_id IN ({placeholders})
+                    """,
+                    (channel_id, *message_ids),
+                ).fetchall()
+                for message_id, payload, resolved_url in rows:
+                    loaded[(channel_id, int(message_id))] = MessageEnvelope.from_record(
+                        channel_id,
+                        int(message_id),
+                        payload,
+                        resolved_url,
+                    )
+
+        return [loaded[key] for key in keys if key in loaded]
+
+    def set_resolved_url(self, channel_id: int, message_id: int, resolved_url: Optional[str]) -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                "UPDATE staging_queue SET resolved_url = ? WHERE channel_id = ? AND message_id = ?",
+                (str(resolved_url or ""), int(channel_id), int(message_id)),
+            )
+            connection.commit()
+
+    def purge_through(self, channel_last_ids: Dict[int, int]) -> int:
+        """删除断点（含）之前的暂存消息，返回删除条数。"""
+        if not channel_last_ids:
+            return 0
+
+        with sqlite3.connect(self.db_path) as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "DELETE FROM staging_queue WHERE channel_id = ? AND message_id <= ?",
+                [(int(channel_id), int(last_id)) for channel_id, last_id in channel_last_ids.items()],
+            )
+            deleted = connection.total_changes - before
+            connection.commit()
+        return deleted
+
+    def count(self) -> int:
+        with sqlite3.connect(self.db_path) as connection:
+            row = connection.execute("SELECT COUNT(*) FROM staging_queue").fetchone()
+        return int(row[0]) if row else 0
@@ -0,0 +1,246 @@
+import asyncio
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Set, Tuple
+
+from .message_analysis import (
+    BOT_TRIGGER_PHRASE,
+    QUARK_TRIGGER_LINK_INLINE_PATTERN,
+    QUARK_TRIGGER_LINK_PAREN_PATTERN,
+    QUARK_TRIGGER_MARKDOWN_PATTERN,
+    MessageAnalysis,
+    _clean_url_token,
+    _has_quark_trigger_phrase,
+)
+
+
+# 每次提交给进程池的消息按工作进程数均分，单块不少于该条数，避免小块的序列化开销超过并行收益。
+TEXT_POOL_MIN_CHUNK_SIZE = 25
+TEXT_POOL_MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class PreparedOutbound:
+    """单条消息的文本处理结果；text 为 None 表示只完成了过滤、尚未生成发送文本。"""
+
+    skip_reason: Optional[str] = None
+    text: Optional[str] = None
+    text_changed: bool = False
+    term_hits: int = 0
+    regex_hits: int = 0
+
+
+def _replace_quark_trigger_segment(text: str, resolved_url: str) -> str:
+    content = str(text or "")
+    replacement = str(resolved_url or "").strip()
+    if not replacement:
+        return content
+
+    content = QUARK_TRIGGER_MARKDOWN_PATTERN.sub(replacement, content)
+
+    content = QUARK_TRIGGER_LINK_PAREN_PATTERN.sub(f"{replacement} ({replacement})", content)
+    content = QUARK_TRIGGER_LINK_INLINE_PATTERN.sub(f"{replacement} {replacement}", content)
+
+    if BOT_TRIGGER_PHRASE in content:
+        content = content.replace(BOT_TRIGGER_PHRASE, replacement)
+    return content
+
+
+def _materialize_text_url_entities(analysis: MessageAnalysis, skip_urls: Optional[Set[str]] = None) -> str:
+    content = analysis.text
+    if not content or not analysis.text_url_links:
+        return content
+
+    skip_link_set = {_clean_url_token(item) for item in (skip_urls or set()) if str(item).strip()}
+
+    pair_candidates: List[tuple[str, str]] = []
+    for entity_text, entity_url in analysis.text_url_links:
+        anchor_text = str(entity_text or "").strip()
+        if not entity_url or entity_url in skip_link_set:
+            continue
+        if BOT_TRIGGER_PHRASE in anchor_text:
+            continue
+        pair_candidates.append((anchor_text, entity_url))
+
+    append_later: List[str] = []
+    for anchor_text, entity_url in pair_candidates:
+        if entity_url in content:
+            continue
+
+        replacement = f"{anchor_text} ({entity_url})" if anchor_text else entity_url
+        if anchor_text and anchor_text in content:
+            content = content.replace(anchor_text, replacement, 1)
+        else:
+            append_later.append(replacement)
+
+    for item in append_later:
+        normalized_item = str(item or "").strip()
+        if not normalized_item or normalized_item in content:
+            continue
+        content = f"{content}\n{normalized_item}" if content else normalized_item
+
+    return content
+
+
+def _apply_text_replacements(
+    text: str,
+    replacement_terms: List[str],
+    replacement_regex_rules: List[re.Pattern[str]],
+) -> tuple[str, int, int]:
+    updated = str(text or "")
+    term_hits = 0
+    regex_hits = 0
+
+    for term in replacement_terms:
+        token = str(term or "")
+        if not token:
+            continue
+        hit_count = updated.count(token)
+        if hit_count > 0:
+            updated = updated.replace(token, "")
+            term_hits += hit_count
+
+    for pattern in replacement_regex_rules:
+        updated, hit_count = pattern.subn("", updated)
+        regex_hits += int(hit_count)
+
+    return updated, term_hits, regex_hits
+
+
+def screen_message(
+    analysis: MessageAnalysis,
+    has_media: bool,
+    keyword_blacklist: List[str],
+    user_blacklist: Set[int],
+) -> Optional[str]:
+    """关键词/用户黑名单与空消息过滤，命中时返回跳过原因。"""
+    if keyword_blacklist and analysis.lower_text:
+        if any(keyword in analysis.lower_text for keyword in keyword_blacklist):
+            return "skipped_keyword"
+
+    if user_blacklist and not analysis.mention_user_ids.isdisjoint(user_blacklist):
+        return "skipped_user_blacklist"
+
+    if not analysis.text and not has_media:
+        return "skipped_no_content"
+    return None
+
+
+def build_outbound_text(
+    analysis: MessageAnalysis,
+    has_entities: bool,
+    resolved_url: Optional[str],
+    replacement_terms: List[str],
+    replacement_regex_rules: List[re.Pattern[str]],
+) -> PreparedOutbound:
+    """生成待发送文本：替换触发词、执行择词规则，正文改动时还原蓝字链接。"""
+    original_text = analysis.text
+    outbound_text = original_text
+    term_hits = 0
+    regex_hits = 0
+
+    if resolved_url and _has_quark_trigger_phrase(outbound_text):
+        outbound_text = _replace_quark_trigger_segment(outbound_text, resolved_url)
+
+    if outbound_text:
+        outbound_text, term_hits, regex_hits = _apply_text_replacements(
+            outbound_text,
+            replacement_terms,
+            replacement_regex_rules,
+        )
+        outbound_text = outbound_text.strip()
+
+    text_changed = outbound_text != original_text
+
+    if text_changed and has_entities:
+        outbound_with_links = _materialize_text_url_entities(analysis, set(analysis.trigger_bot_links))
+
+        if resolved_url and _has_quark_trigger_phrase(outbound_with_links):
+            outbound_with_links = _replace_quark_trigger_segment(outbound_with_links, resolved_url)
+
+        outbound_with_links, _, _ = _apply_text_replacements(
+            outbound_with_links,
+            replacement_terms,
+            replacement_regex_rules,
+        )
+        outbound_text = outbound_with_links.strip()
+
+    return PreparedOutbound(
+        text=outbound_text,
+        text_changed=text_changed,
+        term_hits=term_hits,
+        regex_hits=regex_hits,
+    )
+
+
+def _screen_chunk(
+    items: List[Tuple[MessageAnalysis, bool]],
+    keyword_blacklist: List[str],
+    user_blacklist: Set[int],
+) -> List[Optional[str]]:
+    return [screen_message(analysis, has_media, keyword_blacklist, user_blacklist) for analysis, has_media in items]
+
+
+def _build_chunk(
+    items: List[Tuple[MessageAnalysis, bool, Optional[str]]],
+    replacement_terms: List[str],
+    replacement_regex_patterns: List[str],
+) -> List[PreparedOutbound]:
+    # 正则以源码传入并在工作进程内编译，与主进程 re.compile(pattern) 的结果一致。
+    regex_rules = [re.compile(pattern) for pattern in replacement_regex_patterns]
+    return [
+        build_outbound_text(analysis, has_entities, resolved_url, replacement_terms, regex_rules)
+        for analysis, has_entities, resolved_url in items
+    ]
+
+
+def _split_chunks(items: Sequence, parts: int = TEXT_POOL_MAX_WORKERS) -> List[Sequence]:
+    """把一批消息均分为最多 parts 块（每块不少于 TEXT_POOL_MIN_CHUNK_SIZE 条），各块由不同工作进程并行处理。"""
+    chunk_size = max(TEXT_POOL_MIN_CHUNK_SIZE, -(-len(items) // max(1, parts)))
+    return [items[index : index + chunk_size] for index in range(0, len(items), chunk_size)]
+
+
+def open_text_pool(item_count: int, max_workers: int = TEXT_POOL_MAX_WORKERS) -> ProcessPoolExecutor:
+    chunk_count = max(1, -(-item_count // TEXT_POOL_MIN_CHUNK_SIZE))
+    # 面板进程内有事件循环与线程，使用 spawn 避免 fork 继承锁状态。
+    return ProcessPoolExecutor(
+        max_workers=max(1, min(max_workers, chunk_count)),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+async def screen_in_pool(
+    pool: ProcessPoolExecutor,
+    items: List[Tuple[MessageAnalysis, bool]],
+    keyword_blacklist: List[str],
+    user_blacklist: Set[int],
+) -> List[Optional[str]]:
+    loop = asyncio.get_running_loop()
+    futures = [
+        loop.run_in_executor(pool, _screen_chunk, list(chunk), list(keyword_blacklist), set(user_blacklist))
+        for chunk in _split_chunks(items)
+    ]
+    results: List[Optional[str]] = []
+    for chunk_result in await asyncio.gather(*futures):
+        results.extend(chunk_result)
+    return results
+
+
+async def build_in_pool(
+    pool: ProcessPoolExecutor,
+    items: List[Tuple[MessageAnalysis, bool, Optional[str]]],
+    replacement_terms: List[str],
+    replacement_regex_rules: List[re.Pattern[str]],
+) -> List[PreparedOutbound]:
+    loop = asyncio.get_running_loop()
+    patterns = [rule.pattern for rule in replacement_regex_rules]
+    futures = [
+        loop.run_in_executor(pool, _build_chunk, list(chunk), list(replacement_terms), patterns)
+        for chunk in _split_chunks(items)
+    ]
+    results: List[PreparedOutbound] = []
+    for chunk_result in await asyncio.gather(*futures):
+        results.extend(chunk_result)
+    return results
@@ -0,0 +1,47 @@
+"""独立转发进程：python -m app.worker。
+
+面板以 PANEL_WORKER_MODE=external 启动时不持有 Telegram 客户端，由本进程运行默认任务、附加任务、实时转发、
+历史回填与 RSS 刷新，并通过 panel.db 中的 worker_commands / worker_status 表与面板交换命令和状态。
+worker 与多进程面板使用同一个转发租约：同时启动多个 worker 时只有一个在工作，其余作为备用进程在其退出后接管。
+"""
+
+import asyncio
+import os
+import signal
+
+from .logging_utils import rebind_logger_file_handler
+
+
+async def main() -> int:
+    if os.environ.get("PANEL_WORKER_MODE", "").strip().lower() != "external":
+        print("请在面板与 worker 进程中都设置 PANEL_WORKER_MODE=external 后再启动独立转发进程。")
+        return 2
+
+    from . import main as panel
+
+    rebind_logger_file_handler(panel.logger, panel.config_store.worker_log_file)
+    panel.prepare_storage()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop_event.set)
+
+    await panel.update_forwarding_leadership()
+    if not panel.forwarding_leader:
+        panel.logger.info("已有其他转发进程持有租约，本进程（PID %s）作为备用进程等待接管。", os.getpid())
+    try:
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=panel.LEADER_RENEW_SECONDS)
+            except asyncio.TimeoutError:
+                await panel.renew_forwarding_leadership()
+    finally:
+        if panel.forwarding_leader:
+            await panel.release_forwarding_leadership()
+        panel.logger.info("独立转发进程已退出（PID %s）。", os.getpid())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
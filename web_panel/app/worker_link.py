@@ -0,0 +1,199 @@
+import asyncio
+import contextlib
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .time_utils import now_shanghai_iso
+
+from .worker_store import WorkerChannelStore
+
+
+# worker 写入状态快照的间隔；超过 WORKER_STALE_SECONDS 没有心跳视为离线。
+WORKER_HEARTBEAT_SECONDS = 2
+WORKER_STALE_SECONDS = 15
+WORKER_CALL_TIMEOUT_SECONDS = 15
+WORKER_POLL_INTERVAL_SECONDS = 0.2
+# 替换会话文件期间 worker 断开客户端并暂停使用会话；面板异常退出未发出结束命令时，到时自动恢复。
+WORKER_SESSION_HOLD_SECONDS = 120
+# 已结束命令在 panel.db 中保留的时长与清理间隔。
+WORKER_COMMAND_RETENTION_SECONDS = 3600
+WORKER_PRUNE_INTERVAL_SECONDS = 600
+
+
+class WorkerUnavailableError(RuntimeError):
+    """独立转发进程未运行或未在时限内响应。"""
+
+
+class WorkerLink:
+    """面板侧的 worker 通道：把控制命令写入 panel.db 并等待 worker 执行结果，读取 worker 的状态快照。
+
+    面板进程不持有 Telegram 客户端，转发、实时转发、历史回填、RSS 刷新与来源解析都在 worker 进程中执行，
+    页面与 RSS 请求的响应不受转发负载影响。
+    """
+
+    def __init__(self, store: WorkerChannelStore, logger):
+        self.store = store
+        self.logger = logger
+
+    def status_record(self) -> Optional[Dict[str, Any]]:
+        """worker 在线时返回最近一次状态记录，离线返回 None。"""
+        record = self.store.read_status()
+        if record is None or record["heartbeat_age_seconds"] > WORKER_STALE_SECONDS:
+            return None
+        return record
+
+    @property
+    def is_online(self) -> bool:
+        return self.status_record() is not None
+
+    def status_payload(self, mode: str = "external") -> Dict[str, Any]:
+        record = self.status_record()
+        return {
+            "mode": mode,
+            "online": record is not None,
+            "pid": record["pid"] if record else None,
+            "started_at": record["started_at"] if record else None,
+            "heartbeat_at": record["heartbeat_at"] if record else None,
+        }
+
+    def send(self, command: str, payload: Dict[str, Any], ttl_seconds: float = 60) -> int:
+        """只投递命令，不等待结果（如后台 RSS 刷新）。"""
+        return self.store.enqueue(command, payload, ttl_seconds)
+
+    async def call(self, command: str, payload: Dict[str, Any], timeout: float = WORKER_CALL_TIMEOUT_SECONDS) -> Any:
+        if not self.is_online:
+            raise WorkerUnavailableError("负责转发的进程未运行或正在切换，请稍后重试；独立 worker 模式下请检查 python -m app.worker 进程。")
+
+        command_id = self.store.enqueue(command, payload, timeout)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            outcome = self.store.get_result(command_id)
+            if outcome is not None:
+                status, result, error = outcome
+                if status == "done":
+                    return result
+                if status == "expired":
+                    break
+                raise RuntimeError(error or "worker 执行命令失败")
+            await asyncio.sleep(WORKER_POLL_INTERVAL_SECONDS)
+        raise WorkerUnavailableError(f"负责转发的进程在 {int(timeout)} 秒内没有响应命令 {command}。")
+
+    @contextlib.asynccontextmanager
+    async def session_write(self, account_name: str = ""):
+        """替换或删除会话文件期间持有：先让 worker 断开对应客户端并暂停使用会话，写入完成后恢复。
+
+        worker 离线时没有进程持有会话文件，直接写入。
+        """
+        hold_id: Optional[int] = None
+        if self.is_online:
+            hold_id = await self.call(
+                "session_write_begin",
+                {"account_name": account_name, "hold_seconds": WORKER_SESSION_HOLD_SECONDS},
+            )
+        try:
+            yield
+        finally:
+            if hold_id is not None:
+                self.send("session_write_end", {"hold_id": hold_id})
+
+
+class WorkerCommandServer:
+    """执行面板命令的一侧：定期写入状态快照，领取 worker_commands 中的命令交给处理函数执行并写回结果。
+
+    由独立 worker 进程或多进程部署中持有主进程租约的面板进程运行。
+    """
+
+    def __init__(
+        self,
+        store: WorkerChannelStore,
+        logger,
+        handlers: Dict[str, Callable[..., Awaitable[Any]]],
+        collect_status: Callable[[], Dict[str, Any]],
+        session_writer: Callable[[str], Any],
+    ):
+        self.store = store
+        self.logger = logger
+        self.handlers = handlers
+        self.collect_status = collect_status
+        self.session_writer = session_writer
+        self.pid = os.getpid()
+        self.started_at = now_shanghai_iso()
+        self._tasks: set[asyncio.Task] = set()
+        self._session_holds: Dict[int, asyncio.Event] = {}
+
+    async def serve(self, stop_event: asyncio.Event) -> None:
+        abandoned = self.store.abandon_running()
+        if abandoned > 0:
+            self.logger.info("上一转发进程有 %s 条命令未执行完，已标记为失败。", abandoned)
+        last_heartbeat = 0.0
+        last_prune = 0.0
+        try:
+            while not stop_event.is_set():
+                now = time.monotonic()
+                if now - last_heartbeat >= WORKER_HEARTBEAT_SECONDS:
+                    self.store.write_status(self.pid, self.started_at, self.collect_status())
+                    last_heartbeat = now
+                if now - last_prune >= WORKER_PRUNE_INTERVAL_SECONDS:
+                    self.store.prune(WORKER_COMMAND_RETENTION_SECONDS)
+                    last_prune = now
+                for command in self.store.claim_pending():
+                    task = asyncio.create_task(self._execute(command))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=WORKER_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for hold_event in self._session_holds.values():
+                hold_event.set()
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self.store.clear_status(self.pid)
+
+    async def _execute(self, command: Dict[str, Any]) -> None:
+        command_id = command["id"]
+        name = command["command"]
+        payload = command["payload"]
+        try:
+            if name == "session_write_begin":
+                await self._hold_session(command_id, payload)
+                return
+            if name == "session_write_end":
+                hold_event = self._session_holds.get(int(payload.get("hold_id", 0)))
+                if hold_event is not None:
+                    hold_event.set()
+                self.store.finish(command_id, True)
+                return
+            handler = self.handlers.get(name)
+            if handler is None:
+                self.store.finish(command_id, error=f"未知命令：{name}")
+                return
+            result = await handler(**payload)
+            self.store.finish(command_id, result)
+        except asyncio.CancelledError:
+            self.store.finish(command_id, error="转发进程正在退出")
+            raise
+        except Exception as exc:
+            self.logger.warning("执行面板命令 %s 失败: %s", name, exc)
+            self.store.finish(command_id, error=str(exc))
+
+    async def _hold_session(self, command_id: int, payload: Dict[str, Any]) -> None:
+        """断开使用该会话的客户端并暂停使用，直到面板发出结束命令或超过持有时限。
+
+        确认（结果为 hold_id）在进入持有状态后才写回，面板随后才开始替换会话文件。
+        """
+        hold_seconds = float(payload.get("hold_seconds", WORKER_SESSION_HOLD_SECONDS))
+        hold_event = asyncio.Event()
+        self._session_holds[command_id] = hold_event
+        try:
+            async with self.session_writer(str(payload.get("account_name", "") or "")):
+                self.store.finish(command_id, command_id)
+                try:
+                    await asyncio.wait_for(hold_event.wait(), timeout=hold_seconds)
+                except asyncio.TimeoutError:
+                    self.logger.warning("面板未在 %s 秒内结束会话写入，已恢复使用会话。", int(hold_seconds))
+        finally:
+            self._session_holds.pop(command_id, None)
@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .time_utils import now_shanghai_iso
+
+
+class WorkerChannelStore:
+    """面板与独立转发进程之间的命令/状态通道：面板写入命令，worker 领取执行后写回结果；
+    worker 定期把运行状态快照写入 worker_status，面板读取快照展示状态。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS worker_commands (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    command TEXT NOT NULL,
+                    payload_json TEXT NOT NULL DEFAULT '{}',
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    result_json TEXT NOT NULL DEFAULT '',
+                    error TEXT NOT NULL DEFAULT '',
+                    expires_ts REAL NOT NULL,
+                    created_ts REAL NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS worker_status (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    pid INTEGER NOT NULL,
+                    payload_json TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    heartbeat_ts REAL NOT NULL,
+                    heartbeat_at TEXT NOT NULL
+                )
+                """
+            )
+            connection.commit()
+
+    def enqueue(self, command: str, payload: Dict[str, Any], ttl_seconds: float) -> int:
+        now_ts = time.time()
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute(
+                "INSERT INTO worker_commands (command, payload_json, expires_ts, created_ts) VALUES (?, ?, ?, ?)",
+                (command, json.dumps(payload, ensure_ascii=False), now_ts + ttl_seconds, now_ts),
+            )
+            connection.commit()
+            return int(cursor.lastrowid)
+
+    def claim_pending(self) -> List[Dict[str, Any]]:
+        """领取待执行命令并标记为执行中；已过期的命令（面板已不再等待）直接丢弃。"""
+        now_ts = time.time()
+        with sqlite3.connect(self.db_path, isolation_level=None) as connection:
+            connection.row_factory = sqlite3.Row
+            # 每 0.2 秒轮询一次，没有待执行命令时只做一次只读查询，不占用写锁。
+            if connection.execute("SELECT 1 FROM worker_commands WHERE status = 'pending' LIMIT 1").fetchone() is None:
+                return []
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "UPDATE worker_commands SET status = 'expired' WHERE status = 'pending' AND expires_ts < ?",
+                (now_ts,),
+            )
+            rows = connection.execute(
+                "SELECT id, command, payload_json FROM worker_commands WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+            if rows:
+                connection.executemany(
+                    "UPDATE worker_commands SET status = 'running' WHERE id = ?",
+                    [(int(row["id"]),) for row in rows],
+                )
+            connection.execute("COMMIT")
+        return [
+            {"id": int(row["id"]), "command": str(row["command"]), "payload": json.loads(row["payload_json"] or "{}")}
+            for row in rows
+        ]
+
+    def finish(self, command_id: int, result: Any = None, error: str = "") -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                "UPDATE worker_commands SET status = ?, result_json = ?, error = ? WHERE id = ?",
+                (
+                    "failed" if error else "done",
+                    json.dumps(result, ensure_ascii=False),
+                    str(error or ""),
+                    int(command_id),
+                ),
+            )
+            connection.commit()
+
+    def get_result(self, command_id: int) -> Optional[Tuple[str, Any, str]]:
+        """命令已结束时返回 (状态, 结果, 错误)，否则返回 None。"""
+        with sqlite3.connect(self.db_path) as connection:
+            row = connection.execute(
+                "SELECT status, result_json, error FROM worker_commands WHERE id = ?",
+                (int(command_id),),
+            ).fetchone()
+        if row is None or row[0] in {"pending", "running"}:
+            return None
+        return str(row[0]), json.loads(row[1]) if row[1] else None, str(row[2] or "")
+
+    def prune(self, older_than_seconds: float = 3600) -> int:
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute(
+                "DELETE FROM worker_commands WHERE status NOT IN ('pending', 'running') AND created_ts < ?",
+                (time.time() - older_than_seconds,),
+            )
+            connection.commit()
+            return cursor.rowcount
+
+    def abandon_running(self) -> int:
+        """worker 重启时，上一进程未执行完的命令标记为失败，避免面板一直等待。"""
+        with sqlite3.connect(self.db_path) as connection:
+            cursor = connection.execute(
+                "UPDATE worker_commands SET status = 'failed', error = 'worker 已重启' WHERE status = 'running'"
+            )
+            connection.commit()
+            return cursor.rowcount
+
+    def write_status(self, pid: int, started_at: str, payload: Dict[str, Any]) -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO worker_status (id, pid, payload_json, started_at, heartbeat_ts, heartbeat_at)
+                VALUES (1, ?, ?, ?, ?, ?)
+                """,
+                (int(pid), json.dumps(payload, ensure_ascii=False), started_at, time.time(), now_shanghai_iso()),
+            )
+            connection.commit()
+
+    def read_status(self) -> Optional[Dict[str, Any]]:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.row_factory = sqlite3.Row
+            row = connection.execute("SELECT * FROM worker_status WHERE id = 1").fetchone()
+        if row is None:
+            return None
+        return {
+            "pid": int(row["pid"]),
+            "payload": json.loads(row["payload_json"] or "{}"),
+            "started_at": str(row["started_at"]),
+            "heartbeat_age_seconds": max(0.0, time.time() - float(row["heartbeat_ts"])),
+            "heartbeat_at": str(row["heartbeat_at"]),
+        }
+
+    def clear_status(self, pid: int) -> None:
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute("DELETE FROM worker_status WHERE id = 1 AND pid = ?", (int(pid),))
+            connection.commit()
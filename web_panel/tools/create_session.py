@@ -1,4 +1,6 @@
+import argparse
 import os
+import re
 from pathlib import Path
 
 from dotenv import dotenv_values
@@ -11,6 +13,7 @@ DATA_DIR = Path(os.environ.get("DATA_DIR", str(ROOT_DIR / "data"))).resolve()
 ENV_FILE = DATA_DIR / "config.env"
 SESSION_DIR = DATA_DIR / "session"
 SESSION_BASE_PATH = SESSION_DIR / "t2rss"
+ACCOUNT_SESSION_DIR = SESSION_DIR / "accounts"
 
 
 def load_config() -> dict[str, str]:
@@ -29,20 +32,30 @@ def load_config() -> dict[str, str]:
     return values
 
 
-def create_session() -> None:
+def create_session(account: str = "") -> None:
     config = load_config()
     api_id = config.get("API_ID", "").strip()
     api_hash = config.get("API_HASH", "").strip()
     phone = config.get("PHONE", "").strip()
     password = config.get("PASSWORD", "").strip()
+    session_base_path = SESSION_BASE_PATH
+
+    if account:
+        # 账号池会话：手机号与两步验证密码属于另一个账号，不使用配置中的值。
+        if not re.match(r"^[A-Za-z0-9_-]{1,32}$", account):
+            print("账号名称只能包含字母、数字、下划线和短横线（最多 32 个字符）。")
+            return
+        phone = input("请输入该账号的手机号：").strip()
+        password = ""
+        session_base_path = ACCOUNT_SESSION_DIR / account
 
     if not api_id or not api_hash or not phone:
         print("缺少必要配置，请先在 data/config.env 中设置 API_ID、API_HASH、PHONE。")
         return
 
-    SESSION_DIR.mkdir(parents=True, exist_ok=True)
+    session_base_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with TelegramClient(str(SESSION_BASE_PATH), int(api_id), api_hash) as client:
+    with TelegramClient(str(session_base_path), int(api_id), api_hash) as client:
         if not client.is_user_authorized():
             client.send_code_request(phone)
             code = input("请输入 Telegram 验证码：").strip()
@@ -55,10 +68,12 @@ def create_session() -> None:
                 client.sign_in(password=password)
 
         if client.is_user_authorized():
-            print(f"会话创建成功：{SESSION_BASE_PATH}.session")
+            print(f"会话创建成功：{session_base_path}.session")
         else:
             print("会话创建失败。")
 
 
 if __name__ == "__main__":
-    create_session()
+    parser = argparse.ArgumentParser(description="创建 Telegram 会话文件。")
+    parser.add_argument("--account", default="", help="为账号池创建会话，保存为 session/accounts/<名称>.session")
+    create_session(parser.parse_args().account)
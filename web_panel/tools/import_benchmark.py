@@ -0,0 +1,98 @@
+"""面板与命令行入口的导入耗时检查：python tools/import_benchmark.py。
+
+在空的临时数据目录中以 python -X importtime 导入各入口模块，取多次中的最短耗时与预算比较，
+并检查导入期间没有加载 Telethon / Pillow、没有读写数据目录。任一项不满足时以退出码 1 结束，可直接放进 CI。
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# 入口模块 -> 导入耗时预算（秒）。app.main 的大部分耗时在 FastAPI 本身。
+IMPORT_BUDGETS_SECONDS = {
+    "app.main": 1.0,
+    "app.cli": 0.15,
+}
+# 只应在首次使用时才导入的重量级依赖。
+LAZY_PACKAGES = ("telethon", "PIL")
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """解析 -X importtime 输出：模块名 -> (自身耗时, 累计耗时)，单位微秒。"""
+    timings: dict[str, tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        timings[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return timings
+
+
+def measure(module: str) -> tuple[dict[str, tuple[int, int]], list[str]]:
+    """在空数据目录中导入一次模块，返回耗时表与导入后数据目录中出现的文件。"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {**os.environ, "DATA_DIR": data_dir, "PYTHONDONTWRITEBYTECODE": "1"}
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"导入 {module} 失败:\n{completed.stderr[-2000:]}")
+        created = sorted(str(path.relative_to(data_dir)) for path in Path(data_dir).rglob("*"))
+    return parse_importtime(completed.stderr), created
+
+
+def check_module(module: str, budget_seconds: float, runs: int, top: int) -> list[str]:
+    best_seconds = None
+    best_timings: dict[str, tuple[int, int]] = {}
+    problems: list[str] = []
+    for _ in range(max(1, runs)):
+        timings, created = measure(module)
+        if created:
+            problems.append(f"{module} 导入时写入了数据目录: {', '.join(created[:5])}")
+        seconds = timings.get(module, (0, 0))[1] / 1_000_000
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds, best_timings = seconds, timings
+
+    loaded_lazy = sorted({name.split(".")[0] for name in best_timings if name.split(".")[0] in LAZY_PACKAGES})
+    if loaded_lazy:
+        problems.append(f"{module} 导入时加载了应按需导入的依赖: {', '.join(loaded_lazy)}")
+    if best_seconds > budget_seconds:
+        problems.append(f"{module} 导入耗时 {best_seconds:.3f} 秒，超过预算 {budget_seconds:.3f} 秒")
+
+    print(f"{module}: {best_seconds:.3f} 秒（预算 {budget_seconds:.3f} 秒，{runs} 次取最短）")
+    slowest = sorted(best_timings.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000:8.1f} ms 自身  {cumulative_us / 1000:8.1f} ms 累计  {name}")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="检查面板与命令行入口的导入耗时")
+    parser.add_argument("--runs", type=int, default=3, help="每个模块导入的次数，取最短耗时")
+    parser.add_argument("--top", type=int, default=10, help="列出自身耗时最长的模块数")
+    parser.add_argument("--scale", type=float, default=1.0, help="预算倍数，较慢的 CI 机器上可适当放宽")
+    args = parser.parse_args()
+
+    problems: list[str] = []
+    for module, budget_seconds in IMPORT_BUDGETS_SECONDS.items():
+        problems.extend(check_module(module, budget_seconds * args.scale, args.runs, args.top))
+
+    for problem in problems:
+        print(f"失败: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())